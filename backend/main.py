@@ -2,11 +2,16 @@
 InnerWorld Edu - FastAPI Backend
 UGC платформа для создания образовательных квестов через AI
 """
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import os
+import time
 from dotenv import load_dotenv
 
+from src.core.metrics import REGISTRY, CONTENT_TYPE, start_event_loop_monitor
+from src.core.watchdog import start_watchdog
+
 # Загрузка переменных окружения
 load_dotenv()
 
@@ -17,6 +22,14 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Метрики (общий реестр с ботом, см. src/core/metrics.py)
+HTTP_REQUESTS = REGISTRY.counter(
+    "innerworld_http_requests_total", "Backend HTTP requests", ["method", "route", "status"]
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "innerworld_http_request_duration_seconds", "Backend HTTP request latency", ["method", "route"]
+)
+
 
 # Создание таблиц при старте (для MVP - без миграций)
 @app.on_event("startup")
@@ -34,6 +47,49 @@ async def startup_event():
         print(f"⚠️ Database initialization failed: {e}")
         print("   Continue without database (some endpoints will fail)")
 
+    _register_db_pool_metrics()
+    app.state.loop_lag_monitor = start_event_loop_monitor()
+    start_watchdog()
+
+
+def _register_db_pool_metrics():
+    """Статистика пула соединений БД (читается при scrape)"""
+    try:
+        from backend.database import engine
+    except Exception:
+        return
+
+    pool = engine.sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return  # NullPool / StaticPool - нечего считать
+
+    REGISTRY.register_callback(
+        "innerworld_db_pool_connections", "Database pool connections by state",
+        lambda: {
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "size": pool.size()
+        },
+        labelnames=["state"]
+    )
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Латентность и количество запросов по шаблону роута (не по URL)"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        HTTP_REQUESTS.labels(request.method, path, status).inc()
+        HTTP_REQUEST_SECONDS.labels(request.method, path).observe(time.perf_counter() - started)
+
 # CORS настройка (для фронтенда)
 app.add_middleware(
     CORSMiddleware,
@@ -61,19 +117,44 @@ async def root():
 @app.get("/health")
 async def health():
     """Detailed health check"""
+    database = await _check_database()
     return {
-        "status": "healthy",
-        "database": "not_connected",  # TODO: добавить проверку БД
-        "openai_api": "not_checked"   # TODO: добавить проверку OpenAI
+        "status": "healthy" if database == "connected" else "degraded",
+        "database": database,
+        "openai_api": "configured" if os.getenv("OPENAI_API_KEY") else "not_configured"
     }
 
 
+async def _check_database(timeout: float = 2.0) -> str:
+    """SELECT 1 через пул (с таймаутом, чтобы /health не висел)"""
+    try:
+        from sqlalchemy import text
+        from backend.database import engine
+
+        async def ping():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+
+        await asyncio.wait_for(ping(), timeout)
+        return "connected"
+    except Exception:
+        return "not_connected"
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 # Импорт роутеров
 from backend.api import builder, quests
+from src.core.admin import router as admin_router
 
 # Подключение роутеров
 app.include_router(builder.router, prefix="/api/builder", tags=["AI Quest Builder"])
 app.include_router(quests.router, prefix="/api/quests", tags=["Quests"])
+app.include_router(admin_router)  # /debug/* (watchdog, профилирование), нужен X-Admin-Token
 
 # TODO: Добавить остальные роутеры
 # from backend.api import users, moderation
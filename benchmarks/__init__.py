@@ -0,0 +1 @@
+"""Microbenchmarks for InnerWorld Edu hot paths (run: python -m benchmarks.run)."""
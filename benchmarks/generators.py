@@ -0,0 +1,199 @@
+"""
+Synthetic data generators for benchmarks.
+
+Sizes follow what production sees: child messages of 10-300 characters
+with a few emotion keywords, profiles with a few months of history, quests
+of 5-12 steps across all educational locations.
+
+All generators take a random.Random so runs are reproducible.
+"""
+
+import random
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import yaml
+
+from src.config import EDUCATIONAL_LOCATIONS
+from src.orchestration.emotional_router import EmotionalRouter, EmotionalState
+from src.orchestration.learning_profile import LearningProfile, LearningDimension
+from src.data.user_manager import UserProfile, UserProgress, ScreeningMetrics
+
+FILLER_WORDS = [
+    "сегодня", "в", "школе", "мы", "решали", "задачи", "и", "читали", "текст",
+    "учительница", "сказала", "что", "надо", "повторить", "дома", "я", "думаю",
+    "это", "про", "дроби", "и", "проценты", "потом", "была", "перемена", "друг",
+    "показал", "игру", "мама", "спросила", "про", "оценки", "а", "ещё", "урок",
+]
+
+ALL_KEYWORDS = [
+    keyword
+    for keywords in EmotionalRouter.EMOTION_KEYWORDS.values()
+    for keyword in keywords
+]
+
+
+def make_message(rng: random.Random, min_length: int = 10, max_length: int = 300) -> str:
+    """Make one child message with 0-3 emotion keywords."""
+    target = rng.randint(min_length, max_length)
+    words: List[str] = []
+    keywords = rng.sample(ALL_KEYWORDS, rng.randint(0, 3))
+
+    while sum(len(w) + 1 for w in words) < target:
+        if keywords and rng.random() < 0.15:
+            words.append(keywords.pop())
+        else:
+            words.append(rng.choice(FILLER_WORDS))
+
+    words.extend(keywords)
+    return " ".join(words).capitalize()
+
+
+def make_messages(count: int, rng: random.Random) -> List[str]:
+    """Make count child messages."""
+    return [make_message(rng) for _ in range(count)]
+
+
+def make_learning_profile(rng: random.Random, history_size: int = 50) -> LearningProfile:
+    """Make learning profile with history_size readings."""
+    profile = LearningProfile(
+        understanding_meaning=rng.randint(2, 9),
+        memory=rng.randint(2, 9),
+        attention=rng.randint(2, 9),
+        motivation=rng.randint(2, 9)
+    )
+    dimensions = list(LearningDimension)
+    for index in range(history_size):
+        profile.set_dimension(
+            rng.choice(dimensions),
+            rng.randint(1, 10),
+            source=f"quest_{index % 12}_completed"
+        )
+    return profile
+
+
+def make_user_profile(user_id: str, rng: random.Random) -> UserProfile:
+    """Make a stored user profile of typical size."""
+    learning = make_learning_profile(rng, history_size=0)
+    screening = ScreeningMetrics(
+        self_worth=round(rng.uniform(0.2, 0.9), 2),
+        self_criticism=round(rng.uniform(0.1, 0.8), 2),
+        emotional_volatility=round(rng.uniform(0.1, 0.8), 2),
+        manipulation_score=rng.randint(0, 3),
+        emotional_storm_count=rng.randint(0, 4)
+    )
+
+    return UserProfile(
+        user_id=user_id,
+        child_name=rng.choice(["Саша", "Маша", "Петя", "Аня", "Дима"]),
+        age=rng.randint(7, 14),
+        parent_linked=True,
+        link_id=f"link_{user_id}",
+        parent_id=f"parent_{user_id}",
+        learning_profile=learning.to_dict(),
+        progress=asdict(UserProgress(
+            level=rng.randint(1, 10),
+            xp=rng.randint(0, 5000),
+            streak_days=rng.randint(0, 30),
+            last_activity_date="2025-01-15",
+            total_quests_completed=rng.randint(0, 40),
+            total_time_minutes=rng.randint(0, 2000)
+        )),
+        current_location=rng.choice(EDUCATIONAL_LOCATIONS),
+        current_quest=f"{rng.choice(EDUCATIONAL_LOCATIONS)}_quest_01",
+        quest_step=rng.randint(0, 5),
+        screening=asdict(screening)
+    )
+
+
+def make_user_state(user_id: str, rng: random.Random):
+    """Make in-memory UserState with message history."""
+    from langchain_core.messages import HumanMessage, AIMessage
+    from src.orchestration.state_manager import UserState
+
+    state = UserState(
+        user_id=user_id,
+        child_name="Саша",
+        age=rng.randint(7, 14),
+        learning_profile=make_learning_profile(rng),
+        current_location=rng.choice(EDUCATIONAL_LOCATIONS),
+        emotional_state=rng.choice(list(EmotionalState)),
+        parent_linked=True,
+        link_id=f"link_{user_id}"
+    )
+    for message in make_messages(20, rng):
+        state.message_history.append(HumanMessage(content=message))
+        state.message_history.append(AIMessage(content=message[::-1]))
+    return state
+
+
+def make_quest_data(quest_id: str, location: str, steps: int, rng: random.Random) -> Dict[str, Any]:
+    """Make quest dict in the YAML quest format (see src/data/quests)."""
+    quest_steps = []
+    for index in range(steps):
+        if index % 2:
+            quest_steps.append({
+                "id": f"step_{index + 1}",
+                "type": "choice",
+                "prompt": make_message(rng, 40, 120),
+                "options": [
+                    {"text": make_message(rng, 10, 40), "score": round(rng.random(), 1),
+                     "feedback": make_message(rng, 30, 90)}
+                    for _ in range(3)
+                ]
+            })
+        else:
+            quest_steps.append({
+                "id": f"step_{index + 1}",
+                "type": "input_text",
+                "prompt": make_message(rng, 40, 160),
+                "validation": {"min_length": 2, "max_length": 200},
+                "hint": make_message(rng, 20, 80)
+            })
+
+    return {
+        "id": quest_id,
+        "title": make_message(rng, 10, 30),
+        "location": location,
+        "psychological_module": "module_15_metacognition",
+        "difficulty": rng.choice(["easy", "medium", "hard"]),
+        "estimated_time_minutes": rng.randint(5, 20),
+        "target_learning_profile": {d.value: "medium" for d in LearningDimension},
+        "description": make_message(rng, 100, 300),
+        "steps": quest_steps,
+        "completion_message": make_message(rng, 40, 120),
+        "rewards": {
+            "experience_points": rng.randint(50, 200),
+            "learning_profile": {"understanding_meaning": 1}
+        },
+        "reality_bridge": {
+            "id": f"{quest_id}_bridge",
+            "title": make_message(rng, 10, 30),
+            "description": make_message(rng, 60, 160),
+            "deadline_hours": 48,
+            "reminder_hours": 24,
+            "verification": {"type": "self_report", "prompt": "Получилось?", "options": ["Да", "Нет"]}
+        },
+        "psychological_insights": [make_message(rng, 40, 100) for _ in range(3)]
+    }
+
+
+def write_quest_tree(quests_dir: Path, quests_per_location: int, steps: int, rng: random.Random) -> int:
+    """
+    Write synthetic quest YAML files, one directory per location.
+
+    Returns:
+        Number of quest files written
+    """
+    count = 0
+    for location in EDUCATIONAL_LOCATIONS:
+        location_dir = quests_dir / location
+        location_dir.mkdir(parents=True, exist_ok=True)
+        for index in range(quests_per_location):
+            quest_id = f"{location}_quest_{index + 1:02d}"
+            data = make_quest_data(quest_id, location, steps, rng)
+            with open(location_dir / f"quest_{index + 1:02d}.yaml", "w", encoding="utf-8") as f:
+                yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
+            count += 1
+    return count
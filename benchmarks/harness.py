@@ -0,0 +1,213 @@
+"""
+Timing, baseline storage and regression report for benchmarks.
+
+Each benchmark is calibrated so one sample takes about min_sample_time
+seconds, then sampled `repeats` times. The median time per call is the
+number compared against the baseline; min and stdev show the noise.
+"""
+
+import asyncio
+import json
+import platform
+import statistics
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+# Below this difference results are reported as unchanged
+DEFAULT_THRESHOLD = 0.20
+
+
+@dataclass
+class BenchmarkResult:
+    """Timing of one benchmark (seconds per call)."""
+    name: str
+    calls_per_sample: int
+    repeats: int
+    min: float
+    median: float
+    mean: float
+    stdev: float
+
+    @property
+    def ops_per_second(self) -> float:
+        return 1.0 / self.median if self.median else 0.0
+
+
+@dataclass
+class Comparison:
+    """Benchmark result compared with its baseline."""
+    name: str
+    current: float  # Median seconds per call
+    baseline: Optional[float]
+    ratio: Optional[float]  # current / baseline
+    status: str  # "regression" | "improvement" | "unchanged" | "new"
+
+
+BenchCallable = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+def measure(
+    name: str,
+    func: BenchCallable,
+    is_async: bool = False,
+    repeats: int = 7,
+    min_sample_time: float = 0.1
+) -> BenchmarkResult:
+    """
+    Time a callable.
+
+    Args:
+        name: Benchmark name
+        func: Zero-argument callable (coroutine function if is_async)
+        is_async: Await func() inside one event loop
+        repeats: Number of samples
+        min_sample_time: Target seconds per sample (calibrates calls per sample)
+
+    Returns:
+        BenchmarkResult
+    """
+    if is_async:
+        loop = asyncio.new_event_loop()
+
+        async def run_async(number: int) -> float:
+            started = time.perf_counter()
+            for _ in range(number):
+                await func()
+            return time.perf_counter() - started
+
+        def run(number: int) -> float:
+            return loop.run_until_complete(run_async(number))
+    else:
+        loop = None
+
+        def run(number: int) -> float:
+            started = time.perf_counter()
+            for _ in range(number):
+                func()
+            return time.perf_counter() - started
+
+    try:
+        # Calibrate (also warms caches)
+        number = 1
+        while True:
+            elapsed = run(number)
+            if elapsed >= min_sample_time or number >= 1_000_000:
+                break
+            number *= 2 if elapsed == 0 else max(2, min(10, int(min_sample_time / elapsed) + 1))
+
+        samples = [run(number) / number for _ in range(repeats)]
+    finally:
+        if loop:
+            loop.close()
+
+    return BenchmarkResult(
+        name=name,
+        calls_per_sample=number,
+        repeats=repeats,
+        min=min(samples),
+        median=statistics.median(samples),
+        mean=statistics.fmean(samples),
+        stdev=statistics.stdev(samples) if len(samples) > 1 else 0.0
+    )
+
+
+def save_baseline(path: Path, results: List[BenchmarkResult]) -> None:
+    """
+    Save results as baseline (merged into existing baseline file).
+
+    Args:
+        path: Baseline JSON file
+        results: Benchmark results
+    """
+    data = load_baseline(path) or {"benchmarks": {}}
+    data["saved_at"] = datetime.now().isoformat()
+    data["machine"] = f"{platform.node()} {platform.machine()} Python {platform.python_version()}"
+    for result in results:
+        data["benchmarks"][result.name] = asdict(result)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    temp_path.replace(path)
+
+
+def load_baseline(path: Path) -> Optional[Dict[str, Any]]:
+    """Load baseline file, or None if it does not exist."""
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(
+    results: List[BenchmarkResult],
+    baseline: Optional[Dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD
+) -> List[Comparison]:
+    """
+    Compare results with baseline medians.
+
+    Args:
+        results: Current results
+        baseline: Loaded baseline file (or None)
+        threshold: Relative change treated as significant (0.2 = 20%)
+
+    Returns:
+        List of Comparison (same order as results)
+    """
+    stored = (baseline or {}).get("benchmarks", {})
+    comparisons = []
+
+    for result in results:
+        previous = stored.get(result.name)
+        if not previous:
+            comparisons.append(Comparison(result.name, result.median, None, None, "new"))
+            continue
+
+        ratio = result.median / previous["median"] if previous["median"] else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "unchanged"
+
+        comparisons.append(Comparison(result.name, result.median, previous["median"], ratio, status))
+
+    return comparisons
+
+
+def _format_time(seconds: float) -> str:
+    """Format seconds per call with a readable unit."""
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} µs"
+
+
+def format_report(results: List[BenchmarkResult], comparisons: List[Comparison], threshold: float) -> str:
+    """Build text report table."""
+    lines = [
+        f"{'benchmark':<44}{'median':>12}{'min':>12}{'stdev':>10}{'baseline':>12}{'change':>10}  status",
+        "-" * 112
+    ]
+    markers = {"regression": "❌", "improvement": "✅", "unchanged": "  ", "new": "🆕"}
+
+    for result, comparison in zip(results, comparisons):
+        baseline = _format_time(comparison.baseline) if comparison.baseline else "-"
+        change = f"{(comparison.ratio - 1) * 100:+.1f}%" if comparison.ratio is not None else "-"
+        stdev = f"{result.stdev / result.median * 100:.1f}%" if result.median else "-"
+        lines.append(
+            f"{result.name:<44}{_format_time(result.median):>12}{_format_time(result.min):>12}"
+            f"{stdev:>10}{baseline:>12}{change:>10}  {markers[comparison.status]} {comparison.status}"
+        )
+
+    regressions = [c for c in comparisons if c.status == "regression"]
+    lines.append("")
+    lines.append(f"{len(regressions)} regression(s) beyond {threshold * 100:.0f}%")
+    return "\n".join(lines)
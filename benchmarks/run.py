@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Run microbenchmarks and compare with baseline.
+
+Run:
+    python -m benchmarks.run                       # run all, compare with baseline
+    python -m benchmarks.run --save-baseline       # run all, store as new baseline
+    python -m benchmarks.run emotion quest --threshold 0.1
+
+Exit status is 1 if any benchmark regressed beyond the threshold, so the
+command can gate CI. Logging is configured as in production (LOG_LEVEL)
+with output discarded, so log rendering cost is part of the numbers.
+"""
+
+import argparse
+import logging
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+# Add repo root to path (also allows python benchmarks/run.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.harness import (
+    DEFAULT_THRESHOLD,
+    measure,
+    compare,
+    format_report,
+    load_baseline,
+    save_baseline
+)
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent.parent / "data" / "benchmarks" / "baseline.json"
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="InnerWorld Edu microbenchmarks")
+    parser.add_argument("patterns", nargs="*", help="Run benchmarks whose name contains any pattern")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store results as baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown reported as regression (0.2 = 20%%)")
+    parser.add_argument("--repeats", type=int, default=7, help="Samples per benchmark")
+    parser.add_argument("--min-sample-time", type=float, default=0.1, help="Seconds per sample")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for synthetic data")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run benchmarks, print report, return exit status."""
+    args = parse_args(argv)
+
+    from src.config import LOG_LEVEL
+    from src.core.logger import setup_logging
+    from benchmarks.suite import BenchContext, select
+
+    benchmarks = select(args.patterns)
+    if args.list:
+        for bench in benchmarks:
+            print(bench.name)
+        return 0
+
+    workdir = Path(tempfile.mkdtemp(prefix="innerworld_bench_"))
+    setup_logging(LOG_LEVEL, log_dir=workdir / "logs")
+    logging.basicConfig(level=LOG_LEVEL, handlers=[logging.NullHandler()])
+
+    results = []
+    try:
+        for bench in benchmarks:
+            ctx = BenchContext(workdir=workdir, rng=random.Random(args.seed))
+            func = bench.setup(ctx)
+            result = measure(
+                bench.name,
+                func,
+                is_async=bench.is_async,
+                repeats=args.repeats,
+                min_sample_time=args.min_sample_time
+            )
+            results.append(result)
+            notes = "".join(f", {key}={value}" for key, value in ctx.notes.items())
+            print(f"  {bench.name}: {result.median * 1e6:.2f} µs/call{notes}", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    comparisons = compare(results, load_baseline(args.baseline), args.threshold)
+    print(format_report(results, comparisons, args.threshold))
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    return 1 if any(c.status == "regression" for c in comparisons) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
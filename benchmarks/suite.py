@@ -0,0 +1,348 @@
+"""
+Benchmark definitions for the per-message hot paths.
+
+Each benchmark is a setup function registered with @benchmark. Setup gets a
+BenchContext (scratch directory + seeded random) and returns the zero-argument
+callable to time. Setup cost is not measured.
+"""
+
+import itertools
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks import generators
+
+# Synthetic data sizes
+MESSAGES = 1000
+USERS = 500
+QUESTS_PER_LOCATION = 10
+QUEST_STEPS = 8
+
+
+@dataclass
+class BenchContext:
+    """Shared setup context."""
+    workdir: Path
+    rng: random.Random
+    notes: Dict[str, Any] = field(default_factory=dict)  # Extra figures printed with the timing
+
+
+@dataclass
+class Benchmark:
+    """Registered benchmark."""
+    name: str
+    setup: Callable[[BenchContext], Callable[[], Any]]
+    is_async: bool = False
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, is_async: bool = False):
+    """Register a benchmark setup function."""
+    def register(setup: Callable[[BenchContext], Callable[[], Any]]):
+        BENCHMARKS.append(Benchmark(name=name, setup=setup, is_async=is_async))
+        return setup
+    return register
+
+
+def select(patterns: List[str]) -> List[Benchmark]:
+    """Select benchmarks whose name contains any of patterns (all if empty)."""
+    if not patterns:
+        return list(BENCHMARKS)
+    return [b for b in BENCHMARKS if any(p in b.name for p in patterns)]
+
+
+# ==================== src/core ====================
+
+@benchmark("metrics.histogram_observe")
+def bench_histogram_observe(ctx: BenchContext):
+    from src.core.metrics import MetricsRegistry
+
+    child = MetricsRegistry().histogram("bench_seconds", "Benchmark", ["stage"]).labels("graph")
+    values = itertools.cycle([ctx.rng.expovariate(10.0) for _ in range(1000)])
+    return lambda: child.observe(next(values))
+
+
+@benchmark("metrics.render")
+def bench_metrics_render(ctx: BenchContext):
+    from src.core.metrics import MetricsRegistry
+
+    registry = MetricsRegistry()
+    histogram = registry.histogram("bench_seconds", "Benchmark", ["stage"])
+    counter = registry.counter("bench_total", "Benchmark", ["stage", "status"])
+    for index in range(20):
+        histogram.labels(f"stage_{index}").observe(ctx.rng.random())
+        counter.labels(f"stage_{index}", "ok").inc()
+    return registry.render
+
+
+def _structlog_logger(ctx: BenchContext, mode: str):
+    """Logger wired like setup_logging(mode) without touching global config."""
+    import io
+    import logging
+    import structlog
+    from src.core.logger import build_processors, callsite_levels, EventSampler, CallsiteByLevel, LogWriter
+    from src.config import LOG_SAMPLED_EVENTS
+
+    renderer = structlog.processors.JSONRenderer()
+    processors = build_processors(
+        mode, renderer, EventSampler(LOG_SAMPLED_EVENTS), CallsiteByLevel(callsite_levels(mode))
+    )
+
+    if mode == "queue":
+        writer = LogWriter(io.StringIO(), renderer, max_queue=1_000_000)
+        return structlog.wrap_logger(
+            writer.logger_factory("bench"),
+            processors=processors,
+            wrapper_class=structlog.make_filtering_bound_logger("INFO"),
+            context_class=dict
+        )
+
+    stdlib_logger = logging.getLogger(f"bench.{mode}")
+    stdlib_logger.setLevel(logging.INFO)
+    stdlib_logger.propagate = False
+    stdlib_logger.addHandler(logging.StreamHandler(io.StringIO()))
+    return structlog.wrap_logger(
+        stdlib_logger,
+        processors=processors,
+        wrapper_class=structlog.stdlib.BoundLogger,
+        context_class=dict
+    )
+
+
+@benchmark("logger.info_sync")
+def bench_logger_info_sync(ctx: BenchContext):
+    logger = _structlog_logger(ctx, "sync")
+    return lambda: logger.info("emotional_state_detected", user_id="100001", state="interest",
+                               intensity=0.4, keywords=["интересно"])
+
+
+@benchmark("logger.info_queue")
+def bench_logger_info_queue(ctx: BenchContext):
+    logger = _structlog_logger(ctx, "queue")
+    return lambda: logger.info("emotional_state_detected", user_id="100001", state="interest",
+                               intensity=0.4, keywords=["интересно"])
+
+
+# Record file formats: "legacy" is the pretty-printed json.dump(asdict(...)) used before serialization.py
+RECORD_FORMATS = ("legacy", "json", "msgpack")
+
+
+def _profile_codec(ctx: BenchContext, record_format: str):
+    """(encode, decode, encoded sample profiles) for a record file format."""
+    import json
+    from dataclasses import asdict
+    from src.core.serialization import RecordSerializer
+    from src.data.user_manager import UserProfile
+
+    if record_format == "legacy":
+        def encode(profile):
+            return json.dumps(asdict(profile), indent=2, ensure_ascii=False).encode("utf-8")
+
+        def decode(raw):
+            return UserProfile(**json.loads(raw))
+    else:
+        serializer = RecordSerializer(UserProfile, record_format)
+        encode, decode = serializer.dumps, serializer.loads
+
+    profiles = [generators.make_user_profile(str(100000 + i), ctx.rng) for i in range(100)]
+    encoded = [encode(profile) for profile in profiles]
+    ctx.notes["bytes"] = sum(len(raw) for raw in encoded) // len(encoded)
+    return encode, decode, profiles, encoded
+
+
+def _register_record_format(record_format: str) -> None:
+    @benchmark(f"serialization.encode_profile.{record_format}")
+    def bench_encode(ctx: BenchContext):
+        encode, _, profiles, _ = _profile_codec(ctx, record_format)
+        items = itertools.cycle(profiles)
+        return lambda: encode(next(items))
+
+    @benchmark(f"serialization.decode_profile.{record_format}")
+    def bench_decode(ctx: BenchContext):
+        _, decode, _, encoded = _profile_codec(ctx, record_format)
+        items = itertools.cycle(encoded)
+        return lambda: decode(next(items))
+
+
+for _record_format in RECORD_FORMATS:
+    _register_record_format(_record_format)
+
+
+# ==================== src/orchestration ====================
+
+@benchmark("emotional_router.detect_emotion")
+def bench_detect_emotion(ctx: BenchContext):
+    from src.orchestration.emotional_router import EmotionalRouter
+
+    router = EmotionalRouter()
+    messages = itertools.cycle(generators.make_messages(MESSAGES, ctx.rng))
+    return lambda: router.detect_emotion(next(messages))
+
+
+def _state_manager():
+    """StateManager without initialize() (no LLM needed for these paths)."""
+    from src.orchestration.state_manager import StateManager
+    return StateManager()
+
+
+@benchmark("state_manager._update_screening_metrics", is_async=True)
+def bench_update_screening_metrics(ctx: BenchContext):
+    from src.orchestration.emotional_router import EmotionalState
+
+    state_manager = _state_manager()
+    user_state = generators.make_user_state("100001", ctx.rng)
+    messages = itertools.cycle(generators.make_messages(MESSAGES, ctx.rng))
+    emotions = itertools.cycle([EmotionalState.INTEREST, EmotionalState.ANGER, EmotionalState.ANXIETY])
+
+    async def run():
+        user_state.emotional_state = next(emotions)
+        await state_manager._update_screening_metrics(user_state, next(messages))
+
+    return run
+
+
+@benchmark("state_manager._profile_to_state")
+def bench_profile_to_state(ctx: BenchContext):
+    state_manager = _state_manager()
+    profiles = itertools.cycle([
+        generators.make_user_profile(str(100000 + i), ctx.rng) for i in range(100)
+    ])
+    return lambda: state_manager._profile_to_state(next(profiles))
+
+
+@benchmark("state_manager._state_to_profile")
+def bench_state_to_profile(ctx: BenchContext):
+    state_manager = _state_manager()
+    states = itertools.cycle([
+        generators.make_user_state(str(100000 + i), ctx.rng) for i in range(100)
+    ])
+    return lambda: state_manager._state_to_profile(next(states))
+
+
+# ==================== src/data ====================
+
+def _user_manager(ctx: BenchContext, name: str) -> Tuple[Any, List[str]]:
+    """UserManager over USERS synthetic profiles in a scratch directory."""
+    import asyncio
+    from src.data.user_manager import UserManager
+
+    manager = UserManager(data_dir=ctx.workdir / name)
+    profiles = [generators.make_user_profile(str(100000 + i), ctx.rng) for i in range(USERS)]
+
+    async def populate():
+        for profile in profiles:
+            await manager._save_profile(profile)
+
+    asyncio.run(populate())
+    return manager, [p.user_id for p in profiles]
+
+
+@benchmark("user_manager.get_user", is_async=True)
+def bench_get_user(ctx: BenchContext):
+    manager, user_ids = _user_manager(ctx, "get_user")
+    ids = itertools.cycle(user_ids)
+    return lambda: manager.get_user(next(ids))
+
+
+@benchmark("user_manager._save_profile", is_async=True)
+def bench_save_profile(ctx: BenchContext):
+    manager, user_ids = _user_manager(ctx, "save_profile")
+    profiles = itertools.cycle([
+        generators.make_user_profile(user_id, ctx.rng) for user_id in user_ids
+    ])
+    return lambda: manager._save_profile(next(profiles))
+
+
+# ==================== src/game ====================
+
+def _quest_engine(ctx: BenchContext, name: str):
+    """QuestEngine over a synthetic quest tree."""
+    from src.game.quest_engine import QuestEngine
+
+    quests_dir = ctx.workdir / name
+    generators.write_quest_tree(quests_dir, QUESTS_PER_LOCATION, QUEST_STEPS, ctx.rng)
+    return QuestEngine(quests_dir=quests_dir)
+
+
+@benchmark("quest_engine.load_all_quests", is_async=True)
+def bench_load_all_quests(ctx: BenchContext):
+    engine = _quest_engine(ctx, "load_all_quests")
+    return engine.load_all_quests
+
+
+@benchmark("quest_engine.process_step_response", is_async=True)
+def bench_process_step_response(ctx: BenchContext):
+    import asyncio
+    from src.game.quest_engine import StepType
+
+    engine = _quest_engine(ctx, "process_step_response")
+    asyncio.run(engine.load_all_quests())
+
+    quest_ids = sorted(engine.quests)
+    users = [str(100000 + i) for i in range(USERS)]
+    answers = itertools.cycle(generators.make_messages(MESSAGES, ctx.rng))
+    user_cycle = itertools.cycle(users)
+
+    async def run():
+        user_id = next(user_cycle)
+        progress = engine.get_current_quest_progress(user_id)
+        if not progress or progress.is_completed():
+            await engine.start_quest(user_id, quest_ids[int(user_id) % len(quest_ids)])
+            progress = engine.get_current_quest_progress(user_id)
+
+        step = engine.get_quest(progress.quest_id).steps[progress.current_step_index]
+        response = 1 if step.type == StepType.CHOICE else next(answers)[:150]
+        await engine.process_step_response(user_id, response)
+
+    return run
+
+
+@benchmark("reality_bridge.check_deadlines", is_async=True)
+def bench_check_deadlines(ctx: BenchContext):
+    """Deadline check over USERS pending bridges, none due (the common case)."""
+    import asyncio
+    from src.game.reality_bridge_manager import RealityBridgeManager
+
+    manager = RealityBridgeManager(storage_path=ctx.workdir / "check_deadlines")
+
+    async def populate():
+        for index in range(USERS):
+            await manager.create_bridge(
+                str(100000 + index), "quest_1", f"bridge_{index}", "Мост", "Описание",
+                deadline_hours=24 + ctx.rng.random() * 24
+            )
+
+    asyncio.run(populate())
+    return manager.check_deadlines
+
+
+# ==================== backend/quest_builder ====================
+
+@benchmark("yaml_to_graph.convert_quest_data")
+def bench_convert_quest_data(ctx: BenchContext):
+    from backend.quest_builder.yaml_to_graph_converter import YAMLToGraphConverter
+
+    converter = YAMLToGraphConverter()
+    quests = itertools.cycle([
+        generators.make_quest_data(f"quest_{i}", "tower_confusion", QUEST_STEPS, ctx.rng)
+        for i in range(50)
+    ])
+    return lambda: converter.convert_quest_data(next(quests))
+
+
+@benchmark("quest_graph.model_dump")
+def bench_quest_graph_model_dump(ctx: BenchContext):
+    from backend.quest_builder.yaml_to_graph_converter import YAMLToGraphConverter
+
+    converter = YAMLToGraphConverter()
+    graphs = itertools.cycle([
+        converter.convert_quest_data(
+            generators.make_quest_data(f"quest_{i}", "tower_confusion", QUEST_STEPS, ctx.rng)
+        )
+        for i in range(50)
+    ])
+    return lambda: next(graphs).model_dump()
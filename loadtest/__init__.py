@@ -0,0 +1,6 @@
+"""Load testing tools for InnerWorld Edu (fake Telegram/OpenAI servers, scripted children)."""
+
+from .fake_servers import FakeOpenAI, FakeTelegram, LatencyProfile
+from .scenarios import ChildScript, build_scripts
+
+__all__ = ["FakeOpenAI", "FakeTelegram", "LatencyProfile", "ChildScript", "build_scripts"]
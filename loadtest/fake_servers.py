@@ -0,0 +1,354 @@
+"""
+Local stand-ins for the Telegram Bot API and OpenAI chat completions.
+
+Both servers are small FastAPI apps served by uvicorn in a background thread,
+so the system under test talks to them over real HTTP:
+
+- FakeOpenAI: POST /v1/chat/completions (plain and SSE streaming)
+- FakeTelegram: POST /bot<token>/<method> (getMe, sendMessage,
+  editMessageText, ...)
+
+Latency and errors are drawn per request from a LatencyProfile, e.g. a
+lognormal GPT-4 latency with 2% 500s and 1% 429s.
+"""
+
+import abc
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Canned reply used by FakeOpenAI (Russian, like real responses)
+FAKE_COMPLETION = (
+    "Привет! 😊 Здорово, что ты здесь. Расскажи, какой предмет в школе "
+    "кажется тебе самым сложным? Может быть, математика или чтение? "
+    "Я помогу разобраться шаг за шагом! 🌟"
+)
+
+
+@dataclass
+class LatencyProfile:
+    """
+    Latency and error distribution for a fake server.
+
+    Latency is lognormal around median_seconds; sigma controls the tail
+    (0.5 gives p99 ~3x median).
+    """
+    median_seconds: float = 0.0
+    sigma: float = 0.5
+    error_rate: float = 0.0  # Fraction of requests answered with 500
+    rate_limit_rate: float = 0.0  # Fraction answered with 429
+    retry_after: int = 1  # Seconds in 429 responses
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Draw one request latency in seconds."""
+        if self.median_seconds <= 0:
+            return 0.0
+        return rng.lognormvariate(0.0, self.sigma) * self.median_seconds
+
+    def sample_outcome(self, rng: random.Random) -> str:
+        """Draw request outcome: "ok", "error" or "rate_limited"."""
+        roll = rng.random()
+        if roll < self.error_rate:
+            return "error"
+        if roll < self.error_rate + self.rate_limit_rate:
+            return "rate_limited"
+        return "ok"
+
+
+def _free_port() -> int:
+    """Get a free TCP port on localhost."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeServer(abc.ABC):
+    """Base class: serves self.app with uvicorn in a background thread."""
+
+    def __init__(self, profile: Optional[LatencyProfile] = None, seed: int = 0):
+        self.profile = profile or LatencyProfile()
+        self.rng = random.Random(seed)
+        self.port = 0
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.app = self._build_app()
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @abc.abstractmethod
+    def _build_app(self) -> FastAPI:
+        """Create the FastAPI app with the fake API routes."""
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> None:
+        """Start serving in a background thread (returns when ready)."""
+        self.port = _free_port()
+        config = uvicorn.Config(
+            self.app,
+            host="127.0.0.1",
+            port=self.port,
+            log_level="warning",
+            access_log=False,
+            backlog=4096
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + 10.0
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{type(self).__name__} failed to start")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        """Stop server and wait for its thread."""
+        if self._server:
+            self._server.should_exit = True
+        if self._thread:
+            self._thread.join(timeout=10.0)
+
+    async def _simulate(self) -> str:
+        """Sleep for sampled latency, return sampled outcome."""
+        self.requests += 1
+        await asyncio.sleep(self.profile.sample_latency(self.rng))
+        outcome = self.profile.sample_outcome(self.rng)
+        if outcome == "error":
+            self.errors += 1
+        elif outcome == "rate_limited":
+            self.rate_limited += 1
+        return outcome
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get request counters."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited
+        }
+
+
+class FakeOpenAI(FakeServer):
+    """
+    Fake OpenAI chat completions endpoint.
+
+    Point ChatOpenAI at it with OPENAI_BASE_URL=<url>/v1. Streaming responses
+    are split into tokens_per_chunk-word chunks spaced over the sampled
+    latency, so time to first token is realistic too.
+    """
+
+    def __init__(
+        self,
+        profile: Optional[LatencyProfile] = None,
+        seed: int = 0,
+        completion: str = FAKE_COMPLETION,
+        first_token_fraction: float = 0.3
+    ):
+        self.completion = completion
+        self.first_token_fraction = first_token_fraction
+        self.completion_tokens = 0
+        super().__init__(profile, seed)
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake OpenAI")
+
+        @app.post("/v1/chat/completions")
+        async def chat_completions(request: Request):
+            body = await request.json()
+            return await self._complete(body)
+
+        return app
+
+    async def _complete(self, body: Dict[str, Any]):
+        """Answer one chat completion request."""
+        self.requests += 1
+        latency = self.profile.sample_latency(self.rng)
+        outcome = self.profile.sample_outcome(self.rng)
+        model = body.get("model", "gpt-4")
+
+        if outcome != "ok":
+            await asyncio.sleep(latency)
+            return self._error_response(outcome)
+
+        words = self.completion.split(" ")
+        self.completion_tokens += len(words)
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            return JSONResponse({
+                "id": f"chatcmpl-{self.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": self.completion},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(words),
+                    "total_tokens": prompt_tokens + len(words)
+                }
+            })
+
+        first_token_delay = latency * self.first_token_fraction
+        token_delay = (latency - first_token_delay) / max(1, len(words))
+
+        async def events():
+            await asyncio.sleep(first_token_delay)
+            for index, word in enumerate(words):
+                chunk = {
+                    "id": f"chatcmpl-{self.requests}",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "delta": {"content": word if index == 0 else " " + word},
+                        "finish_reason": None
+                    }]
+                }
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                await asyncio.sleep(token_delay)
+
+            done = {
+                "id": f"chatcmpl-{self.requests}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            }
+            yield f"data: {json.dumps(done)}\n\n"
+
+            if body.get("stream_options", {}).get("include_usage"):
+                usage = dict(done, choices=[], usage={
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(words),
+                    "total_tokens": prompt_tokens + len(words)
+                })
+                yield f"data: {json.dumps(usage)}\n\n"
+
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    def _error_response(self, outcome: str) -> JSONResponse:
+        """Build OpenAI-style error response."""
+        if outcome == "rate_limited":
+            self.rate_limited += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                status_code=429,
+                headers={"retry-after": str(self.profile.retry_after)}
+            )
+
+        self.errors += 1
+        return JSONResponse(
+            {"error": {"message": "The server had an error", "type": "server_error"}},
+            status_code=500
+        )
+
+    def get_statistics(self) -> Dict[str, Any]:
+        stats = super().get_statistics()
+        stats["completion_tokens"] = self.completion_tokens
+        return stats
+
+
+class FakeTelegram(FakeServer):
+    """
+    Fake Telegram Bot API.
+
+    Point telegram.Bot at it with base_url=<url>/bot. Accepts any token,
+    records sent and edited messages per chat.
+    """
+
+    def __init__(self, profile: Optional[LatencyProfile] = None, seed: int = 0):
+        self.sent = 0
+        self.edited = 0
+        self.chats: Dict[int, int] = {}  # chat_id -> messages sent
+        self._message_ids = 0
+        super().__init__(profile, seed)
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake Telegram Bot API")
+
+        @app.post("/bot{token}/{method}")
+        async def bot_method(token: str, method: str, request: Request):
+            return await self._call(method, await self._params(request))
+
+        return app
+
+    async def _params(self, request: Request) -> Dict[str, Any]:
+        """Read method parameters (PTB sends url-encoded form data, others JSON)."""
+        body = await request.body()
+        if not body:
+            return {}
+        if request.headers.get("content-type", "").startswith("application/json"):
+            return json.loads(body)
+        return dict(parse_qsl(body.decode("utf-8")))
+
+    async def _call(self, method: str, params: Dict[str, Any]) -> JSONResponse:
+        """Answer one Bot API call."""
+        outcome = await self._simulate()
+
+        if outcome == "rate_limited":
+            return JSONResponse({
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.profile.retry_after}",
+                "parameters": {"retry_after": self.profile.retry_after}
+            }, status_code=429)
+
+        if outcome == "error":
+            return JSONResponse({
+                "ok": False,
+                "error_code": 500,
+                "description": "Internal Server Error"
+            }, status_code=500)
+
+        if method == "getMe":
+            return JSONResponse({"ok": True, "result": {
+                "id": 1, "is_bot": True, "first_name": "LoadTestBot", "username": "loadtest_bot"
+            }})
+
+        if method in ("sendMessage", "editMessageText"):
+            chat_id = int(params.get("chat_id", 0))
+            if method == "sendMessage":
+                self.sent += 1
+                self._message_ids += 1
+                message_id = self._message_ids
+                self.chats[chat_id] = self.chats.get(chat_id, 0) + 1
+            else:
+                self.edited += 1
+                message_id = int(params.get("message_id", 0))
+
+            return JSONResponse({"ok": True, "result": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": params.get("text", "")
+            }})
+
+        return JSONResponse({"ok": True, "result": True})
+
+    def get_statistics(self) -> Dict[str, Any]:
+        stats = super().get_statistics()
+        stats.update({"sent": self.sent, "edited": self.edited, "chats": len(self.chats)})
+        return stats
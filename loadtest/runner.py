@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test for InnerWorld Edu.
+
+Drives many simulated children through StateManager against local fake
+OpenAI and Telegram servers, delivering replies via OutboundSender and
+telegram.Bot exactly as the child bot does:
+
+    child script → StateManager (LangGraph, ChatOpenAI → FakeOpenAI)
+                 → OutboundSender → telegram.Bot → FakeTelegram
+
+Reports throughput, end-to-end latency per flow phase, latency per graph
+node and memory growth. All data files go to a temporary working directory.
+
+Run:
+    python -m loadtest.runner --children 1000 --openai-latency 1.5
+    python -m loadtest.runner --children 200 --stream --json report.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add repo root to path (also allows python loadtest/runner.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loadtest.fake_servers import FakeOpenAI, FakeTelegram, LatencyProfile
+from loadtest.scenarios import ChildScript, build_scripts
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# Response returned by StateManager when graph processing fails
+FALLBACK_RESPONSE = "Извини, что-то пошло не так. Давай попробуем еще раз? 😊"
+
+GRAPH_NODES = [
+    "start", "parent_linking", "onboarding", "emotion_check", "location_selection",
+    "quest_active", "quest_reflection", "casual_chat", "learning_support",
+    "screening_check", "end_session"
+]
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    """Get count, p50/p95/p99 and max of latency samples (milliseconds)."""
+    if not samples:
+        return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1] * 1000, 1)
+    }
+
+
+def _rss_bytes() -> int:
+    """Get current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class NodeTimer:
+    """Wraps StateManager node handlers to record per-node latency."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def instrument(self, state_manager: Any) -> None:
+        """
+        Replace node handlers on the instance (before initialize()).
+
+        _build_state_graph picks up the wrapped methods, so timings cover
+        exactly what LangGraph runs.
+        """
+        for node in GRAPH_NODES:
+            name = f"_handle_{node}"
+            setattr(state_manager, name, self._wrap(node, getattr(state_manager, name)))
+
+    def _wrap(self, node: str, handler):
+        async def timed(state: Dict[str, Any]) -> Dict[str, Any]:
+            started = time.perf_counter()
+            try:
+                return await handler(state)
+            finally:
+                self.samples[node].append(time.perf_counter() - started)
+        return timed
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {node: _percentiles(self.samples[node]) for node in GRAPH_NODES if self.samples[node]}
+
+
+class LoadTest:
+    """One load test run."""
+
+    def __init__(
+        self,
+        children: int,
+        ramp_up: float,
+        think_time: float,
+        stream: bool,
+        openai_profile: LatencyProfile,
+        telegram_profile: LatencyProfile,
+        telegram_rate: Optional[float] = None,
+        seed: int = 0
+    ):
+        """
+        Initialize load test.
+
+        Args:
+            children: Number of simulated children
+            ramp_up: Seconds over which children start
+            think_time: Mean seconds between a reply and the child's next message
+            stream: Deliver replies with StreamingReply (placeholder + edits)
+            openai_profile: Fake OpenAI latency/errors
+            telegram_profile: Fake Telegram latency/errors
+            telegram_rate: Global OutboundSender rate (None = TELEGRAM_GLOBAL_RATE)
+            seed: Random seed for scripts and think times
+        """
+        self.children = children
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.stream = stream
+        self.telegram_rate = telegram_rate
+        self.rng = random.Random(seed)
+        self.scripts = build_scripts(children, seed=seed)
+
+        self.fake_openai = FakeOpenAI(openai_profile, seed=seed)
+        self.fake_telegram = FakeTelegram(telegram_profile, seed=seed + 1)
+        self.node_timer = NodeTimer()
+
+        self.phase_latency: Dict[str, List[float]] = defaultdict(list)
+        self.messages = 0
+        self.fallbacks = 0
+        self.failures = 0
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.completed_children = 0
+        self.memory_samples: List[int] = []
+
+    async def run(self) -> Dict[str, Any]:
+        """Run load test and return report."""
+        from telegram import Bot
+        from telegram.request import HTTPXRequest
+
+        from src.config import OUTBOUND_MAX_CONCURRENCY, TELEGRAM_GLOBAL_RATE
+        from src.bot.outbound import OutboundSender
+        from src.orchestration.state_manager import StateManager
+
+        os.environ["OPENAI_BASE_URL"] = f"{self.fake_openai.url}/v1"
+        os.environ["OPENAI_API_KEY"] = "sk-loadtest"
+
+        state_manager = StateManager()
+        self.node_timer.instrument(state_manager)
+        await state_manager.initialize()
+
+        bot = Bot(
+            token="123456:loadtest",
+            base_url=f"{self.fake_telegram.url}/bot",
+            request=HTTPXRequest(connection_pool_size=OUTBOUND_MAX_CONCURRENCY)
+        )
+        await bot.initialize()
+        sender = OutboundSender(bot, global_rate=self.telegram_rate or TELEGRAM_GLOBAL_RATE)
+        await sender.start()
+        state_manager.set_outbound_sender(sender)
+
+        rss_start = _rss_bytes()
+        sampler = asyncio.create_task(self._sample_memory())
+        started = time.perf_counter()
+
+        await asyncio.gather(*(
+            self._run_child(state_manager, sender, bot, script, index)
+            for index, script in enumerate(self.scripts)
+        ))
+
+        duration = time.perf_counter() - started
+        sampler.cancel()
+        rss_end = _rss_bytes()
+
+        await sender.stop()
+        await bot.shutdown()
+        if state_manager.reality_bridge_manager:
+            await state_manager.reality_bridge_manager.shutdown()
+        if state_manager.link_manager:
+            await state_manager.link_manager.shutdown()
+        if state_manager.parent_dashboards:
+            await state_manager.parent_dashboards.shutdown()
+
+        return {
+            "children": self.children,
+            "completed_children": self.completed_children,
+            "messages": self.messages,
+            "duration_seconds": round(duration, 2),
+            "throughput_messages_per_second": round(self.messages / duration, 2) if duration else 0.0,
+            "fallback_responses": self.fallbacks,
+            "failed_deliveries": self.failures,
+            "errors": dict(self.errors),
+            "end_to_end": {phase: _percentiles(s) for phase, s in self.phase_latency.items()},
+            "graph_nodes": self.node_timer.report(),
+            "memory": {
+                "rss_start_mb": round(rss_start / 2**20, 1),
+                "rss_end_mb": round(rss_end / 2**20, 1),
+                "rss_peak_mb": round(max(self.memory_samples + [rss_end]) / 2**20, 1),
+                "growth_per_child_kb": round((rss_end - rss_start) / max(1, self.children) / 1024, 1),
+                "user_states": len(state_manager.user_states),
+                "emotional_routers": len(state_manager.user_emotional_routers),
+                "quest_progress": len(state_manager.quest_engine.quest_progress),
+                "active_bridges": len(state_manager.reality_bridge_manager.active_bridges)
+            },
+            "outbound": sender.get_statistics(),
+            "fake_openai": self.fake_openai.get_statistics(),
+            "fake_telegram": self.fake_telegram.get_statistics()
+        }
+
+    async def _sample_memory(self) -> None:
+        """Record RSS every second."""
+        while True:
+            self.memory_samples.append(_rss_bytes())
+            await asyncio.sleep(1.0)
+
+    async def _run_child(
+        self,
+        state_manager: Any,
+        sender: Any,
+        bot: Any,
+        script: ChildScript,
+        index: int
+    ) -> None:
+        """Play one child's script."""
+        from src.bot.streaming import StreamingReply
+        from src.orchestration.learning_profile import LearningDimension
+
+        await asyncio.sleep(self.ramp_up * index / max(1, self.children))
+
+        # Stands in for the parent confirming the link
+        await state_manager.initialize_user(script.user_id)
+        user_state = state_manager.user_states[script.user_id]
+        user_state.parent_linked = True
+
+        # Quest-eligible: understanding is the weakest dimension, so location
+        # selection picks the Tower of Confusion and its quest
+        user_state.learning_profile.adjust_dimension(LearningDimension.UNDERSTANDING_MEANING, -3, "loadtest")
+
+        chat_id = int(script.user_id)
+
+        for phase, message in script.steps:
+            started = time.perf_counter()
+            try:
+                if self.stream:
+                    reply = StreamingReply(bot, chat_id, sender=sender)
+                    response = await reply.stream(state_manager.stream_message(script.user_id, message))
+                else:
+                    response = await state_manager.process_message(script.user_id, message)
+                    await sender.send(chat_id, response)
+            except Exception as e:
+                self.failures += 1
+                self.errors[type(e).__name__] += 1
+                continue
+            finally:
+                self.phase_latency[phase].append(time.perf_counter() - started)
+                self.messages += 1
+
+            if FALLBACK_RESPONSE in response:
+                self.fallbacks += 1
+
+            if self.think_time > 0:
+                await asyncio.sleep(self.rng.expovariate(1.0 / self.think_time))
+
+        self.completed_children += 1
+
+    def start_servers(self) -> None:
+        self.fake_openai.start()
+        self.fake_telegram.start()
+
+    def stop_servers(self) -> None:
+        self.fake_openai.stop()
+        self.fake_telegram.stop()
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Print human-readable report."""
+    print("\n" + "=" * 60)
+    print("LOAD TEST REPORT")
+    print("=" * 60)
+    print(f"Children: {report['completed_children']}/{report['children']} completed")
+    print(f"Messages: {report['messages']} in {report['duration_seconds']}s "
+          f"({report['throughput_messages_per_second']} msg/s)")
+    print(f"Fallback responses: {report['fallback_responses']}, "
+          f"failed deliveries: {report['failed_deliveries']} {report['errors'] or ''}")
+
+    for title, key in (("End-to-end by phase", "end_to_end"), ("Graph nodes", "graph_nodes")):
+        print(f"\n{title}:")
+        print(f"  {'name':<20}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for name, stats in report[key].items():
+            print(f"  {name:<20}{stats['count']:>8}{stats['p50_ms']:>10}"
+                  f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}")
+
+    memory = report["memory"]
+    print(f"\nMemory: {memory['rss_start_mb']} MB → {memory['rss_end_mb']} MB "
+          f"(peak {memory['rss_peak_mb']} MB, {memory['growth_per_child_kb']} KB/child)")
+    print(f"  user_states={memory['user_states']} quest_progress={memory['quest_progress']} "
+          f"active_bridges={memory['active_bridges']}")
+    print(f"\nOutbound: {report['outbound']}")
+    print(f"Fake OpenAI: {report['fake_openai']}")
+    print(f"Fake Telegram: {report['fake_telegram']}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="InnerWorld Edu load test")
+    parser.add_argument("--children", type=int, default=100, help="Simulated children")
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="Seconds to start all children")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between messages")
+    parser.add_argument("--stream", action="store_true", help="Stream replies (placeholder + edits)")
+    parser.add_argument("--openai-latency", type=float, default=1.5, help="Median OpenAI latency (s)")
+    parser.add_argument("--openai-sigma", type=float, default=0.5, help="OpenAI lognormal sigma")
+    parser.add_argument("--openai-error-rate", type=float, default=0.0, help="Fraction of OpenAI 500s")
+    parser.add_argument("--openai-429-rate", type=float, default=0.0, help="Fraction of OpenAI 429s")
+    parser.add_argument("--telegram-latency", type=float, default=0.05, help="Median Bot API latency (s)")
+    parser.add_argument("--telegram-error-rate", type=float, default=0.0, help="Fraction of Bot API 500s")
+    parser.add_argument("--telegram-429-rate", type=float, default=0.0, help="Fraction of Bot API 429s")
+    parser.add_argument("--telegram-rate", type=float, default=None,
+                        help="OutboundSender global rate (default TELEGRAM_GLOBAL_RATE)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--json", type=Path, default=None, help="Write report JSON to this path")
+    parser.add_argument("--keep-data", action="store_true", help="Keep temporary data directory")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run load test from command line arguments."""
+    args = parse_args(argv)
+
+    # Keep stdout for the report (LLM/quest logs at INFO are per message)
+    logging.basicConfig(level=logging.WARNING)
+    from src.core.logger import setup_logging
+
+    workdir = Path(tempfile.mkdtemp(prefix="innerworld_loadtest_"))
+    setup_logging("WARNING", log_dir=workdir / "logs")
+
+    # Managers use paths relative to the working directory
+    (workdir / "src" / "data").mkdir(parents=True)
+    (workdir / "src" / "data" / "quests").symlink_to(REPO_DIR / "src" / "data" / "quests")
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)
+
+    test = LoadTest(
+        children=args.children,
+        ramp_up=args.ramp_up,
+        think_time=args.think_time,
+        stream=args.stream,
+        openai_profile=LatencyProfile(
+            median_seconds=args.openai_latency,
+            sigma=args.openai_sigma,
+            error_rate=args.openai_error_rate,
+            rate_limit_rate=args.openai_429_rate
+        ),
+        telegram_profile=LatencyProfile(
+            median_seconds=args.telegram_latency,
+            error_rate=args.telegram_error_rate,
+            rate_limit_rate=args.telegram_429_rate
+        ),
+        telegram_rate=args.telegram_rate,
+        seed=args.seed
+    )
+
+    test.start_servers()
+    try:
+        report = asyncio.run(test.run())
+    finally:
+        test.stop_servers()
+        os.chdir(previous_cwd)
+        if not args.keep_data:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nReport written to {args.json}")
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
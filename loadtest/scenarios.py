@@ -0,0 +1,97 @@
+"""
+Scripted child conversations for load testing.
+
+Each simulated child walks the educational flow:
+
+    onboarding (name, subject, difficulty, mood) → location → quest → reflection
+
+Messages are drawn from small pools so conversations differ between
+children but a given seed always produces the same scripts. Quest answers
+fit the Tower of Confusion quest (the quest shipped in src/data/quests),
+so every step validates and the quest runs through to reflection.
+"""
+
+import random
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+NAMES = ["Саша", "Маша", "Петя", "Аня", "Дима", "Катя", "Миша", "Лиза", "Ваня", "Оля"]
+
+ONBOARDING_MESSAGES = [
+    ["Мне сложно с математикой", "Чтение скучное", "Не понимаю русский язык", "Физика трудная"],
+    ["Я не понимаю, что объясняют", "Я всё забываю", "Мне скучно на уроках", "Не могу сосредоточиться"],
+    ["Я устал немного", "Мне интересно!", "Я волнуюсь перед контрольной", "Злюсь, когда не получается"],
+]
+
+# The fifth message completes onboarding and picks the location
+LOCATION_MESSAGES = ["Куда мне пойти?", "Какую локацию выбрать?", "Покажи локацию", "Да, давай начнём"]
+
+QUEST_START_MESSAGES = ["Давай квест", "Готов начать!", "Начнём квест"]
+
+# One pool per quest step: word, choice, own words, example, choice
+QUEST_ANSWERS = [
+    ["дробь", "экосистема", "метафора", "подлежащее"],
+    ["1", "3", "Показать картинку или пример"],
+    ["Это когда целое делят на равные части", "Это когда всё вокруг живёт вместе и связано"],
+    ["Когда режем пиццу на куски для друзей", "Лес, где звери и растения помогают друг другу"],
+    ["1", "2", "Да, теперь ясно!"],
+]
+
+REFLECTION_MESSAGES = [
+    "Было интересно, я узнал новое",
+    "Понял, что можно просить помощь",
+    "Самое интересное — схема",
+    "Спасибо, пока!",
+]
+
+
+@dataclass
+class ChildScript:
+    """Messages one simulated child sends, tagged with flow phase."""
+    user_id: str
+    steps: List[Tuple[str, str]] = field(default_factory=list)  # (phase, message)
+
+
+def build_script(user_id: str, rng: random.Random) -> ChildScript:
+    """
+    Build one child's conversation.
+
+    Args:
+        user_id: Simulated Telegram user ID
+        rng: Random source (seeded by the caller)
+
+    Returns:
+        ChildScript
+    """
+    script = ChildScript(user_id=user_id)
+
+    script.steps.append(("onboarding", rng.choice(NAMES)))
+    for pool in ONBOARDING_MESSAGES:
+        script.steps.append(("onboarding", rng.choice(pool)))
+
+    script.steps.append(("location", rng.choice(LOCATION_MESSAGES)))
+
+    script.steps.append(("quest", rng.choice(QUEST_START_MESSAGES)))
+    for pool in QUEST_ANSWERS:
+        script.steps.append(("quest", rng.choice(pool)))
+
+    for message in rng.sample(REFLECTION_MESSAGES, 2):
+        script.steps.append(("reflection", message))
+
+    return script
+
+
+def build_scripts(children: int, seed: int = 0, first_user_id: int = 100000) -> List[ChildScript]:
+    """
+    Build scripts for a population of children.
+
+    Args:
+        children: Number of simulated children
+        seed: Random seed
+        first_user_id: User ID of the first child (others follow sequentially)
+
+    Returns:
+        List of ChildScript
+    """
+    rng = random.Random(seed)
+    return [build_script(str(first_user_id + index), rng) for index in range(children)]
@@ -1,9 +1,17 @@
 """
 ChildBot - Main bot for children (7-14 years old)
 Educational Mode - helps with learning and emotional literacy
+
+Commands and the parent linking flow are handled here; every other text
+message goes to MessageDispatcher (the orchestration StateManager, in process
+or on shard workers), which streams LLM replies into the chat.
+
+Run: python -m src.bot.child_bot  (BOT_MODE=polling | webhook)
 """
 
+import asyncio
 import logging
+import signal
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application,
@@ -14,13 +22,15 @@ from telegram.ext import (
     filters
 )
 
-from ..config import CHILD_BOT_TOKEN, FEATURES
-from ..game.scenario_engine import ScenarioEngine
-from ..game.emotional_router import EmotionalRouter
-from ..game.learning_profile import LearningProfile
-from ..game.state_manager import StateManager
+from ..config import CHILD_BOT_TOKEN, BOT_MODE, METRICS_ENABLED, SHARD_WORKERS
+from ..core.metrics import start_metrics_server, start_event_loop_monitor
+from ..core.watchdog import get_watchdog, start_watchdog
+from ..core.profiler import install_profile_signal
+from .. import orchestration  # noqa: F401 (import order: orchestration before data)
 from ..data.user_manager import UserManager
 from ..data.link_manager import LinkManager
+from .dispatcher import MessageDispatcher
+from .outbound import OutboundSender
 
 # Configure logging
 logging.basicConfig(
@@ -33,15 +43,26 @@ logger = logging.getLogger(__name__)
 class ChildBot:
     """Main bot class for children"""
 
-    def __init__(self):
-        self.app = Application.builder().token(CHILD_BOT_TOKEN).build()
-        self.scenario_engine = ScenarioEngine()
-        self.emotional_router = EmotionalRouter()
-        self.learning_profile = LearningProfile()
-        self.state_manager = StateManager()
+    def __init__(self, mode: str = BOT_MODE, token: str = CHILD_BOT_TOKEN):
+        self.mode = mode
+
+        builder = Application.builder().token(token)
+        if mode == "webhook":
+            # Updates are fed by WebhookServer, not by PTB's Updater
+            builder = builder.updater(None)
+        else:
+            builder = builder.post_init(self._post_init).post_shutdown(self._post_shutdown)
+        self.app = builder.build()
         self.user_manager = UserManager()
         self.link_manager = LinkManager()
 
+        # Replies and reminders share Telegram's flood limits
+        self.sender = OutboundSender(self.app.bot)
+
+        # Free-form messages: in-process StateManager, or ShardedRuntime
+        # workers when SHARD_WORKERS > 1
+        self.dispatcher = MessageDispatcher(num_workers=SHARD_WORKERS, sender=self.sender)
+
         # Register handlers
         self._register_handlers()
 
@@ -61,27 +82,24 @@ class ChildBot:
 
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command - First entry point"""
-        user_telegram_id = update.effective_user.id
+        user = await self.user_manager.get_user(str(update.effective_user.id))
 
-        # Check if user already exists
-        user = self.user_manager.get_user_by_telegram_id(user_telegram_id)
-
-        if user:
+        if user and user.parent_linked:
             # Existing user
             await update.message.reply_text(
-                f"С возвращением, {user['child_name']}! 😊\n\n"
+                f"С возвращением, {user.child_name}! 😊\n\n"
                 f"Продолжим наше путешествие?\n\n"
-                f"Твой уровень: {user['progress']['level']}\n"
-                f"XP: {user['progress']['experience_points']}/{user['progress']['next_level_xp']}"
+                f"Твой уровень: {user.progress['level']}\n"
+                f"XP: {user.progress['xp']}/{user.progress['level'] * 100}"
             )
 
             # Continue from where they left off
             await self._show_main_menu(update, context, user)
         else:
             # New user - need parent linking
-            await self._start_linking_flow(update, context, user_telegram_id)
+            await self._start_linking_flow(update, context)
 
-    async def _start_linking_flow(self, update: Update, context: ContextTypes.DEFAULT_TYPE, user_telegram_id: int):
+    async def _start_linking_flow(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Start the parent linking flow for new users"""
         await update.message.reply_text(
             "Привет! Я InnerWorld Edu 🌟\n\n"
@@ -92,32 +110,20 @@ class ChildBot:
         )
 
         # Set state: waiting for name
-        self.state_manager.set_state(user_telegram_id, "waiting_for_name")
+        context.user_data['flow'] = "waiting_for_name"
 
     async def text_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle text messages based on current state"""
-        user_telegram_id = update.effective_user.id
-        text = update.message.text
-
-        # Get current state
-        current_state = self.state_manager.get_state(user_telegram_id)
-
-        if current_state == "waiting_for_name":
-            await self._handle_name_input(update, context, text)
-        elif current_state == "onboarding":
-            await self._handle_onboarding(update, context, text)
-        elif current_state == "in_quest":
-            await self._handle_quest_answer(update, context, text)
+        if context.user_data.get('flow') == "waiting_for_name":
+            await self._handle_name_input(update, context, update.message.text)
         else:
-            # Default: echo or handle as regular message
-            await update.message.reply_text(
-                "Я не совсем понял. Попробуй использовать кнопки или команды.\n\n"
-                "/help - помощь"
-            )
+            # Default: conversation state machine (sharded when configured)
+            await self.dispatcher.handle(update, context)
 
     async def _handle_name_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE, name: str):
         """Handle child's name input"""
-        user_telegram_id = update.effective_user.id
+        user_id = str(update.effective_user.id)
+        name = name.strip()
 
         # Validate name
         if len(name) < 2 or len(name) > 50:
@@ -127,7 +133,15 @@ class ChildBot:
             return
 
         # Create linking request
-        link_id, parent_link = self.link_manager.create_link(user_telegram_id, name)
+        try:
+            link = await self.link_manager.create_link(child_id=user_id, child_name=name)
+        except ValueError:
+            # Already linked (e.g. by another device)
+            context.user_data.pop('flow', None)
+            await update.message.reply_text("Твой родитель уже подключён! Напиши мне что-нибудь 😊")
+            return
+
+        parent_link = self.link_manager.generate_link_url(link.link_id)
 
         await update.message.reply_text(
             f"Отлично, {name}! 😊\n\n"
@@ -142,8 +156,8 @@ class ChildBot:
         )
 
         # Set state: waiting for parent
-        self.state_manager.set_state(user_telegram_id, "waiting_for_parent")
-        context.user_data['link_id'] = link_id
+        context.user_data['flow'] = "waiting_for_parent"
+        context.user_data['link_id'] = link.link_id
         context.user_data['child_name'] = name
 
     async def button_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -151,17 +165,8 @@ class ChildBot:
         query = update.callback_query
         await query.answer()
 
-        user_telegram_id = update.effective_user.id
-        data = query.data
-
-        if data == "check_link_status":
+        if query.data == "check_link_status":
             await self._check_link_status(query, context)
-        elif data.startswith("emotion_"):
-            emotion = data.split("_")[1]
-            await self._handle_emotion_selection(query, context, emotion)
-        elif data.startswith("location_"):
-            location = data.split("_", 1)[1]
-            await self._handle_location_selection(query, context, location)
         else:
             await query.edit_message_text("Функция в разработке 🚧")
 
@@ -173,28 +178,26 @@ class ChildBot:
             await query.edit_message_text("Ошибка: link_id не найден")
             return
 
-        link = self.link_manager.get_link(link_id)
+        link = await self.link_manager.get_link(link_id)
 
-        if link and link['status'] == 'active':
-            # Parent linked! Start onboarding
+        if link and link.is_active():
+            # Parent linked! Record it in the child's profile
             child_name = context.user_data['child_name']
-            user_telegram_id = query.from_user.id
-
-            # Create user profile
-            user = self.user_manager.create_user(
-                telegram_id=user_telegram_id,
-                child_name=child_name,
-                link_id=link_id
-            )
-
+            user = await self.user_manager.get_or_create_user(str(query.from_user.id), child_name=child_name)
+            user.child_name = user.child_name or child_name
+            user.parent_linked = True
+            user.link_id = link.link_id
+            user.parent_id = link.parent_id
+            await self.user_manager.update_user(user)
+            context.user_data.pop('flow', None)
+
+            # Onboarding continues in the conversation state machine
             await query.edit_message_text(
-                f"🎉 Отлично! {link['relationship'].capitalize()} подключил{'а' if link['relationship'] == 'mother' else ''} ся.\n\n"
+                f"🎉 Отлично! Родитель подключился.\n\n"
                 f"Теперь мы можем начать твоё путешествие в Понималию!\n\n"
-                f"Готов{'а' if child_name.endswith('а') or child_name.endswith('я') else ''}?"
+                f"Готов{'а' if child_name.endswith('а') or child_name.endswith('я') else ''}? "
+                f"Напиши мне что-нибудь 😊"
             )
-
-            # Start onboarding
-            await self._start_onboarding(query, context, user)
         else:
             await query.edit_message_text(
                 "Родитель еще не подключился.\n\n"
@@ -205,26 +208,7 @@ class ChildBot:
                 ]])
             )
 
-    async def _start_onboarding(self, query_or_update, context: ContextTypes.DEFAULT_TYPE, user: dict):
-        """Start the onboarding process"""
-        # Load first onboarding scenario
-        scenario = self.scenario_engine.load_scenario("onboarding/01_greeting.yaml")
-
-        # Show first step
-        await self.scenario_engine.show_step(query_or_update, context, scenario, step_index=0)
-
-        # Set state
-        user_telegram_id = user['telegram_id']
-        self.state_manager.set_state(user_telegram_id, "onboarding")
-        context.user_data['current_scenario'] = "onboarding/01_greeting"
-        context.user_data['current_step'] = 0
-
-    async def _handle_onboarding(self, update: Update, context: ContextTypes.DEFAULT_TYPE, text: str):
-        """Handle onboarding flow"""
-        # This will be implemented with ScenarioEngine
-        pass
-
-    async def _show_main_menu(self, update_or_query, context: ContextTypes.DEFAULT_TYPE, user: dict):
+    async def _show_main_menu(self, update_or_query, context: ContextTypes.DEFAULT_TYPE, user):
         """Show main menu with available options"""
         keyboard = [
             [InlineKeyboardButton("🗺️ Карта Понималии", callback_data="map")],
@@ -234,8 +218,8 @@ class ChildBot:
 
         text = (
             f"Главное меню\n\n"
-            f"Уровень: {user['progress']['level']}\n"
-            f"XP: {user['progress']['experience_points']}/{user['progress']['next_level_xp']}\n\n"
+            f"Уровень: {user.progress['level']}\n"
+            f"XP: {user.progress['xp']}/{user.progress['level'] * 100}\n\n"
             f"Что будем делать?"
         )
 
@@ -259,8 +243,7 @@ class ChildBot:
 
     async def status(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show current status"""
-        user_telegram_id = update.effective_user.id
-        user = self.user_manager.get_user_by_telegram_id(user_telegram_id)
+        user = await self.user_manager.get_user(str(update.effective_user.id))
 
         if not user:
             await update.message.reply_text("Сначала нужно пройти /start")
@@ -268,26 +251,25 @@ class ChildBot:
 
         status_text = (
             f"📊 Твой статус\n\n"
-            f"Имя: {user['child_name']}\n"
-            f"Уровень: {user['progress']['level']}\n"
-            f"XP: {user['progress']['experience_points']}/{user['progress']['next_level_xp']}\n"
-            f"Квестов выполнено: {user['progress']['total_quests_completed']}\n"
-            f"Серия дней: {user['progress']['streak_days']} 🔥\n\n"
-            f"Текущая локация: {user['world']['current_location']}"
+            f"Имя: {user.child_name}\n"
+            f"Уровень: {user.progress['level']}\n"
+            f"XP: {user.progress['xp']}/{user.progress['level'] * 100}\n"
+            f"Квестов выполнено: {max(user.progress['total_quests_completed'], len(user.completed_quests))}\n"
+            f"Серия дней: {user.progress['streak_days']} 🔥\n\n"
+            f"Текущая локация: {user.current_location or '—'}"
         )
 
         await update.message.reply_text(status_text)
 
     async def profile(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show learning profile"""
-        user_telegram_id = update.effective_user.id
-        user = self.user_manager.get_user_by_telegram_id(user_telegram_id)
+        user = await self.user_manager.get_user(str(update.effective_user.id))
 
         if not user:
             await update.message.reply_text("Сначала нужно пройти /start")
             return
 
-        lp = user['learning_profile']
+        lp = user.learning_profile
         profile_text = (
             f"📈 Learning Profile\n\n"
             f"Понимание смысла: {'⭐' * lp['understanding_meaning']}{'☆' * (10 - lp['understanding_meaning'])} ({lp['understanding_meaning']}/10)\n"
@@ -298,10 +280,42 @@ class ChildBot:
 
         await update.message.reply_text(profile_text)
 
+    async def _post_init(self, application: Application):
+        """Start monitoring and the message dispatcher (polling mode)"""
+        await self._start_monitoring(application)
+        await self.dispatcher.start()
+
+    async def _post_shutdown(self, application: Application):
+        """Stop the message dispatcher (polling mode)"""
+        await self.dispatcher.stop()
+
+    async def _start_monitoring(self, application: Application):
+        """Serve /metrics, watch event loop lag and blocking calls (polling mode)"""
+        if METRICS_ENABLED:
+            start_metrics_server()
+            start_event_loop_monitor()
+        start_watchdog()
+
+        # kill -USR2 <pid> toggles the watchdog and logs its report
+        asyncio.get_running_loop().add_signal_handler(signal.SIGUSR2, self._toggle_watchdog)
+        # kill -USR1 <pid> captures CPU/memory profiles and state sizes
+        install_profile_signal(signal.SIGUSR1)
+
+    def _toggle_watchdog(self):
+        """Toggle event loop watchdog, logging the top blocking call sites"""
+        watchdog = get_watchdog()
+        logger.info(watchdog.format_report())
+        watchdog.disable() if watchdog.enabled else watchdog.enable()
+
     def run(self):
-        """Start the bot"""
-        logger.info("Starting ChildBot...")
-        self.app.run_polling()
+        """Start the bot (long polling or webhook, see BOT_MODE)"""
+        logger.info(f"Starting ChildBot in {self.mode} mode...")
+
+        if self.mode == "webhook":
+            from .webhook import WebhookServer
+            WebhookServer(self.app, dispatcher=self.dispatcher).run()
+        else:
+            self.app.run_polling()
 
 
 if __name__ == "__main__":
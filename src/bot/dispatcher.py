@@ -0,0 +1,157 @@
+"""
+Conversation dispatch for InnerWorld Edu bots.
+
+Free-form child messages (text that is not a command and not part of the
+linking flow) are answered by the orchestration StateManager:
+
+    update → MessageDispatcher → StateManager.process_message   (SHARD_WORKERS = 1)
+                               → ShardedRuntime.process_message (SHARD_WORKERS > 1)
+           → reply (through OutboundSender when one is set)
+
+The OutboundSender also delivers Reality Bridge reminders: the in-process
+StateManager submits them directly, shard workers send them back to the
+ShardedRuntime, which submits them.
+
+With one worker the StateManager runs in the bot process, and replies of
+LLM-backed states (onboarding, casual chat) are streamed into the chat with
+StreamingReply. With more, the dispatcher is the front of ShardedRuntime:
+each message goes to the worker process that owns its user, and the reply
+is sent whole once the worker returns it.
+
+Used by ChildBot's text handler in both polling and webhook mode; it is
+started and stopped with the bot (WebhookServer does this in webhook mode).
+"""
+
+import asyncio
+from typing import Any, Optional
+
+from src.bot.streaming import StreamingReply
+from src.core.logger import get_logger
+from src.config import SHARD_WORKERS
+
+logger = get_logger(__name__)
+
+# Reply when no worker can take the message (all restarting, timeout)
+UNAVAILABLE_RESPONSE = "Я немного задумался... Напиши мне ещё раз через минутку! 🌟"
+
+
+class MessageDispatcher:
+    """
+    Routes child messages to the conversation state machine.
+
+    Usage:
+        dispatcher = MessageDispatcher()
+        await dispatcher.start()
+        await dispatcher.handle(update, context)  # from a MessageHandler
+    """
+
+    def __init__(
+        self,
+        num_workers: int = SHARD_WORKERS,
+        state_manager: Optional[Any] = None,
+        runtime: Optional[Any] = None,
+        sender: Optional[Any] = None
+    ):
+        """
+        Initialize dispatcher.
+
+        Args:
+            num_workers: Shard workers; > 1 runs a ShardedRuntime
+            state_manager: In-process StateManager (created if needed)
+            runtime: ShardedRuntime (created if num_workers > 1)
+            sender: Optional OutboundSender for replies
+        """
+        if runtime is None and state_manager is None:
+            if num_workers > 1:
+                from src.orchestration.sharding import ShardedRuntime
+                runtime = ShardedRuntime(num_workers=num_workers)
+            else:
+                from src.orchestration.state_manager import StateManager
+                state_manager = StateManager()
+
+        self.runtime = runtime
+        self.state_manager = state_manager
+        self.sender = sender
+
+        if sender:
+            # Reminders go through the same token buckets as live replies
+            if self.state_manager:
+                self.state_manager.set_outbound_sender(sender)
+            else:
+                self.runtime.set_outbound_sender(sender)
+
+    @property
+    def sharded(self) -> bool:
+        """True if messages go to worker processes."""
+        return self.runtime is not None
+
+    async def start(self) -> None:
+        """Start the sender and worker processes (or the in-process StateManager)."""
+        if self.sender:
+            await self.sender.start()
+        if self.runtime:
+            await self.runtime.start()
+        elif not self.state_manager.initialized:
+            await self.state_manager.initialize()
+
+        logger.info("message_dispatcher_started", sharded=self.sharded)
+
+    async def stop(self) -> None:
+        """Stop worker processes, then the sender (queued messages are drained)."""
+        if self.runtime:
+            await self.runtime.stop()
+        if self.sender:
+            await self.sender.stop()
+
+        logger.info("message_dispatcher_stopped")
+
+    async def process_message(self, user_id: Any, text: str) -> str:
+        """
+        Get the reply to one message.
+
+        Args:
+            user_id: Telegram user ID
+            text: Message text
+
+        Returns:
+            Reply text
+        """
+        user_id = str(user_id)
+
+        if not self.runtime:
+            return await self.state_manager.process_message(user_id, text)
+
+        try:
+            return await self.runtime.process_message(user_id, text)
+        except (RuntimeError, asyncio.TimeoutError) as e:
+            logger.warning("dispatch_failed", user_id=user_id, error=str(e) or type(e).__name__)
+            return UNAVAILABLE_RESPONSE
+
+    async def handle(self, update: Any, context: Any = None) -> str:
+        """
+        Answer a text update (python-telegram-bot handler signature).
+
+        Args:
+            update: telegram.Update with a text message
+            context: Handler context (its bot edits streamed replies)
+
+        Returns:
+            Reply text
+        """
+        chat_id = update.effective_chat.id
+        user_id = str(update.effective_user.id)
+        message = update.message.text
+
+        bot = getattr(context, "bot", None)
+        if not self.runtime and bot and await self.state_manager.streams_reply(user_id):
+            reply = StreamingReply(bot, chat_id, sender=self.sender)
+            return await reply.stream(self.state_manager.stream_message(user_id, message))
+
+        text = await self.process_message(user_id, message)
+
+        if self.sender:
+            await self.sender.send(chat_id, text)
+        else:
+            await update.message.reply_text(text)
+
+        return text
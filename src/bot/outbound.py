@@ -0,0 +1,502 @@
+"""
+Outbound message scheduler for InnerWorld Edu bots.
+
+Telegram throttles bots at roughly 30 messages/second overall and about
+1 message/second per chat. Sending every reply and reminder as soon as it is
+produced causes 429 (RetryAfter) errors during bursts, so all outgoing
+messages go through OutboundSender:
+
+- Global token bucket (TELEGRAM_GLOBAL_RATE) shared by all chats
+- Per-chat token buckets (TELEGRAM_PER_CHAT_RATE) - a busy chat waits
+  without blocking other chats
+- Priorities - live replies go before notifications and reminders
+- Batches - reminder fan-out is enqueued in one call
+- RetryAfter pauses sending for the time Telegram asks and retries the
+  message (up to OUTBOUND_MAX_RETRY_AFTER times); network errors are
+  retried with backoff
+
+Works with any bot object exposing async send_message(chat_id, text, **kwargs)
+(and edit_message_text for streamed replies): telegram.Bot in production,
+a fake bot in tests (see test_outbound.py).
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Deque, Tuple
+
+from telegram.error import RetryAfter, BadRequest, Forbidden, NetworkError
+
+from src.core.logger import get_logger
+from src.core.metrics import REGISTRY
+from src.config import (
+    TELEGRAM_GLOBAL_RATE,
+    TELEGRAM_PER_CHAT_RATE,
+    TELEGRAM_PER_CHAT_BURST,
+    OUTBOUND_MAX_CONCURRENCY,
+    OUTBOUND_MAX_ATTEMPTS,
+    OUTBOUND_MAX_RETRY_AFTER
+)
+
+logger = get_logger(__name__)
+
+# Per-chat buckets idle longer than this are dropped
+CHAT_BUCKET_IDLE_SECONDS = 60.0
+
+# Number of send-lag samples kept for percentile stats
+LAG_SAMPLES = 1000
+
+SEND_LAG_SECONDS = REGISTRY.histogram(
+    "innerworld_outbound_send_lag_seconds", "Time from submit to Bot API success",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+)
+
+
+class Priority(IntEnum):
+    """Outbound priority (lower is sent first)."""
+    LIVE = 0  # Replies to the child's current message
+    NOTIFICATION = 1  # Parent alerts, reports
+    REMINDER = 2  # Reality Bridge reminders
+
+
+class TokenBucket:
+    """Token bucket rate limiter (time from time.monotonic())."""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize bucket (starts full).
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add tokens for time elapsed since last update."""
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        """Take one token (call after wait_time() returned 0)."""
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        """Check if bucket is full (chat idle)."""
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+@dataclass
+class OutboundMessage:
+    """A message waiting to be sent."""
+    chat_id: Any
+    text: str
+    priority: Priority
+    method: str = "send_message"  # Bot method: send_message | edit_message_text
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    future: Optional[asyncio.Future] = None
+    submitted_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+    retry_afters: int = 0  # RetryAfter responses for this message
+    seq: int = 0
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    """Mark a failed future's error as seen (failures are logged by the sender)."""
+    if not future.cancelled():
+        future.exception()
+
+
+class OutboundSender:
+    """
+    Rate-limited, prioritized sender for Telegram messages.
+
+    Usage:
+        sender = OutboundSender(bot)
+        await sender.start()
+        await sender.send(chat_id, "Привет!")                    # live reply
+        sender.submit_batch(reminders, priority=Priority.REMINDER)  # fan-out
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        global_rate: float = TELEGRAM_GLOBAL_RATE,
+        per_chat_rate: float = TELEGRAM_PER_CHAT_RATE,
+        per_chat_burst: int = TELEGRAM_PER_CHAT_BURST,
+        max_concurrency: int = OUTBOUND_MAX_CONCURRENCY,
+        max_attempts: int = OUTBOUND_MAX_ATTEMPTS,
+        max_retry_after: int = OUTBOUND_MAX_RETRY_AFTER
+    ):
+        """
+        Initialize outbound sender.
+
+        Args:
+            bot: Object with async send_message(chat_id, text, **kwargs)
+            global_rate: Messages per second across all chats
+            per_chat_rate: Messages per second per chat
+            per_chat_burst: Burst size per chat
+            max_concurrency: Max in-flight Bot API requests
+            max_attempts: Attempts for retryable network errors
+            max_retry_after: RetryAfter retries before a message fails
+        """
+        self.bot = bot
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.max_attempts = max_attempts
+        self.max_retry_after = max_retry_after
+
+        self._global_bucket = TokenBucket(global_rate, max(1.0, global_rate))
+        self._chat_buckets: Dict[Any, TokenBucket] = {}
+
+        # Ready: (priority, seq, msg); delayed: (ready_at, priority, seq, msg)
+        self._ready: List[Tuple[int, int, OutboundMessage]] = []
+        self._delayed: List[Tuple[float, int, int, OutboundMessage]] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._in_flight: set = set()
+        self._task: Optional[asyncio.Task] = None
+        self.running = False
+
+        # Stats
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.throttled = 0  # RetryAfter responses
+        self.send_lag: Deque[float] = deque(maxlen=LAG_SAMPLES)
+
+        self._register_metrics()
+
+    def _register_metrics(self) -> None:
+        """Expose counters and queue depths (read at scrape time)."""
+        REGISTRY.register_callback(
+            "innerworld_outbound_messages_total", "Outbound Telegram messages by result",
+            lambda: {"sent": self.sent, "failed": self.failed,
+                     "retried": self.retried, "throttled": self.throttled},
+            metric_type="counter", labelnames=["result"]
+        )
+        REGISTRY.register_callback(
+            "innerworld_outbound_queue_depth", "Queued outbound messages by priority",
+            self._queue_depth, labelnames=["priority"]
+        )
+        REGISTRY.register_callback(
+            "innerworld_outbound_in_flight", "In-flight Bot API requests", lambda: len(self._in_flight)
+        )
+
+    def _queue_depth(self) -> Dict[str, int]:
+        """Count queued messages per priority."""
+        depth = {p.name.lower(): 0 for p in Priority}
+        for entry in self._ready + self._delayed:
+            depth[entry[-1].priority.name.lower()] += 1
+        return depth
+
+    async def start(self) -> None:
+        """Start scheduler loop."""
+        self._ensure_started()
+
+    def _ensure_started(self) -> None:
+        """Start scheduler loop if not running (needs a running event loop)."""
+        if self.running:
+            return
+
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info("outbound_sender_started")
+
+    async def stop(self, drain: bool = True, timeout: float = 10.0) -> None:
+        """
+        Stop scheduler loop.
+
+        Args:
+            drain: Wait for queued messages to be sent first
+            timeout: Max seconds to wait for draining
+        """
+        if drain:
+            deadline = time.monotonic() + timeout
+            while (self._ready or self._delayed or self._in_flight) and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+
+        self.running = False
+        self._wakeup.set()
+
+        if self._task:
+            await self._task
+            self._task = None
+
+        for entry in self._ready + self._delayed:
+            msg = entry[-1]
+            if msg.future and not msg.future.done():
+                msg.future.set_exception(RuntimeError("Outbound sender stopped"))
+        self._ready.clear()
+        self._delayed.clear()
+
+        logger.info("outbound_sender_stopped", sent=self.sent, failed=self.failed)
+
+    def submit(
+        self,
+        chat_id: Any,
+        text: str,
+        priority: Priority = Priority.LIVE,
+        method: str = "send_message",
+        **kwargs: Any
+    ) -> asyncio.Future:
+        """
+        Enqueue message without waiting for delivery.
+
+        Args:
+            chat_id: Telegram chat ID
+            text: Message text
+            priority: Outbound priority
+            method: Bot method to call (edits count against the same limits)
+            **kwargs: Extra method arguments (reply_markup, message_id, ...)
+
+        Returns:
+            Future resolved with the sent Message (or the send error)
+        """
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_retrieve_exception)
+        self._enqueue(OutboundMessage(
+            chat_id=chat_id,
+            text=text,
+            priority=priority,
+            method=method,
+            kwargs=kwargs,
+            future=future,
+            seq=next(self._seq)
+        ))
+        self._ensure_started()
+        self._wakeup.set()
+        return future
+
+    async def send(
+        self,
+        chat_id: Any,
+        text: str,
+        priority: Priority = Priority.LIVE,
+        method: str = "send_message",
+        **kwargs: Any
+    ) -> Any:
+        """Enqueue message and wait until it is sent."""
+        return await self.submit(chat_id, text, priority, method, **kwargs)
+
+    def submit_batch(
+        self,
+        messages: List[Tuple[Any, str]],
+        priority: Priority = Priority.REMINDER,
+        **kwargs: Any
+    ) -> List[asyncio.Future]:
+        """
+        Enqueue a fan-out batch in one call.
+
+        Args:
+            messages: List of (chat_id, text)
+            priority: Outbound priority for the whole batch
+            **kwargs: Extra send_message arguments for every message
+
+        Returns:
+            List of futures, one per message
+        """
+        loop = asyncio.get_running_loop()
+        futures = []
+
+        for chat_id, text in messages:
+            future = loop.create_future()
+            future.add_done_callback(_retrieve_exception)
+            self._enqueue(OutboundMessage(
+                chat_id=chat_id,
+                text=text,
+                priority=priority,
+                kwargs=dict(kwargs),
+                future=future,
+                seq=next(self._seq)
+            ))
+            futures.append(future)
+
+        self._ensure_started()
+        self._wakeup.set()
+        logger.info("outbound_batch_enqueued", size=len(messages), priority=priority.name)
+        return futures
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get sender statistics.
+
+        Returns:
+            Dictionary with counters, queue depths and send lag (seconds)
+        """
+        lag = sorted(self.send_lag)
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "throttled": self.throttled,
+            "queue_depth": self._queue_depth(),
+            "in_flight": len(self._in_flight),
+            "chat_buckets": len(self._chat_buckets),
+            "send_lag_p50": lag[len(lag) // 2] if lag else 0.0,
+            "send_lag_p95": lag[int(len(lag) * 0.95)] if lag else 0.0
+        }
+
+    def _enqueue(self, msg: OutboundMessage) -> None:
+        """Put message on ready heap."""
+        heapq.heappush(self._ready, (msg.priority, msg.seq, msg))
+
+    def _delay(self, msg: OutboundMessage, ready_at: float) -> None:
+        """Put message on delayed heap until ready_at."""
+        heapq.heappush(self._delayed, (ready_at, msg.priority, msg.seq, msg))
+
+    def _chat_bucket(self, chat_id: Any, now: float) -> TokenBucket:
+        """Get (or create) bucket for chat, pruning idle buckets."""
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) > 10000:
+                self._prune_chat_buckets(now)
+            bucket = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _prune_chat_buckets(self, now: float) -> None:
+        """Drop buckets of chats that have been idle for a while."""
+        idle = [
+            chat_id for chat_id, bucket in self._chat_buckets.items()
+            if now - bucket.updated > CHAT_BUCKET_IDLE_SECONDS and bucket.is_full(now)
+        ]
+        for chat_id in idle:
+            del self._chat_buckets[chat_id]
+
+    async def _sleep(self, timeout: Optional[float]) -> None:
+        """Sleep until timeout or until a new message is submitted."""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        """Scheduler loop: pick next sendable message within rate limits."""
+        while self.running:
+            now = time.monotonic()
+
+            # Promote delayed messages whose time has come
+            while self._delayed and self._delayed[0][0] <= now:
+                msg = heapq.heappop(self._delayed)[-1]
+                self._enqueue(msg)
+
+            if now < self._paused_until:
+                await self._sleep(self._paused_until - now)
+                continue
+
+            if not self._ready:
+                timeout = self._delayed[0][0] - now if self._delayed else None
+                await self._sleep(timeout)
+                continue
+
+            msg = self._ready[0][-1]
+
+            # Busy chat: park message, keep serving other chats
+            chat_bucket = self._chat_bucket(msg.chat_id, now)
+            chat_wait = chat_bucket.wait_time(now)
+            if chat_wait > 0:
+                heapq.heappop(self._ready)
+                self._delay(msg, now + chat_wait)
+                continue
+
+            global_wait = self._global_bucket.wait_time(now)
+            if global_wait > 0:
+                await self._sleep(global_wait)
+                continue
+
+            await self._slots.acquire()
+
+            heapq.heappop(self._ready)
+            now = time.monotonic()
+            chat_bucket.consume(now)
+            self._global_bucket.consume(now)
+
+            task = asyncio.create_task(self._deliver(msg))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _deliver(self, msg: OutboundMessage) -> None:
+        """Send one message and handle Telegram errors."""
+        msg.attempts += 1
+
+        try:
+            send = getattr(self.bot, msg.method)
+            result = await send(chat_id=msg.chat_id, text=msg.text, **msg.kwargs)
+
+            self.sent += 1
+            lag = time.monotonic() - msg.submitted_at
+            self.send_lag.append(lag)
+            SEND_LAG_SECONDS.observe(lag)
+            if msg.future and not msg.future.done():
+                msg.future.set_result(result)
+
+        except RetryAfter as e:
+            # Flood limit hit: pause everything, retry this message first
+            self.throttled += 1
+            msg.retry_afters += 1
+            retry_after = float(e.retry_after)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            if msg.retry_afters <= self.max_retry_after:
+                self.retried += 1
+                self._enqueue(msg)
+                logger.warning("outbound_retry_after",
+                              chat_id=msg.chat_id,
+                              retry_after=retry_after,
+                              attempt=msg.retry_afters)
+            else:
+                self._fail(msg, e)
+
+        except (BadRequest, Forbidden) as e:
+            # Not retryable (chat blocked the bot, bad markup, ...)
+            self._fail(msg, e)
+
+        except NetworkError as e:
+            if msg.attempts < self.max_attempts:
+                self.retried += 1
+                self._delay(msg, time.monotonic() + 0.5 * (2 ** msg.attempts))
+                logger.warning("outbound_send_retry",
+                              chat_id=msg.chat_id,
+                              attempt=msg.attempts,
+                              error=str(e))
+            else:
+                self._fail(msg, e)
+
+        except Exception as e:
+            self._fail(msg, e)
+
+        finally:
+            self._slots.release()
+            self._wakeup.set()
+
+    def _fail(self, msg: OutboundMessage, error: Exception) -> None:
+        """Record failed message."""
+        self.failed += 1
+        logger.error("outbound_send_failed",
+                    chat_id=msg.chat_id,
+                    priority=msg.priority.name,
+                    error=str(error))
+        if msg.future and not msg.future.done():
+            msg.future.set_exception(error)
@@ -0,0 +1,181 @@
+"""
+Progressive reply streaming for InnerWorld Edu bots.
+
+For LLM-backed states the full GPT-4 completion can take several seconds.
+StreamingReply shows a placeholder immediately and edits it as tokens arrive
+from StateManager.stream_message:
+
+    placeholder "💭..." → edit (debounced) → edit → ... → final edit
+
+Edits are debounced (STREAM_EDIT_INTERVAL_SECONDS, STREAM_MIN_CHARS_PER_EDIT)
+so one reply costs about one edit per second, and when an OutboundSender is
+given, edits go through its per-chat and global buckets like any message.
+Replies longer than Telegram's 4096 characters continue in a new message.
+"""
+
+import time
+from typing import Any, AsyncIterator, List, Optional
+
+from telegram.error import BadRequest
+
+from src.core.logger import get_logger
+from src.config import (
+    STREAM_PLACEHOLDER,
+    STREAM_EDIT_INTERVAL_SECONDS,
+    STREAM_MIN_CHARS_PER_EDIT,
+    TELEGRAM_MAX_MESSAGE_LENGTH
+)
+
+logger = get_logger(__name__)
+
+
+class StreamingReply:
+    """
+    Streams a reply into a Telegram chat by editing a placeholder message.
+
+    Usage:
+        reply = StreamingReply(bot, chat_id, sender=outbound_sender)
+        text = await reply.stream(state_manager.stream_message(user_id, message))
+    """
+
+    def __init__(
+        self,
+        bot: Any,
+        chat_id: Any,
+        sender: Optional[Any] = None,
+        placeholder: str = STREAM_PLACEHOLDER,
+        edit_interval: float = STREAM_EDIT_INTERVAL_SECONDS,
+        min_chars_per_edit: int = STREAM_MIN_CHARS_PER_EDIT,
+        max_length: int = TELEGRAM_MAX_MESSAGE_LENGTH,
+        **send_kwargs: Any
+    ):
+        """
+        Initialize streaming reply.
+
+        Args:
+            bot: telegram.Bot (send_message, edit_message_text)
+            chat_id: Target chat
+            sender: Optional OutboundSender to rate-limit sends and edits
+            placeholder: Text shown until the first tokens arrive
+            edit_interval: Min seconds between edits
+            min_chars_per_edit: Min new characters before an edit
+            max_length: Max characters per Telegram message
+            **send_kwargs: Extra arguments for the final edit (reply_markup, ...)
+        """
+        self.bot = bot
+        self.chat_id = chat_id
+        self.sender = sender
+        self.placeholder = placeholder
+        self.edit_interval = edit_interval
+        self.min_chars_per_edit = min_chars_per_edit
+        self.max_length = max_length
+        self.send_kwargs = send_kwargs
+
+        self.messages: List[Any] = []  # Sent Telegram messages
+        self.edits = 0
+        self._shown = ""  # Text currently displayed in the last message
+        self._last_edit = 0.0
+
+    async def stream(self, chunks: AsyncIterator[str]) -> str:
+        """
+        Consume chunks and keep the chat message up to date.
+
+        Args:
+            chunks: Async iterator of text chunks
+
+        Returns:
+            Full reply text
+        """
+        started = time.monotonic()
+        current = await self._send(self.placeholder)
+        parts: List[str] = []
+        offset = 0  # Start of the current message within the full text
+        first_token_at = None
+
+        async for chunk in chunks:
+            if first_token_at is None:
+                first_token_at = time.monotonic() - started
+
+            parts.append(chunk)
+            text = "".join(parts)
+
+            # Overflow: finish this message, continue in a new one
+            while len(text) - offset > self.max_length:
+                cut = self._split_point(text, offset)
+                await self._edit(current, text[offset:cut], force=True)
+                offset = cut
+                current = await self._send(text[offset:offset + self.max_length] or self.placeholder)
+
+            pending = text[offset:]
+            due = time.monotonic() - self._last_edit >= self.edit_interval
+            enough = len(pending) - len(self._shown) >= self.min_chars_per_edit
+            if due and enough:
+                await self._edit(current, pending)
+
+        text = "".join(parts)
+        await self._edit(current, text[offset:] or self.placeholder, force=True, final=True)
+
+        logger.info("streaming_reply_done",
+                    chat_id=self.chat_id,
+                    chars=len(text),
+                    edits=self.edits,
+                    messages=len(self.messages),
+                    first_token_seconds=round(first_token_at or 0.0, 3),
+                    total_seconds=round(time.monotonic() - started, 3))
+
+        return text
+
+    def _split_point(self, text: str, offset: int) -> int:
+        """Find where to split an overlong message (prefer newline, then space)."""
+        limit = offset + self.max_length
+        for separator in ("\n", " "):
+            position = text.rfind(separator, offset, limit)
+            if position > offset:
+                return position + 1
+        return limit
+
+    async def _send(self, text: str) -> Any:
+        """Send a new message."""
+        if self.sender:
+            message = await self.sender.send(self.chat_id, text)
+        else:
+            message = await self.bot.send_message(chat_id=self.chat_id, text=text)
+
+        self.messages.append(message)
+        self._shown = text
+        self._last_edit = time.monotonic()
+        return message
+
+    async def _edit(self, message: Any, text: str, force: bool = False, final: bool = False) -> None:
+        """Edit message text (skips no-op edits)."""
+        if text == self._shown and not (final and self.send_kwargs):
+            return
+
+        if not force and time.monotonic() - self._last_edit < self.edit_interval:
+            return
+
+        kwargs = dict(self.send_kwargs) if final else {}
+        message_id = message.message_id if hasattr(message, "message_id") else message["message_id"]
+
+        try:
+            if self.sender:
+                await self.sender.send(
+                    self.chat_id, text,
+                    method="edit_message_text",
+                    message_id=message_id,
+                    **kwargs
+                )
+            else:
+                await self.bot.edit_message_text(
+                    chat_id=self.chat_id,
+                    text=text,
+                    message_id=message_id,
+                    **kwargs
+                )
+            self.edits += 1
+        except BadRequest as e:
+            # "Message is not modified" and similar are harmless mid-stream
+            logger.debug("streaming_edit_skipped", chat_id=self.chat_id, error=str(e))
+
+        self._shown = text
+        self._last_edit = time.monotonic()
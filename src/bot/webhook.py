@@ -0,0 +1,379 @@
+"""
+Webhook ingestion for InnerWorld Edu bots.
+
+Serves Telegram webhook updates from an ASGI app (FastAPI + uvicorn, the same
+stack as backend/main.py) instead of long polling:
+
+    Telegram → POST /telegram/webhook → dedup by update_id → bounded queue
+             → N update workers → Application.process_update
+
+The HTTP handler only validates, deduplicates and enqueues, so Telegram gets
+its 200 immediately. Updates are partitioned over workers by chat ID: updates
+of one chat are processed in order, different chats run concurrently.
+
+When the queue is full the handler answers 503 and Telegram retries the
+update later; retried update_ids that were already accepted are dropped.
+
+The webhook listener is public, so it only answers a bare /health; ingestion
+stats (/debug/webhook) and the /debug/* admin routes need X-Admin-Token, and
+/metrics is served on the internal METRICS_PORT as in polling mode.
+"""
+
+import asyncio
+import hmac
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Deque
+
+from fastapi import Depends, FastAPI, Request, Response
+from telegram import Update
+from telegram.ext import Application
+
+from src.core.logger import get_logger
+from src.core.metrics import REGISTRY, start_metrics_server, start_event_loop_monitor
+from src.core.watchdog import get_watchdog, start_watchdog
+from src.core.admin import require_admin, router as admin_router
+from src.config import (
+    METRICS_ENABLED,
+    METRICS_PORT,
+    WEBHOOK_URL,
+    WEBHOOK_PATH,
+    WEBHOOK_SECRET,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_CONCURRENCY,
+    WEBHOOK_QUEUE_SIZE,
+    WEBHOOK_DEDUP_WINDOW,
+    WEBHOOK_DRAIN_TIMEOUT_SECONDS
+)
+
+logger = get_logger(__name__)
+
+# Number of latency samples kept for percentile stats
+LATENCY_SAMPLES = 1000
+
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "innerworld_webhook_queue_wait_seconds", "Time updates wait in the webhook queue"
+)
+UPDATE_SECONDS = REGISTRY.histogram(
+    "innerworld_webhook_update_seconds", "Application.process_update latency"
+)
+
+
+def _percentile(samples: Deque[float], q: float) -> float:
+    """Get q-th percentile (0-1) of samples, 0.0 if empty."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(q * len(ordered)))
+    return ordered[index]
+
+
+def _chat_key(data: Dict[str, Any]) -> int:
+    """Extract chat (or user) ID from raw update for ordering."""
+    for field in ("message", "edited_message", "callback_query", "my_chat_member"):
+        payload = data.get(field)
+        if not payload:
+            continue
+        chat = payload.get("chat") or payload.get("message", {}).get("chat")
+        if chat:
+            return chat["id"]
+        sender = payload.get("from")
+        if sender:
+            return sender["id"]
+    return data.get("update_id", 0)
+
+
+class WebhookServer:
+    """
+    ASGI webhook server feeding a python-telegram-bot Application.
+
+    Handles secret token check, update_id dedup, bounded queueing and
+    concurrent processing with per-chat ordering.
+    """
+
+    def __init__(
+        self,
+        application: Application,
+        webhook_url: str = WEBHOOK_URL,
+        path: str = WEBHOOK_PATH,
+        secret_token: str = WEBHOOK_SECRET,
+        concurrency: int = WEBHOOK_CONCURRENCY,
+        queue_size: int = WEBHOOK_QUEUE_SIZE,
+        dedup_window: int = WEBHOOK_DEDUP_WINDOW,
+        drain_timeout: float = WEBHOOK_DRAIN_TIMEOUT_SECONDS,
+        dispatcher: Optional[Any] = None
+    ):
+        """
+        Initialize webhook server.
+
+        Args:
+            application: Telegram Application (built with updater(None))
+            webhook_url: Public base URL registered with Telegram ("" to skip)
+            path: HTTP path for webhook requests
+            secret_token: Expected X-Telegram-Bot-Api-Secret-Token ("" to skip check)
+            concurrency: Number of concurrent update workers
+            queue_size: Max updates buffered across all workers
+            dedup_window: Number of recent update_ids remembered
+            drain_timeout: Max seconds stop() waits for queued updates
+            dispatcher: MessageDispatcher started and stopped with the server
+                (the bot's handlers forward messages to it)
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+
+        self.application = application
+        self.webhook_url = webhook_url
+        self.path = path
+        self.secret_token = secret_token
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.dedup_window = dedup_window
+        self.drain_timeout = drain_timeout
+        self.dispatcher = dispatcher
+
+        # One queue per worker; chat ID picks the queue
+        per_worker = max(1, queue_size // concurrency)
+        self._queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=per_worker) for _ in range(concurrency)
+        ]
+        self._workers: List[asyncio.Task] = []
+        self._seen_updates: "OrderedDict[int, None]" = OrderedDict()
+
+        # Stats
+        self.received = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+        self.queue_wait: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.processing_time: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._lag_monitor: Optional[asyncio.Task] = None
+        self._metrics_server = None  # ThreadingHTTPServer on METRICS_PORT
+
+        self._register_metrics()
+        self.app = self._build_app()
+
+    def _register_metrics(self) -> None:
+        """Expose ingestion counters and queue depth (read at scrape time)."""
+        REGISTRY.register_callback(
+            "innerworld_webhook_updates_total", "Webhook updates by outcome",
+            lambda: {"received": self.received, "duplicate": self.duplicates,
+                     "rejected": self.rejected, "processed": self.processed,
+                     "failed": self.failed},
+            metric_type="counter", labelnames=["outcome"]
+        )
+        REGISTRY.register_callback(
+            "innerworld_webhook_queue_depth", "Updates waiting for a worker",
+            lambda: sum(queue.qsize() for queue in self._queues)
+        )
+
+    def _build_app(self) -> FastAPI:
+        """Create FastAPI app with webhook route."""
+        app = FastAPI(title="InnerWorld Edu Bot Webhook")
+
+        @app.on_event("startup")
+        async def startup_event():
+            await self.start()
+
+        @app.on_event("shutdown")
+        async def shutdown_event():
+            await self.stop()
+
+        @app.post(self.path)
+        async def webhook(request: Request) -> Response:
+            return await self.handle_request(request)
+
+        # Public listener: liveness only. Queue and partition stats need the
+        # admin token; /metrics is served on the internal METRICS_PORT
+        @app.get("/health")
+        async def health():
+            return {"status": "healthy"}
+
+        @app.get("/debug/webhook", dependencies=[Depends(require_admin)])
+        async def webhook_stats():
+            return self.get_statistics()
+
+        app.include_router(admin_router)
+
+        return app
+
+    def _start_metrics_server(self) -> None:
+        """Serve /metrics on METRICS_PORT (internal), as in polling mode."""
+        if self._metrics_server or not METRICS_PORT:
+            return
+        try:
+            self._metrics_server = start_metrics_server(port=METRICS_PORT)
+        except OSError as e:
+            logger.warning("metrics_server_failed", port=METRICS_PORT, error=str(e))
+
+    async def start(self) -> None:
+        """Start Application, update workers and register webhook."""
+        await self.application.initialize()
+        await self.application.start()
+        if self.dispatcher:
+            await self.dispatcher.start()
+
+        self._workers = [
+            asyncio.create_task(self._worker(index))
+            for index in range(self.concurrency)
+        ]
+        if METRICS_ENABLED:
+            self._start_metrics_server()
+            self._lag_monitor = start_event_loop_monitor()
+        start_watchdog()
+
+        if self.webhook_url:
+            await self.application.bot.set_webhook(
+                url=f"{self.webhook_url.rstrip('/')}{self.path}",
+                secret_token=self.secret_token or None,
+                max_connections=min(100, max(1, self.concurrency * 5)),
+                allowed_updates=Update.ALL_TYPES
+            )
+
+        logger.info("webhook_server_started",
+                   path=self.path,
+                   concurrency=self.concurrency,
+                   queue_size=self.queue_size)
+
+    async def stop(self) -> None:
+        """Drain queues (up to drain_timeout), stop workers and Application."""
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues)),
+                self.drain_timeout
+            )
+        except asyncio.TimeoutError:
+            # A hung process_update must not block shutdown
+            logger.warning("webhook_drain_timeout",
+                           timeout=self.drain_timeout,
+                           queue_depth=sum(queue.qsize() for queue in self._queues))
+
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._lag_monitor:
+            self._lag_monitor.cancel()
+            self._lag_monitor = None
+        if self._metrics_server:
+            await asyncio.to_thread(self._metrics_server.shutdown)
+            self._metrics_server.server_close()
+            self._metrics_server = None
+        get_watchdog().disable()
+
+        if self.dispatcher:
+            await self.dispatcher.stop()
+        await self.application.stop()
+        await self.application.shutdown()
+
+        logger.info("webhook_server_stopped", processed=self.processed)
+
+    async def handle_request(self, request: Request) -> Response:
+        """
+        Accept one webhook request.
+
+        Returns:
+            200 if accepted or duplicate, 403 on bad secret,
+            400 on malformed body, 503 if the queue is full
+        """
+        if self.secret_token:
+            received = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+            if not hmac.compare_digest(received.encode(), self.secret_token.encode()):
+                logger.warning("webhook_bad_secret")
+                return Response(status_code=403)
+
+        try:
+            data = await request.json()
+            update_id = int(data["update_id"])
+        except Exception:
+            return Response(status_code=400)
+
+        return Response(status_code=self.enqueue(update_id, data))
+
+    def enqueue(self, update_id: int, data: Dict[str, Any]) -> int:
+        """
+        Deduplicate and enqueue a raw update.
+
+        Args:
+            update_id: Telegram update_id
+            data: Raw update JSON
+
+        Returns:
+            HTTP status code for Telegram
+        """
+        self.received += 1
+
+        if update_id in self._seen_updates:
+            self.duplicates += 1
+            logger.debug("webhook_duplicate_update", update_id=update_id)
+            return 200
+
+        queue = self._queues[_chat_key(data) % self.concurrency]
+
+        try:
+            queue.put_nowait((time.perf_counter(), data))
+        except asyncio.QueueFull:
+            # Not remembered as seen: Telegram's retry must be accepted
+            self.rejected += 1
+            logger.warning("webhook_queue_full", update_id=update_id)
+            return 503
+
+        self._seen_updates[update_id] = None
+        if len(self._seen_updates) > self.dedup_window:
+            self._seen_updates.popitem(last=False)
+
+        return 200
+
+    async def _worker(self, index: int) -> None:
+        """Process updates from one queue in order."""
+        queue = self._queues[index]
+
+        while True:
+            enqueued_at, data = await queue.get()
+            started = time.perf_counter()
+            self.queue_wait.append(started - enqueued_at)
+            QUEUE_WAIT_SECONDS.observe(started - enqueued_at)
+
+            try:
+                update = Update.de_json(data, self.application.bot)
+                await self.application.process_update(update)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error("webhook_update_failed",
+                            update_id=data.get("update_id"),
+                            error=str(e))
+            finally:
+                elapsed = time.perf_counter() - started
+                self.processing_time.append(elapsed)
+                UPDATE_SECONDS.observe(elapsed)
+                queue.task_done()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get ingestion statistics.
+
+        Returns:
+            Dictionary with counters, queue depth and latency percentiles (seconds)
+        """
+        return {
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "failed": self.failed,
+            "queue_depth": sum(queue.qsize() for queue in self._queues),
+            "queue_capacity": sum(queue.maxsize for queue in self._queues),
+            "queue_wait_p50": _percentile(self.queue_wait, 0.50),
+            "queue_wait_p95": _percentile(self.queue_wait, 0.95),
+            "processing_p50": _percentile(self.processing_time, 0.50),
+            "processing_p95": _percentile(self.processing_time, 0.95),
+            "processing_p99": _percentile(self.processing_time, 0.99)
+        }
+
+    def run(self, host: str = WEBHOOK_HOST, port: int = WEBHOOK_PORT) -> None:
+        """Serve webhook with uvicorn (blocking)."""
+        import uvicorn
+        uvicorn.run(self.app, host=host, port=port)
@@ -13,6 +13,7 @@ LOCATIONS_DIR = DATA_DIR / "locations"
 USER_PROFILES_DIR = DATA_DIR / "user_profiles"
 PARENTS_DIR = DATA_DIR / "parents"
 LINKS_DIR = DATA_DIR / "links"
+REALITY_BRIDGES_DIR = DATA_DIR / "reality_bridges"
 
 # Bot tokens (from environment variables)
 CHILD_BOT_TOKEN = os.getenv("CHILD_BOT_TOKEN", "")
@@ -94,6 +95,146 @@ LEARNING_DIMENSIONS = ["understanding_meaning", "memory", "attention", "motivati
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE = BASE_DIR / "logs" / "bot.log"
+LOG_MODE = os.getenv("LOG_MODE", "sync")  # sync | queue (background writer thread)
+LOG_QUEUE_SIZE = 10000  # Queued events before new ones are dropped
+LOG_FLUSH_INTERVAL_SECONDS = 0.05
+# Levels that record filename/line/function; unset: every level in sync mode,
+# warning and above in queue mode (see src/core/logger.py)
+LOG_CALLSITE_LEVELS = [
+    level.strip().lower() for level in os.getenv("LOG_CALLSITE_LEVELS", "").split(",") if level.strip()
+] or None
+LOG_SAMPLED_EVENTS = {  # High-volume events: max per second each
+    "user_loaded": 10,
+    "bridge_saved": 10,
+    "bridge_loaded": 10,
+    "user_state_saved": 10,
+    "event_loop_blocked": 5,
+}
+
+# Sharded runtime (worker processes own a slice of users by user_id hash)
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "1"))
+SHARD_VIRTUAL_NODES = 160  # Ring points per worker
+SHARD_HEALTH_INTERVAL_SECONDS = 1.0
+SHARD_REQUEST_TIMEOUT_SECONDS = 60.0
+SHARD_READY_TIMEOUT_SECONDS = 120.0  # Restarted worker not ready by then is killed and restarted
+
+# Bot update ingestion: "polling" (long polling) or "webhook" (ASGI server)
+BOT_MODE = os.getenv("BOT_MODE", "polling")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # Public HTTPS base URL
+WEBHOOK_PATH = "/telegram/webhook"
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_CONCURRENCY = int(os.getenv("WEBHOOK_CONCURRENCY", "8"))  # Parallel update workers
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000"))  # Max buffered updates
+WEBHOOK_DEDUP_WINDOW = 10000  # Remembered update_ids for retry dedup
+WEBHOOK_DRAIN_TIMEOUT_SECONDS = 30.0  # Max wait for queued updates on shutdown
+
+# Outbound Telegram messages (flood limits)
+TELEGRAM_GLOBAL_RATE = 30.0  # Messages per second, all chats
+TELEGRAM_PER_CHAT_RATE = 1.0  # Messages per second, one chat
+TELEGRAM_PER_CHAT_BURST = 3  # Short bursts allowed per chat
+OUTBOUND_MAX_CONCURRENCY = 20  # In-flight Bot API requests
+OUTBOUND_MAX_ATTEMPTS = 3  # Attempts on network errors
+OUTBOUND_MAX_RETRY_AFTER = 5  # RetryAfter (429) retries before a message fails
+
+# Streamed LLM replies (placeholder message edited as tokens arrive)
+STREAM_PLACEHOLDER = "💭..."
+STREAM_EDIT_INTERVAL_SECONDS = 1.0  # Min time between edits of one message
+STREAM_MIN_CHARS_PER_EDIT = 20  # Skip edits that add less text than this
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+# Tracing (per-message spans, OTLP JSON; only slow or failed traces are kept)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file")  # file | otlp
+TRACING_FILE = Path(os.getenv("TRACING_FILE", str(BASE_DIR / "data" / "traces" / "spans.jsonl")))
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACING_SLOW_THRESHOLD_SECONDS = float(os.getenv("TRACING_SLOW_THRESHOLD_SECONDS", "2.0"))
+TRACING_BASE_SAMPLE_RATE = float(os.getenv("TRACING_BASE_SAMPLE_RATE", "0.0"))  # Fast traces kept
+TRACING_MAX_SPANS_PER_TRACE = 256
+
+# Metrics (Prometheus text format at /metrics)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))  # Polling bot; shard worker k uses PORT + 1 + k
+METRICS_LOOP_LAG_INTERVAL_SECONDS = 0.5
+
+# Event loop watchdog (captures stacks of calls that block the loop).
+# Off by default: when on it runs a 50 ms heartbeat and a monitor thread in
+# every process. Switch on per process with POST /debug/watchdog or SIGUSR2.
+WATCHDOG_ENABLED = os.getenv("WATCHDOG_ENABLED", "false").lower() == "true"
+WATCHDOG_THRESHOLD_SECONDS = float(os.getenv("WATCHDOG_THRESHOLD_SECONDS", "0.1"))
+WATCHDOG_INTERVAL_SECONDS = 0.05  # Heartbeat period
+WATCHDOG_MAX_SITES = 200  # Distinct blocking call sites kept
+
+# Reality Bridge reminders (durable SQLite queue, paged into memory)
+REMINDER_PAGE_SECONDS = 300  # Reminders due within this window are held in memory
+REMINDER_PAGE_LIMIT = 5000  # Max reminders paged in at once
+REMINDER_MAX_ATTEMPTS = 5  # Delivery attempts before a reminder is marked failed
+REMINDER_RETRY_SECONDS = 30  # First retry delay (doubles per attempt)
+REMINDER_RETENTION_DAYS = 7  # Delivered/failed reminders kept for idempotency
+REMINDER_BATCH_SIZE = 500  # Max reminders per fan-out batch
+REMINDER_TICK_SECONDS = 1.0  # Reminders due within one tick are sent together (up to a tick early)
+REMINDER_FANOUT_CONCURRENCY = 20  # Concurrent per-bridge callbacks (without batch callback)
+
+# Reality Bridge history archive (append-only, gzip, one partition per day)
+BRIDGE_ARCHIVE_FLUSH_EVENTS = 500  # Buffered events that trigger a flush
+BRIDGE_ARCHIVE_FLUSH_SECONDS = 5.0  # Max time an event stays buffered
+
+# Cohort analytics (NumPy, profiles streamed from storage in chunks)
+COHORT_CHUNK_SIZE = 10000  # Profiles converted to arrays at once
+COHORT_TRAJECTORY_DAYS = 90  # Default trajectory length
+
+# Quest recommender (nearest-neighbour over learning profile vectors)
+RECOMMENDER_TOP_K = 3  # Quests recommended per child
+RECOMMENDER_EMOTION_WEIGHT = 0.5  # Weight of the emotion's location vs. learning needs
+RECOMMENDER_REWARD_WEIGHT = 0.5  # Weight of reward changes vs. target_learning_profile
+RECOMMENDER_ACTIVE_DAYS = 30  # Nightly batch: children active within this many days
+RECOMMENDER_CHUNK_SIZE = 10000  # Nightly batch: profiles scored at once
+
+# Location routing (table compiled from locations_metadata.yaml, hot-reloaded)
+ROUTING_FOCUS_WEIGHT = 2.0  # Location's learning_focus is the weakest dimension
+ROUTING_EMOTION_WEIGHT = 1.0  # Location serves the emotional state (half for "all")
+LOCATION_INDEX_RELOAD_SECONDS = 5.0  # Min interval between YAML mtime checks
+
+# Parent links (TTL index, background expiry sweeper, archive retention)
+LINK_TTL_DAYS = 7  # Pending links expire after this many days
+LINK_RETENTION_DAYS = 30  # Expired/revoked links kept before archiving
+LINK_SWEEP_BATCH = 500  # Links expired / archived per batch
+LINK_SWEEP_MAX_SECONDS = 3600  # Sweep at least this often
+
+# Parent dashboard (per-parent read model of children's summaries)
+DASHBOARD_FLUSH_SECONDS = 2.0  # Max delay before a child's change is visible to parent readers
+
+# Weekly parent reports (batch pipeline, runs at WEEKLY_REPORT_DAY / WEEKLY_REPORT_HOUR)
+REPORT_WORKERS = 4  # Render processes (0: render in the calling process)
+REPORT_CHUNK_SIZE = 200  # Parents per render task; each finished task is checkpointed
+REPORT_SEND_RATE = 10.0  # Reports handed to OutboundSender per second
+REPORT_SEND_BATCH = 50  # Reports per hand-off (next batch waits for this one)
+REPORT_MAX_ATTEMPTS = 3  # Delivery attempts per report (failed ones are retried, also on re-runs)
+REPORT_RETRY_DELAY_SECONDS = 60.0  # Wait before retrying a run's failed reports
+
+# Record stores (user_profiles, links, parents, reality_bridges)
+# File layout - 0: flat {id}.json; 2: hashed ab/cd/{id}.json. Migrate first: python -m src.core.store_layout
+STORE_FANOUT_LEVELS = int(os.getenv("STORE_FANOUT_LEVELS", "0"))
+# Codec - "json" (compact) or "msgpack" (needs msgpack). Reads detect the codec, so switching
+# needs no migration: existing files are converted on their next write (see src/core/serialization.py)
+STORE_CODEC = os.getenv("STORE_CODEC", "json")
+USER_PROFILES_CODEC = os.getenv("USER_PROFILES_CODEC", STORE_CODEC)
+LINKS_CODEC = os.getenv("LINKS_CODEC", STORE_CODEC)
+PARENTS_CODEC = os.getenv("PARENTS_CODEC", STORE_CODEC)
+REALITY_BRIDGES_CODEC = os.getenv("REALITY_BRIDGES_CODEC", STORE_CODEC)
+
+# Admin API (/debug/* routes on backend and webhook; disabled without a token)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")  # Sent as X-Admin-Token header
+
+# On-demand profiling (folded stacks for flamegraph.pl / speedscope)
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(BASE_DIR / "data" / "profiles")))
+PROFILE_DEFAULT_SECONDS = 10.0
+PROFILE_MAX_SECONDS = 120.0  # CPU profiles are time-boxed to this
+PROFILE_SAMPLE_INTERVAL_SECONDS = 0.005
+PROFILE_TRACEMALLOC_FRAMES = 25  # Stack depth recorded per allocation
+PROFILE_STATE_SAMPLE = 100  # Items measured per container when estimating sizes
 
 # Database (for Therapeutic Mode - not used in MVP)
 DATABASE_URL = os.getenv("DATABASE_URL", "")
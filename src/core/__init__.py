@@ -1,5 +1,8 @@
 """Core module for InnerWorld Edu."""
 
-from .logger import setup_logging, get_logger
+from .logger import setup_logging, get_logger, shutdown_logging
+from .tracing import configure_tracing, get_tracer, hash_user_id
+from .metrics import REGISTRY, start_metrics_server, start_event_loop_monitor
 
-__all__ = ["setup_logging", "get_logger"]
+__all__ = ["setup_logging", "get_logger", "shutdown_logging", "configure_tracing", "get_tracer", "hash_user_id",
+           "REGISTRY", "start_metrics_server", "start_event_loop_monitor"]
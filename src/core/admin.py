@@ -0,0 +1,110 @@
+"""
+Admin API for InnerWorld Edu processes.
+
+Shared /debug/* routes mounted by backend/main.py and the bot's
+WebhookServer:
+
+- /debug/watchdog - event loop watchdog report and toggle
+- /debug/profile/cpu - time-boxed sampling CPU profile
+- /debug/profile/memory/* - tracemalloc start / snapshot / diff / stop
+- /debug/state - sizes of in-memory caches
+- /debug/profile - all of the above in one capture
+
+Every route requires the X-Admin-Token header to match ADMIN_TOKEN; without
+ADMIN_TOKEN configured the routes answer 403.
+"""
+
+import hmac
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from src.core.profiler import capture_profile, get_cpu_profiler, get_memory_profiler, get_state_sizes
+from src.core.watchdog import get_watchdog
+from src.config import ADMIN_TOKEN, PROFILE_DEFAULT_SECONDS
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """Reject requests without the admin token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled (ADMIN_TOKEN not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/debug", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/watchdog")
+async def watchdog_report(top: int = 10):
+    """Top call sites blocking the event loop."""
+    watchdog = get_watchdog()
+    return {**watchdog.get_statistics(), "top_sites": watchdog.get_report(top)}
+
+
+@router.post("/watchdog")
+async def watchdog_toggle(enabled: bool, reset: bool = False):
+    """Enable/disable the watchdog at runtime."""
+    watchdog = get_watchdog()
+    watchdog.enable() if enabled else watchdog.disable()
+    if reset:
+        watchdog.reset()
+    return watchdog.get_statistics()
+
+
+@router.post("/profile/cpu")
+async def profile_cpu(seconds: float = PROFILE_DEFAULT_SECONDS, all_threads: bool = False, top: int = 20):
+    """Sample the event loop (or all threads) for a few seconds."""
+    try:
+        return await get_cpu_profiler().profile(seconds, all_threads=all_threads, top=top)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/profile/memory")
+async def memory_status():
+    """tracemalloc state."""
+    return get_memory_profiler().get_statistics()
+
+
+@router.post("/profile/memory/start")
+async def memory_start():
+    """Start tracing allocations."""
+    profiler = get_memory_profiler()
+    profiler.start()
+    return profiler.get_statistics()
+
+
+@router.post("/profile/memory/snapshot")
+async def memory_snapshot(top: int = 20):
+    """Take a snapshot (baseline for the next diff)."""
+    return get_memory_profiler().snapshot(top)
+
+
+@router.post("/profile/memory/diff")
+async def memory_diff(top: int = 20):
+    """Take a snapshot and diff it against the previous one."""
+    return get_memory_profiler().diff(top)
+
+
+@router.post("/profile/memory/stop")
+async def memory_stop():
+    """Stop tracing allocations."""
+    profiler = get_memory_profiler()
+    profiler.stop()
+    return profiler.get_statistics()
+
+
+@router.get("/state")
+async def state_sizes():
+    """Item counts and estimated sizes of in-memory caches."""
+    return get_state_sizes()
+
+
+@router.post("/profile")
+async def profile_all(seconds: float = PROFILE_DEFAULT_SECONDS):
+    """CPU profile, memory growth during it and state sizes in one call."""
+    try:
+        return await capture_profile(seconds)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
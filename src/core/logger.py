@@ -1,41 +1,385 @@
-"""Structured logging configuration using structlog."""
+"""
+Structured logging configuration using structlog.
 
+Two modes (LOG_MODE):
+
+- sync: events go through structlog processors and stdlib logging handlers
+  on the calling thread (the event loop in the bot)
+- queue: the calling thread only adds level, logger name and timestamp and
+  appends the raw event dict to an in-memory queue. A background thread
+  (LogWriter) renders queued events to JSON and writes them in batches.
+  When the queue is full new events are dropped and counted; the writer
+  logs how many were lost.
+
+Callsite capture (filename, line, function - a stack walk per event) runs
+for LOG_CALLSITE_LEVELS; unset, sync mode records it for every level and
+queue mode only for warning and above. In both modes high-volume events in
+LOG_SAMPLED_EVENTS are rate-limited to N per second each (the next emitted
+event carries `sampled_out` with the number suppressed).
+
+Queue mode renders events later on another thread, so event values should
+not be mutated after logging (the codebase logs scalars and fresh lists).
+"""
+
+import atexit
 import sys
+import threading
+import time
 import structlog
-from typing import Any, Dict
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterable, List, Optional, TextIO
 from pathlib import Path
 
+from src.config import (
+    LOG_MODE,
+    LOG_QUEUE_SIZE,
+    LOG_FLUSH_INTERVAL_SECONDS,
+    LOG_CALLSITE_LEVELS,
+    LOG_SAMPLED_EVENTS
+)
+
+_writer: Optional["LogWriter"] = None
+
+# Callsite levels per mode when LOG_CALLSITE_LEVELS is not set
+DEFAULT_CALLSITE_LEVELS = {
+    "sync": ("debug", "info", "warning", "error", "critical"),
+    "queue": ("warning", "error", "critical"),
+}
+
+
+class EventSampler:
+    """Rate-limit selected events to max_per_second each (structlog processor)."""
+
+    def __init__(self, rates: Dict[str, float]):
+        """
+        Args:
+            rates: Event name -> max events per second
+        """
+        self.rates = rates
+        self._windows: Dict[str, List[float]] = {}  # event -> [window_start, count, suppressed]
+        self.suppressed = 0
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        event = event_dict.get("event")
+        rate = self.rates.get(event) if isinstance(event, str) else None
+        if rate is None:
+            return event_dict
+
+        now = time.monotonic()
+        window = self._windows.get(event)
+        if window is None or now - window[0] >= 1.0:
+            suppressed = window[2] if window else 0
+            window = self._windows[event] = [now, 0, 0]
+            if suppressed:
+                event_dict["sampled_out"] = suppressed
+
+        if window[1] >= rate:
+            window[2] += 1
+            self.suppressed += 1
+            raise structlog.DropEvent
+
+        window[1] += 1
+        return event_dict
+
+
+class CallsiteByLevel:
+    """Add filename/lineno/func_name only for selected levels (structlog processor)."""
+
+    def __init__(self, levels: Iterable[str]):
+        self.levels = {level.lower() for level in levels}
+        self._adder = structlog.processors.CallsiteParameterAdder(
+            parameters=[
+                structlog.processors.CallsiteParameter.FILENAME,
+                structlog.processors.CallsiteParameter.LINENO,
+                structlog.processors.CallsiteParameter.FUNC_NAME,
+            ],
+            additional_ignores=[__name__]  # Report callers of log_* helpers
+        )
+
+    def __call__(self, logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        if event_dict.get("level", method_name) in self.levels:
+            return self._adder(logger, method_name, event_dict)
+        return event_dict
+
+
+def callsite_levels(mode: str) -> Iterable[str]:
+    """Levels that record the callsite: LOG_CALLSITE_LEVELS or the mode default."""
+    return LOG_CALLSITE_LEVELS or DEFAULT_CALLSITE_LEVELS.get(mode, DEFAULT_CALLSITE_LEVELS["sync"])
+
+
+def _add_logger_name(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    event_dict["logger"] = logger.name
+    return event_dict
+
+
+def _add_epoch_timestamp(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    # Formatted on the writer thread
+    event_dict["timestamp"] = time.time()
+    return event_dict
+
+
+def _capture_exc_info(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    # exc_info=True means "current exception" - resolve it on the calling thread
+    exc_info = event_dict.get("exc_info")
+    if exc_info is True:
+        event_dict["exc_info"] = sys.exc_info()
+    elif isinstance(exc_info, BaseException):
+        event_dict["exc_info"] = (type(exc_info), exc_info, exc_info.__traceback__)
+    return event_dict
+
+
+def _format_timestamp(logger: Any, method_name: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+    timestamp = event_dict.get("timestamp")
+    if isinstance(timestamp, float):
+        event_dict["timestamp"] = datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+    return event_dict
+
+
+class QueueLogger:
+    """structlog logger that hands event dicts to the LogWriter."""
+
+    __slots__ = ("name", "writer")
+
+    def __init__(self, name: str, writer: "LogWriter"):
+        self.name = name
+        self.writer = writer
+
+    def msg(self, **event_dict: Any) -> None:
+        self.writer.enqueue(event_dict)
+
+    debug = info = warning = warn = error = critical = exception = fatal = log = msg
+
+
+class LogWriter:
+    """
+    Background thread rendering and writing queued log events in batches.
+
+    The queue is a deque: appends from the event loop take no lock. The
+    writer wakes every flush_interval and drains everything queued.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        renderer: Any,
+        max_queue: int = LOG_QUEUE_SIZE,
+        flush_interval: float = LOG_FLUSH_INTERVAL_SECONDS
+    ):
+        """
+        Args:
+            stream: Text stream to write rendered lines to
+            renderer: Final structlog renderer (JSONRenderer or ConsoleRenderer)
+            max_queue: Max queued events before new events are dropped
+            flush_interval: Seconds between batch writes
+        """
+        self.stream = stream
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+        self._processors = [
+            _format_timestamp,
+            structlog.processors.dict_tracebacks,
+            structlog.processors.UnicodeDecoder(),
+            renderer,
+        ]
+
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()  # One drain at a time (writer thread or flush())
+        self._stopped = threading.Event()
+
+        # Stats
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self._reported_dropped = 0
+
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def logger_factory(self, name: str = "root", *args: Any) -> QueueLogger:
+        """structlog logger_factory."""
+        return QueueLogger(name, self)
+
+    def enqueue(self, event_dict: Dict[str, Any]) -> None:
+        """Queue one event (never blocks; drops when full)."""
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            return
+        self._queue.append(event_dict)
+
+    def flush(self) -> None:
+        """Write everything queued so far."""
+        self._drain()
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Flush and stop the writer thread."""
+        self._stopped.set()
+        self._thread.join(timeout)
+        self._drain()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches
+        }
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            self._drain()
+
+    def _render(self, event_dict: Dict[str, Any]) -> str:
+        method_name = event_dict.get("level", "info")
+        try:
+            for processor in self._processors:
+                event_dict = processor(None, method_name, event_dict)
+            return event_dict
+        except Exception as e:
+            return repr({"event": "log_render_failed", "error": str(e), "original": repr(event_dict)})
+
+    def _drain(self) -> None:
+        with self._lock:
+            queue = self._queue
+            lines = []
+            while queue:
+                lines.append(self._render(queue.popleft()))
 
-def setup_logging(log_level: str = "INFO", log_dir: Path = Path("data/logs")) -> None:
-    """Configure structured logging."""
+            dropped = self.dropped - self._reported_dropped
+            if dropped:
+                self._reported_dropped += dropped
+                lines.append(self._render({
+                    "event": "log_events_dropped",
+                    "level": "warning",
+                    "logger": __name__,
+                    "timestamp": time.time(),
+                    "count": dropped
+                }))
+
+            if not lines:
+                return
+
+            try:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+            except Exception:
+                pass  # Nowhere left to report to
+
+            self.written += len(lines)
+            self.batches += 1
+
+
+def get_log_writer() -> Optional[LogWriter]:
+    """Get the queue-mode writer (None in sync mode)."""
+    return _writer
+
+
+def shutdown_logging() -> None:
+    """Flush and stop the queue-mode writer."""
+    global _writer
+    if _writer is not None:
+        _writer.shutdown()
+        _writer = None
+
+
+def build_processors(mode: str, renderer: Any, sampler: EventSampler, callsite: CallsiteByLevel) -> List[Any]:
+    """
+    Build structlog processor chain for a logging mode.
+
+    In queue mode only cheap processors run on the calling thread; the
+    LogWriter applies the renderer.
+    """
+    if mode == "queue":
+        return [
+            structlog.processors.add_log_level,
+            sampler,
+            _add_logger_name,
+            _add_epoch_timestamp,
+            _capture_exc_info,
+            callsite,
+        ]
+
+    return [
+        structlog.stdlib.filter_by_level,
+        structlog.stdlib.add_log_level,
+        sampler,
+        structlog.stdlib.add_logger_name,
+        structlog.stdlib.PositionalArgumentsFormatter(),
+        structlog.processors.TimeStamper(fmt="iso"),
+        structlog.processors.StackInfoRenderer(),
+        structlog.processors.format_exc_info,
+        structlog.processors.UnicodeDecoder(),
+        callsite,
+        structlog.processors.dict_tracebacks,
+        renderer,
+    ]
+
+
+def setup_logging(
+    log_level: str = "INFO",
+    log_dir: Path = Path("data/logs"),
+    mode: str = LOG_MODE,
+    stream: Optional[TextIO] = None
+) -> None:
+    """
+    Configure structured logging.
+
+    Args:
+        log_level: Minimum level
+        log_dir: Log directory
+        mode: "sync" (stdlib handlers on the calling thread) or "queue"
+            (background writer, see module docstring)
+        stream: Output stream for queue mode (default: stderr)
+    """
+    global _writer
 
     # Ensure log directory exists
     log_dir.mkdir(parents=True, exist_ok=True)
 
-    # Configure structlog
-    structlog.configure(
-        processors=[
-            structlog.stdlib.filter_by_level,
-            structlog.stdlib.add_logger_name,
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.CallsiteParameterAdder(
-                parameters=[
-                    structlog.processors.CallsiteParameter.FILENAME,
-                    structlog.processors.CallsiteParameter.LINENO,
-                    structlog.processors.CallsiteParameter.FUNC_NAME,
-                ]
-            ),
-            structlog.processors.dict_tracebacks,
-            structlog.dev.ConsoleRenderer() if log_level == "DEBUG" else structlog.processors.JSONRenderer(),
-        ],
-        context_class=dict,
-        logger_factory=structlog.stdlib.LoggerFactory(),
-        cache_logger_on_first_use=True,
+    renderer = structlog.dev.ConsoleRenderer() if log_level == "DEBUG" else structlog.processors.JSONRenderer()
+    sampler = EventSampler(LOG_SAMPLED_EVENTS)
+    processors = build_processors(mode, renderer, sampler, CallsiteByLevel(callsite_levels(mode)))
+
+    shutdown_logging()
+
+    if mode == "queue":
+        _writer = LogWriter(stream or sys.stderr, renderer)
+        atexit.register(shutdown_logging)
+
+        structlog.configure(
+            processors=processors,
+            wrapper_class=structlog.make_filtering_bound_logger(log_level.upper()),
+            context_class=dict,
+            logger_factory=_writer.logger_factory,
+            cache_logger_on_first_use=True,
+        )
+    else:
+        # Configure structlog
+        structlog.configure(
+            processors=processors,
+            context_class=dict,
+            logger_factory=structlog.stdlib.LoggerFactory(),
+            cache_logger_on_first_use=True,
+        )
+
+    _register_metrics(sampler)
+
+
+def _register_metrics(sampler: EventSampler) -> None:
+    """Expose logging pipeline counters (read at scrape time)."""
+    from src.core.metrics import REGISTRY
+
+    REGISTRY.register_callback(
+        "innerworld_log_events_sampled_out_total", "Log events suppressed by rate-limited sampling",
+        lambda: sampler.suppressed, metric_type="counter"
+    )
+    REGISTRY.register_callback(
+        "innerworld_log_events_dropped_total", "Log events dropped because the log queue was full",
+        lambda: _writer.dropped if _writer else 0, metric_type="counter"
+    )
+    REGISTRY.register_callback(
+        "innerworld_log_queue_depth", "Log events waiting for the writer thread",
+        lambda: len(_writer._queue) if _writer else 0
     )
 
 
@@ -0,0 +1,420 @@
+"""
+Prometheus metrics for InnerWorld Edu.
+
+One process-wide registry (REGISTRY) shared by the bot side (StateManager,
+src/data managers, QuestEngine, RealityBridgeManager, webhook server,
+outbound sender) and the FastAPI backend. It renders the Prometheus text
+exposition format (0.0.4) served at /metrics:
+
+    MESSAGES = REGISTRY.counter("innerworld_messages_total", "Messages", ["status"])
+    MESSAGES.labels("ok").inc()
+
+Hot path cost is low: labelled children are cached (bind fixed label values
+once at import time), histograms only bump one bucket count and cumulate
+buckets when scraped, and nothing takes a lock.
+
+Values that already live in objects (queue depths, cache sizes, DB pool
+stats, webhook/outbound counters) are not mirrored on every change: a
+callback registered with REGISTRY.register_callback reads them at scrape
+time. Registering a callback under an existing name replaces it, so the
+latest instance (e.g. a re-created StateManager) is the one reported.
+"""
+
+import abc
+import asyncio
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.core.logger import get_logger
+from src.config import (
+    METRICS_HOST,
+    METRICS_PORT,
+    METRICS_LOOP_LAG_INTERVAL_SECONDS
+)
+
+logger = get_logger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Default latency buckets (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+Sample = Tuple[str, Dict[str, str], float]
+CallbackValue = Union[float, Dict[Union[str, Tuple[str, ...]], float]]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _Timer:
+    """Context manager observing elapsed seconds into a histogram."""
+
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram: "_HistogramChild"):
+        self.histogram = histogram
+        self.started = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+
+class Metric(abc.ABC):
+    """Metric family with optional labels."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    @abc.abstractmethod
+    def _new_child(self) -> Any:
+        """Create the value holder for one label combination."""
+
+    def labels(self, *values: Any) -> Any:
+        """Get child for label values (cached; bind once on hot paths)."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            child = self._children[key] = self._new_child()
+        return child
+
+    def _child_samples(self, child: Any, labels: Dict[str, str]) -> Iterator[Sample]:
+        yield self.name, labels, child.value
+
+    def samples(self) -> Iterator[Sample]:
+        # Copy: scrapes may run on the metrics server thread
+        for key, child in list(self._children.items()):
+            yield from self._child_samples(child, dict(zip(self.labelnames, key)))
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> _Timer:
+        return self.labels().time()
+
+    def _child_samples(self, child: _HistogramChild, labels: Dict[str, str]) -> Iterator[Sample]:
+        cumulative = 0
+        counts = list(child.counts)
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+        yield f"{self.name}_sum", labels, child.sum
+        yield f"{self.name}_count", labels, cumulative
+
+
+class CallbackMetric(Metric):
+    """Metric whose value is read from a callback at scrape time."""
+
+    def __init__(self, name: str, documentation: str, metric_type: str,
+                 callback: Callable[[], CallbackValue], labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.type = metric_type
+        self.callback = callback
+
+    def _new_child(self) -> Any:
+        raise TypeError(f"{self.name} is read from a callback and has no labelled children")
+
+    def samples(self) -> Iterator[Sample]:
+        try:
+            value = self.callback()
+        except Exception as e:
+            logger.debug("metrics_callback_failed", metric=self.name, error=str(e))
+            return
+
+        if not isinstance(value, dict):
+            yield self.name, {}, value
+            return
+
+        for key, item in value.items():
+            key = key if isinstance(key, tuple) else (key,)
+            yield self.name, dict(zip(self.labelnames, (str(k) for k in key))), item
+
+
+class MetricsRegistry:
+    """Named metric families rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _get_or_create(self, cls: type, name: str, *args: Any, **kwargs: Any) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} already registered as {metric.type}")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_callback(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], CallbackValue],
+        metric_type: str = "gauge",
+        labelnames: Sequence[str] = ()
+    ) -> None:
+        """
+        Register (or replace) a metric read at scrape time.
+
+        Args:
+            name: Metric name
+            documentation: HELP text
+            callback: Returns a number, or {label value(s): number}
+            metric_type: "gauge" or "counter"
+            labelnames: Label names for dict results
+        """
+        existing = self._metrics.get(name)
+        if existing is not None and not isinstance(existing, CallbackMetric):
+            raise ValueError(f"Metric {name} already registered as {existing.type}")
+        self._metrics[name] = CallbackMetric(name, documentation, metric_type, callback, labelnames)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def get_sample_value(self, name: str, labels: Optional[Dict[str, str]] = None) -> Optional[float]:
+        """Get current value of one sample (for tests and debugging)."""
+        labels = labels or {}
+        for metric in list(self._metrics.values()):
+            for sample_name, sample_labels, value in metric.samples():
+                if sample_name == name and sample_labels == labels:
+                    return value
+        return None
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text format."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        lines.append("")
+        return "\n".join(lines)
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ==================== Shared metrics ====================
+
+STORAGE_SECONDS = REGISTRY.histogram(
+    "innerworld_storage_operation_seconds",
+    "JSON storage read/write latency",
+    ["store", "operation"]
+)
+STORAGE_ERRORS = REGISTRY.counter(
+    "innerworld_storage_errors_total",
+    "Failed JSON storage reads/writes",
+    ["store", "operation"]
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "innerworld_cache_requests_total",
+    "In-memory cache lookups (hit ratio = hit / (hit + miss))",
+    ["cache", "result"]
+)
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "innerworld_event_loop_lag_seconds",
+    "Delay of event loop wakeups beyond their scheduled time",
+    buckets=LAG_BUCKETS
+)
+EVENT_LOOP_LAG_LAST = REGISTRY.gauge(
+    "innerworld_event_loop_lag_last_seconds",
+    "Most recent event loop lag reading"
+)
+
+_STARTED_AT = time.time()
+
+
+def _resident_memory_bytes() -> float:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+REGISTRY.register_callback(
+    "innerworld_process_resident_memory_bytes", "Resident memory size", _resident_memory_bytes
+)
+REGISTRY.register_callback(
+    "innerworld_process_uptime_seconds", "Seconds since process start", lambda: time.time() - _STARTED_AT
+)
+
+
+# ==================== Event loop lag ====================
+
+async def monitor_event_loop_lag(interval: float = METRICS_LOOP_LAG_INTERVAL_SECONDS) -> None:
+    """Measure how late the loop wakes up from a fixed sleep (runs forever)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - started - interval)
+        EVENT_LOOP_LAG.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
+
+
+def start_event_loop_monitor(interval: float = METRICS_LOOP_LAG_INTERVAL_SECONDS) -> asyncio.Task:
+    """Start lag monitor on the running loop."""
+    return asyncio.get_running_loop().create_task(monitor_event_loop_lag(interval))
+
+
+# ==================== Exposition ====================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # Scrapes are not worth a log line
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> ThreadingHTTPServer:
+    """
+    Serve /metrics from a daemon thread (bot in polling mode, shard workers).
+
+    Args:
+        port: TCP port (0 picks a free port)
+        host: Bind address
+
+    Returns:
+        Running server (server.server_address has the bound port)
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    logger.info("metrics_server_started", host=host, port=server.server_address[1])
+    return server
@@ -0,0 +1,487 @@
+"""
+On-demand profiling for live InnerWorld Edu processes.
+
+Lets an admin look inside a degraded bot or backend without restarting it:
+
+- CPU: time-boxed sampling profile. A thread samples the event loop
+  thread's stack (sys._current_frames) every PROFILE_SAMPLE_INTERVAL_SECONDS
+  and counts identical stacks.
+- Memory: tracemalloc snapshots, diffed against the previous snapshot
+  to show what grew in between.
+- State: item counts and estimated sizes of in-memory caches
+  (StateManager.user_states, message histories, quest_progress,
+  active_bridges), registered by their owners with register_state().
+
+CPU profiles and memory diffs are written to PROFILE_DIR in the folded
+stack format ("frame;frame;frame value" per line), readable by
+flamegraph.pl, inferno and speedscope.
+
+Exposed through the admin API (/debug/profile/*) and SIGUSR1 in polling mode.
+"""
+
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.logger import get_logger
+from src.config import (
+    BASE_DIR,
+    PROFILE_DIR,
+    PROFILE_DEFAULT_SECONDS,
+    PROFILE_MAX_SECONDS,
+    PROFILE_SAMPLE_INTERVAL_SECONDS,
+    PROFILE_TRACEMALLOC_FRAMES,
+    PROFILE_STATE_SAMPLE
+)
+
+logger = get_logger(__name__)
+
+# Frames per stack kept in CPU samples (deeper stacks are truncated at the root)
+MAX_STACK_DEPTH = 128
+
+
+def _short_path(filename: str, project_root: str) -> str:
+    """Project-relative path, or path from site-packages / stdlib basename."""
+    if filename.startswith(project_root):
+        return filename[len(project_root):].lstrip("/")
+    marker = "site-packages/"
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.basename(filename)
+
+
+def write_folded(stacks: Dict[str, int], path: Path) -> Path:
+    """
+    Write stacks in folded format (one "a;b;c value" line per stack).
+
+    Args:
+        stacks: Folded stack -> value (samples or bytes)
+        path: Output file
+
+    Returns:
+        Path written
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, value in sorted(stacks.items(), key=lambda item: item[1], reverse=True):
+            if value > 0:
+                f.write(f"{stack} {value}\n")
+    return path
+
+
+def _output_path(output_dir: Path, kind: str) -> Path:
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"-{int(now * 1000) % 1000:03d}"
+    return output_dir / f"{kind}-{os.getpid()}-{stamp}.folded"
+
+
+class CPUProfiler:
+    """Sampling CPU profiler for one thread (the event loop by default)."""
+
+    def __init__(
+        self,
+        interval: float = PROFILE_SAMPLE_INTERVAL_SECONDS,
+        max_duration: float = PROFILE_MAX_SECONDS,
+        output_dir: Path = PROFILE_DIR,
+        project_root: Path = BASE_DIR
+    ):
+        """
+        Initialize profiler.
+
+        Args:
+            interval: Seconds between samples
+            max_duration: Upper bound for one profile (seconds)
+            output_dir: Directory for folded stack files
+            project_root: Paths under this directory are shown project-relative
+        """
+        self.interval = interval
+        self.max_duration = max_duration
+        self.output_dir = output_dir
+        self.project_root = str(project_root.resolve())
+        self.running = False
+        self._labels: Dict[Any, str] = {}
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = _short_path(code.co_filename, self.project_root)
+            label = self._labels[code] = f"{code.co_name} ({path}:{code.co_firstlineno})"
+        return label
+
+    def _fold(self, frame) -> str:
+        labels = []
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    def sample(self, duration: float, thread_ids: Optional[List[int]] = None) -> Counter:
+        """
+        Sample stacks for duration seconds (blocking; run off the profiled thread).
+
+        Args:
+            duration: Seconds to sample
+            thread_ids: Threads to sample (None = all but the sampling thread)
+
+        Returns:
+            Counter of folded stack -> samples
+        """
+        stacks: Counter = Counter()
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        prefix = thread_ids is None or len(thread_ids) > 1
+
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or (thread_ids is not None and thread_id not in thread_ids):
+                    continue
+                stack = self._fold(frame)
+                if prefix:
+                    stack = f"{names.get(thread_id, thread_id)};{stack}"
+                stacks[stack] += 1
+            time.sleep(self.interval)
+        return stacks
+
+    async def profile(self, duration: float, all_threads: bool = False, top: int = 20) -> Dict[str, Any]:
+        """
+        Profile the running event loop for duration seconds.
+
+        Args:
+            duration: Seconds to sample (capped at max_duration)
+            all_threads: Sample every thread, not just the loop thread
+            top: Number of hottest frames in the summary
+
+        Returns:
+            Summary dict (path, samples, duration, top frames by self samples)
+
+        Raises:
+            RuntimeError: If a profile is already running
+        """
+        if self.running:
+            raise RuntimeError("CPU profile already running")
+
+        duration = max(0.0, min(duration, self.max_duration))
+        thread_ids = None if all_threads else [threading.get_ident()]
+
+        self.running = True
+        logger.info("cpu_profile_started", duration=duration, all_threads=all_threads)
+        try:
+            loop = asyncio.get_running_loop()
+            stacks = await loop.run_in_executor(None, self.sample, duration, thread_ids)
+        finally:
+            self.running = False
+
+        path = write_folded(stacks, _output_path(self.output_dir, "cpu"))
+        total = sum(stacks.values())
+        leaves: Counter = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+
+        logger.info("cpu_profile_written", path=str(path), samples=total)
+        return {
+            "path": str(path),
+            "duration": duration,
+            "samples": total,
+            "top": [
+                {"frame": frame, "samples": count, "percent": round(100 * count / total, 1)}
+                for frame, count in leaves.most_common(top)
+            ]
+        }
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots and diffs."""
+
+    def __init__(
+        self,
+        frames: int = PROFILE_TRACEMALLOC_FRAMES,
+        output_dir: Path = PROFILE_DIR,
+        project_root: Path = BASE_DIR
+    ):
+        """
+        Initialize profiler.
+
+        Args:
+            frames: Stack depth recorded per allocation
+            output_dir: Directory for folded stack files
+            project_root: Paths under this directory are shown project-relative
+        """
+        self.frames = frames
+        self.output_dir = output_dir
+        self.project_root = str(project_root.resolve())
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._last: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> None:
+        """Start tracing allocations (slows allocation-heavy code noticeably)."""
+        if not self.tracing:
+            tracemalloc.start(self.frames)
+            logger.info("tracemalloc_started", frames=self.frames)
+        self._previous = self._last = None
+
+    def stop(self) -> None:
+        """Stop tracing and drop snapshots."""
+        if self.tracing:
+            tracemalloc.stop()
+            logger.info("tracemalloc_stopped")
+        self._previous = self._last = None
+
+    def _take(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def _where(self, frame: tracemalloc.Frame) -> str:
+        return f"{_short_path(frame.filename, self.project_root)}:{frame.lineno}"
+
+    def snapshot(self, top: int = 20) -> Dict[str, Any]:
+        """
+        Take a snapshot (starts tracing if needed).
+
+        Args:
+            top: Number of largest allocation sites in the summary
+
+        Returns:
+            Summary dict (traced/peak bytes, top sites by size)
+        """
+        if not self.tracing:
+            self.start()
+
+        self._previous, self._last = self._last, self._take()
+        current, peak = tracemalloc.get_traced_memory()
+        stats = self._last.statistics("lineno")[:top] if top else []
+        return {
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "has_previous": self._previous is not None,
+            "top": [
+                {"site": self._where(stat.traceback[0]), "bytes": stat.size, "count": stat.count}
+                for stat in stats
+            ]
+        }
+
+    def diff(self, top: int = 20) -> Dict[str, Any]:
+        """
+        Take a snapshot and compare it with the previous one.
+
+        Growth per allocation stack is written as a folded file (bytes).
+
+        Args:
+            top: Number of sites in the summary
+
+        Returns:
+            Summary dict (path, total growth, top sites by growth)
+        """
+        self.snapshot(top=0)
+        if self._previous is None:
+            return {"path": None, "growth_bytes": 0, "top": []}
+
+        stacks: Dict[str, int] = {}
+        for stat in self._last.compare_to(self._previous, "traceback"):
+            if stat.size_diff > 0:
+                # tracemalloc tracebacks are most recent call first
+                stack = ";".join(self._where(frame) for frame in reversed(stat.traceback))
+                stacks[stack] = stacks.get(stack, 0) + stat.size_diff
+        path = write_folded(stacks, _output_path(self.output_dir, "memory"))
+
+        stats = self._last.compare_to(self._previous, "lineno")
+        growth = sum(stat.size_diff for stat in stats)
+        logger.info("memory_diff_written", path=str(path), growth_bytes=growth)
+        return {
+            "path": str(path),
+            "growth_bytes": growth,
+            "top": [
+                {
+                    "site": self._where(stat.traceback[0]),
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "bytes": stat.size
+                }
+                for stat in stats[:top]
+            ]
+        }
+
+    def get_statistics(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory() if self.tracing else (0, 0)
+        return {
+            "tracing": self.tracing,
+            "frames": self.frames,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+            "snapshots": (self._previous is not None) + (self._last is not None)
+        }
+
+
+# In-memory containers registered for size dumps: name -> provider
+_state_providers: Dict[str, Callable[[], Any]] = {}
+
+
+def register_state(name: str, provider: Callable[[], Any]) -> None:
+    """
+    Register an in-memory container for get_state_sizes().
+
+    Args:
+        name: Container name (re-registering replaces the provider)
+        provider: Returns the container (dict, list, ...), called on demand
+    """
+    _state_providers[name] = provider
+
+
+def _deep_size(obj: Any, seen: set) -> int:
+    """Approximate size of obj and everything it references (objects in seen are skipped)."""
+    size = 0
+    pending = [obj]
+    while pending:
+        current = pending.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+
+        if isinstance(current, (str, bytes, int, float, bool, type(None))):
+            continue
+        if isinstance(current, dict):
+            pending.extend(current.keys())
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            pending.extend(current)
+        elif hasattr(current, "__dict__") and not isinstance(current, type):
+            pending.append(current.__dict__)
+        elif hasattr(current, "__slots__"):
+            pending.extend(
+                getattr(current, slot) for slot in current.__slots__ if hasattr(current, slot)
+            )
+    return size
+
+
+def estimate_size(container: Any, sample: int = PROFILE_STATE_SAMPLE) -> int:
+    """
+    Estimate deep size of a container from a sample of its items.
+
+    Args:
+        container: Dict or other sized iterable
+        sample: Items measured; the average is extrapolated to all items
+
+    Returns:
+        Approximate bytes
+    """
+    items = list(container.items() if isinstance(container, dict) else container)
+    if not items:
+        return sys.getsizeof(container)
+
+    step = max(1, len(items) // sample)
+    measured = items[::step][:sample]
+    seen: set = set()
+    per_item = sum(_deep_size(item, seen) for item in measured) / len(measured)
+    return sys.getsizeof(container) + int(per_item * len(items))
+
+
+def get_state_sizes(sample: int = PROFILE_STATE_SAMPLE) -> Dict[str, Dict[str, int]]:
+    """
+    Get item counts and estimated sizes of registered containers.
+
+    Args:
+        sample: Items measured per container
+
+    Returns:
+        Dict of name -> {"items", "approx_bytes"}
+    """
+    sizes = {}
+    for name, provider in _state_providers.items():
+        try:
+            container = provider()
+            sizes[name] = {"items": len(container), "approx_bytes": estimate_size(container, sample)}
+        except Exception as e:
+            logger.warning("state_size_failed", name=name, error=str(e))
+    return sizes
+
+
+_cpu_profiler: Optional[CPUProfiler] = None
+_memory_profiler: Optional[MemoryProfiler] = None
+
+
+def get_cpu_profiler() -> CPUProfiler:
+    """Get the process-wide CPU profiler."""
+    global _cpu_profiler
+    if _cpu_profiler is None:
+        _cpu_profiler = CPUProfiler()
+    return _cpu_profiler
+
+
+def get_memory_profiler() -> MemoryProfiler:
+    """Get the process-wide memory profiler."""
+    global _memory_profiler
+    if _memory_profiler is None:
+        _memory_profiler = MemoryProfiler()
+    return _memory_profiler
+
+
+async def capture_profile(duration: float) -> Dict[str, Any]:
+    """
+    Capture everything at once: CPU profile, memory growth during it, state sizes.
+
+    Tracing allocations is only enabled for the capture if it was off.
+
+    Args:
+        duration: CPU profile length (seconds)
+
+    Returns:
+        Dict with "cpu", "memory" and "state" summaries
+    """
+    memory = get_memory_profiler()
+    was_tracing = memory.tracing
+    memory.start()
+    memory.snapshot(top=0)
+    try:
+        cpu = await get_cpu_profiler().profile(duration)
+        memory_diff = memory.diff()
+    finally:
+        if not was_tracing:
+            memory.stop()
+
+    return {"cpu": cpu, "memory": memory_diff, "state": get_state_sizes()}
+
+
+def install_profile_signal(sig: int = signal.SIGUSR1, duration: float = PROFILE_DEFAULT_SECONDS) -> None:
+    """
+    Capture a profile when the process receives sig (call from the loop thread).
+
+    Results are logged; folded stack files go to PROFILE_DIR.
+    Signals received while a capture is running are ignored.
+
+    Args:
+        sig: Signal to handle (kill -USR1 <pid>)
+        duration: CPU profile length (seconds)
+    """
+    loop = asyncio.get_running_loop()
+
+    async def run() -> None:
+        try:
+            result = await capture_profile(duration)
+        except RuntimeError as e:
+            logger.warning("profile_signal_ignored", reason=str(e))
+            return
+        logger.info(
+            "profile_captured",
+            cpu_path=result["cpu"]["path"],
+            memory_path=result["memory"]["path"],
+            hottest=[frame["frame"] for frame in result["cpu"]["top"][:5]],
+            memory_growth_bytes=result["memory"]["growth_bytes"],
+            state=result["state"]
+        )
+
+    loop.add_signal_handler(sig, lambda: loop.create_task(run()))
@@ -0,0 +1,187 @@
+"""
+Serialization - encoding of the {id}.json record stores.
+
+UserProfile, ParentLink, ParentProfile and ActiveBridge files used to be
+written with json.dump(asdict(record), indent=2): a recursive deep copy of
+the record followed by pretty-printed text. A RecordSerializer writes the
+record's fields directly (nested dicts and lists are encoded in place, not
+copied) with one of two codecs, chosen per store:
+
+    json     compact JSON (orjson when installed, else the json module)
+    msgpack  MessagePack binary, smaller and faster to decode
+
+Every record starts with a schema version header: its first key is
+"_schema". Readers strip the header and upgrade older records before
+building the dataclass. Files without the header (the old pretty-printed
+JSON) are schema version 0.
+
+Reads detect the codec from the first byte, since a JSON object starts
+with "{" and a MessagePack map never does. Switching a store's codec
+therefore needs no migration: old files stay readable and are converted
+on their next write. Files keep the .json name whatever the codec.
+"""
+
+import json
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Optional, Tuple, Type, TypeVar
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up, falls back to the json module
+    orjson = None
+
+SCHEMA_KEY = "_schema"
+JSON_START = frozenset(b"{ \t\r\n")
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=None)
+def _field_names(record_type: type) -> Tuple[str, ...]:
+    return tuple(field.name for field in fields(record_type))
+
+
+def to_record(obj: Any) -> Dict[str, Any]:
+    """Shallow field dict of a dataclass (nested values are shared, not copied)."""
+    return {name: getattr(obj, name) for name in _field_names(type(obj))}
+
+
+def _default(value: Any) -> Any:
+    """Encode values the codecs do not handle natively."""
+    if is_dataclass(value) and not isinstance(value, type):
+        return to_record(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+# ----------------------------------------------------------------------
+# Codecs
+# ----------------------------------------------------------------------
+
+class JsonCodec:
+    """Compact JSON (no indentation, UTF-8 kept as is)."""
+
+    name = "json"
+
+    def encode(self, record: Dict[str, Any]) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(record, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(record, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, raw: bytes) -> Dict[str, Any]:
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
+
+
+class MsgpackCodec:
+    """MessagePack binary."""
+
+    name = "msgpack"
+
+    def __init__(self):
+        import msgpack  # Only needed by stores configured for it
+
+        self._msgpack = msgpack
+
+    def encode(self, record: Dict[str, Any]) -> bytes:
+        return self._msgpack.packb(record, default=_default, use_bin_type=True)
+
+    def decode(self, raw: bytes) -> Dict[str, Any]:
+        return self._msgpack.unpackb(raw, raw=False, strict_map_key=False)
+
+
+CODECS = {codec.name: codec for codec in (JsonCodec, MsgpackCodec)}
+
+
+@lru_cache(maxsize=None)
+def get_codec(name: str):
+    """Codec instance by name ("json" or "msgpack")."""
+    if name not in CODECS:
+        raise ValueError(f"Unknown store codec {name!r} (expected one of {sorted(CODECS)})")
+    return CODECS[name]()
+
+
+def decode(raw: bytes) -> Tuple[int, Dict[str, Any]]:
+    """
+    Decode a record file of any codec.
+
+    Args:
+        raw: File contents
+
+    Returns:
+        (schema version, record without the header); version 0 for files
+        written before the header existed
+    """
+    codec = get_codec("json" if raw[:1] and raw[0] in JSON_START else "msgpack")
+    data = codec.decode(raw)
+    return data.pop(SCHEMA_KEY, 0), data
+
+
+def read_record(path: Path) -> Dict[str, Any]:
+    """Read a record file as a plain dict (header stripped, no upgrades)."""
+    with open(path, "rb") as f:
+        return decode(f.read())[1]
+
+
+class RecordSerializer(Generic[T]):
+    """Encodes one dataclass type with a store's codec and schema version."""
+
+    def __init__(
+        self,
+        record_type: Type[T],
+        codec: str = "json",
+        version: int = 1,
+        upgrades: Optional[Dict[int, Callable[[Dict[str, Any]], Dict[str, Any]]]] = None
+    ):
+        """
+        Initialize serializer.
+
+        Args:
+            record_type: Dataclass stored in the files
+            codec: Codec name used for writing
+            version: Current schema version (written in the header)
+            upgrades: {from_version: fn(data) -> data} applied in order to
+                records written with an older version
+        """
+        self.record_type = record_type
+        self.codec = get_codec(codec)
+        self.version = version
+        self.upgrades = upgrades or {}
+
+    def dumps(self, obj: T) -> bytes:
+        """Encode a record with the schema header."""
+        record = {SCHEMA_KEY: self.version}
+        record.update(to_record(obj))
+        return self.codec.encode(record)
+
+    def loads(self, raw: bytes) -> T:
+        """Decode a record of any codec and schema version up to the current one."""
+        version, data = decode(raw)
+        if version > self.version:
+            raise ValueError(
+                f"{self.record_type.__name__} record has schema {version}, newer than {self.version}"
+            )
+        for from_version in range(version, self.version):
+            upgrade = self.upgrades.get(from_version)
+            if upgrade:
+                data = upgrade(data)
+        return self.record_type(**data)
+
+    def read(self, path: Path) -> T:
+        """Read and decode a record file."""
+        with open(path, "rb") as f:
+            return self.loads(f.read())
+
+    def write(self, path: Path, obj: T) -> None:
+        """Write a record atomically (temp file + rename)."""
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(self.dumps(obj))
+        temp_path.replace(path)
@@ -0,0 +1,226 @@
+"""
+Store Layout - file placement for the {id}.json stores.
+
+user_profiles/, links/, parents/ and reality_bridges/ keep one JSON file
+per record. In one flat directory, lookups and enumeration slow down
+badly once it holds hundreds of thousands of entries (ext4 htree,
+overlayfs copy-up). The optional fan-out layout spreads files over
+hashed subdirectories:
+
+    levels=0 (default):  root/{id}.json
+    levels=2:            root/ab/cd/{id}.json   (ab, cd: blake2b(id) hex pairs)
+
+With 2 levels each leaf directory holds 1/65536 of the records.
+Subdirectories are exactly two hex characters, so other entries in a store
+root (archive/, reminders.db) are never mistaken for buckets.
+
+Enumeration uses os.scandir and yields lazily. It never sorts and never
+builds a full list, so a scan uses constant memory.
+
+The layout is chosen by STORE_FANOUT_LEVELS. Migrate existing stores first,
+with the bot stopped. Migration is idempotent and can be re-run after an
+interruption:
+
+    python -m src.core.store_layout --levels 2            # all stores
+    python -m src.core.store_layout --levels 2 --store users --dry-run
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from src.core.logger import get_logger
+from src.config import (
+    USER_PROFILES_DIR,
+    LINKS_DIR,
+    PARENTS_DIR,
+    REALITY_BRIDGES_DIR,
+    STORE_FANOUT_LEVELS
+)
+
+logger = get_logger(__name__)
+
+SUFFIX = ".json"
+HEX_DIGITS = frozenset("0123456789abcdef")
+
+STORES = {
+    "users": USER_PROFILES_DIR,
+    "links": LINKS_DIR,
+    "parents": PARENTS_DIR,
+    "bridges": REALITY_BRIDGES_DIR
+}
+
+
+def _is_bucket(name: str) -> bool:
+    return len(name) == 2 and name[0] in HEX_DIGITS and name[1] in HEX_DIGITS
+
+
+class StoreLayout:
+    """Maps record IDs to file paths and enumerates a store lazily."""
+
+    def __init__(self, root: Path, levels: int = STORE_FANOUT_LEVELS):
+        """
+        Initialize layout.
+
+        Args:
+            root: Store directory
+            levels: Fan-out directory levels (0: flat)
+        """
+        if not 0 <= levels <= 4:
+            raise ValueError(f"Fan-out levels must be 0-4, got {levels}")
+        self.root = root
+        self.levels = levels
+
+        # Buckets known to exist (mkdir once per bucket, not per write)
+        self._buckets: Set[Path] = set()
+
+    def bucket(self, item_id: str) -> Path:
+        """Directory holding an ID's file."""
+        if not self.levels:
+            return self.root
+        digest = hashlib.blake2b(item_id.encode("utf-8"), digest_size=self.levels).hexdigest()
+        return self.root.joinpath(*(digest[index:index + 2] for index in range(0, 2 * self.levels, 2)))
+
+    def path(self, item_id: str) -> Path:
+        """File path of an ID (may not exist)."""
+        return self.bucket(item_id) / f"{item_id}{SUFFIX}"
+
+    def path_for_write(self, item_id: str) -> Path:
+        """File path of an ID, creating its bucket directory if needed."""
+        bucket = self.bucket(item_id)
+        if bucket not in self._buckets:
+            bucket.mkdir(parents=True, exist_ok=True)
+            self._buckets.add(bucket)
+        return bucket / f"{item_id}{SUFFIX}"
+
+    def iter_entries(self) -> Iterator[os.DirEntry]:
+        """
+        Stream the store's record files (os.scandir, no sorting).
+
+        Yields:
+            DirEntry of each {id}.json at this layout's depth
+        """
+        yield from self._walk(self.root, self.levels)
+
+    def _walk(self, directory: Path, depth: int) -> Iterator[os.DirEntry]:
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            return
+        with entries:
+            for entry in entries:
+                if depth:
+                    if _is_bucket(entry.name) and entry.is_dir(follow_symlinks=False):
+                        yield from self._walk(entry.path, depth - 1)
+                elif entry.name.endswith(SUFFIX) and entry.is_file():
+                    yield entry
+
+    def iter_ids(self) -> Iterator[str]:
+        """Stream record IDs (file names without .json)."""
+        for entry in self.iter_entries():
+            yield entry.name[:-len(SUFFIX)]
+
+    def count(self) -> int:
+        """Number of records (one streaming pass)."""
+        return sum(1 for _ in self.iter_entries())
+
+    # ------------------------------------------------------------------
+    # Migration
+    # ------------------------------------------------------------------
+
+    def _walk_all(self, directory: Path, depth: int = 0) -> Iterator[os.DirEntry]:
+        """Record files at any bucket depth (a layout half-way through a migration)."""
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if _is_bucket(entry.name) and entry.is_dir(follow_symlinks=False):
+                    if depth < 4:
+                        yield from self._walk_all(entry.path, depth + 1)
+                elif entry.name.endswith(SUFFIX) and entry.is_file():
+                    yield entry
+
+    def _remove_empty_buckets(self, directory: Path) -> int:
+        """Delete bucket directories left empty (bottom-up). Returns number removed."""
+        removed = 0
+        with os.scandir(directory) as entries:
+            buckets = [entry.path for entry in entries
+                       if _is_bucket(entry.name) and entry.is_dir(follow_symlinks=False)]
+        for bucket in buckets:
+            removed += self._remove_empty_buckets(Path(bucket))
+            try:
+                os.rmdir(bucket)
+                removed += 1
+            except OSError:
+                pass  # Not empty
+        return removed
+
+    def migrate(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Move every record file of the store into this layout.
+
+        Files are found at any bucket depth, so an interrupted migration
+        (or one to a different level count) is finished by running it again.
+        Each move is a rename within the store's filesystem.
+
+        Args:
+            dry_run: Count files to move without moving them
+
+        Returns:
+            Dictionary with files moved, files already in place and seconds
+        """
+        started = time.perf_counter()
+        moved = in_place = 0
+        if not self.root.exists():
+            return {"root": str(self.root), "levels": self.levels, "moved": 0, "in_place": 0,
+                    "buckets_removed": 0, "seconds": 0.0}
+
+        # Snapshot the listing first: renames must not feed back into the scan
+        sources = [entry.path for entry in self._walk_all(self.root)]
+        for source in sources:
+            name = os.path.basename(source)
+            target = self.path(name[:-len(SUFFIX)])
+            if os.path.dirname(source) == str(target.parent):
+                in_place += 1
+                continue
+            if not dry_run:
+                os.replace(source, self.path_for_write(name[:-len(SUFFIX)]))
+            moved += 1
+
+        removed = 0 if dry_run else self._remove_empty_buckets(self.root)
+        result = {
+            "root": str(self.root),
+            "levels": self.levels,
+            "moved": moved,
+            "in_place": in_place,
+            "buckets_removed": removed,
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+        logger.info("store_layout_migrated", dry_run=dry_run, **result)
+        return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Migrate stores to a fan-out level count."""
+    parser = argparse.ArgumentParser(description="Migrate InnerWorld Edu JSON stores between file layouts")
+    parser.add_argument("--levels", type=int, required=True, help="Target fan-out levels (0: flat)")
+    parser.add_argument("--store", choices=sorted(STORES), action="append",
+                        help="Store to migrate (repeatable; default: all)")
+    parser.add_argument("--dry-run", action="store_true", help="Only count files that would move")
+    args = parser.parse_args(argv)
+
+    results = [
+        StoreLayout(STORES[name], levels=args.levels).migrate(dry_run=args.dry_run)
+        for name in args.store or sorted(STORES)
+    ]
+    print(json.dumps(results, indent=2))
+    if args.levels != STORE_FANOUT_LEVELS and not args.dry_run:
+        print(f"\nSet STORE_FANOUT_LEVELS={args.levels} before starting the bot.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,425 @@
+"""
+Lightweight span tracing for InnerWorld Edu.
+
+Records a span per processing stage (emotion detection, screening, graph,
+LangGraph nodes, LLM calls, save) and exports traces in the OpenTelemetry
+OTLP/JSON format, so any OTel collector or viewer (Jaeger, Tempo) can read
+them:
+
+    with tracer.start_span("process_message", {"user.id_hash": ...}) as span:
+        with tracer.start_span("graph.node.onboarding"):
+            ...
+
+Parent spans propagate through contextvars, so spans opened in LangGraph
+node tasks attach to the right trace.
+
+Tail-latency sampling: spans of a trace are buffered in memory until its
+root span ends. The whole trace is exported only if the root took longer
+than TRACING_SLOW_THRESHOLD_SECONDS or any span failed (plus a
+TRACING_BASE_SAMPLE_RATE fraction of fast traces). Export runs in a
+background thread, off the event loop.
+
+Disabled tracing (TRACING_ENABLED=false) hands out a shared no-op span.
+"""
+
+import abc
+import hashlib
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.logger import get_logger
+from src.config import (
+    TRACING_ENABLED,
+    TRACING_EXPORTER,
+    TRACING_FILE,
+    TRACING_OTLP_ENDPOINT,
+    TRACING_SLOW_THRESHOLD_SECONDS,
+    TRACING_BASE_SAMPLE_RATE,
+    TRACING_MAX_SPANS_PER_TRACE
+)
+
+logger = get_logger(__name__)
+
+SERVICE_NAME = "innerworld-edu"
+
+# OTLP status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def hash_user_id(user_id: Any) -> str:
+    """Pseudonymize user ID for span attributes (children's IDs stay out of traces)."""
+    return hashlib.sha256(str(user_id).encode("utf-8")).hexdigest()[:16]
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    """Convert attribute value to OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class _Trace:
+    """Spans of one trace buffered until the root span ends."""
+
+    __slots__ = ("trace_id", "spans", "error", "dropped_spans")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+        self.error = False
+        self.dropped_spans = 0
+
+
+class Span:
+    """A timed operation within a trace (use as context manager)."""
+
+    __slots__ = (
+        "tracer", "trace", "span_id", "parent_id", "name", "attributes",
+        "start_ns", "end_ns", "status", "status_message", "_token"
+    )
+
+    def __init__(self, tracer: "Tracer", trace: _Trace, name: str,
+                 parent_id: Optional[str], attributes: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        self._token = None
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds (so far, if not ended)."""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_exception(self, error: BaseException) -> None:
+        """Mark span (and so its trace) as failed."""
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+        self.trace.error = True
+
+    def end(self) -> None:
+        if not self.end_ns:
+            self.end_ns = time.time_ns()
+            self.tracer._on_end(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc is not None:
+            self.record_exception(exc)
+        _current_span.reset(self._token)
+        self.end()
+        return False
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert to OTLP/JSON span."""
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": self.status, "message": self.status_message}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Span stand-in when tracing is disabled."""
+
+    duration = 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def record_exception(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter(abc.ABC):
+    """
+    Base exporter: batches OTLP payloads on a background thread.
+
+    Subclasses implement _write(payload).
+    """
+
+    def __init__(self, max_queue: int = 1000):
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        self.exported = 0
+        self.dropped = 0
+
+    def export(self, spans: List[Span]) -> None:
+        """Queue one trace for export (never blocks; drops when full)."""
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                    {"key": "process.pid", "value": {"intValue": str(os.getpid())}}
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "src.core.tracing"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+        try:
+            self._queue.put_nowait(payload)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Flush queued traces and stop the thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            payload = self._queue.get()
+            if payload is None:
+                return
+            try:
+                self._write(payload)
+                self.exported += 1
+            except Exception as e:
+                self.dropped += 1
+                logger.warning("trace_export_failed", exporter=type(self).__name__, error=str(e))
+
+    @abc.abstractmethod
+    def _write(self, payload: Dict[str, Any]) -> None:
+        """Export one OTLP payload (called on the exporter thread)."""
+
+
+class FileSpanExporter(SpanExporter):
+    """Appends one OTLP/JSON ExportTraceServiceRequest per line."""
+
+    def __init__(self, path: Path = TRACING_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__()
+
+    def _write(self, payload: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+
+
+class OTLPHttpSpanExporter(SpanExporter):
+    """POSTs OTLP/JSON to a collector (e.g. http://localhost:4318/v1/traces)."""
+
+    def __init__(self, endpoint: str = TRACING_OTLP_ENDPOINT, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        super().__init__()
+
+    def _write(self, payload: Dict[str, Any]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class Tracer:
+    """Creates spans and applies tail-latency sampling to finished traces."""
+
+    def __init__(
+        self,
+        exporter: Optional[SpanExporter] = None,
+        enabled: bool = True,
+        slow_threshold: float = TRACING_SLOW_THRESHOLD_SECONDS,
+        base_sample_rate: float = TRACING_BASE_SAMPLE_RATE,
+        max_spans_per_trace: int = TRACING_MAX_SPANS_PER_TRACE
+    ):
+        """
+        Initialize tracer.
+
+        Args:
+            exporter: Where kept traces go (None = spans are recorded, not exported)
+            enabled: Record spans at all (False = no-op spans)
+            slow_threshold: Root span seconds above which a trace is kept
+            base_sample_rate: Fraction of fast, successful traces kept anyway
+            max_spans_per_trace: Spans beyond this are dropped (loops, retries)
+        """
+        self.exporter = exporter
+        self.enabled = enabled
+        self.slow_threshold = slow_threshold
+        self.base_sample_rate = base_sample_rate
+        self.max_spans_per_trace = max_spans_per_trace
+
+        # Stats
+        self.traces_started = 0
+        self.traces_kept = 0
+        self.traces_dropped = 0
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        """
+        Start span as child of the current span (or as a new trace root).
+
+        Args:
+            name: Span name (e.g. "graph.node.onboarding")
+            attributes: Initial attributes
+
+        Returns:
+            Span context manager (no-op span when disabled)
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        parent = _current_span.get()
+        if parent is None or parent.end_ns:
+            self.traces_started += 1
+            trace = _Trace(os.urandom(16).hex())
+            parent_id = None
+        else:
+            trace = parent.trace
+            parent_id = parent.span_id
+
+        return Span(self, trace, name, parent_id, attributes)
+
+    def current_span(self):
+        """Get active span (no-op span if none)."""
+        return _current_span.get() or NOOP_SPAN
+
+    def _on_end(self, span: Span) -> None:
+        """Buffer ended span; decide on the trace when its root ends."""
+        trace = span.trace
+
+        if len(trace.spans) < self.max_spans_per_trace:
+            trace.spans.append(span)
+        else:
+            trace.dropped_spans += 1
+
+        if span.parent_id is not None:
+            return
+
+        keep = (
+            trace.error
+            or span.duration >= self.slow_threshold
+            or (self.base_sample_rate > 0 and random.random() < self.base_sample_rate)
+        )
+
+        if keep:
+            self.traces_kept += 1
+            if trace.dropped_spans:
+                span.set_attribute("trace.dropped_spans", trace.dropped_spans)
+            if self.exporter:
+                self.exporter.export(trace.spans)
+        else:
+            self.traces_dropped += 1
+
+        trace.spans = []
+
+    def shutdown(self) -> None:
+        """Flush exporter."""
+        if self.exporter:
+            self.exporter.shutdown()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get tracing statistics."""
+        return {
+            "enabled": self.enabled,
+            "traces_started": self.traces_started,
+            "traces_kept": self.traces_kept,
+            "traces_dropped": self.traces_dropped,
+            "exported": self.exporter.exported if self.exporter else 0,
+            "export_dropped": self.exporter.dropped if self.exporter else 0
+        }
+
+
+_tracer: Optional[Tracer] = None
+
+
+def configure_tracing(
+    enabled: bool = TRACING_ENABLED,
+    exporter: str = TRACING_EXPORTER,
+    path: Path = TRACING_FILE,
+    endpoint: str = TRACING_OTLP_ENDPOINT,
+    **kwargs: Any
+) -> Tracer:
+    """
+    Create the process-wide tracer.
+
+    Args:
+        enabled: Record spans
+        exporter: "file" or "otlp"
+        path: JSON lines file for the file exporter
+        endpoint: Collector URL for the otlp exporter
+        **kwargs: Extra Tracer arguments (slow_threshold, base_sample_rate, ...)
+
+    Returns:
+        Configured Tracer
+    """
+    global _tracer
+
+    if _tracer:
+        _tracer.shutdown()
+
+    span_exporter = None
+    if enabled:
+        span_exporter = OTLPHttpSpanExporter(endpoint) if exporter == "otlp" else FileSpanExporter(path)
+
+    _tracer = Tracer(exporter=span_exporter, enabled=enabled, **kwargs)
+    logger.info("tracing_configured", enabled=enabled, exporter=exporter if enabled else None)
+    return _tracer
+
+
+def get_tracer() -> Tracer:
+    """Get process-wide tracer (configured from src.config on first use)."""
+    if _tracer is None:
+        return configure_tracing()
+    return _tracer
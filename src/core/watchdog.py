@@ -0,0 +1,291 @@
+"""
+Event loop watchdog for InnerWorld Edu.
+
+Finds code that blocks the event loop (sync file I/O in src/data and
+src/game, CPU-heavy loops, ...):
+
+- A heartbeat coroutine wakes every WATCHDOG_INTERVAL_SECONDS and records
+  how late it woke up (event loop lag).
+- A monitor thread checks the heartbeat. When the loop has not come back
+  for WATCHDOG_THRESHOLD_SECONDS it grabs the loop thread's current stack
+  with sys._current_frames() - the stack of the blocking call.
+- When the heartbeat resumes, the stall is attributed to the call site:
+  the innermost frame in project code (not stdlib / site-packages).
+
+Offenders are aggregated per call site (count, total and max blocked time)
+for get_report() and the innerworld_loop_blocked_* metrics.
+
+Off unless WATCHDOG_ENABLED is set; toggle at runtime with enable()/disable()
+(from the loop thread). Disabled, the watchdog has no task and no thread; enabled and idle, it costs one
+short wakeup per interval and one thread poll per quarter threshold.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.logger import get_logger
+from src.config import (
+    BASE_DIR,
+    WATCHDOG_ENABLED,
+    WATCHDOG_INTERVAL_SECONDS,
+    WATCHDOG_THRESHOLD_SECONDS,
+    WATCHDOG_MAX_SITES
+)
+
+logger = get_logger(__name__)
+
+# Frames shown per offender in reports
+STACK_DEPTH = 12
+
+UNKNOWN_SITE = "unknown"
+
+
+@dataclass
+class BlockingSite:
+    """Aggregated stalls attributed to one call site."""
+    site: str
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    stack: str = ""  # Sample stack (innermost last)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "site": self.site,
+            "count": self.count,
+            "total_seconds": round(self.total_seconds, 4),
+            "max_seconds": round(self.max_seconds, 4),
+            "stack": self.stack
+        }
+
+
+def _project_path(filename: str, project_root: str) -> Optional[str]:
+    """Path relative to project root, or None for stdlib / site-packages / this module."""
+    if filename.startswith("<") or "site-packages" in filename:
+        return None
+    path = str(Path(filename).resolve())
+    if not path.startswith(project_root) or path == __file__:
+        return None
+    return path[len(project_root):].lstrip("/")
+
+
+class LoopWatchdog:
+    """Detects and aggregates event loop stalls."""
+
+    def __init__(
+        self,
+        threshold: float = WATCHDOG_THRESHOLD_SECONDS,
+        interval: float = WATCHDOG_INTERVAL_SECONDS,
+        max_sites: int = WATCHDOG_MAX_SITES,
+        project_root: Path = BASE_DIR
+    ):
+        """
+        Initialize watchdog.
+
+        Args:
+            threshold: Loop stall (seconds) reported as blocking
+            interval: Heartbeat period (seconds)
+            max_sites: Max distinct call sites kept (smallest are evicted)
+            project_root: Frames under this directory count as call sites
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self.max_sites = max_sites
+        self.project_root = str(project_root.resolve())
+
+        self.sites: Dict[str, BlockingSite] = {}
+        self.blocks = 0
+        self.blocked_seconds = 0.0
+        self.last_lag = 0.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._monitor_stop: Optional[threading.Event] = None
+        self._last_beat = 0.0
+        self._pending: Optional[List[traceback.FrameSummary]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._heartbeat_task is not None
+
+    def enable(self) -> None:
+        """Start heartbeat and monitor thread (call from the loop thread)."""
+        if self.enabled:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._pending = None
+
+        # Fresh stop event per run: a monitor from an earlier run may still be sleeping
+        self._monitor_stop = threading.Event()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        threading.Thread(
+            target=self._watch, args=(self._monitor_stop,), name="loop-watchdog", daemon=True
+        ).start()
+        logger.info("loop_watchdog_enabled", threshold=self.threshold)
+
+    def disable(self) -> None:
+        """Stop heartbeat and monitor thread (aggregates are kept)."""
+        if not self.enabled:
+            return
+
+        self._heartbeat_task.cancel()
+        self._heartbeat_task = None
+        self._monitor_stop.set()
+        self._pending = None
+        logger.info("loop_watchdog_disabled")
+
+    def reset(self) -> None:
+        """Clear aggregated offenders."""
+        self.sites.clear()
+        self.blocks = 0
+        self.blocked_seconds = 0.0
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self._last_beat = time.monotonic()
+            self.last_lag = lag
+
+            if lag >= self.threshold:
+                stack, self._pending = self._pending, None
+                self._record(stack, lag)
+            else:
+                self._pending = None
+
+    def _watch(self, stop: threading.Event) -> None:
+        """Monitor thread: capture the loop thread's stack during a stall."""
+        # A stall reaching the threshold still runs half a threshold past the
+        # missed heartbeat, so capture there; polling at a quarter threshold
+        # never misses it.
+        poll = max(0.005, self.threshold / 4)
+        while not stop.wait(poll):
+            if self._pending is not None:
+                continue
+            if time.monotonic() - self._last_beat < self.interval + self.threshold / 2:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._pending = traceback.extract_stack(frame)
+
+    def _site_of(self, stack: List[traceback.FrameSummary]) -> str:
+        """Innermost project frame, else innermost frame."""
+        for frame in reversed(stack):
+            path = _project_path(frame.filename, self.project_root)
+            if path:
+                return f"{path}:{frame.lineno} {frame.name}"
+        frame = stack[-1]
+        return f"{frame.filename}:{frame.lineno} {frame.name}"
+
+    def _record(self, stack: Optional[List[traceback.FrameSummary]], lag: float) -> None:
+        site = self._site_of(stack) if stack else UNKNOWN_SITE
+
+        entry = self.sites.get(site)
+        if entry is None:
+            if len(self.sites) >= self.max_sites:
+                smallest = min(self.sites.values(), key=lambda s: s.total_seconds)
+                del self.sites[smallest.site]
+            entry = self.sites[site] = BlockingSite(
+                site=site,
+                stack="".join(traceback.format_list(stack[-STACK_DEPTH:])) if stack else ""
+            )
+
+        entry.count += 1
+        entry.total_seconds += lag
+        entry.max_seconds = max(entry.max_seconds, lag)
+        self.blocks += 1
+        self.blocked_seconds += lag
+
+        logger.warning("event_loop_blocked", site=site, seconds=round(lag, 4))
+
+    def get_report(self, top: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get top blocking call sites by total blocked time.
+
+        Args:
+            top: Number of sites
+
+        Returns:
+            List of site dicts (site, count, total_seconds, max_seconds, stack)
+        """
+        sites = sorted(self.sites.values(), key=lambda s: s.total_seconds, reverse=True)
+        return [site.to_dict() for site in sites[:top]]
+
+    def format_report(self, top: int = 10) -> str:
+        """Text report of top blocking call sites."""
+        lines = [
+            f"Event loop watchdog: {'enabled' if self.enabled else 'disabled'}, "
+            f"threshold {self.threshold * 1000:.0f} ms, "
+            f"{self.blocks} stalls, {self.blocked_seconds:.2f}s blocked",
+            ""
+        ]
+        for index, site in enumerate(self.get_report(top), 1):
+            lines.append(
+                f"{index:>2}. {site['site']}  count={site['count']} "
+                f"total={site['total_seconds']:.3f}s max={site['max_seconds']:.3f}s"
+            )
+            if site["stack"]:
+                lines.extend("      " + line for line in site["stack"].rstrip().splitlines())
+        return "\n".join(lines)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "threshold": self.threshold,
+            "blocks": self.blocks,
+            "blocked_seconds": self.blocked_seconds,
+            "sites": len(self.sites),
+            "last_lag": self.last_lag
+        }
+
+
+_watchdog: Optional[LoopWatchdog] = None
+
+
+def get_watchdog() -> LoopWatchdog:
+    """Get the process-wide watchdog (created disabled)."""
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = LoopWatchdog()
+        _register_metrics(_watchdog)
+    return _watchdog
+
+
+def start_watchdog() -> LoopWatchdog:
+    """Enable the process-wide watchdog if WATCHDOG_ENABLED (call from the loop thread)."""
+    watchdog = get_watchdog()
+    if WATCHDOG_ENABLED:
+        watchdog.enable()
+    return watchdog
+
+
+def _register_metrics(watchdog: LoopWatchdog) -> None:
+    """Expose stalls and top offenders (read at scrape time)."""
+    from src.core.metrics import REGISTRY
+
+    REGISTRY.register_callback(
+        "innerworld_loop_watchdog_enabled", "Event loop watchdog running (1) or not (0)",
+        lambda: 1 if watchdog.enabled else 0
+    )
+    REGISTRY.register_callback(
+        "innerworld_loop_blocks_total", "Event loop stalls longer than the watchdog threshold",
+        lambda: watchdog.blocks, metric_type="counter"
+    )
+    REGISTRY.register_callback(
+        "innerworld_loop_blocked_seconds_total", "Event loop time blocked, top call sites",
+        lambda: {site["site"]: site["total_seconds"] for site in watchdog.get_report(10)},
+        metric_type="counter", labelnames=["site"]
+    )
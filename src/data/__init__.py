@@ -2,6 +2,7 @@
 
 from .user_manager import UserManager, UserProfile, UserProgress, ScreeningMetrics
 from .link_manager import LinkManager, ParentLink, ParentProfile, LinkStatus
+from .parent_dashboard import ParentDashboardStore, ParentDashboard, ChildSummary
 
 __all__ = [
     "UserManager",
@@ -11,5 +12,8 @@ __all__ = [
     "LinkManager",
     "ParentLink",
     "ParentProfile",
-    "LinkStatus"
+    "LinkStatus",
+    "ParentDashboardStore",
+    "ParentDashboard",
+    "ChildSummary"
 ]
@@ -15,22 +15,61 @@ Security:
 
 Storage:
     src/data/links/{link_id}.json - Link records
+    src/data/links/archive/links-YYYY-MM.jsonl.gz - Archived expired/revoked links
     src/data/parents/{parent_id}.json - Parent profiles
+    (with STORE_FANOUT_LEVELS=2 record files live in ab/cd/ subdirectories, see store_layout)
+    Record files are encoded by RecordSerializer (LINKS_CODEC / PARENTS_CODEC)
+
+Expiry:
+    An in-memory index (built by one directory scan) keeps link status
+    counts, links per child, and two min-heaps: pending links by expires_at
+    and expired/revoked links by archive time (LINK_RETENTION_DAYS after
+    they closed). A background sweeper pops due entries and, in batches of
+    LINK_SWEEP_BATCH, marks pending links expired and moves old closed
+    links to a gzip archive, deleting their files. Directory size and
+    lookup cost stay bounded by live links instead of growing forever.
+    Due links of children another shard worker owns are parked and go back
+    on the heaps when ownership changes (apply_ownership).
+
+    The index drives the sweeper and statistics only. Child lookups re-read
+    the child's link files and any files missing from the index, so links
+    activated by the parent bot or another shard worker are seen at once.
 """
 
+import gzip
+import heapq
 import json
 import asyncio
+import os
 import secrets
+import time
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Awaitable, Callable, Iterator, Set, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
 
 from src.core.logger import get_logger, log_parent_notification
+from src.core.metrics import REGISTRY, STORAGE_SECONDS, STORAGE_ERRORS
+from src.core.serialization import RecordSerializer
+from src.core.store_layout import StoreLayout
+from src.config import (
+    LINK_TTL_DAYS,
+    LINK_RETENTION_DAYS,
+    LINK_SWEEP_BATCH,
+    LINK_SWEEP_MAX_SECONDS,
+    STORE_FANOUT_LEVELS,
+    LINKS_CODEC,
+    PARENTS_CODEC
+)
 
 logger = get_logger(__name__)
 
+# Link / parent profile file schema versions (see src/core/serialization.py)
+LINK_SCHEMA = 1
+PARENT_SCHEMA = 1
+
 
 class LinkStatus(str, Enum):
     """Link status."""
@@ -51,6 +90,7 @@ class ParentLink:
     created_at: str = ""
     activated_at: Optional[str] = None
     expires_at: str = ""
+    revoked_at: Optional[str] = None
 
     def __post_init__(self):
         """Set timestamps if not provided."""
@@ -58,8 +98,8 @@ class ParentLink:
             self.created_at = datetime.now().isoformat()
 
         if not self.expires_at:
-            # Links expire after 7 days
-            expires = datetime.now() + timedelta(days=7)
+            # Links expire after LINK_TTL_DAYS (7 days)
+            expires = datetime.now() + timedelta(days=LINK_TTL_DAYS)
             self.expires_at = expires.isoformat()
 
     def is_expired(self) -> bool:
@@ -74,6 +114,11 @@ class ParentLink:
         """Check if link is active."""
         return self.status == LinkStatus.ACTIVE and not self.is_expired()
 
+    def closed_ts(self) -> float:
+        """When an expired/revoked link closed, epoch seconds (start of retention)."""
+        closed = self.revoked_at if self.status == LinkStatus.REVOKED else None
+        return datetime.fromisoformat(closed or self.expires_at or self.created_at).timestamp()
+
 
 @dataclass
 class ParentProfile:
@@ -109,14 +154,18 @@ class LinkManager:
     Manages parent-child linking with JSON file storage.
 
     Creates unique links for parent activation.
-    Tracks link status and expiration.
+    Tracks link status and expiration (TTL index + background sweeper).
     Manages parent profiles and notifications.
     """
 
     def __init__(
         self,
         links_dir: Path = Path("src/data/links"),
-        parents_dir: Path = Path("src/data/parents")
+        parents_dir: Path = Path("src/data/parents"),
+        owner_filter: Optional[Callable[[str], bool]] = None,
+        fanout_levels: int = STORE_FANOUT_LEVELS,
+        links_codec: str = LINKS_CODEC,
+        parents_codec: str = PARENTS_CODEC
     ):
         """
         Initialize link manager.
@@ -124,28 +173,384 @@ class LinkManager:
         Args:
             links_dir: Directory for link JSON files
             parents_dir: Directory for parent profile JSON files
+            owner_filter: Predicate(child_id) selecting links this process
+                sweeps (default: all). Shard workers share the directory.
+            fanout_levels: Hashed subdirectory levels for both stores (0: flat)
+            links_codec: Link file codec for writes ("json" or "msgpack"; reads detect it)
+            parents_codec: Parent profile file codec for writes
         """
         self.links_dir = links_dir
         self.parents_dir = parents_dir
+        self.archive_dir = links_dir / "archive"
+        self.owner_filter = owner_filter
 
         self.links_dir.mkdir(parents=True, exist_ok=True)
         self.parents_dir.mkdir(parents=True, exist_ok=True)
+        self.link_layout = StoreLayout(links_dir, fanout_levels)
+        self.parent_layout = StoreLayout(parents_dir, fanout_levels)
+        self.link_serializer = RecordSerializer(ParentLink, links_codec, version=LINK_SCHEMA)
+        self.parent_serializer = RecordSerializer(ParentProfile, parents_codec, version=PARENT_SCHEMA)
+
+        # Index (built on first use by one directory scan)
+        self._indexed = False
+        self._index_lock = asyncio.Lock()
+        self._status: Dict[str, LinkStatus] = {}
+        self._child: Dict[str, str] = {}  # link_id -> child_id
+        self._by_child: Dict[str, Set[str]] = defaultdict(set)
+        self._counts: Counter = Counter()
+        self._parents = 0
+        # Min-heaps of (due_ts, link_id); stale entries are skipped when popped
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._retention_heap: List[Tuple[float, str]] = []
+        # Due entries of children owned by another worker (re-pushed by apply_ownership)
+        self._parked_expiry: List[Tuple[float, str]] = []
+        self._parked_retention: List[Tuple[float, str]] = []
+
+        # Sweeper
+        self._sweeper_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._next_sweep = float("inf")
+        self._sweep_lock = asyncio.Lock()
+        self.links_expired = 0
+        self.links_archived = 0
+        self.sweeps = 0
+        self.last_sweep: Dict[str, Any] = {}
+
+        # Called after a link is revoked (unlinks the child's profile and dashboard row)
+        self._revoke_callback: Optional[Callable[[ParentLink], Awaitable[None]]] = None
 
         logger.info("link_manager_initialized",
                    links_dir=str(links_dir),
                    parents_dir=str(parents_dir))
 
+    def set_revoke_callback(self, callback: Callable[[ParentLink], Awaitable[None]]) -> None:
+        """
+        Set async callback(link) invoked after a link is revoked.
+
+        Args:
+            callback: Async function receiving the revoked ParentLink
+        """
+        self._revoke_callback = callback
+
     def _generate_link_id(self) -> str:
         """Generate unique link ID."""
         return secrets.token_urlsafe(16)
 
     def _get_link_path(self, link_id: str) -> Path:
         """Get file path for link."""
-        return self.links_dir / f"{link_id}.json"
+        return self.link_layout.path(link_id)
 
     def _get_parent_path(self, parent_id: str) -> Path:
         """Get file path for parent profile."""
-        return self.parents_dir / f"{parent_id}.json"
+        return self.parent_layout.path(parent_id)
+
+    def _owns(self, child_id: str) -> bool:
+        return self.owner_filter is None or self.owner_filter(child_id)
+
+    async def apply_ownership(self, owner_filter: Optional[Callable[[str], bool]]) -> None:
+        """
+        Switch to a new sweep ownership predicate.
+
+        Parked due links go back on the heaps, so links of children that
+        moved to this worker are expired and archived by the next sweep.
+
+        Args:
+            owner_filter: Predicate(child_id), or None to own every child
+        """
+        async with self._sweep_lock:
+            self.owner_filter = owner_filter
+            requeued = 0
+            for heap, parked in ((self._expiry_heap, self._parked_expiry),
+                                 (self._retention_heap, self._parked_retention)):
+                for due, link_id in parked:
+                    if link_id in self._status:
+                        self._push(heap, due, link_id)
+                        requeued += 1
+                parked.clear()
+
+        logger.info("link_ownership_applied", requeued=requeued)
+
+    # ------------------------------------------------------------------
+    # TTL index
+    # ------------------------------------------------------------------
+
+    async def initialize(self) -> None:
+        """Build the index and start the expiry sweeper."""
+        await self._ensure_index()
+        self._register_metrics()
+        if not self._sweeper_task:
+            self._sweeper_task = asyncio.get_running_loop().create_task(self._run_sweeper())
+        logger.info("link_manager_ready",
+                   links=len(self._status),
+                   pending=self._counts[LinkStatus.PENDING])
+
+    async def shutdown(self) -> None:
+        """Stop the sweeper."""
+        if self._sweeper_task:
+            self._sweeper_task.cancel()
+            await asyncio.gather(self._sweeper_task, return_exceptions=True)
+            self._sweeper_task = None
+
+    def _register_metrics(self) -> None:
+        """Expose link counts (read at scrape time)."""
+        REGISTRY.register_callback(
+            "innerworld_links", "Parent links on disk by status",
+            lambda: {status.value: count for status, count in self._counts.items()}, labelnames=["status"]
+        )
+
+    async def _ensure_index(self) -> None:
+        """Scan links and parents once."""
+        if self._indexed:
+            return
+        async with self._index_lock:
+            if self._indexed:
+                return
+            links, parents = await asyncio.to_thread(self._scan)
+            for link in links:
+                self._index_link(link)
+            self._parents = parents
+            self._indexed = True
+            logger.info("link_index_built", links=len(links), parents=parents)
+
+    def _scan(self) -> Tuple[List[ParentLink], int]:
+        """Read all link files (blocking)."""
+        links = []
+        for entry in self.link_layout.iter_entries():
+            try:
+                links.append(self.link_serializer.read(entry.path))
+            except Exception as e:
+                logger.warning("link_index_skipped", path=entry.name, error=str(e))
+
+        return links, self.parent_layout.count()
+
+    def _scan_unindexed(self) -> List[ParentLink]:
+        """Read link files missing from the index (blocking)."""
+        links = []
+        for entry in self.link_layout.iter_entries():
+            if entry.name[:-len(".json")] in self._status:
+                continue
+            try:
+                links.append(self.link_serializer.read(entry.path))
+            except Exception as e:
+                logger.warning("link_index_skipped", path=entry.name, error=str(e))
+        return links
+
+    def _refresh_link(self, link: ParentLink) -> None:
+        """Re-index a link read from disk if another process changed its status."""
+        if self._status.get(link.link_id) != link.status:
+            self._index_link(link)
+
+    def _index_link(self, link: ParentLink) -> None:
+        """Record a link's current status (called on every save)."""
+        previous = self._status.get(link.link_id)
+        if previous is not None:
+            self._counts[previous] -= 1
+        self._status[link.link_id] = link.status
+        self._counts[link.status] += 1
+        self._child[link.link_id] = link.child_id
+        self._by_child[link.child_id].add(link.link_id)
+
+        if link.status == LinkStatus.PENDING:
+            # Pushed on every save: expires_at may have changed (stale entries are re-checked)
+            self._push(self._expiry_heap, datetime.fromisoformat(link.expires_at).timestamp(), link.link_id)
+        elif link.status != previous and link.status in (LinkStatus.EXPIRED, LinkStatus.REVOKED):
+            self._push(self._retention_heap, link.closed_ts() + LINK_RETENTION_DAYS * 86400, link.link_id)
+
+    def _push(self, heap: List[Tuple[float, str]], due: float, link_id: str) -> None:
+        """Add a heap entry; wake the sweeper if it is due before its next run."""
+        heapq.heappush(heap, (due, link_id))
+        if due < self._next_sweep:
+            self._wakeup.set()
+
+    def _unindex_link(self, link_id: str) -> None:
+        status = self._status.pop(link_id, None)
+        if status is not None:
+            self._counts[status] -= 1
+        child_id = self._child.pop(link_id, None)
+        links = self._by_child.get(child_id)
+        if links is not None:
+            links.discard(link_id)
+            if not links:
+                del self._by_child[child_id]
+
+    def _pop_due(
+        self,
+        heap: List[Tuple[float, str]],
+        statuses: Tuple[LinkStatus, ...],
+        now: float
+    ) -> List[Tuple[float, str]]:
+        """Pop up to LINK_SWEEP_BATCH due entries whose link is still in one of statuses."""
+        due = []
+        while heap and heap[0][0] <= now and len(due) < LINK_SWEEP_BATCH:
+            entry = heapq.heappop(heap)
+            if self._status.get(entry[1]) in statuses:
+                due.append(entry)
+        return due
+
+    def _owned_due(self, due: List[Tuple[float, str]], parked: List[Tuple[float, str]]) -> List[str]:
+        """Link IDs of owned due entries; the rest are added to parked."""
+        owned = []
+        for entry in due:
+            if self._owns(self._child[entry[1]]):
+                owned.append(entry[1])
+            else:
+                parked.append(entry)
+        return owned
+
+    # ------------------------------------------------------------------
+    # Sweeper
+    # ------------------------------------------------------------------
+
+    async def _run_sweeper(self) -> None:
+        """Sweep when the next link is due (at least every LINK_SWEEP_MAX_SECONDS)."""
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error("link_sweep_failed", error=str(e))
+
+            next_due = min(
+                (heap[0][0] for heap in (self._expiry_heap, self._retention_heap) if heap),
+                default=float("inf")
+            )
+            delay = min(max(next_due - time.time(), 0.1), LINK_SWEEP_MAX_SECONDS)
+            self._next_sweep = time.time() + delay
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def sweep(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Expire due pending links and archive closed links past retention.
+
+        Args:
+            now: Epoch seconds (default: now)
+
+        Returns:
+            Dictionary with expired/archived counts and duration
+        """
+        await self._ensure_index()
+        now = now if now is not None else time.time()
+        started = time.perf_counter()
+        expired = archived = batches = 0
+
+        async with self._sweep_lock:
+            while True:
+                due = self._pop_due(self._expiry_heap, (LinkStatus.PENDING,), now)
+                if not due:
+                    break
+                owned = self._owned_due(due, self._parked_expiry)
+                for link in await asyncio.to_thread(self._expire_batch, owned, now):
+                    self._index_link(link)
+                    expired += 1
+                batches += 1
+
+            while True:
+                due = self._pop_due(self._retention_heap, (LinkStatus.EXPIRED, LinkStatus.REVOKED), now)
+                if not due:
+                    break
+                owned = self._owned_due(due, self._parked_retention)
+                for link_id in await asyncio.to_thread(self._archive_batch, owned, now):
+                    self._unindex_link(link_id)
+                    archived += 1
+                batches += 1
+
+        self.links_expired += expired
+        self.links_archived += archived
+        self.sweeps += 1
+        self.last_sweep = {
+            "expired": expired,
+            "archived": archived,
+            "batches": batches,
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+        if expired or archived:
+            logger.info("links_swept", **self.last_sweep)
+        return self.last_sweep
+
+    def _read_link_file(self, link_id: str) -> Optional[ParentLink]:
+        try:
+            return self.link_serializer.read(self._get_link_path(link_id))
+        except FileNotFoundError:
+            return None
+
+    def _write_link_file(self, link: ParentLink) -> None:
+        self.link_serializer.write(self.link_layout.path_for_write(link.link_id), link)
+
+    def _expire_batch(self, link_ids: List[str], now: float) -> List[ParentLink]:
+        """Mark pending links expired on disk (blocking). Returns links changed."""
+        changed = []
+        with STORAGE_SECONDS.labels("link", "sweep").time():
+            for link_id in link_ids:
+                try:
+                    link = self._read_link_file(link_id)
+                    # Re-check on disk: another process may have activated it
+                    if link is None or link.status != LinkStatus.PENDING:
+                        continue
+                    if datetime.fromisoformat(link.expires_at).timestamp() > now:
+                        continue
+                    link.status = LinkStatus.EXPIRED
+                    self._write_link_file(link)
+                    changed.append(link)
+                except Exception as e:
+                    STORAGE_ERRORS.labels("link", "sweep").inc()
+                    logger.error("link_expire_failed", link_id=link_id, error=str(e))
+        return changed
+
+    def _archive_batch(self, link_ids: List[str], now: float) -> List[str]:
+        """
+        Append closed links to the month's archive and delete their files (blocking).
+
+        Returns:
+            IDs of archived links
+        """
+        records = []
+        for link_id in link_ids:
+            try:
+                link = self._read_link_file(link_id)
+            except Exception as e:
+                STORAGE_ERRORS.labels("link", "sweep").inc()
+                logger.error("link_archive_read_failed", link_id=link_id, error=str(e))
+                continue
+            if link is None or link.status not in (LinkStatus.EXPIRED, LinkStatus.REVOKED):
+                continue
+            records.append(link)
+        if not records:
+            return []
+
+        lines = "".join(
+            json.dumps(asdict(link), ensure_ascii=False, separators=(",", ":")) + "\n" for link in records
+        )
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        partition = self.archive_dir / f"links-{datetime.fromtimestamp(now).strftime('%Y-%m')}.jsonl.gz"
+        with STORAGE_SECONDS.labels("link", "archive").time():
+            # One gzip member per batch, single append (see BridgeArchive)
+            fd = os.open(partition, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, gzip.compress(lines.encode("utf-8")))
+            finally:
+                os.close(fd)
+
+        archived = []
+        for link in records:
+            try:
+                self._get_link_path(link.link_id).unlink()
+            except FileNotFoundError:
+                pass
+            archived.append(link.link_id)
+        return archived
+
+    def iter_archived(self) -> List[Dict[str, Any]]:
+        """Read all archived link records (blocking; for audits and tests)."""
+        records = []
+        if not self.archive_dir.exists():
+            return records
+        for partition in sorted(self.archive_dir.glob("links-*.jsonl.gz")):
+            with gzip.open(partition, "rt", encoding="utf-8") as f:
+                records.extend(json.loads(line) for line in f if line.strip())
+        return records
 
     async def create_link(
         self,
@@ -207,10 +612,8 @@ class LinkManager:
 
         try:
             async with asyncio.Lock():
-                with open(link_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-            link = ParentLink(**data)
+                with STORAGE_SECONDS.labels("link", "read").time():
+                    link = self.link_serializer.read(link_path)
 
             # Auto-expire if needed
             if link.status == LinkStatus.PENDING and link.is_expired():
@@ -220,6 +623,7 @@ class LinkManager:
             return link
 
         except Exception as e:
+            STORAGE_ERRORS.labels("link", "read").inc()
             logger.error("link_load_failed", link_id=link_id, error=str(e))
             return None
 
@@ -298,10 +702,26 @@ class LinkManager:
         if not link:
             return False
 
+        was_active = link.status == LinkStatus.ACTIVE
         link.status = LinkStatus.REVOKED
+        link.revoked_at = datetime.now().isoformat()
         await self._save_link(link)
 
-        logger.info("link_revoked", link_id=link_id)
+        # The parent no longer sees this child
+        if was_active and link.parent_id:
+            parent = await self.get_parent(link.parent_id)
+            if parent and link.child_id in parent.children:
+                parent.children.remove(link.child_id)
+                await self._save_parent(parent)
+
+        logger.info("link_revoked", link_id=link_id, child_id=link.child_id, parent_id=link.parent_id)
+
+        if self._revoke_callback:
+            try:
+                await self._revoke_callback(link)
+            except Exception as e:
+                logger.error("link_revoke_callback_failed", link_id=link_id, error=str(e))
+
         return True
 
     async def get_active_link_by_child(self, child_id: str) -> Optional[ParentLink]:
@@ -314,13 +734,26 @@ class LinkManager:
         Returns:
             ParentLink or None
         """
-        # Search through all links
-        for link_path in self.links_dir.glob("*.json"):
-            link = await self.get_link(link_path.stem)
-            if link and link.child_id == child_id and link.is_active():
+        await self._ensure_index()
+
+        # Re-read this child's known links: the parent bot or another shard
+        # worker may have activated or revoked one since it was indexed
+        for link_id in list(self._by_child.get(child_id, ())):
+            link = await self.get_link(link_id)
+            if link is None:
+                continue
+            self._refresh_link(link)
+            if link.child_id == child_id and link.is_active():
                 return link
 
-        return None
+        # Links other processes created after the index was built
+        found = None
+        for link in await asyncio.to_thread(self._scan_unindexed):
+            self._index_link(link)
+            if found is None and link.child_id == child_id and link.is_active():
+                found = link
+
+        return found
 
     async def get_parent(self, parent_id: str) -> Optional[ParentProfile]:
         """
@@ -339,15 +772,23 @@ class LinkManager:
 
         try:
             async with asyncio.Lock():
-                with open(parent_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-            return ParentProfile(**data)
+                with STORAGE_SECONDS.labels("parent", "read").time():
+                    return self.parent_serializer.read(parent_path)
 
         except Exception as e:
+            STORAGE_ERRORS.labels("parent", "read").inc()
             logger.error("parent_load_failed", parent_id=parent_id, error=str(e))
             return None
 
+    def iter_parent_ids(self) -> Iterator[str]:
+        """
+        Stream parent IDs from storage (lazy os.scandir, unsorted).
+
+        Yields:
+            Parent IDs
+        """
+        return self.parent_layout.iter_ids()
+
     async def get_or_create_parent(self, parent_id: str) -> ParentProfile:
         """
         Get existing parent or create new one.
@@ -363,6 +804,7 @@ class LinkManager:
         if not parent:
             parent = ParentProfile(parent_id=parent_id)
             await self._save_parent(parent)
+            self._parents += 1
             logger.info("parent_created", parent_id=parent_id)
 
         return parent
@@ -453,64 +895,45 @@ class LinkManager:
 
     async def _save_link(self, link: ParentLink) -> None:
         """Save link to disk."""
-        link_path = self._get_link_path(link.link_id)
-        data = asdict(link)
-
         async with asyncio.Lock():
-            temp_path = link_path.with_suffix('.tmp')
-
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with STORAGE_SECONDS.labels("link", "write").time():
+                self._write_link_file(link)
 
-            temp_path.replace(link_path)
+        if self._indexed:
+            self._index_link(link)
 
     async def _save_parent(self, parent: ParentProfile) -> None:
         """Save parent profile to disk."""
-        parent_path = self._get_parent_path(parent.parent_id)
-        data = asdict(parent)
+        parent_path = self.parent_layout.path_for_write(parent.parent_id)
 
         async with asyncio.Lock():
-            temp_path = parent_path.with_suffix('.tmp')
-
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-
-            temp_path.replace(parent_path)
+            with STORAGE_SECONDS.labels("parent", "write").time():
+                self.parent_serializer.write(parent_path, parent)
 
     async def get_statistics(self) -> Dict[str, Any]:
         """
-        Get linking statistics.
+        Get linking statistics (from the index; due links are swept first).
 
         Returns:
             Dictionary with statistics
         """
-        total_links = 0
-        active_links = 0
-        pending_links = 0
-        expired_links = 0
-
-        for link_path in self.links_dir.glob("*.json"):
-            link = await self.get_link(link_path.stem)
-            if link:
-                total_links += 1
-
-                if link.status == LinkStatus.ACTIVE:
-                    active_links += 1
-                elif link.status == LinkStatus.PENDING:
-                    if link.is_expired():
-                        expired_links += 1
-                    else:
-                        pending_links += 1
-                elif link.status == LinkStatus.EXPIRED:
-                    expired_links += 1
+        await self._ensure_index()
+        if self._expiry_heap and self._expiry_heap[0][0] <= time.time():
+            await self.sweep()
 
-        total_parents = len(list(self.parents_dir.glob("*.json")))
+        active_links = self._counts[LinkStatus.ACTIVE]
+        total_parents = self._parents
 
         return {
-            "total_links": total_links,
+            "total_links": len(self._status),
             "active_links": active_links,
-            "pending_links": pending_links,
-            "expired_links": expired_links,
+            "pending_links": self._counts[LinkStatus.PENDING],
+            "expired_links": self._counts[LinkStatus.EXPIRED],
+            "revoked_links": self._counts[LinkStatus.REVOKED],
             "total_parents": total_parents,
-            "avg_children_per_parent": active_links / total_parents if total_parents > 0 else 0
+            "avg_children_per_parent": active_links / total_parents if total_parents > 0 else 0,
+            "links_expired": self.links_expired,
+            "links_archived": self.links_archived,
+            "sweeps": self.sweeps,
+            "last_sweep": self.last_sweep
         }
@@ -0,0 +1,434 @@
+"""
+Parent Dashboard - denormalized per-parent read model.
+
+A parent view needs every linked child's progress, learning profile and
+emotional summary. Instead of loading each child's profile and running
+LearningProfileAnalyzer / EmotionalRouter on every view, a ChildSummary is
+computed when the child's profile is saved and upserted into
+
+    src/data/parent_dashboards/dashboards.db
+        dashboard (parent_id, child_id) -> summary, emotional, changed_at, built_at
+
+clustered by parent, so a parent's dashboard is one range read.
+
+Writes are coalesced: update_child() only queues the summary; a flusher
+task writes all queued summaries in one transaction at most
+DASHBOARD_FLUSH_SECONDS after the first of them arrived. That bounds how
+stale the table can be for readers in other processes (parent bot, admin).
+Readers in this process also see queued summaries, so their view is exact.
+
+Staleness is measured per row: changed_at is when the child's profile
+changed, built_at when the row was written. Their difference is observed
+in innerworld_dashboard_lag_seconds, and the age of the oldest queued
+change is exported as innerworld_dashboard_pending_age_seconds.
+
+Emotional state lives in memory (per-user EmotionalRouter); summaries
+built without it keep the emotional summary already stored.
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.logger import get_logger
+from src.core.metrics import REGISTRY, STORAGE_SECONDS
+from src.orchestration.learning_profile import LearningProfile, LearningProfileAnalyzer, DIMENSIONS
+from src.config import DASHBOARD_FLUSH_SECONDS
+
+logger = get_logger(__name__)
+
+DASHBOARD_LAG_SECONDS = REGISTRY.histogram(
+    "innerworld_dashboard_lag_seconds", "Delay between a child's profile change and its dashboard row",
+    buckets=(0.01, 0.1, 0.5, 1.0, 2.0, 5.0, 15.0, 60.0)
+)
+DASHBOARD_FLUSH_ROWS = REGISTRY.histogram(
+    "innerworld_dashboard_flush_rows", "Dashboard rows written per flush",
+    buckets=(1, 10, 50, 100, 500, 1000, 5000)
+)
+
+_READ_SECONDS = STORAGE_SECONDS.labels("parent_dashboard", "read")
+_WRITE_SECONDS = STORAGE_SECONDS.labels("parent_dashboard", "write")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dashboard (
+    parent_id TEXT NOT NULL,
+    child_id TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    emotional TEXT,
+    changed_at REAL NOT NULL,
+    built_at REAL NOT NULL,
+    PRIMARY KEY (parent_id, child_id)
+) WITHOUT ROWID;
+"""
+
+UPSERT = (
+    "INSERT INTO dashboard (parent_id, child_id, summary, emotional, changed_at, built_at) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (parent_id, child_id) DO UPDATE SET "
+    "summary = excluded.summary, "
+    "emotional = COALESCE(excluded.emotional, dashboard.emotional), "
+    "changed_at = excluded.changed_at, "
+    "built_at = excluded.built_at"
+)
+
+
+@dataclass
+class ChildSummary:
+    """Precomputed parent-facing summary of one child."""
+    child_id: str
+    child_name: Optional[str] = None
+    level: int = 1
+    xp: int = 0
+    streak_days: int = 0
+    quests_completed: int = 0
+    learning_profile: Dict[str, int] = field(default_factory=dict)  # Dimension values
+    average_score: float = 0.0
+    weakest_dimension: str = ""
+    trend: str = "neutral"  # LearningProfileAnalyzer.detect_learning_pattern
+    concern: bool = False
+    progress_summary: str = ""  # LearningProfileAnalyzer.get_progress_summary
+    emotional: Optional[Dict[str, Any]] = None  # EmotionalRouter.get_emotional_summary
+    current_location: Optional[str] = None
+    last_activity: str = ""  # ISO timestamp
+    changed_at: float = 0.0  # Epoch seconds of the profile change
+    built_at: float = 0.0  # Epoch seconds the row was written (0: not yet)
+
+
+@dataclass
+class ParentDashboard:
+    """All children of a parent."""
+    parent_id: str
+    children: List[ChildSummary]
+
+    @property
+    def lag_seconds(self) -> float:
+        """Largest change-to-write delay among the children's rows."""
+        return max((child.built_at - child.changed_at for child in self.children if child.built_at), default=0.0)
+
+
+def summarize_child(profile: Any, emotional: Optional[Dict[str, Any]] = None) -> ChildSummary:
+    """
+    Build a child's summary from a stored profile.
+
+    Args:
+        profile: src.data.user_manager.UserProfile
+        emotional: EmotionalRouter.get_emotional_summary() (None: keep stored)
+
+    Returns:
+        ChildSummary
+    """
+    learning_profile = LearningProfile.from_dict(profile.learning_profile)
+    pattern = LearningProfileAnalyzer.detect_learning_pattern(learning_profile)
+    progress = profile.progress or {}
+
+    return ChildSummary(
+        child_id=profile.user_id,
+        child_name=profile.child_name,
+        level=progress.get("level", 1),
+        xp=progress.get("xp", 0),
+        streak_days=progress.get("streak_days", 0),
+        quests_completed=max(progress.get("total_quests_completed", 0), len(profile.completed_quests or [])),
+        learning_profile={dimension.value: learning_profile.get_dimension(dimension) for dimension in DIMENSIONS},
+        average_score=round(learning_profile.get_average_score(), 2),
+        weakest_dimension=learning_profile.get_weakest_dimension().value,
+        trend=pattern["trend"],
+        concern=pattern["concern"],
+        progress_summary=LearningProfileAnalyzer.get_progress_summary(learning_profile),
+        emotional=emotional,
+        current_location=profile.current_location,
+        last_activity=profile.last_activity,
+        changed_at=time.time()
+    )
+
+
+class ParentDashboardStore:
+    """SQLite read model of parent dashboards with a coalescing writer."""
+
+    def __init__(
+        self,
+        path: Path = Path("src/data/parent_dashboards/dashboards.db"),
+        flush_seconds: float = DASHBOARD_FLUSH_SECONDS
+    ):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite database file
+            flush_seconds: Max delay between update_child() and the row being written
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.flush_seconds = flush_seconds
+
+        self._lock = threading.Lock()
+        # WAL + busy timeout: shard workers and the parent bot share one file
+        self._conn = sqlite3.connect(str(path), timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        # parent_id -> child_id -> summary (None: remove the child)
+        self._pending: Dict[str, Dict[str, Optional[ChildSummary]]] = {}
+        self._oldest_pending: Optional[float] = None
+
+        self._flusher_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+        self.updates = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+
+    async def initialize(self) -> None:
+        """Start the flusher."""
+        self._register_metrics()
+        if not self._flusher_task:
+            self._flusher_task = asyncio.get_running_loop().create_task(self._run_flusher())
+        logger.info("parent_dashboard_ready", path=str(self.path), flush_seconds=self.flush_seconds)
+
+    async def shutdown(self) -> None:
+        """Stop the flusher and write what is still queued."""
+        if self._flusher_task:
+            self._flusher_task.cancel()
+            await asyncio.gather(self._flusher_task, return_exceptions=True)
+            self._flusher_task = None
+        await self.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _register_metrics(self) -> None:
+        """Expose queue depth and age (read at scrape time)."""
+        REGISTRY.register_callback(
+            "innerworld_dashboard_pending", "Child summaries queued for the dashboard table",
+            lambda: sum(len(children) for children in self._pending.values())
+        )
+        REGISTRY.register_callback(
+            "innerworld_dashboard_pending_age_seconds", "Age of the oldest queued dashboard change",
+            self.pending_age
+        )
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def update_child(self, parent_id: str, summary: ChildSummary) -> None:
+        """
+        Queue a child's new summary (written within flush_seconds).
+
+        Args:
+            parent_id: Parent's Telegram ID
+            summary: summarize_child() result
+        """
+        children = self._pending.setdefault(parent_id, {})
+        previous = children.get(summary.child_id)
+        if summary.emotional is None and previous is not None:
+            summary.emotional = previous.emotional
+        children[summary.child_id] = summary
+        self.updates += 1
+        self._mark_pending(summary.changed_at)
+
+    def remove_child(self, parent_id: str, child_id: str) -> None:
+        """Queue removal of a child from a parent's dashboard (link revoked)."""
+        self._pending.setdefault(parent_id, {})[child_id] = None
+        self._mark_pending(time.time())
+
+    def _mark_pending(self, changed_at: float) -> None:
+        if self._oldest_pending is None:
+            self._oldest_pending = changed_at
+            self._wakeup.set()
+
+    def pending_age(self, now: Optional[float] = None) -> float:
+        """Seconds since the oldest change not yet written (0: nothing queued)."""
+        if self._oldest_pending is None:
+            return 0.0
+        return max(0.0, (time.time() if now is None else now) - self._oldest_pending)
+
+    async def _run_flusher(self) -> None:
+        """Write queued summaries flush_seconds after the first one arrives."""
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.flush_seconds)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error("parent_dashboard_flush_failed", error=str(e))
+
+    async def flush(self) -> int:
+        """
+        Write all queued summaries in one transaction.
+
+        Returns:
+            Number of rows written or deleted
+        """
+        async with self._flush_lock:
+            self._wakeup.clear()
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+            self._oldest_pending = None
+
+            now = time.time()
+            upserts: List[Tuple] = []
+            deletes: List[Tuple[str, str]] = []
+            for parent_id, children in pending.items():
+                for child_id, summary in children.items():
+                    if summary is None:
+                        deletes.append((parent_id, child_id))
+                        continue
+                    summary.built_at = now
+                    upserts.append(self._row(parent_id, summary))
+
+            try:
+                await asyncio.to_thread(self._write, upserts, deletes)
+            except Exception:
+                # Requeue unless a newer summary arrived meanwhile
+                for parent_id, children in pending.items():
+                    queued = self._pending.setdefault(parent_id, {})
+                    for child_id, summary in children.items():
+                        queued.setdefault(child_id, summary)
+                self._mark_pending(now)
+                raise
+
+            for row in upserts:
+                lag = now - row[4]
+                DASHBOARD_LAG_SECONDS.observe(lag)
+                self.max_lag = max(self.max_lag, lag)
+                self.last_lag = lag
+            DASHBOARD_FLUSH_ROWS.observe(len(upserts) + len(deletes))
+            self.flushes += 1
+            self.rows_written += len(upserts) + len(deletes)
+
+            logger.debug("parent_dashboard_flushed", rows=len(upserts), removed=len(deletes))
+            return len(upserts) + len(deletes)
+
+    @staticmethod
+    def _row(parent_id: str, summary: ChildSummary) -> Tuple:
+        data = asdict(summary)
+        emotional = data.pop("emotional")
+        return (
+            parent_id,
+            summary.child_id,
+            json.dumps(data, ensure_ascii=False),
+            json.dumps(emotional, ensure_ascii=False) if emotional is not None else None,
+            summary.changed_at,
+            summary.built_at
+        )
+
+    def _write(self, upserts: List[Tuple], deletes: List[Tuple[str, str]]) -> None:
+        with self._lock, _WRITE_SECONDS.time():
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(UPSERT, upserts)
+                self._conn.executemany(
+                    "DELETE FROM dashboard WHERE parent_id = ? AND child_id = ?", deletes
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _read(self, parent_id: str) -> List[ChildSummary]:
+        with self._lock, _READ_SECONDS.time():
+            rows = self._conn.execute(
+                "SELECT summary, emotional, built_at FROM dashboard WHERE parent_id = ?", (parent_id,)
+            ).fetchall()
+
+        children = []
+        for summary, emotional, built_at in rows:
+            data = json.loads(summary)
+            data["emotional"] = json.loads(emotional) if emotional else None
+            data["built_at"] = built_at
+            children.append(ChildSummary(**data))
+        return children
+
+    async def get_dashboard(self, parent_id: str) -> ParentDashboard:
+        """
+        Get a parent's dashboard (one indexed read plus queued changes).
+
+        Args:
+            parent_id: Parent's Telegram ID
+
+        Returns:
+            ParentDashboard (children in child_id order)
+        """
+        children = {child.child_id: child for child in await asyncio.to_thread(self._read, parent_id)}
+
+        for child_id, summary in self._pending.get(parent_id, {}).items():
+            if summary is None:
+                children.pop(child_id, None)
+                continue
+            stored = children.get(child_id)
+            if summary.emotional is None and stored is not None:
+                summary.emotional = stored.emotional
+            children[child_id] = summary
+
+        return ParentDashboard(parent_id, [children[child_id] for child_id in sorted(children)])
+
+    # ------------------------------------------------------------------
+    # Backfill
+    # ------------------------------------------------------------------
+
+    async def rebuild(self, link_manager: Any, user_manager: Any) -> int:
+        """
+        Rebuild all dashboards from parent profiles and stored user profiles.
+
+        Used once to populate the table for existing links; afterwards
+        summaries are kept current by update_child().
+
+        Args:
+            link_manager: LinkManager (parent profiles list their children)
+            user_manager: UserManager
+
+        Returns:
+            Number of child summaries written
+        """
+        count = 0
+        for parent_id in link_manager.iter_parent_ids():
+            parent = await link_manager.get_parent(parent_id)
+            if not parent:
+                continue
+            for child_id in parent.children:
+                profile = await user_manager.get_user(child_id)
+                if profile:
+                    self.update_child(parent.parent_id, summarize_child(profile))
+                    count += 1
+
+        await self.flush()
+        logger.info("parent_dashboard_rebuilt", children=count)
+        return count
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Dictionary with row counts, queue and lag
+        """
+        with self._lock:
+            rows, parents = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT parent_id) FROM dashboard"
+            ).fetchone()
+        return {
+            "rows": rows,
+            "parents": parents,
+            "pending": sum(len(children) for children in self._pending.values()),
+            "pending_age_seconds": round(self.pending_age(), 3),
+            "updates": self.updates,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "last_lag_seconds": round(self.last_lag, 3),
+            "max_lag_seconds": round(self.max_lag, 3)
+        }
@@ -5,6 +5,7 @@ Manages user profiles stored as JSON files.
 
 Storage structure:
     src/data/user_profiles/{user_id}.json
+    src/data/user_profiles/ab/cd/{user_id}.json  (STORE_FANOUT_LEVELS=2, see store_layout)
 
 Each file contains:
 - User metadata (id, name, age)
@@ -15,22 +16,36 @@ Each file contains:
 - Screening metrics
 - Timestamps
 
+Files are written by a RecordSerializer (compact JSON or MessagePack per
+USER_PROFILES_CODEC, with a schema version header); older pretty-printed
+JSON files are still read.
+
 Educational Mode uses JSON (lightweight, no database).
 Therapeutic Mode will use PostgreSQL (not implemented yet).
 """
 
-import json
 import asyncio
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Iterator
 from datetime import datetime
 from dataclasses import dataclass, asdict
 
 from src.core.logger import get_logger
+from src.core.metrics import STORAGE_SECONDS, STORAGE_ERRORS
+from src.core.serialization import RecordSerializer
+from src.core.store_layout import StoreLayout
+from src.config import STORE_FANOUT_LEVELS, USER_PROFILES_CODEC
 from src.orchestration.learning_profile import LearningProfile
 
 logger = get_logger(__name__)
 
+_READ_SECONDS = STORAGE_SECONDS.labels("user_profile", "read")
+_WRITE_SECONDS = STORAGE_SECONDS.labels("user_profile", "write")
+_READ_ERRORS = STORAGE_ERRORS.labels("user_profile", "read")
+
+# UserProfile file schema version (bump with an upgrade step when fields change meaning)
+PROFILE_SCHEMA = 1
+
 
 @dataclass
 class UserProgress:
@@ -52,6 +67,7 @@ class ScreeningMetrics:
     manipulation_score: int = 0  # 0-10
     self_harm_detected: bool = False
     emotional_storm_count: int = 0
+    last_emotional_storm: str = ""  # ISO timestamp
     last_check: str = ""  # ISO timestamp
 
 
@@ -71,6 +87,7 @@ class UserProfile:
     # Learning
     learning_profile: Dict[str, Any] = None  # LearningProfile.to_dict()
     progress: Dict[str, Any] = None  # UserProgress as dict
+    completed_quests: List[str] = None  # Quest IDs, in completion order
 
     # Current state
     current_location: Optional[str] = None
@@ -92,6 +109,9 @@ class UserProfile:
         if self.progress is None:
             self.progress = asdict(UserProgress())
 
+        if self.completed_quests is None:
+            self.completed_quests = []
+
         if self.screening is None:
             self.screening = asdict(ScreeningMetrics())
 
@@ -111,20 +131,42 @@ class UserManager:
     Error recovery and logging.
     """
 
-    def __init__(self, data_dir: Path = Path("src/data/user_profiles")):
+    def __init__(
+        self,
+        data_dir: Path = Path("src/data/user_profiles"),
+        fanout_levels: int = STORE_FANOUT_LEVELS,
+        codec: str = USER_PROFILES_CODEC
+    ):
         """
         Initialize user manager.
 
         Args:
             data_dir: Directory for user profile JSON files
+            fanout_levels: Hashed subdirectory levels (0: flat)
+            codec: File codec for writes ("json" or "msgpack"; reads detect it)
         """
         self.data_dir = data_dir
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.layout = StoreLayout(data_dir, fanout_levels)
+        self.serializer = RecordSerializer(UserProfile, codec, version=PROFILE_SCHEMA)
+
+        # Called after every profile write (keeps read models such as the parent dashboard current)
+        self._save_callback: Optional[Callable[[UserProfile], Awaitable[None]]] = None
+
         logger.info("user_manager_initialized", data_dir=str(data_dir))
 
+    def set_save_callback(self, callback: Callable[[UserProfile], Awaitable[None]]) -> None:
+        """
+        Set async callback(profile) invoked after a profile is saved.
+
+        Args:
+            callback: Async function receiving the saved UserProfile
+        """
+        self._save_callback = callback
+
     def _get_user_path(self, user_id: str) -> Path:
         """Get file path for user profile."""
-        return self.data_dir / f"{user_id}.json"
+        return self.layout.path(user_id)
 
     async def create_user(
         self,
@@ -182,16 +224,14 @@ class UserManager:
         try:
             # Read from disk
             async with asyncio.Lock():
-                with open(user_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-            # Convert to UserProfile
-            profile = UserProfile(**data)
+                with _READ_SECONDS.time():
+                    profile = self.serializer.read(user_path)
 
             logger.debug("user_loaded", user_id=user_id)
             return profile
 
         except Exception as e:
+            _READ_ERRORS.inc()
             logger.error("user_load_failed", user_id=user_id, error=str(e))
             return None
 
@@ -277,19 +317,23 @@ class UserManager:
 
         return profile
 
+    def iter_user_ids(self) -> Iterator[str]:
+        """
+        Stream user IDs from storage (lazy os.scandir, unsorted).
+
+        Yields:
+            User IDs
+        """
+        return self.layout.iter_ids()
+
     async def list_users(self) -> List[str]:
         """
-        List all user IDs.
+        List all user IDs (sorted; builds the full list - prefer iter_user_ids).
 
         Returns:
             List of user IDs
         """
-        user_ids = []
-
-        for path in self.data_dir.glob("*.json"):
-            user_ids.append(path.stem)
-
-        return sorted(user_ids)
+        return sorted(self.iter_user_ids())
 
     async def get_users_by_parent(self, parent_id: str) -> List[UserProfile]:
         """
@@ -303,7 +347,7 @@ class UserManager:
         """
         profiles = []
 
-        for user_id in await self.list_users():
+        for user_id in self.iter_user_ids():
             profile = await self.get_user(user_id)
             if profile and profile.parent_id == parent_id:
                 profiles.append(profile)
@@ -442,21 +486,18 @@ class UserManager:
         Args:
             profile: UserProfile to save
         """
-        user_path = self._get_user_path(profile.user_id)
-
-        # Convert to dict
-        data = asdict(profile)
+        user_path = self.layout.path_for_write(profile.user_id)
 
-        # Write to disk with atomic operation
+        # Write to disk with atomic operation (temp file + rename)
         async with asyncio.Lock():
-            # Write to temp file first
-            temp_path = user_path.with_suffix('.tmp')
+            with _WRITE_SECONDS.time():
+                self.serializer.write(user_path, profile)
 
-            with open(temp_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-
-            # Atomic rename
-            temp_path.replace(user_path)
+        if self._save_callback:
+            try:
+                await self._save_callback(profile)
+            except Exception as e:
+                logger.error("user_save_callback_failed", user_id=profile.user_id, error=str(e))
 
     async def get_statistics(self) -> Dict[str, Any]:
         """
@@ -465,14 +506,13 @@ class UserManager:
         Returns:
             Dictionary with statistics
         """
-        user_ids = await self.list_users()
-        total_users = len(user_ids)
-
+        total_users = 0
         linked_users = 0
         total_xp = 0
         total_quests = 0
 
-        for user_id in user_ids:
+        for user_id in self.iter_user_ids():
+            total_users += 1
             profile = await self.get_user(user_id)
             if profile:
                 if profile.parent_linked:
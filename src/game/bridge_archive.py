@@ -0,0 +1,243 @@
+"""
+Bridge Archive - append-only history of Reality Bridge lifecycle events.
+
+Bridge files ({user_id}.json) only hold the latest bridge of each user, so
+they cannot answer "how many bridges of this quest get completed?". Every
+lifecycle event (created, reminded, completed, expired) is also appended
+here, one JSON line per event.
+
+Events are partitioned by local day: archive/YYYY-MM-DD.jsonl.gz. Each
+flush appends one gzip member to the day's file (a file of concatenated
+members is a valid gzip stream), written with a single append so shard
+workers sharing the directory do not interleave. Files are never
+rewritten.
+
+Queries open only the partitions inside the requested date range, so
+their cost scales with the range, not with the total history.
+"""
+
+import gzip
+import json
+import asyncio
+import os
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.core.logger import get_logger
+from src.config import BRIDGE_ARCHIVE_FLUSH_EVENTS, BRIDGE_ARCHIVE_FLUSH_SECONDS
+
+logger = get_logger(__name__)
+
+EVENTS = ("created", "reminded", "completed", "expired")
+GROUP_BY = ("quest_id", "bridge_id", "location")
+
+
+def partition_name(day: date) -> str:
+    """File name of a day's partition."""
+    return f"{day.isoformat()}.jsonl.gz"
+
+
+class BridgeArchive:
+    """Append-only, day-partitioned, gzip-compressed bridge event log."""
+
+    def __init__(
+        self,
+        path: Path,
+        flush_events: int = BRIDGE_ARCHIVE_FLUSH_EVENTS,
+        flush_seconds: float = BRIDGE_ARCHIVE_FLUSH_SECONDS
+    ):
+        """
+        Initialize archive.
+
+        Args:
+            path: Archive directory
+            flush_events: Buffered events that trigger a flush
+            flush_seconds: Max time an event stays buffered
+        """
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.flush_events = flush_events
+        self.flush_seconds = flush_seconds
+
+        # Buffered lines by partition day
+        self._buffer: Dict[date, List[str]] = defaultdict(list)
+        self._buffered = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.events_written = 0
+        self.partitions_scanned = 0
+
+    def append(self, event: str, bridge: Any, ts: Optional[float] = None) -> None:
+        """
+        Buffer a lifecycle event (flushed in the background).
+
+        Args:
+            event: One of EVENTS
+            bridge: ActiveBridge the event belongs to
+            ts: Event time, epoch seconds (default: now)
+        """
+        ts = ts if ts is not None else time.time()
+        record = {
+            "ts": round(ts, 3),
+            "event": event,
+            "user_id": bridge.user_id,
+            "quest_id": bridge.quest_id,
+            "bridge_id": bridge.bridge_id,
+            "location": bridge.location,
+            "key": bridge.reminder_key
+        }
+        self._buffer[datetime.fromtimestamp(ts).date()].append(
+            json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        )
+        self._buffered += 1
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Flush when the buffer is full, otherwise within flush_seconds."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_sync()
+            return
+
+        if self._buffered >= self.flush_events:
+            self._start_flush()
+        elif not self._flush_handle:
+            self._flush_handle = loop.call_later(self.flush_seconds, self._start_flush)
+
+    def _start_flush(self) -> None:
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task and not self._flush_task.done():
+            return
+        self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> None:
+        """Write buffered events off the event loop."""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._buffered:
+            buffer, self._buffer = self._buffer, defaultdict(list)
+            self._buffered = 0
+            await asyncio.to_thread(self._write, buffer)
+
+    def flush_sync(self) -> None:
+        """Write buffered events on the calling thread."""
+        buffer, self._buffer = self._buffer, defaultdict(list)
+        self._buffered = 0
+        self._write(buffer)
+
+    def _write(self, buffer: Dict[date, List[str]]) -> None:
+        for day, lines in buffer.items():
+            member = gzip.compress(("\n".join(lines) + "\n").encode("utf-8"))
+            partition = self.path / partition_name(day)
+            try:
+                # One write per member: concurrent appenders never interleave
+                fd = os.open(partition, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, member)
+                finally:
+                    os.close(fd)
+                self.events_written += len(lines)
+            except OSError as e:
+                logger.error("bridge_archive_write_failed", partition=partition.name, error=str(e))
+        logger.debug("bridge_archive_flushed", events=sum(len(lines) for lines in buffer.values()))
+
+    async def close(self) -> None:
+        """Flush remaining events."""
+        if self._flush_task:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
+
+    def partitions(self, start: date, end: date) -> List[Path]:
+        """Existing partition files for days start..end (inclusive)."""
+        days = (end - start).days + 1
+        paths = (self.path / partition_name(start + timedelta(days=offset)) for offset in range(days))
+        return [path for path in paths if path.exists()]
+
+    def iter_events(
+        self,
+        start: date,
+        end: date,
+        event: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate archived events of days start..end (inclusive).
+
+        Only flushed events are returned; call flush() first for the latest.
+
+        Args:
+            start: First day
+            end: Last day
+            event: Only this event type (default: all)
+
+        Yields:
+            Event dicts in write order
+        """
+        for partition in self.partitions(start, end):
+            self.partitions_scanned += 1
+            try:
+                with gzip.open(partition, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        # Cheap prefilter before parsing
+                        if event and f'"event":"{event}"' not in line:
+                            continue
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+            except (EOFError, OSError) as e:
+                # Truncated last member of an interrupted write
+                logger.warning("bridge_archive_partition_truncated", partition=partition.name, error=str(e))
+
+    def completion_rates(
+        self,
+        start: date,
+        end: date,
+        group_by: str = "quest_id"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Count lifecycle events per group and compute completion rates.
+
+        Rates are per events in the range: completed / created of bridges
+        created, completed or expired between start and end.
+
+        Args:
+            start: First day
+            end: Last day (inclusive)
+            group_by: "quest_id", "bridge_id" or "location"
+
+        Returns:
+            {group: {"created", "reminded", "completed", "expired", "completion_rate"}}
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by must be one of {GROUP_BY}")
+
+        counts: Dict[str, Dict[str, Any]] = defaultdict(lambda: dict.fromkeys(EVENTS, 0))
+        for record in self.iter_events(start, end):
+            counts[record.get(group_by) or "unknown"][record["event"]] += 1
+
+        for group in counts.values():
+            group["completion_rate"] = round(group["completed"] / group["created"], 4) if group["created"] else 0.0
+
+        return dict(counts)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get archive statistics.
+
+        Returns:
+            Dictionary with written/buffered events and partition count
+        """
+        return {
+            "events_written": self.events_written,
+            "events_buffered": self._buffered,
+            "partitions": sum(1 for _ in self.path.glob("*.jsonl.gz")),
+            "partitions_scanned": self.partitions_scanned
+        }
@@ -0,0 +1,334 @@
+"""
+Location Index - routing table compiled from locations_metadata.yaml.
+
+Every location declares a learning_focus (dimension), the emotional_states
+it serves, its modules and quests, and an unlock_condition. The index
+evaluates all of it once per load and stores a table
+
+    (emotion, weakest dimension, unlocked locations) -> LocationRoute
+
+so routing is one dict lookup plus evaluating the few unlock predicates.
+Locations are ranked by ROUTING_FOCUS_WEIGHT when their focus is the
+weakest dimension plus ROUTING_EMOTION_WEIGHT when they serve the emotion
+(half for "all"); ties follow navigation.unlock_order.
+
+The YAML is hot-reloaded: lookups check its mtime at most every
+LOCATION_INDEX_RELOAD_SECONDS and swap in a freshly compiled table. A file
+that fails to compile leaves the previous table in place.
+
+Emotions and dimensions are plain strings (EmotionalState /
+LearningDimension values) so orchestration modules can use the index
+without import cycles.
+"""
+
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+from src.core.logger import get_logger
+from src.config import (
+    LOCATIONS_DIR,
+    ROUTING_FOCUS_WEIGHT,
+    ROUTING_EMOTION_WEIGHT,
+    LOCATION_INDEX_RELOAD_SECONDS
+)
+
+logger = get_logger(__name__)
+
+DEFAULT_DIMENSION_VALUE = 5  # Profile value assumed when routing without a profile
+
+CONDITION_PATTERN = re.compile(r"^\s*(<=|>=|==|<|>)\s*(\d+)\s*$")
+COMPARISONS: Dict[str, Callable[[int, int], bool]] = {
+    "<=": lambda a, b: a <= b,
+    ">=": lambda a, b: a >= b,
+    "==": lambda a, b: a == b,
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b
+}
+
+# (dimension values, emotion, quests completed) -> unlocked
+UnlockPredicate = Callable[[Dict[str, int], Optional[str], int], bool]
+
+
+@dataclass(frozen=True)
+class LocationRoute:
+    """Routing result."""
+    locations: Tuple[str, ...]  # Unlocked locations, best first
+    quests: Tuple[str, ...]  # Quests of the best location (metadata order)
+    modules: Tuple[int, ...]  # Module numbers of the best location
+
+
+@dataclass(frozen=True)
+class LocationInfo:
+    """Compiled metadata of one location."""
+    id: str
+    name: str
+    emoji: str
+    learning_focus: Optional[str]
+    emotional_states: Tuple[str, ...]  # ("all",) serves every emotion
+    modules: Tuple[int, ...]
+    quests: Tuple[str, ...]
+    xp: int
+
+
+EMPTY_ROUTE = LocationRoute((), (), ())
+
+
+def _compile_comparison(expression: Any) -> Callable[[int], bool]:
+    """'>= 3' -> predicate."""
+    match = CONDITION_PATTERN.match(str(expression))
+    if not match:
+        raise ValueError(f"Bad unlock comparison: {expression!r}")
+    compare, bound = COMPARISONS[match.group(1)], int(match.group(2))
+    return lambda value: compare(value, bound)
+
+
+def _compile_unlock(condition: Any) -> Optional[UnlockPredicate]:
+    """unlock_condition -> predicate (None: always unlocked)."""
+    if condition in (None, "always"):
+        return None
+    if not isinstance(condition, dict):
+        raise ValueError(f"Bad unlock_condition: {condition!r}")
+
+    checks: List[UnlockPredicate] = []
+    for key, value in condition.items():
+        if key == "emotional_state":
+            emotions = frozenset(value if isinstance(value, list) else [value])
+            checks.append(lambda values, emotion, quests, emotions=emotions: emotion in emotions)
+        elif key == "learning_profile":
+            for dimension, expression in value.items():
+                check = _compile_comparison(expression)
+                checks.append(lambda values, emotion, quests, dimension=dimension, check=check:
+                              check(values.get(dimension, DEFAULT_DIMENSION_VALUE)))
+        elif key == "quest_completed":
+            check = _compile_comparison(value)
+            checks.append(lambda values, emotion, quests, check=check: check(quests))
+        else:
+            raise ValueError(f"Unknown unlock_condition key: {key}")
+
+    return lambda values, emotion, quests: all(check(values, emotion, quests) for check in checks)
+
+
+def _module_number(module: Any) -> Optional[int]:
+    match = re.match(r"module_(\d+)", str(module))
+    return int(match.group(1)) if match else None
+
+
+class LocationIndex:
+    """Compiled, hot-reloaded location routing table."""
+
+    def __init__(
+        self,
+        path: Path = LOCATIONS_DIR / "locations_metadata.yaml",
+        reload_seconds: float = LOCATION_INDEX_RELOAD_SECONDS
+    ):
+        """
+        Initialize index (compiles the YAML).
+
+        Args:
+            path: locations_metadata.yaml
+            reload_seconds: Min interval between mtime checks (0: check every lookup)
+        """
+        self.path = path
+        self.reload_seconds = reload_seconds
+
+        # Replaced as a whole on reload, so lookups never see a half-built table
+        self._compiled: Tuple[Dict[str, LocationInfo], List[Tuple[str, UnlockPredicate]],
+                              Dict[Tuple, LocationRoute], frozenset] = ({}, [], {}, frozenset())
+        self._mtime_ns: Optional[int] = None
+        self._next_check = 0.0
+
+        self.lookups = 0
+        self.reloads = 0
+        self.reload_errors = 0
+
+        self.reload()
+
+    # ------------------------------------------------------------------
+    # Compilation
+    # ------------------------------------------------------------------
+
+    def reload(self) -> bool:
+        """
+        Compile the YAML and swap in the new table.
+
+        Returns:
+            True if the table was replaced
+        """
+        self._next_check = time.monotonic() + self.reload_seconds
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f) or {}
+            compiled = self._compile(data)
+        except (OSError, yaml.YAMLError, ValueError, AttributeError, TypeError) as e:
+            self.reload_errors += 1
+            logger.error("location_index_compile_failed", path=str(self.path), error=str(e))
+            return False
+
+        self._compiled = compiled
+        self._mtime_ns = mtime_ns
+        self.reloads += 1
+        logger.info("location_index_compiled", locations=len(compiled[0]), routes=len(compiled[2]))
+        return True
+
+    def _compile(self, data: Dict[str, Any]):
+        """Build location infos, unlock predicates and the route table."""
+        raw = data.get("locations") or {}
+        xp = data.get("location_xp") or {}
+
+        locations: Dict[str, LocationInfo] = {}
+        always: List[str] = []
+        conditional: List[Tuple[str, UnlockPredicate]] = []
+        for location_id, meta in raw.items():
+            states = meta.get("emotional_states") or []
+            focus = meta.get("learning_focus")
+            locations[location_id] = LocationInfo(
+                id=location_id,
+                name=meta.get("name", location_id),
+                emoji=meta.get("emoji", ""),
+                learning_focus=None if focus in (None, "none") else focus,
+                emotional_states=("all",) if states == "all" else tuple(states),
+                modules=tuple(n for n in map(_module_number, meta.get("modules") or []) if n is not None),
+                quests=tuple(meta.get("quests") or []),
+                xp=int(xp.get(location_id, 0))
+            )
+            predicate = _compile_unlock(meta.get("unlock_condition", "always"))
+            if predicate is None:
+                always.append(location_id)
+            else:
+                conditional.append((location_id, predicate))
+
+        # Tie-break: navigation.unlock_order, then file order
+        unlock_order = (data.get("navigation") or {}).get("unlock_order") or []
+        order = {location_id: index for index, location_id in enumerate(unlock_order)}
+        position = {
+            location_id: (order.get(location_id, len(order)), index)
+            for index, location_id in enumerate(locations)
+        }
+
+        emotions = frozenset(
+            state for info in locations.values() for state in info.emotional_states if state != "all"
+        )
+        dimensions = {info.learning_focus for info in locations.values()} - {None}
+
+        routes: Dict[Tuple, LocationRoute] = {}
+        for mask in range(1 << len(conditional)):
+            unlocked = always + [conditional[bit][0] for bit in range(len(conditional)) if mask >> bit & 1]
+            for emotion in [None, *emotions]:
+                for weakest in [None, *dimensions]:
+                    routes[(emotion, weakest, mask)] = self._rank(
+                        locations, unlocked, emotion, weakest, position
+                    )
+
+        return locations, conditional, routes, emotions
+
+    @staticmethod
+    def _rank(
+        locations: Dict[str, LocationInfo],
+        unlocked: List[str],
+        emotion: Optional[str],
+        weakest: Optional[str],
+        position: Dict[str, Tuple[int, int]]
+    ) -> LocationRoute:
+        def score(location_id: str) -> float:
+            info = locations[location_id]
+            value = ROUTING_FOCUS_WEIGHT if weakest and info.learning_focus == weakest else 0.0
+            if emotion and emotion in info.emotional_states:
+                value += ROUTING_EMOTION_WEIGHT
+            elif info.emotional_states == ("all",):
+                value += ROUTING_EMOTION_WEIGHT / 2
+            return value
+
+        ranked = tuple(sorted(unlocked, key=lambda location_id: (-score(location_id), position[location_id])))
+        if not ranked:
+            return EMPTY_ROUTE
+        best = locations[ranked[0]]
+        return LocationRoute(ranked, best.quests, best.modules)
+
+    def _maybe_reload(self) -> None:
+        """Recompile if the YAML changed (mtime checked at most every reload_seconds)."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.reload_seconds
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns != self._mtime_ns:
+            self.reload()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def route(
+        self,
+        emotion: Optional[str] = None,
+        weakest: Optional[str] = None,
+        profile: Optional[Dict[str, int]] = None,
+        quests_completed: int = 0
+    ) -> LocationRoute:
+        """
+        Ranked unlocked locations for a child.
+
+        Args:
+            emotion: EmotionalState value (None: learning focus only)
+            weakest: Weakest LearningDimension value (None: emotion only)
+            profile: {dimension: value} for unlock conditions (default: 5 each)
+            quests_completed: Completed quests, for unlock conditions
+
+        Returns:
+            LocationRoute (empty if the metadata could not be loaded)
+        """
+        self._maybe_reload()
+        self.lookups += 1
+        _, conditional, routes, emotions = self._compiled
+
+        values = profile or {}
+        mask = 0
+        for bit, (_, predicate) in enumerate(conditional):
+            if predicate(values, emotion, quests_completed):
+                mask |= 1 << bit
+
+        key_emotion = emotion if emotion in emotions else None
+        return routes.get((key_emotion, weakest, mask)) or routes.get((key_emotion, None, mask), EMPTY_ROUTE)
+
+    def location(self, location_id: str) -> Optional[LocationInfo]:
+        """Compiled metadata of a location."""
+        self._maybe_reload()
+        return self._compiled[0].get(location_id)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+
+        Returns:
+            Dictionary with table size, lookups and reloads
+        """
+        locations, conditional, routes, _ = self._compiled
+        return {
+            "locations": len(locations),
+            "conditional_locations": len(conditional),
+            "routes": len(routes),
+            "lookups": self.lookups,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors
+        }
+
+
+_location_index: Optional[LocationIndex] = None
+
+
+def get_location_index() -> LocationIndex:
+    """Get the process-wide location index (compiled on first use)."""
+    global _location_index
+    if _location_index is None:
+        _location_index = LocationIndex()
+    return _location_index
@@ -21,9 +21,26 @@ from enum import Enum
 from datetime import datetime, timedelta
 
 from src.core.logger import get_logger
+from src.core.metrics import REGISTRY, CACHE_REQUESTS
+from src.core.profiler import register_state
 
 logger = get_logger(__name__)
 
+# Metrics
+QUEST_EVENTS = REGISTRY.counter(
+    "innerworld_quest_events_total", "Quest lifecycle events", ["event"]
+)
+QUEST_STEP_SECONDS = REGISTRY.histogram(
+    "innerworld_quest_step_seconds", "process_step_response latency"
+)
+
+_QUEST_STARTED = QUEST_EVENTS.labels("started")
+_QUEST_STEP = QUEST_EVENTS.labels("step")
+_QUEST_INVALID = QUEST_EVENTS.labels("invalid_response")
+_QUEST_COMPLETED = QUEST_EVENTS.labels("completed")
+_QUEST_HIT = CACHE_REQUESTS.labels("quest", "hit")
+_QUEST_MISS = CACHE_REQUESTS.labels("quest", "miss")
+
 
 class StepType(str, Enum):
     """Quest step types."""
@@ -131,6 +148,15 @@ class QuestEngine:
         self.quests: Dict[str, Quest] = {}
         self.quest_progress: Dict[str, QuestProgress] = {}  # user_id -> current quest progress
 
+        REGISTRY.register_callback(
+            "innerworld_quests_loaded", "Quests held in memory", lambda: len(self.quests)
+        )
+        REGISTRY.register_callback(
+            "innerworld_quest_progress_active", "In-progress quests held in memory",
+            lambda: len(self.quest_progress)
+        )
+        register_state("quest_progress", lambda: self.quest_progress)
+
         logger.info("quest_engine_initialized", quests_dir=str(quests_dir))
 
     async def load_quest(self, quest_file: Path) -> Optional[Quest]:
@@ -241,7 +267,9 @@ class QuestEngine:
 
     def get_quest(self, quest_id: str) -> Optional[Quest]:
         """Get quest by ID."""
-        return self.quests.get(quest_id)
+        quest = self.quests.get(quest_id)
+        (_QUEST_HIT if quest else _QUEST_MISS).inc()
+        return quest
 
     def get_quests_by_location(self, location: str) -> List[Quest]:
         """
@@ -312,6 +340,7 @@ class QuestEngine:
         )
 
         self.quest_progress[user_id] = progress
+        _QUEST_STARTED.inc()
 
         logger.info("quest_started",
                    user_id=user_id,
@@ -334,6 +363,15 @@ class QuestEngine:
         Returns:
             (success, next_step, feedback)
         """
+        with QUEST_STEP_SECONDS.time():
+            return self._process_step_response(user_id, response)
+
+    def _process_step_response(
+        self,
+        user_id: str,
+        response: Any
+    ) -> Tuple[bool, Optional[QuestStep], Optional[str]]:
+        """Process step response (see process_step_response)."""
         progress = self.quest_progress.get(user_id)
 
         if not progress:
@@ -349,11 +387,13 @@ class QuestEngine:
             return False, None, "Квест уже завершён"
 
         current_step = quest.steps[progress.current_step_index]
+        response = self._parse_choice(current_step, response)
 
         # Validate response
         is_valid, validation_message = self._validate_response(current_step, response)
 
         if not is_valid:
+            _QUEST_INVALID.inc()
             return False, current_step, validation_message
 
         # Calculate score (for choice/multiple_choice steps)
@@ -366,10 +406,12 @@ class QuestEngine:
 
         # Move to next step
         progress.current_step_index += 1
+        _QUEST_STEP.inc()
 
         # Check if quest is complete
         if progress.current_step_index >= len(quest.steps):
             progress.completed_at = datetime.now()
+            _QUEST_COMPLETED.inc()
 
             logger.info("quest_completed",
                        user_id=user_id,
@@ -386,6 +428,31 @@ class QuestEngine:
 
         return True, next_step, feedback
 
+    def _parse_choice(self, step: QuestStep, response: Any) -> Any:
+        """
+        Map a typed answer to a choice step onto its option index.
+
+        Accepts the option number ("2") or the option text; anything else is
+        returned unchanged (and rejected by validation).
+
+        Args:
+            step: Quest step
+            response: User response
+
+        Returns:
+            Option index, or the response as given
+        """
+        if step.type not in [StepType.CHOICE, StepType.MULTIPLE_CHOICE] or not isinstance(response, str):
+            return response
+
+        answer = response.strip().lower()
+        if answer.isdigit():
+            return int(answer) - 1
+        for index, option in enumerate(step.options):
+            if option.get('text', '').strip().lower() == answer:
+                return index
+        return response
+
     def _validate_response(self, step: QuestStep, response: Any) -> Tuple[bool, str]:
         """
         Validate user response against step validation rules.
@@ -0,0 +1,419 @@
+"""
+Quest Recommender - nearest-neighbour quest retrieval over profile vectors.
+
+Quests and children are embedded in one vector space:
+
+- quest: what it trains - target_learning_profile levels (high/medium/low)
+  plus rewards.learning_profile_changes, per dimension, followed by a
+  one-hot of the quest's location
+- child: what they need - per-dimension deficit (10 - value), followed by
+  the location EmotionalRouter suggests for their emotional state
+
+Both halves are L2-normalized, so a child's scores for all quests are one
+matrix-vector product with the quest index: cosine of learning needs vs.
+quest effect, plus emotion_weight when the quest is in the emotion's
+location. The index is built once after quests load; top-k is taken with
+argpartition after completed quests are masked out.
+
+Batch mode (precompute) streams stored profiles of active children in
+chunks, scores each chunk with one matrix product and stores the top-k
+per child in SQLite, so reports can read recommendations of children
+who are not online. Run it nightly:
+
+    python -m src.game.quest_recommender --precompute
+"""
+
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.logger import get_logger
+from src.core.serialization import read_record
+from src.core.store_layout import StoreLayout
+from src.config import (
+    EDUCATIONAL_LOCATIONS,
+    USER_PROFILES_DIR,
+    RECOMMENDER_TOP_K,
+    RECOMMENDER_EMOTION_WEIGHT,
+    RECOMMENDER_REWARD_WEIGHT,
+    RECOMMENDER_ACTIVE_DAYS,
+    RECOMMENDER_CHUNK_SIZE,
+    STORE_FANOUT_LEVELS
+)
+from src.orchestration.emotional_router import EmotionalRouter, EmotionalState
+from src.orchestration.learning_profile import LearningProfile, DIMENSIONS
+
+logger = get_logger(__name__)
+
+LEVEL_WEIGHTS = {"high": 1.0, "medium": 0.5, "low": 0.0}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recommendations (
+    user_id TEXT PRIMARY KEY,
+    quests TEXT NOT NULL,
+    computed_at REAL NOT NULL
+);
+"""
+
+
+@dataclass
+class QuestRecommendation:
+    """A recommended quest."""
+    quest_id: str
+    location: str
+    score: float  # Cosine similarity, higher is better
+
+
+def _normalize(rows: np.ndarray) -> np.ndarray:
+    """L2-normalize rows (zero rows stay zero)."""
+    norms = np.linalg.norm(rows, axis=-1, keepdims=True)
+    return np.divide(rows, norms, out=np.zeros_like(rows), where=norms > 0)
+
+
+class QuestRecommender:
+    """Precomputed quest index with top-k retrieval for children."""
+
+    def __init__(
+        self,
+        quest_engine: Any,
+        store_path: Path = Path("src/data/recommendations/recommendations.db"),
+        top_k: int = RECOMMENDER_TOP_K,
+        emotion_weight: float = RECOMMENDER_EMOTION_WEIGHT,
+        reward_weight: float = RECOMMENDER_REWARD_WEIGHT
+    ):
+        """
+        Initialize recommender (call build_index() after quests load).
+
+        Args:
+            quest_engine: QuestEngine with loaded quests
+            store_path: SQLite file for precomputed recommendations
+            top_k: Recommendations per child
+            emotion_weight: Weight of the emotion's location vs. learning needs
+            reward_weight: Weight of reward changes vs. target_learning_profile
+        """
+        self.quest_engine = quest_engine
+        self.store_path = store_path
+        self.top_k = top_k
+        self.emotion_weight = emotion_weight
+        self.reward_weight = reward_weight
+
+        self.locations: List[str] = list(EDUCATIONAL_LOCATIONS)
+        self.quest_ids: List[str] = []
+        self.quest_locations: List[str] = []
+        self._quest_row: Dict[str, int] = {}
+        self._index = np.zeros((0, len(DIMENSIONS) + len(self.locations)))
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.queries = 0
+        self.users_precomputed = 0
+        self.last_precompute: Optional[Dict[str, Any]] = None
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def build_index(self) -> int:
+        """
+        Embed all loaded quests into the index matrix.
+
+        Returns:
+            Number of quests indexed
+        """
+        quests = sorted(self.quest_engine.quests.values(), key=lambda quest: quest.id)
+        for quest in quests:
+            if quest.location not in self.locations:
+                self.locations.append(quest.location)
+
+        index = np.zeros((len(quests), len(DIMENSIONS) + len(self.locations)))
+        for row, quest in enumerate(quests):
+            index[row, :len(DIMENSIONS)] = self._quest_effect(quest)
+            index[row, len(DIMENSIONS) + self.locations.index(quest.location)] = 1.0
+
+        self.quest_ids = [quest.id for quest in quests]
+        self.quest_locations = [quest.location for quest in quests]
+        self._quest_row = {quest_id: row for row, quest_id in enumerate(self.quest_ids)}
+        self._index = index
+
+        logger.info("quest_index_built", quests=len(quests), dimensions=index.shape[1])
+        return len(quests)
+
+    def _quest_effect(self, quest: Any) -> np.ndarray:
+        """Unit vector of what a quest trains, per learning dimension."""
+        target = np.array([
+            LEVEL_WEIGHTS.get(str(quest.target_learning_profile.get(dimension.value, "low")).lower(), 0.0)
+            for dimension in DIMENSIONS
+        ])
+
+        changes = quest.rewards.learning_profile_changes if quest.rewards else {}
+        rewards = np.array([float(changes.get(dimension.value, 0)) for dimension in DIMENSIONS])
+        if np.abs(rewards).max() > 0:
+            rewards /= np.abs(rewards).max()
+
+        return _normalize(_normalize(target) + self.reward_weight * rewards)
+
+    def child_vectors(
+        self,
+        values: np.ndarray,
+        emotions: Optional[Sequence[Optional[EmotionalState]]] = None
+    ) -> np.ndarray:
+        """
+        Embed children.
+
+        Args:
+            values: (children, dimensions) learning profile values 1-10
+            emotions: Emotional state per child (None: learning needs only)
+
+        Returns:
+            (children, index dimensions) query matrix
+        """
+        values = np.atleast_2d(np.asarray(values, dtype=float))
+        queries = np.zeros((len(values), self._index.shape[1]))
+        queries[:, :len(DIMENSIONS)] = _normalize(np.clip(10.0 - values, 0.0, 9.0))
+
+        for row, emotion in enumerate(emotions or ()):
+            location = EmotionalRouter.EMOTION_TO_LOCATION.get(emotion) if emotion else None
+            if location in self.locations:
+                queries[row, len(DIMENSIONS) + self.locations.index(location)] = self.emotion_weight
+
+        return queries
+
+    # ------------------------------------------------------------------
+    # Retrieval
+    # ------------------------------------------------------------------
+
+    def top_k_many(
+        self,
+        queries: np.ndarray,
+        completed: Optional[Sequence[Iterable[str]]] = None,
+        k: Optional[int] = None
+    ) -> List[List[QuestRecommendation]]:
+        """
+        Top-k quests for each query row.
+
+        Args:
+            queries: Matrix from child_vectors()
+            completed: Completed quest IDs per row (excluded)
+            k: Results per row (default: top_k)
+
+        Returns:
+            Recommendations per row, best first
+        """
+        k = min(k or self.top_k, len(self.quest_ids))
+        if k == 0:
+            return [[] for _ in range(len(queries))]
+
+        scores = queries @ self._index.T
+        for row, quest_ids in enumerate(completed or ()):
+            columns = [self._quest_row[quest_id] for quest_id in quest_ids if quest_id in self._quest_row]
+            scores[row, columns] = -np.inf
+
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.take_along_axis(top, np.argsort(-top_scores, axis=1, kind="stable"), axis=1)
+
+        return [
+            [
+                QuestRecommendation(self.quest_ids[column], self.quest_locations[column], round(float(score), 4))
+                for column, score in zip(columns, scores[row, columns])
+                if np.isfinite(score)
+            ]
+            for row, columns in enumerate(order)
+        ]
+
+    def recommend(
+        self,
+        learning_profile: LearningProfile,
+        emotion: Optional[EmotionalState] = None,
+        completed: Iterable[str] = (),
+        k: Optional[int] = None
+    ) -> List[QuestRecommendation]:
+        """
+        Recommend quests for one child.
+
+        Args:
+            learning_profile: Child's learning profile
+            emotion: Current emotional state
+            completed: Quest IDs to exclude
+            k: Number of quests (default: top_k)
+
+        Returns:
+            Recommendations, best first (empty if every quest is completed)
+        """
+        self.queries += 1
+        values = [[learning_profile.get_dimension(dimension) for dimension in DIMENSIONS]]
+        return self.top_k_many(self.child_vectors(values, [emotion]), [list(completed)], k)[0]
+
+    # ------------------------------------------------------------------
+    # Batch mode
+    # ------------------------------------------------------------------
+
+    def _store(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.store_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.store_path), timeout=10.0, check_same_thread=False,
+                                         isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _iter_active(
+        self,
+        layout: StoreLayout,
+        since: str,
+        chunk_size: int
+    ) -> Iterator[List[Tuple[str, List[int], List[str]]]]:
+        """Stream (user_id, values, completed) of children active since an ISO time."""
+        batch: List[Tuple[str, List[int], List[str]]] = []
+        for entry in layout.iter_entries():
+            try:
+                profile = read_record(entry.path)
+            except (OSError, ValueError) as e:
+                logger.warning("recommender_profile_skipped", path=entry.name, error=str(e))
+                continue
+
+            if profile.get("last_activity", "") < since:
+                continue
+
+            learning = profile.get("learning_profile") or {}
+            values = [int(learning.get(dimension.value, 5)) for dimension in DIMENSIONS]
+            batch.append((str(profile["user_id"]), values, profile.get("completed_quests") or []))
+            if len(batch) >= chunk_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    def precompute(
+        self,
+        data_dir: Path = USER_PROFILES_DIR,
+        active_days: int = RECOMMENDER_ACTIVE_DAYS,
+        chunk_size: int = RECOMMENDER_CHUNK_SIZE,
+        fanout_levels: int = STORE_FANOUT_LEVELS
+    ) -> int:
+        """
+        Precompute top-k for every active child and store them (blocking).
+
+        Emotional state is not stored with profiles, so batch scores use
+        learning needs only; recommend() adds the live emotion.
+
+        Args:
+            data_dir: Directory of UserProfile JSON files
+            active_days: Only children active within this many days
+            chunk_size: Profiles scored with one matrix product
+            fanout_levels: Profile file layout (0: flat)
+
+        Returns:
+            Number of children stored
+        """
+        started = time.perf_counter()
+        since = (datetime.now() - timedelta(days=active_days)).isoformat()
+        computed_at = time.time()
+        users = 0
+
+        for batch in self._iter_active(StoreLayout(data_dir, fanout_levels), since, chunk_size):
+            queries = self.child_vectors(np.array([values for _, values, _ in batch]))
+            results = self.top_k_many(queries, [completed for _, _, completed in batch])
+            rows = [
+                (user_id, json.dumps([[r.quest_id, r.location, r.score] for r in recommendations]), computed_at)
+                for (user_id, _, _), recommendations in zip(batch, results)
+            ]
+            with self._lock:
+                conn = self._store()
+                conn.execute("BEGIN")
+                conn.executemany(
+                    "INSERT OR REPLACE INTO recommendations (user_id, quests, computed_at) VALUES (?, ?, ?)", rows
+                )
+                conn.execute("COMMIT")
+            users += len(rows)
+
+        self.users_precomputed += users
+        self.last_precompute = {
+            "users": users,
+            "seconds": round(time.perf_counter() - started, 3),
+            "computed_at": datetime.fromtimestamp(computed_at).isoformat()
+        }
+        logger.info("recommendations_precomputed", **self.last_precompute)
+        return users
+
+    def get_precomputed(self, user_id: str) -> Optional[List[QuestRecommendation]]:
+        """
+        Read a child's stored recommendations (blocking).
+
+        Returns:
+            Recommendations from the last precompute, or None if not stored
+        """
+        with self._lock:
+            row = self._store().execute(
+                "SELECT quests FROM recommendations WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return [QuestRecommendation(quest_id, location, score) for quest_id, location, score in json.loads(row[0])]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get recommender statistics.
+
+        Returns:
+            Dictionary with index size, queries and last precompute
+        """
+        return {
+            "quests_indexed": len(self.quest_ids),
+            "dimensions": int(self._index.shape[1]),
+            "queries": self.queries,
+            "users_precomputed": self.users_precomputed,
+            "last_precompute": self.last_precompute
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point (nightly batch)."""
+    import asyncio
+    from src.game.quest_engine import QuestEngine
+
+    parser = argparse.ArgumentParser(description="Quest recommendations for InnerWorld Edu children")
+    parser.add_argument("--precompute", action="store_true", help="Store top-k for all active children")
+    parser.add_argument("--user", help="Print stored recommendations of a child")
+    parser.add_argument("--data-dir", type=Path, default=USER_PROFILES_DIR)
+    parser.add_argument("--active-days", type=int, default=RECOMMENDER_ACTIVE_DAYS)
+    args = parser.parse_args(argv)
+
+    quest_engine = QuestEngine()
+    asyncio.run(quest_engine.load_all_quests())
+    recommender = QuestRecommender(quest_engine)
+    recommender.build_index()
+
+    try:
+        if args.precompute:
+            recommender.precompute(args.data_dir, args.active_days)
+            print(json.dumps(recommender.get_statistics(), ensure_ascii=False, indent=2))
+        if args.user:
+            recommendations = recommender.get_precomputed(args.user) or []
+            print(json.dumps([r.__dict__ for r in recommendations], ensure_ascii=False, indent=2))
+    finally:
+        recommender.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,23 +2,97 @@
 Reality Bridge Manager - Manages micro-action reminders.
 
 Handles scheduling, tracking, and reminders for Reality Bridge actions.
-Uses APScheduler for reminder delivery and JSON for persistence.
+Bridges are persisted one file per user (placed by StoreLayout, encoded by
+RecordSerializer); reminders are queued in a SQLite
+ReminderStore (see reminder_store.py).
+
+Deadlines are kept in a min-heap of epoch floats. Completed or replaced
+bridges are not removed from the heap; their entries are skipped when they
+reach the top (lazy deletion). A timer armed for the earliest deadline
+runs check_deadlines exactly when it is due.
+
+Reminders work the same way, but only jobs due within REMINDER_PAGE_SECONDS
+are paged into memory; a timer pages in the next window as time advances.
+A reminder is marked done in the store only after the callback succeeded
+(at-least-once); failed deliveries are retried with backoff.
+
+Reminders due within the same tick are delivered as one batch: a single
+fan-out through the batch callback (OutboundSender.submit_batch in
+StateManager), then one bulk write of the reminded flags and one store
+transaction for the whole batch.
+
+Lifecycle events (created, reminded, completed, expired) are also appended
+to a BridgeArchive (see bridge_archive.py) for completion-rate analytics.
 """
 
-import json
+import heapq
+import itertools
 import asyncio
+import time
+from collections import deque
 from pathlib import Path
-from typing import Optional, Dict, Any, Callable, Awaitable, List
-from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict, field
-
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.date import DateTrigger
+from typing import Optional, Dict, Any, Callable, Awaitable, List, Tuple, Deque
+from datetime import date, datetime, timedelta
+from dataclasses import dataclass, field
 
 from src.core.logger import get_logger
+from src.core.metrics import REGISTRY, STORAGE_SECONDS, STORAGE_ERRORS
+from src.core.profiler import register_state
+from src.core.serialization import RecordSerializer
+from src.core.store_layout import StoreLayout
+from src.game.reminder_store import ReminderStore, ReminderJob, reminder_key
+from src.game.bridge_archive import BridgeArchive
+from src.config import (
+    REMINDER_PAGE_SECONDS,
+    REMINDER_PAGE_LIMIT,
+    REMINDER_MAX_ATTEMPTS,
+    REMINDER_RETRY_SECONDS,
+    REMINDER_RETENTION_DAYS,
+    REMINDER_BATCH_SIZE,
+    REMINDER_TICK_SECONDS,
+    REMINDER_FANOUT_CONCURRENCY,
+    STORE_FANOUT_LEVELS,
+    REALITY_BRIDGES_CODEC
+)
 
 logger = get_logger(__name__)
 
+# Metrics
+BRIDGE_EVENTS = REGISTRY.counter(
+    "innerworld_bridge_events_total", "Reality Bridge lifecycle events", ["event"]
+)
+REMINDER_DELAY_SECONDS = REGISTRY.histogram(
+    "innerworld_reminder_delay_seconds", "Reminder delivery delay past its scheduled time",
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+)
+REMINDER_BATCH_SIZE_HIST = REGISTRY.histogram(
+    "innerworld_reminder_batch_size", "Reminders delivered per batch",
+    buckets=(1, 10, 50, 100, 500, 1000, 5000)
+)
+REMINDER_BATCH_SECONDS = REGISTRY.histogram(
+    "innerworld_reminder_batch_seconds", "Reminder batch fan-out and persist time",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0)
+)
+
+# Number of reminder lag samples kept for percentile stats
+LAG_SAMPLES = 1000
+
+# Batch callback: bridges -> one error (or None) per bridge
+ReminderBatchCallback = Callable[[List["ActiveBridge"]], Awaitable[List[Optional[BaseException]]]]
+
+_BRIDGE_WRITE_SECONDS = STORAGE_SECONDS.labels("bridge", "write")
+
+# ActiveBridge file schema version (see src/core/serialization.py)
+BRIDGE_SCHEMA = 1
+
+# Heap is rebuilt when stale entries outnumber live bridges by this factor
+HEAP_COMPACT_FACTOR = 2
+
+
+def _epoch(iso_timestamp: str) -> float:
+    """Epoch seconds of a naive local ISO timestamp (0.0 if empty)."""
+    return datetime.fromisoformat(iso_timestamp).timestamp() if iso_timestamp else 0.0
+
 
 @dataclass
 class ActiveBridge:
@@ -37,60 +111,151 @@ class ActiveBridge:
     # Status
     completed: bool = False
     reminded: bool = False
+    expired: bool = False  # Expiry archived (not again after a restart)
     verification_response: Optional[str] = None
     completed_at: Optional[str] = None
 
+    # Location the quest was played in (for analytics)
+    location: Optional[str] = None
+
+    # Epoch seconds of deadline_at / reminder_at (stored, so loading skips ISO parsing)
+    deadline_ts: float = 0.0
+    reminder_ts: float = 0.0
+
+    def __post_init__(self):
+        # Files written before epoch fields existed
+        if not self.deadline_ts:
+            self.deadline_ts = _epoch(self.deadline_at)
+        if not self.reminder_ts:
+            self.reminder_ts = _epoch(self.reminder_at)
+
+    @property
+    def reminder_key(self) -> str:
+        """Idempotency key of this bridge's reminder."""
+        return reminder_key(self.user_id, self.bridge_id, self.created_at)
+
 
 class RealityBridgeManager:
     """Manages Reality Bridge micro-actions and reminders."""
 
-    def __init__(self, storage_path: Optional[Path] = None):
+    def __init__(
+        self,
+        storage_path: Optional[Path] = None,
+        owner_filter: Optional[Callable[[str], bool]] = None,
+        fanout_levels: int = STORE_FANOUT_LEVELS,
+        codec: str = REALITY_BRIDGES_CODEC
+    ):
         """
         Initialize Reality Bridge Manager.
 
         Args:
             storage_path: Path to store active bridges (default: src/data/reality_bridges/)
+            owner_filter: Predicate(user_id) selecting users whose reminders this
+                process owns (default: all users). Used by the sharded runtime so
+                that each reminder is scheduled by exactly one worker.
+            fanout_levels: Hashed subdirectory levels for bridge files (0: flat)
+            codec: Bridge file codec for writes ("json" or "msgpack"; reads detect it)
         """
         self.storage_path = storage_path or Path("src/data/reality_bridges")
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.layout = StoreLayout(self.storage_path, fanout_levels)
+        self.serializer = RecordSerializer(ActiveBridge, codec, version=BRIDGE_SCHEMA)
+        self.owner_filter = owner_filter
 
         # Active bridges by user_id
         self.active_bridges: Dict[str, ActiveBridge] = {}
 
-        # Scheduler for reminders
-        self.scheduler = AsyncIOScheduler()
+        # Durable reminder queue (shared by shard workers, filtered by owner)
+        self.reminder_store = ReminderStore(self.storage_path / "reminders.db", owner_filter)
 
-        # Callback for sending reminders (will be set by StateManager/Bot)
+        # Append-only lifecycle history (bridge files only keep the latest bridge)
+        self.archive = BridgeArchive(self.storage_path / "archive")
+
+        # Callback for sending reminders (will be set by StateManager/Bot);
+        # the batch callback, if set, is used instead
         self.reminder_callback: Optional[Callable[[str, ActiveBridge], Awaitable[None]]] = None
+        self.reminder_batch_callback: Optional[ReminderBatchCallback] = None
+
+        # Callback for expired bridges (optional)
+        self.expiry_callback: Optional[Callable[[ActiveBridge], Awaitable[None]]] = None
+
+        # Deadline min-heap: (deadline_ts, seq, bridge); seq breaks ties
+        self._deadline_heap: List[Tuple[float, int, ActiveBridge]] = []
+        self._heap_seq = itertools.count()
+        self._sweep_handle: Optional[asyncio.TimerHandle] = None
+        self._sweep_at = 0.0
+        self._sweep_task: Optional[asyncio.Task] = None
+
+        # Reminders due before _paged_until, paged in from the store
+        self._reminder_heap: List[Tuple[float, str]] = []
+        self._paged_jobs: Dict[str, ReminderJob] = {}
+        self._paged_until = 0.0
+        self._reminder_handle: Optional[asyncio.TimerHandle] = None
+        self._reminder_at = 0.0
+        self._reminder_task: Optional[asyncio.Task] = None
+
+        # Reminder delivery stats
+        self.reminders_sent = 0
+        self.reminders_failed = 0
+        self.reminder_batches = 0
+        self.last_batch: Dict[str, Any] = {}
+        self.reminder_lag: Deque[float] = deque(maxlen=LAG_SAMPLES)
 
         self.initialized = False
 
     async def initialize(self) -> None:
-        """Initialize scheduler and load active bridges."""
+        """Load active bridges and start deadline and reminder timers."""
         try:
             # Load active bridges from storage
             await self._load_active_bridges()
+            await self._enqueue_unreminded(self.active_bridges.values())
+            purged = await asyncio.to_thread(
+                self.reminder_store.purge, time.time() - REMINDER_RETENTION_DAYS * 86400
+            )
 
-            # Start scheduler
-            self.scheduler.start()
+            self._register_metrics()
             logger.info("reality_bridge_manager_initialized",
-                       active_bridges=len(self.active_bridges))
-
-            # Reschedule existing reminders
-            await self._reschedule_reminders()
+                       active_bridges=len(self.active_bridges),
+                       reminders_purged=purged)
 
             self.initialized = True
+            self._arm_sweeper()
+            self._arm_reminders()
 
         except Exception as e:
             logger.error("reality_bridge_manager_init_failed", error=str(e))
             raise
 
     async def shutdown(self) -> None:
-        """Shutdown scheduler gracefully."""
-        if self.scheduler.running:
-            self.scheduler.shutdown()
+        """Stop timers and close the reminder store."""
+        was_initialized, self.initialized = self.initialized, False
+        for handle in (self._sweep_handle, self._reminder_handle):
+            if handle:
+                handle.cancel()
+        self._sweep_handle = self._reminder_handle = None
+        if self._reminder_task:
+            await asyncio.gather(self._reminder_task, return_exceptions=True)
+        self.reminder_store.close()
+        await self.archive.close()
+        if was_initialized:
             logger.info("reality_bridge_manager_shutdown")
 
+    def _register_metrics(self) -> None:
+        """Expose bridge and scheduler sizes (read at scrape time / by the profiler)."""
+        REGISTRY.register_callback(
+            "innerworld_bridges_active", "Active Reality Bridges held in memory",
+            lambda: len(self.active_bridges)
+        )
+        REGISTRY.register_callback(
+            "innerworld_scheduler_jobs", "Reminder jobs paged into memory",
+            lambda: len(self._paged_jobs)
+        )
+        REGISTRY.register_callback(
+            "innerworld_reminders_stored", "Reminder jobs in the durable store by state",
+            self.reminder_store.count_by_state, labelnames=["state"]
+        )
+        register_state("active_bridges", lambda: self.active_bridges)
+
     def set_reminder_callback(
         self,
         callback: Callable[[str, ActiveBridge], Awaitable[None]]
@@ -103,6 +268,30 @@ class RealityBridgeManager:
         """
         self.reminder_callback = callback
         logger.info("reminder_callback_set")
+        self._arm_reminders()
+
+    def set_reminder_batch_callback(self, callback: ReminderBatchCallback) -> None:
+        """
+        Set callback delivering a batch of reminders in one fan-out.
+
+        Args:
+            callback: Async function(bridges) returning one error (or None) per bridge
+        """
+        self.reminder_batch_callback = callback
+        logger.info("reminder_batch_callback_set")
+        self._arm_reminders()
+
+    def set_expiry_callback(
+        self,
+        callback: Callable[[ActiveBridge], Awaitable[None]]
+    ) -> None:
+        """
+        Set callback for expired bridges (called by the deadline sweeper).
+
+        Args:
+            callback: Async function(bridge) called once per expired bridge
+        """
+        self.expiry_callback = callback
 
     async def create_bridge(
         self,
@@ -111,8 +300,9 @@ class RealityBridgeManager:
         bridge_id: str,
         title: str,
         description: str,
-        deadline_hours: int = 48,
-        reminder_hours: int = 24
+        deadline_hours: float = 48,
+        reminder_hours: float = 24,
+        location: Optional[str] = None
     ) -> ActiveBridge:
         """
         Create new Reality Bridge for user.
@@ -125,6 +315,7 @@ class RealityBridgeManager:
             description: Bridge description
             deadline_hours: Hours until deadline
             reminder_hours: Hours until reminder
+            location: Location the quest was played in
 
         Returns:
             ActiveBridge
@@ -142,15 +333,21 @@ class RealityBridgeManager:
             description=description,
             created_at=now.isoformat(),
             deadline_at=deadline.isoformat(),
-            reminder_at=reminder.isoformat()
+            reminder_at=reminder.isoformat(),
+            location=location,
+            deadline_ts=deadline.timestamp(),
+            reminder_ts=reminder.timestamp()
         )
 
         # Store in memory and disk
         self.active_bridges[user_id] = bridge
+        self._index_deadline(bridge)
         await self._save_bridge(bridge)
 
-        # Schedule reminder
-        await self._schedule_reminder(bridge)
+        # Schedule reminder (replaces the reminder of a previous bridge)
+        await self._schedule_reminder(bridge, replace=True)
+        BRIDGE_EVENTS.labels("created").inc()
+        self.archive.append("created", bridge, now.timestamp())
 
         logger.info("reality_bridge_created",
                    user_id=user_id,
@@ -191,7 +388,9 @@ class RealityBridgeManager:
 
         # Cancel reminder if not sent yet
         if not bridge.reminded:
-            self._cancel_reminder(user_id)
+            await self._cancel_reminder(user_id)
+        BRIDGE_EVENTS.labels("completed").inc()
+        self.archive.append("completed", bridge)
 
         logger.info("reality_bridge_completed",
                    user_id=user_id,
@@ -199,143 +398,470 @@ class RealityBridgeManager:
 
         return True
 
+    async def apply_ownership(self, owner_filter: Optional[Callable[[str], bool]]) -> None:
+        """
+        Switch to a new reminder ownership predicate.
+
+        Bridges of users that are no longer owned are dropped from memory and
+        their reminders cancelled; bridges of newly owned users are loaded
+        from storage and their reminders scheduled.
+
+        Args:
+            owner_filter: Predicate(user_id), or None to own every user
+        """
+        self.owner_filter = owner_filter
+        self.reminder_store.owner_filter = owner_filter
+
+        released = [
+            user_id for user_id in self.active_bridges
+            if not self._owns(user_id)
+        ]
+        for user_id in released:
+            del self.active_bridges[user_id]
+
+        known = set(self.active_bridges)
+        await self._load_active_bridges()
+        await self._enqueue_unreminded(
+            bridge for user_id, bridge in self.active_bridges.items() if user_id not in known
+        )
+
+        # Page the new owner set in from scratch
+        self._reminder_heap.clear()
+        self._paged_jobs.clear()
+        self._paged_until = 0.0
+        self._arm_reminders(force=True)
+
+        logger.info("reminder_ownership_applied",
+                   released=len(released),
+                   active_bridges=len(self.active_bridges))
+
+    def _owns(self, user_id: str) -> bool:
+        """Check if this process owns reminders for user."""
+        return self.owner_filter is None or self.owner_filter(user_id)
+
     async def get_active_bridge(self, user_id: str) -> Optional[ActiveBridge]:
         """Get active Reality Bridge for user."""
         return self.active_bridges.get(user_id)
 
     async def check_deadlines(self) -> List[ActiveBridge]:
         """
-        Check for expired Reality Bridges.
+        Pop expired Reality Bridges off the deadline heap.
+
+        Costs O(k log n) for k expired bridges; each expired bridge is
+        returned once and evicted from active_bridges (its reminder, if
+        still pending, is then skipped as stale).
 
         Returns:
             List of expired bridges
         """
-        now = datetime.now()
+        now = time.time()
         expired = []
+        heap = self._deadline_heap
 
-        for bridge in self.active_bridges.values():
-            if bridge.completed:
+        while heap and heap[0][0] < now:
+            _, _, bridge = heapq.heappop(heap)
+            if not self._is_live(bridge):
                 continue
 
-            deadline = datetime.fromisoformat(bridge.deadline_at)
-            if now > deadline:
-                expired.append(bridge)
-                logger.warning("reality_bridge_expired",
-                             user_id=bridge.user_id,
-                             bridge_id=bridge.bridge_id)
+            bridge.expired = True
+            del self.active_bridges[bridge.user_id]
+            expired.append(bridge)
+            BRIDGE_EVENTS.labels("expired").inc()
+            self.archive.append("expired", bridge, bridge.deadline_ts)
+            logger.warning("reality_bridge_expired",
+                         user_id=bridge.user_id,
+                         bridge_id=bridge.bridge_id)
 
+        await self._save_bridges(expired)
+        self._arm_sweeper()
         return expired
 
-    async def _schedule_reminder(self, bridge: ActiveBridge) -> None:
-        """Schedule reminder for bridge."""
-        if not self.reminder_callback:
-            logger.warning("reminder_callback_not_set", user_id=bridge.user_id)
-            return
+    def _is_live(self, bridge: ActiveBridge) -> bool:
+        """Check if heap entry still refers to a pending bridge (lazy deletion)."""
+        return not bridge.completed and self.active_bridges.get(bridge.user_id) is bridge
 
-        reminder_time = datetime.fromisoformat(bridge.reminder_at)
+    def _index_deadline(self, bridge: ActiveBridge) -> None:
+        """Push bridge deadline onto the heap and re-arm the sweeper if it is the earliest."""
+        heap = self._deadline_heap
+        if len(heap) > HEAP_COMPACT_FACTOR * len(self.active_bridges) + 64:
+            # Drop stale entries of completed / replaced / released bridges
+            heap[:] = [entry for entry in heap if self._is_live(entry[2])]
+            heapq.heapify(heap)
 
-        # Don't schedule if reminder time has passed
-        if datetime.now() >= reminder_time:
-            logger.warning("reminder_time_passed",
-                         user_id=bridge.user_id,
-                         reminder_at=bridge.reminder_at)
+        heapq.heappush(heap, (bridge.deadline_ts, next(self._heap_seq), bridge))
+        self._arm_sweeper()
+
+    def _arm_sweeper(self) -> None:
+        """Arm a timer for the earliest deadline (no polling)."""
+        if not self.initialized or not self._deadline_heap:
+            return
+
+        next_deadline = self._deadline_heap[0][0]
+        if self._sweep_handle and self._sweep_at <= next_deadline:
             return
+        if self._sweep_handle:
+            self._sweep_handle.cancel()
 
-        # Schedule job
-        self.scheduler.add_job(
-            self._send_reminder,
-            trigger=DateTrigger(run_date=reminder_time),
-            args=[bridge.user_id],
-            id=f"reminder_{bridge.user_id}",
-            replace_existing=True
+        loop = asyncio.get_running_loop()
+        self._sweep_at = next_deadline
+        self._sweep_handle = loop.call_later(
+            max(0.0, next_deadline - time.time()), self._on_sweep_due
         )
 
-        logger.info("reminder_scheduled",
-                   user_id=bridge.user_id,
-                   reminder_at=reminder_time.isoformat())
+    def _on_sweep_due(self) -> None:
+        self._sweep_handle = None
+        self._sweep_task = asyncio.get_running_loop().create_task(self._sweep())
+
+    async def _sweep(self) -> None:
+        """Expire due bridges and notify the expiry callback."""
+        for bridge in await self.check_deadlines():
+            if not self.expiry_callback:
+                continue
+            try:
+                await self.expiry_callback(bridge)
+            except Exception as e:
+                logger.error("expiry_callback_failed",
+                           user_id=bridge.user_id,
+                           error=str(e))
 
-    def _cancel_reminder(self, user_id: str) -> None:
-        """Cancel scheduled reminder."""
-        job_id = f"reminder_{user_id}"
+    async def _schedule_reminder(self, bridge: ActiveBridge, replace: bool = False) -> None:
+        """
+        Queue bridge reminder in the store (and in memory if due soon).
 
-        try:
-            self.scheduler.remove_job(job_id)
+        Args:
+            bridge: Bridge to remind about
+            replace: Drop the user's other pending reminders first
+        """
+        job = ReminderJob(key=bridge.reminder_key, user_id=bridge.user_id, due_at=bridge.reminder_ts)
+
+        def write() -> bool:
+            if replace:
+                self.reminder_store.cancel_user(bridge.user_id)
+            return self.reminder_store.schedule(job)
+
+        if not await asyncio.to_thread(write):
+            return
+        if job.due_at <= self._paged_until:
+            self._page(job)
+            self._arm_reminders()
+
+        logger.info("reminder_scheduled",
+                   user_id=bridge.user_id,
+                   reminder_at=bridge.reminder_at)
+
+    async def _enqueue_unreminded(self, bridges) -> None:
+        """Queue reminders of loaded bridges (idempotent: existing keys are kept)."""
+        jobs = [
+            ReminderJob(key=bridge.reminder_key, user_id=bridge.user_id, due_at=bridge.reminder_ts)
+            for bridge in bridges
+            if not bridge.completed and not bridge.reminded
+        ]
+        if jobs:
+            added = await asyncio.to_thread(self.reminder_store.schedule_many, jobs)
+            if added:
+                logger.info("reminders_enqueued_from_bridges", count=added)
+
+    async def _cancel_reminder(self, user_id: str) -> None:
+        """Cancel pending reminder (a paged-in copy is skipped at delivery)."""
+        cancelled = await asyncio.to_thread(self.reminder_store.cancel_user, user_id)
+        if cancelled:
             logger.info("reminder_cancelled", user_id=user_id)
-        except Exception as e:
-            logger.debug("reminder_cancel_failed", user_id=user_id, error=str(e))
 
-    async def _send_reminder(self, user_id: str) -> None:
-        """Send reminder to user."""
-        bridge = self.active_bridges.get(user_id)
+    def _page(self, job: ReminderJob) -> None:
+        """Hold job in memory until it is due."""
+        if job.key in self._paged_jobs:
+            return
+        self._paged_jobs[job.key] = job
+        heapq.heappush(self._reminder_heap, (job.due_at, job.key))
 
-        if not bridge:
-            logger.warning("send_reminder_bridge_not_found", user_id=user_id)
+    def _arm_reminders(self, force: bool = False) -> None:
+        """Arm a timer for the next due reminder or the end of the paged window."""
+        if not self.initialized or not (self.reminder_callback or self.reminder_batch_callback):
             return
 
-        if bridge.completed:
-            logger.info("send_reminder_already_completed", user_id=user_id)
+        wake_at = self._paged_until
+        if self._reminder_heap:
+            wake_at = min(wake_at, self._reminder_heap[0][0])
+
+        if self._reminder_handle:
+            if not force and self._reminder_at <= wake_at:
+                return
+            self._reminder_handle.cancel()
+
+        loop = asyncio.get_running_loop()
+        self._reminder_at = wake_at
+        self._reminder_handle = loop.call_later(
+            max(0.0, wake_at - time.time()), self._on_reminders_due
+        )
+
+    def _on_reminders_due(self) -> None:
+        self._reminder_handle = None
+        if self._reminder_task and not self._reminder_task.done():
+            # Previous run re-arms when it finishes
             return
+        self._reminder_task = asyncio.get_running_loop().create_task(self._run_reminders())
 
-        # Mark as reminded
-        bridge.reminded = True
-        await self._save_bridge(bridge)
+    async def _run_reminders(self) -> None:
+        """Page in the next window if needed and deliver due reminders."""
+        try:
+            now = time.time()
+            if now >= self._paged_until:
+                await self._page_in(now)
+
+            # One tick: reminders due within REMINDER_TICK_SECONDS go out together
+            due = []
+            while self._reminder_heap and self._reminder_heap[0][0] <= now + REMINDER_TICK_SECONDS:
+                _, key = heapq.heappop(self._reminder_heap)
+                job = self._paged_jobs.pop(key, None)
+                if job:
+                    due.append(job)
+
+            for start in range(0, len(due), REMINDER_BATCH_SIZE):
+                await self._deliver_batch(due[start:start + REMINDER_BATCH_SIZE])
+
+        except Exception as e:
+            logger.error("reminder_run_failed", error=str(e))
+
+        finally:
+            self._arm_reminders()
+
+    async def _page_in(self, now: float) -> None:
+        """Load owned pending reminders due within the next page window."""
+        until = now + REMINDER_PAGE_SECONDS
+        jobs = await asyncio.to_thread(self.reminder_store.fetch_due, until, REMINDER_PAGE_LIMIT)
+        for job in jobs:
+            self._page(job)
+
+        if len(jobs) == REMINDER_PAGE_LIMIT:
+            # Page full: the rest of the window is fetched once these are due
+            self._paged_until = jobs[-1].due_at
+        elif jobs:
+            self._paged_until = until
+        else:
+            # Nothing due soon: sleep until the next stored reminder
+            next_due = await asyncio.to_thread(self.reminder_store.next_due)
+            self._paged_until = next_due if next_due else until
+        logger.debug("reminders_paged_in", count=len(jobs), paged_until=self._paged_until)
+
+    async def _deliver_batch(self, jobs: List[ReminderJob]) -> None:
+        """
+        Deliver due reminders as one fan-out, then persist them in bulk.
 
-        # Call callback
-        if self.reminder_callback:
+        Reminders are marked done only after delivery succeeded (at-least-once).
+        """
+        started = time.monotonic()
+        batch: List[Tuple[ReminderJob, ActiveBridge]] = []
+        stale: List[str] = []
+
+        for job in jobs:
+            if not self._owns(job.user_id):
+                continue
+            bridge = self.active_bridges.get(job.user_id)
+            if not bridge or bridge.completed or bridge.reminded or bridge.reminder_key != job.key:
+                # Bridge completed, expired, replaced or already reminded
+                stale.append(job.key)
+            else:
+                batch.append((job, bridge))
+
+        errors = await self._fan_out([bridge for _, bridge in batch]) if batch else []
+
+        now = time.time()
+        delivered = []
+        for (job, bridge), error in zip(batch, errors):
+            if error is None:
+                bridge.reminded = True
+                delivered.append(bridge)
+                self.archive.append("reminded", bridge, now)
+                lag = max(0.0, now - bridge.reminder_ts)
+                self.reminder_lag.append(lag)
+                REMINDER_DELAY_SECONDS.observe(lag)
+            else:
+                await self._retry_reminder(job, error)
+
+        # One bulk write of reminded flags, one store transaction
+        await self._save_bridges(delivered)
+        await asyncio.to_thread(
+            self.reminder_store.mark_done, stale + [bridge.reminder_key for bridge in delivered]
+        )
+
+        elapsed = time.monotonic() - started
+        self.reminders_sent += len(delivered)
+        self.reminder_batches += 1
+        BRIDGE_EVENTS.labels("reminded").inc(len(delivered))
+        REMINDER_BATCH_SIZE_HIST.observe(len(batch))
+        REMINDER_BATCH_SECONDS.observe(elapsed)
+
+        self.last_batch = {
+            "size": len(batch),
+            "sent": len(delivered),
+            "failed": len(batch) - len(delivered),
+            "stale": len(stale),
+            "seconds": round(elapsed, 4),
+            "throughput": round(len(delivered) / elapsed, 1) if elapsed > 0 else 0.0,
+            "max_lag": round(max((now - b.reminder_ts for b in delivered), default=0.0), 3)
+        }
+        logger.info("reminder_batch_sent", **self.last_batch)
+
+    async def _fan_out(self, bridges: List[ActiveBridge]) -> List[Optional[BaseException]]:
+        """Hand the batch to the batch callback, or run the per-bridge callback with bounded concurrency."""
+        if self.reminder_batch_callback:
             try:
-                await self.reminder_callback(user_id, bridge)
-                logger.info("reminder_sent",
-                           user_id=user_id,
-                           bridge_id=bridge.bridge_id)
+                return await self.reminder_batch_callback(bridges)
             except Exception as e:
-                logger.error("reminder_callback_failed",
-                           user_id=user_id,
-                           error=str(e))
-        else:
-            logger.warning("reminder_callback_not_set", user_id=user_id)
+                return [e] * len(bridges)
+
+        slots = asyncio.Semaphore(REMINDER_FANOUT_CONCURRENCY)
+
+        async def send(bridge: ActiveBridge) -> Optional[BaseException]:
+            async with slots:
+                try:
+                    await self.reminder_callback(bridge.user_id, bridge)
+                    return None
+                except Exception as e:
+                    return e
+
+        return await asyncio.gather(*(send(bridge) for bridge in bridges))
+
+    async def _retry_reminder(self, job: ReminderJob, error: Exception) -> None:
+        """Back off a failed reminder, or give up after REMINDER_MAX_ATTEMPTS."""
+        BRIDGE_EVENTS.labels("reminder_failed").inc()
+        self.reminders_failed += 1
+        job.attempts += 1
+
+        if job.attempts >= REMINDER_MAX_ATTEMPTS:
+            await asyncio.to_thread(self.reminder_store.mark_failed, [job.key])
+            logger.error("reminder_callback_failed",
+                        user_id=job.user_id,
+                        attempts=job.attempts,
+                        error=str(error))
+            return
 
-    async def _reschedule_reminders(self) -> None:
-        """Reschedule reminders after restart."""
-        for bridge in self.active_bridges.values():
-            if not bridge.completed and not bridge.reminded:
-                await self._schedule_reminder(bridge)
+        job.due_at = time.time() + REMINDER_RETRY_SECONDS * 2 ** (job.attempts - 1)
+        await asyncio.to_thread(self.reminder_store.retry, job.key, job.due_at)
+        if job.due_at <= self._paged_until:
+            self._page(job)
+        logger.warning("reminder_callback_retry",
+                      user_id=job.user_id,
+                      attempts=job.attempts,
+                      retry_in=round(job.due_at - time.time(), 1),
+                      error=str(error))
 
     async def _load_active_bridges(self) -> None:
-        """Load active bridges from storage."""
-        for bridge_file in self.storage_path.glob("*.json"):
-            try:
-                with open(bridge_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+        """Load active bridges from storage, archiving ones that expired while down."""
+        now = time.time()
+        expired = []
+        for entry in self.layout.iter_entries():
+            if not self._owns(entry.name[:-len(".json")]):
+                continue
 
-                bridge = ActiveBridge(**data)
+            try:
+                bridge = self.serializer.read(entry.path)
 
                 # Only load if not completed and not expired
-                deadline = datetime.fromisoformat(bridge.deadline_at)
-                if not bridge.completed and datetime.now() < deadline:
+                if bridge.completed or bridge.expired:
+                    continue
+                if now < bridge.deadline_ts:
                     self.active_bridges[bridge.user_id] = bridge
+                    self._index_deadline(bridge)
                     logger.debug("bridge_loaded", user_id=bridge.user_id)
+                else:
+                    bridge.expired = True
+                    expired.append(bridge)
+                    self.archive.append("expired", bridge, bridge.deadline_ts)
 
             except Exception as e:
+                STORAGE_ERRORS.labels("bridge", "read").inc()
                 logger.error("bridge_load_failed",
-                           file=bridge_file.name,
+                           file=entry.name,
                            error=str(e))
 
+        if expired:
+            BRIDGE_EVENTS.labels("expired").inc(len(expired))
+            await self._save_bridges(expired)
+            logger.info("reality_bridges_expired_while_down", count=len(expired))
+
     async def _save_bridge(self, bridge: ActiveBridge) -> None:
         """Save bridge to storage."""
-        bridge_path = self.storage_path / f"{bridge.user_id}.json"
+        bridge_path = self.layout.path_for_write(bridge.user_id)
 
         try:
             async with asyncio.Lock():
-                with open(bridge_path, 'w', encoding='utf-8') as f:
-                    json.dump(asdict(bridge), f, indent=2, ensure_ascii=False)
+                with _BRIDGE_WRITE_SECONDS.time(), open(bridge_path, 'wb') as f:
+                    f.write(self.serializer.dumps(bridge))
 
             logger.debug("bridge_saved", user_id=bridge.user_id)
 
         except Exception as e:
+            STORAGE_ERRORS.labels("bridge", "write").inc()
             logger.error("bridge_save_failed",
                         user_id=bridge.user_id,
                         error=str(e))
 
+    async def _save_bridges(self, bridges: List[ActiveBridge]) -> None:
+        """Save many bridges in one write pass off the event loop."""
+        if not bridges:
+            return
+
+        # Encode on the loop (a snapshot), write in the thread
+        records = [(bridge.user_id, self.serializer.dumps(bridge)) for bridge in bridges]
+
+        def write() -> List[str]:
+            failed = []
+            with _BRIDGE_WRITE_SECONDS.time():
+                for user_id, data in records:
+                    try:
+                        with open(self.layout.path_for_write(user_id), 'wb') as f:
+                            f.write(data)
+                    except OSError:
+                        failed.append(user_id)
+            return failed
+
+        failed = await asyncio.to_thread(write)
+        if failed:
+            STORAGE_ERRORS.labels("bridge", "write").inc(len(failed))
+            logger.error("bridge_bulk_save_failed", failed=len(failed), user_ids=failed[:10])
+        logger.debug("bridges_saved", count=len(bridges) - len(failed))
+
+    async def get_completion_rates(
+        self,
+        start: date,
+        end: date,
+        group_by: str = "quest_id"
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Completion rates from the lifecycle archive.
+
+        Args:
+            start: First day
+            end: Last day (inclusive)
+            group_by: "quest_id", "bridge_id" or "location"
+
+        Returns:
+            {group: {"created", "reminded", "completed", "expired", "completion_rate"}}
+        """
+        await self.archive.flush()
+        return await asyncio.to_thread(self.archive.completion_rates, start, end, group_by)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get bridge and reminder delivery statistics.
+
+        Returns:
+            Dictionary with counts, last batch throughput and reminder lag (seconds)
+        """
+        lag = sorted(self.reminder_lag)
+        return {
+            "active_bridges": len(self.active_bridges),
+            "reminders_paged": len(self._paged_jobs),
+            "reminders_sent": self.reminders_sent,
+            "reminders_failed": self.reminders_failed,
+            "reminder_batches": self.reminder_batches,
+            "last_batch": self.last_batch,
+            "reminder_lag_p50": lag[len(lag) // 2] if lag else 0.0,
+            "reminder_lag_p95": lag[int(len(lag) * 0.95)] if lag else 0.0,
+            "archive": self.archive.get_statistics()
+        }
+
     def _get_bridge_path(self, user_id: str) -> Path:
         """Get storage path for user's bridge."""
-        return self.storage_path / f"{user_id}.json"
+        return self.layout.path(user_id)
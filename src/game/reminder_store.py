@@ -0,0 +1,200 @@
+"""
+Reminder Store - durable queue of Reality Bridge reminders.
+
+SQLite table indexed by (state, due_at). RealityBridgeManager pages only
+reminders due within the next REMINDER_PAGE_SECONDS into memory; the rest
+stay on disk until time advances.
+
+Delivery is at-least-once: a job stays pending until mark_done() after a
+successful delivery, so a crash mid-delivery re-sends it after restart.
+Each job has an idempotency key (see reminder_key) - scheduling an existing
+key is a no-op, and a key that is done is never delivered again.
+
+All methods are synchronous and thread-safe; call them via asyncio.to_thread.
+"""
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    key TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    due_at REAL NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reminders_due ON reminders (state, due_at);
+CREATE INDEX IF NOT EXISTS reminders_user ON reminders (user_id, state);
+"""
+
+
+def reminder_key(user_id: str, bridge_id: str, created_at: str) -> str:
+    """Idempotency key of a bridge's reminder (one per bridge instance)."""
+    return f"{user_id}:{bridge_id}:{created_at}"
+
+
+@dataclass
+class ReminderJob:
+    """Pending reminder."""
+    key: str
+    user_id: str
+    due_at: float  # Epoch seconds
+    attempts: int = 0
+
+
+class ReminderStore:
+    """SQLite-backed reminder queue."""
+
+    def __init__(self, path: Path, owner_filter: Optional[Callable[[str], bool]] = None):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite database file
+            owner_filter: Predicate(user_id) limiting fetch_due/next_due to owned users
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.created = not path.exists()
+        self.owner_filter = owner_filter
+
+        self._lock = threading.Lock()
+        # WAL + busy timeout: shard workers share one file
+        self._conn = sqlite3.connect(str(path), timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.create_function("owns", 1, self._owns, deterministic=True)
+
+    def _owns(self, user_id: str) -> int:
+        return 1 if self.owner_filter is None or self.owner_filter(user_id) else 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def schedule(self, job: ReminderJob) -> bool:
+        """
+        Add a pending job (no-op if the key exists).
+
+        Returns:
+            True if added
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO reminders (key, user_id, due_at, state, attempts, updated_at) "
+                "VALUES (?, ?, ?, ?, 0, ?)",
+                (job.key, job.user_id, job.due_at, PENDING, time.time())
+            )
+            return cursor.rowcount == 1
+
+    def schedule_many(self, jobs: List[ReminderJob]) -> int:
+        """Add pending jobs in one transaction (existing keys are skipped)."""
+        now = time.time()
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO reminders (key, user_id, due_at, state, attempts, updated_at) "
+                "VALUES (?, ?, ?, ?, 0, ?)",
+                [(job.key, job.user_id, job.due_at, PENDING, now) for job in jobs]
+            )
+            self._conn.execute("COMMIT")
+            return self._conn.total_changes - before
+
+    def cancel_user(self, user_id: str) -> int:
+        """Delete pending jobs of user. Returns number deleted."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM reminders WHERE user_id = ? AND state = ?", (user_id, PENDING)
+            )
+            return cursor.rowcount
+
+    def fetch_due(self, until: float, limit: int) -> List[ReminderJob]:
+        """
+        Get owned pending jobs due before until, earliest first.
+
+        Args:
+            until: Epoch seconds
+            limit: Max jobs
+
+        Returns:
+            List of ReminderJob
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, user_id, due_at, attempts FROM reminders "
+                "WHERE state = ? AND due_at <= ? AND owns(user_id) ORDER BY due_at LIMIT ?",
+                (PENDING, until, limit)
+            ).fetchall()
+        return [ReminderJob(key=row[0], user_id=row[1], due_at=row[2], attempts=row[3]) for row in rows]
+
+    def next_due(self) -> Optional[float]:
+        """Earliest due_at of owned pending jobs."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT due_at FROM reminders WHERE state = ? AND owns(user_id) ORDER BY due_at LIMIT 1",
+                (PENDING,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_done(self, keys: List[str]) -> None:
+        """Mark jobs delivered (one transaction)."""
+        self._set_state(keys, DONE)
+
+    def mark_failed(self, keys: List[str]) -> None:
+        """Mark jobs as given up."""
+        self._set_state(keys, FAILED)
+
+    def _set_state(self, keys: List[str], state: str) -> None:
+        if not keys:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE reminders SET state = ?, updated_at = ? WHERE key = ?",
+                [(state, now, key) for key in keys]
+            )
+            self._conn.execute("COMMIT")
+
+    def retry(self, key: str, due_at: float) -> None:
+        """Count a failed attempt and move the job to due_at."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE reminders SET attempts = attempts + 1, due_at = ?, updated_at = ? "
+                "WHERE key = ? AND state = ?",
+                (due_at, time.time(), key, PENDING)
+            )
+
+    def purge(self, before: float) -> int:
+        """Delete done/failed jobs last updated before this epoch time."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM reminders WHERE state != ? AND updated_at < ?", (PENDING, before)
+            )
+            return cursor.rowcount
+
+    def get_state(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT state FROM reminders WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def count_by_state(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM reminders GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
@@ -6,8 +6,12 @@ from .learning_profile import (
     LearningProfile,
     LearningProfileAnalyzer,
     LearningDimension,
-    DimensionReading
+    DimensionReading,
+    DimensionAggregate,
+    LearningHistory,
+    LearningStats
 )
+from .sharding import ShardedRuntime, HashRing
 
 __all__ = [
     "StateManager",
@@ -19,5 +23,10 @@ __all__ = [
     "LearningProfile",
     "LearningProfileAnalyzer",
     "LearningDimension",
-    "DimensionReading"
+    "DimensionReading",
+    "DimensionAggregate",
+    "LearningHistory",
+    "LearningStats",
+    "ShardedRuntime",
+    "HashRing"
 ]
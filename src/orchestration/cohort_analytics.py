@@ -0,0 +1,460 @@
+"""
+Cohort analytics over stored learning profiles.
+
+LearningProfileAnalyzer looks at one child at a time. CohortAnalytics
+answers questions about groups of children:
+- Distribution of each dimension (histogram, mean, percentiles)
+- Average trajectory of each dimension per day, e.g. attention of
+  children currently in forest_calm
+- Which quests (history sources) move a dimension most
+- Correlations between dimensions and progress (level, XP, streak, quests)
+
+Profiles are streamed from UserManager's storage directory in chunks of
+COHORT_CHUNK_SIZE. Each chunk becomes NumPy arrays (users × dimensions,
+and dimensions × users × days for trajectories) that are folded into
+running sums, so memory depends on the chunk size, not on the number of
+profiles.
+
+Run:
+    python -m src.orchestration.cohort_analytics --location forest_calm --days 90
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.core.logger import get_logger
+from src.core.serialization import read_record
+from src.core.store_layout import StoreLayout
+from src.config import COHORT_CHUNK_SIZE, COHORT_TRAJECTORY_DAYS, STORE_FANOUT_LEVELS
+from src.orchestration.learning_profile import DIMENSIONS, DAY_SECONDS
+
+logger = get_logger(__name__)
+
+PROGRESS_FEATURES = ("level", "xp", "streak_days", "total_quests_completed")
+FEATURES = tuple(dimension.value for dimension in DIMENSIONS) + PROGRESS_FEATURES
+
+
+@dataclass
+class CohortChunk:
+    """
+    One chunk of profiles as arrays.
+
+    History readings of all users are flattened into parallel arrays;
+    user holds the row of each reading in values.
+    """
+    values: np.ndarray  # (users, dimensions) current values
+    features: np.ndarray  # (users, FEATURES)
+    created: np.ndarray  # (users,) epoch seconds
+    user: np.ndarray  # Reading -> user row
+    dimension: np.ndarray  # Reading -> dimension index
+    ts: np.ndarray  # Reading time (period start for aggregates)
+    value: np.ndarray  # Value after the reading (end of period)
+    change: np.ndarray  # Change of the reading (net over period)
+    source: np.ndarray  # Source code, -1 for aggregates (no source)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+@dataclass
+class CohortReport:
+    """Result of CohortAnalytics.analyze()."""
+    users: int
+    location: Optional[str]
+    distributions: Dict[str, Dict[str, Any]]
+    days: List[str]  # ISO dates of trajectory points
+    trajectory: Dict[str, List[Optional[float]]]  # Mean value per day
+    quest_deltas: Dict[str, List[Dict[str, Any]]]  # Top sources per dimension
+    correlations: Dict[str, Any]  # {"features": [...], "matrix": [[...]]}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _Distribution:
+    """Histogram of current values per dimension."""
+
+    def __init__(self):
+        self.counts = np.zeros((len(DIMENSIONS), 11), dtype=np.int64)
+
+    def update(self, chunk: CohortChunk) -> None:
+        values = np.clip(chunk.values, 1, 10).astype(np.int64)
+        offsets = np.arange(len(DIMENSIONS)) * 11
+        self.counts += np.bincount((values + offsets).ravel(), minlength=self.counts.size).reshape(self.counts.shape)
+
+    def result(self) -> Dict[str, Dict[str, Any]]:
+        scores = np.arange(11)
+        results = {}
+        for index, dimension in enumerate(DIMENSIONS):
+            counts = self.counts[index]
+            total = counts.sum()
+            if not total:
+                results[dimension.value] = {"histogram": counts[1:].tolist(), "mean": None}
+                continue
+            mean = (counts * scores).sum() / total
+            cumulative = np.cumsum(counts) / total
+            results[dimension.value] = {
+                "histogram": counts[1:].tolist(),  # Counts of scores 1..10
+                "mean": round(float(mean), 3),
+                "std": round(float(np.sqrt((counts * (scores - mean) ** 2).sum() / total)), 3),
+                "p10": int(np.searchsorted(cumulative, 0.1)),
+                "p50": int(np.searchsorted(cumulative, 0.5)),
+                "p90": int(np.searchsorted(cumulative, 0.9))
+            }
+        return results
+
+
+class _Trajectory:
+    """Mean value per dimension per day over the last days."""
+
+    def __init__(self, days: int, end: datetime):
+        self.days = days
+        self.start = (end - timedelta(days=days)).timestamp()
+        self.labels = [(end - timedelta(days=days - offset)).date().isoformat() for offset in range(days)]
+        self.sum = np.zeros((len(DIMENSIONS), days))
+        self.count = np.zeros((len(DIMENSIONS), days), dtype=np.int64)
+
+    def update(self, chunk: CohortChunk) -> None:
+        users, days, dims = len(chunk), self.days, len(DIMENSIONS)
+
+        # Readings before the window count for day 0
+        day = np.clip((chunk.ts - self.start) // DAY_SECONDS, 0, None).astype(np.int64)
+        keep = day < days
+        series = chunk.dimension[keep].astype(np.int64) * users + chunk.user[keep]
+        cell = series * days + day[keep]
+
+        ts, value, change = chunk.ts[keep], chunk.value[keep], chunk.change[keep]
+
+        grid = np.full(dims * users * days, np.nan, dtype=np.float32)
+        prior = chunk.values.T.astype(np.float32).ravel()
+        if len(cell):
+            # Last reading per cell (by time)
+            order = np.lexsort((ts, cell))
+            last = np.r_[cell[order][1:] != cell[order][:-1], True]
+            grid[cell[order][last]] = value[order][last]
+
+            # Value before the first reading (series without readings keep the current value)
+            order = np.lexsort((ts, series))
+            first = np.r_[True, series[order][1:] != series[order][:-1]]
+            prior[series[order][first]] = value[order][first] - change[order][first]
+        grid = grid.reshape(dims, users, days)
+        prior = prior.reshape(dims, users)
+
+        # Forward fill along days
+        valid = ~np.isnan(grid)
+        index = np.where(valid, np.arange(days, dtype=np.int32), 0)
+        np.maximum.accumulate(index, axis=2, out=index)
+        filled = np.take_along_axis(grid, index, axis=2)
+        seen = np.maximum.accumulate(valid, axis=2)
+        filled = np.where(seen, filled, prior[:, :, None])
+
+        # Days before the child was created do not count
+        created_day = np.clip((chunk.created - self.start) // DAY_SECONDS, 0, days).astype(np.int64)
+        exists = np.arange(days)[None, :] >= created_day[:, None]
+        self.sum += np.where(exists[None, :, :], filled, np.float32(0)).sum(axis=1)
+        self.count += exists.sum(axis=0)[None, :]
+
+    def result(self) -> Dict[str, List[Optional[float]]]:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = self.sum / self.count
+        return {
+            dimension.value: [None if np.isnan(mean) else round(float(mean), 3) for mean in means[index]]
+            for index, dimension in enumerate(DIMENSIONS)
+        }
+
+
+class _QuestDeltas:
+    """Sum and count of changes per (source, dimension)."""
+
+    def __init__(self):
+        self.sum = np.zeros((0, len(DIMENSIONS)))
+        self.count = np.zeros((0, len(DIMENSIONS)), dtype=np.int64)
+
+    def update(self, chunk: CohortChunk, sources: int) -> None:
+        if sources > len(self.sum):
+            grow = sources - len(self.sum)
+            self.sum = np.vstack([self.sum, np.zeros((grow, len(DIMENSIONS)))])
+            self.count = np.vstack([self.count, np.zeros((grow, len(DIMENSIONS)), dtype=np.int64)])
+
+        mask = chunk.source >= 0
+        key = chunk.source[mask].astype(np.int64) * len(DIMENSIONS) + chunk.dimension[mask]
+        size = self.sum.size
+        self.sum += np.bincount(key, weights=chunk.change[mask], minlength=size).reshape(self.sum.shape)
+        self.count += np.bincount(key, minlength=size).reshape(self.count.shape)
+
+    def result(self, sources: List[str], top: int, min_count: int) -> Dict[str, List[Dict[str, Any]]]:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(self.count >= min_count, self.sum / np.maximum(self.count, 1), np.nan)
+
+        results = {}
+        for index, dimension in enumerate(DIMENSIONS):
+            column = means[:, index]
+            ranked = [row for row in np.argsort(-np.abs(np.nan_to_num(column))) if not np.isnan(column[row])]
+            results[dimension.value] = [
+                {
+                    "source": sources[row],
+                    "mean_change": round(float(column[row]), 3),
+                    "count": int(self.count[row, index])
+                }
+                for row in ranked[:top]
+            ]
+        return results
+
+
+class _Correlation:
+    """Pearson correlation of FEATURES, merging per-chunk centered moments (Chan et al.)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = np.zeros(len(FEATURES))
+        self.m2 = np.zeros((len(FEATURES), len(FEATURES)))  # Sum of centered cross-products
+
+    def update(self, chunk: CohortChunk) -> None:
+        n = len(chunk)
+        mean = chunk.features.mean(axis=0)
+        centered = chunk.features - mean
+        delta = mean - self.mean
+        total = self.n + n
+
+        self.m2 += centered.T @ centered + np.outer(delta, delta) * (self.n * n / total)
+        self.mean += delta * (n / total)
+        self.n = total
+
+    def result(self) -> Dict[str, Any]:
+        if self.n < 2:
+            return {"features": list(FEATURES), "matrix": []}
+
+        std = np.sqrt(np.diag(self.m2))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = np.nan_to_num(self.m2 / np.outer(std, std))  # Constant features: 0
+        np.fill_diagonal(corr, 1.0)
+        return {"features": list(FEATURES), "matrix": np.round(corr, 3).tolist()}
+
+
+class CohortAnalytics:
+    """Streams stored profiles in chunks and aggregates them with NumPy."""
+
+    def __init__(
+        self,
+        data_dir: Path = Path("src/data/user_profiles"),
+        chunk_size: int = COHORT_CHUNK_SIZE,
+        fanout_levels: int = STORE_FANOUT_LEVELS
+    ):
+        """
+        Initialize cohort analytics.
+
+        Args:
+            data_dir: UserManager profile directory
+            chunk_size: Profiles converted to arrays at once
+            fanout_levels: UserManager profile file layout (0: flat)
+        """
+        self.data_dir = data_dir
+        self.chunk_size = chunk_size
+        self.layout = StoreLayout(data_dir, fanout_levels)
+
+        # History source codebook (shared by all chunks)
+        self.sources: List[str] = []
+        self._source_codes: Dict[str, int] = {}
+
+        self.profiles_scanned = 0
+        self.chunks = 0
+
+    def _source_code(self, source: str) -> int:
+        code = self._source_codes.get(source)
+        if code is None:
+            code = self._source_codes[source] = len(self.sources)
+            self.sources.append(source)
+        return code
+
+    def iter_chunks(self, location: Optional[str] = None) -> Iterator[CohortChunk]:
+        """
+        Stream profiles from storage as array chunks.
+
+        Args:
+            location: Only children currently in this location
+
+        Yields:
+            CohortChunk of up to chunk_size profiles
+        """
+        batch: List[Dict[str, Any]] = []
+        for entry in self.layout.iter_entries():
+            try:
+                profile = read_record(entry.path)
+            except (OSError, ValueError) as e:
+                logger.warning("cohort_profile_skipped", path=entry.name, error=str(e))
+                continue
+
+            self.profiles_scanned += 1
+            if location and profile.get("current_location") != location:
+                continue
+
+            batch.append(profile)
+            if len(batch) >= self.chunk_size:
+                yield self._to_chunk(batch)
+                batch = []
+
+        if batch:
+            yield self._to_chunk(batch)
+
+    def _to_chunk(self, profiles: List[Dict[str, Any]]) -> CohortChunk:
+        """Convert parsed profiles (UserProfile JSON) to arrays."""
+        self.chunks += 1
+        users = len(profiles)
+        values = np.empty((users, len(DIMENSIONS)), dtype=np.int16)
+        features = np.empty((users, len(FEATURES)))
+        created = np.empty(users)
+
+        columns: Dict[str, List] = {name: [] for name in ("user", "dimension", "ts", "value", "change", "source")}
+
+        def extend(row: int, dims: List[int], ts: List[float], vals: List[int],
+                   changes: List[int], sources: List[int]) -> None:
+            columns["user"].extend([row] * len(ts))
+            columns["dimension"].extend(dims)
+            columns["ts"].extend(ts)
+            columns["value"].extend(vals)
+            columns["change"].extend(changes)
+            columns["source"].extend(sources)
+
+        for row, profile in enumerate(profiles):
+            learning = profile.get("learning_profile") or {}
+            current = [learning.get(dimension.value, 5) for dimension in DIMENSIONS]
+            progress = profile.get("progress") or {}
+            values[row] = current
+            features[row] = current + [progress.get(name) or 0 for name in PROGRESS_FEATURES]
+            try:
+                created[row] = datetime.fromisoformat(profile["created_at"]).timestamp()
+            except (KeyError, TypeError, ValueError):
+                created[row] = 0.0
+
+            # Aggregated tiers (oldest first), then raw readings
+            history = learning.get("history") or {}
+            for tier in ("weekly", "daily"):
+                aggregate = history.get(tier) or {}
+                starts = aggregate.get("start") or []
+                if starts:
+                    extend(row, aggregate["dimension"], starts, aggregate["value"],
+                           aggregate["change"], [-1] * len(starts))
+
+            raw = history.get("raw") or {}
+            if raw.get("ts"):
+                codes = [self._source_code(source) for source in history.get("sources", [])]
+                extend(row, raw["dimension"], raw["ts"], raw["value"], raw["change"],
+                       [codes[index] for index in raw["source"]])
+
+        return CohortChunk(
+            values=values,
+            features=features,
+            created=created,
+            user=np.asarray(columns["user"], dtype=np.int64),
+            dimension=np.asarray(columns["dimension"], dtype=np.int64),
+            ts=np.asarray(columns["ts"], dtype=np.float64),
+            value=np.asarray(columns["value"], dtype=np.float32),
+            change=np.asarray(columns["change"], dtype=np.float64),
+            source=np.asarray(columns["source"], dtype=np.int64)
+        )
+
+    def analyze(
+        self,
+        location: Optional[str] = None,
+        days: int = COHORT_TRAJECTORY_DAYS,
+        top: int = 10,
+        min_count: int = 5
+    ) -> CohortReport:
+        """
+        Compute distributions, trajectories, quest deltas and correlations in one pass.
+
+        Args:
+            location: Only children currently in this location
+            days: Trajectory length (days up to today)
+            top: Sources reported per dimension
+            min_count: Min readings for a source to be ranked
+
+        Returns:
+            CohortReport
+        """
+        started = time.perf_counter()
+        end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+        distribution = _Distribution()
+        trajectory = _Trajectory(days, end)
+        deltas = _QuestDeltas()
+        correlation = _Correlation()
+
+        users = 0
+        for chunk in self.iter_chunks(location):
+            users += len(chunk)
+            distribution.update(chunk)
+            trajectory.update(chunk)
+            deltas.update(chunk, len(self.sources))
+            correlation.update(chunk)
+
+        report = CohortReport(
+            users=users,
+            location=location,
+            distributions=distribution.result(),
+            days=trajectory.labels,
+            trajectory=trajectory.result(),
+            quest_deltas=deltas.result(self.sources, top, min_count),
+            correlations=correlation.result()
+        )
+
+        logger.info("cohort_analyzed",
+                   users=users,
+                   location=location,
+                   chunks=self.chunks,
+                   seconds=round(time.perf_counter() - started, 3))
+
+        return report
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get scan statistics.
+
+        Returns:
+            Dictionary with profiles scanned, chunks built and distinct sources
+        """
+        return {
+            "profiles_scanned": self.profiles_scanned,
+            "chunks": self.chunks,
+            "sources": len(self.sources)
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print a cohort report."""
+    parser = argparse.ArgumentParser(description="InnerWorld Edu cohort analytics")
+    parser.add_argument("--data-dir", type=Path, default=Path("src/data/user_profiles"), help="Profile directory")
+    parser.add_argument("--location", help="Only children currently in this location")
+    parser.add_argument("--days", type=int, default=COHORT_TRAJECTORY_DAYS, help="Trajectory length")
+    parser.add_argument("--chunk-size", type=int, default=COHORT_CHUNK_SIZE, help="Profiles per chunk")
+    parser.add_argument("--json", type=Path, help="Write full report to this file")
+    args = parser.parse_args(argv)
+
+    analytics = CohortAnalytics(args.data_dir, chunk_size=args.chunk_size)
+    report = analytics.analyze(location=args.location, days=args.days)
+
+    print(f"Users: {report.users} (location: {report.location or 'all'})")
+    for dimension, stats in report.distributions.items():
+        trend = [mean for mean in report.trajectory[dimension] if mean is not None]
+        change = f"{trend[-1] - trend[0]:+.2f}" if trend else "n/a"
+        print(f"  {dimension}: mean {stats['mean']}, p50 {stats.get('p50')}, {args.days}-day change {change}")
+        for delta in report.quest_deltas[dimension][:3]:
+            print(f"    {delta['source']}: {delta['mean_change']:+.2f} ({delta['count']} readings)")
+
+    if args.json:
+        args.json.write_text(json.dumps(report.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\nReport written to {args.json}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,8 @@ from enum import Enum
 from dataclasses import dataclass, field
 from datetime import datetime
 
+from src.game.location_index import get_location_index
+
 
 class EmotionalState(str, Enum):
     """5 emotional states for children."""
@@ -172,6 +174,9 @@ class EmotionalRouter:
         """
         Recommend Ponimaliya location based on emotional state.
 
+        Looks up the location routing index (locations_metadata.yaml);
+        EMOTION_TO_LOCATION is the fallback if the metadata is unavailable.
+
         Args:
             emotion: Emotional state (uses latest if None)
 
@@ -183,6 +188,9 @@ class EmotionalRouter:
                 return "tower_confusion"  # Default starting location
             emotion = self.emotional_history[-1].state
 
+        route = get_location_index().route(emotion=emotion.value)
+        if route.locations:
+            return route.locations[0]
         return self.EMOTION_TO_LOCATION.get(emotion, "tower_confusion")
 
     def get_support_message(self, emotion: Optional[EmotionalState] = None) -> str:
@@ -13,13 +13,28 @@ Used for:
 - Quest difficulty adaptation
 - Progress tracking
 - Parent reports
+
+History is kept in LearningHistory: parallel array columns instead of one
+object per reading, with source strings interned into a per-profile table.
+Recent readings stay raw; older ones are downsampled to one aggregate per
+dimension per day, and later per week, so history size stays bounded.
+
+LearningStats keeps running statistics (recent change counts, per-dimension
+EWMA, trend slope, streaks and last-week net change) updated in O(1) by
+set_dimension, so LearningProfileAnalyzer reads them in constant time.
 """
 
-from typing import Dict, List, Optional, Any
+import sys
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import Deque, Dict, List, Optional, Any, Iterator, Union
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
 from enum import Enum
 
+from src.game.location_index import get_location_index
+
 
 class LearningDimension(str, Enum):
     """4 learning dimensions."""
@@ -39,6 +54,455 @@ class DimensionReading:
     source: str = ""  # e.g., "quest_1_completed", "onboarding"
 
 
+@dataclass
+class DimensionAggregate:
+    """Downsampled readings of a dimension over one day or week."""
+    dimension: LearningDimension
+    start: datetime  # Start of the day / week
+    value: int  # Last value in the period
+    change: int  # Net change over the period
+    count: int  # Readings aggregated
+    positive: int  # Readings with change > 0
+    negative: int  # Readings with change < 0
+
+
+# History tiers
+RAW_HISTORY_DAYS = 14  # Readings newer than this stay raw
+RAW_HISTORY_LIMIT = 200  # Max raw readings (oldest are downsampled first)
+DAILY_HISTORY_DAYS = 120  # Daily aggregates newer than this; older ones roll up per week
+
+DAY_SECONDS = 86400
+
+# Running statistics
+RECENT_CHANGES = 10  # Changes counted by detect_learning_pattern
+EWMA_ALPHA = 0.3  # Weight of the newest reading in EWMAs
+WEEK_DAYS = 7  # Days kept in the net change ring
+
+DIMENSIONS = tuple(LearningDimension)
+DIMENSION_INDEX = {dimension: index for index, dimension in enumerate(DIMENSIONS)}
+
+# Dimension names in parent/child-facing texts
+DIMENSION_NAMES = {
+    LearningDimension.UNDERSTANDING_MEANING: "понимание смысла",
+    LearningDimension.MEMORY: "память",
+    LearningDimension.ATTENTION: "внимание",
+    LearningDimension.MOTIVATION: "мотивация"
+}
+
+
+def _day_start(ts: float) -> float:
+    """Epoch of local midnight of the day containing ts."""
+    return datetime.fromtimestamp(ts).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+def _week_start(ts: float) -> float:
+    """Epoch of local midnight of the Monday of the week containing ts."""
+    day = datetime.fromtimestamp(ts).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (day - timedelta(days=day.weekday())).timestamp()
+
+
+class AggregateTier:
+    """Aggregates of one granularity as parallel columns, ordered by start."""
+
+    __slots__ = ("start", "dimension", "value", "change", "count", "positive", "negative")
+
+    def __init__(self):
+        self.start = array("d")
+        self.dimension = array("b")
+        self.value = array("b")
+        self.change = array("h")
+        self.count = array("I")
+        self.positive = array("I")
+        self.negative = array("I")
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def add(self, start: float, dimension: int, value: int, change: int,
+            count: int, positive: int, negative: int) -> None:
+        """Add an aggregate, merging with the bucket of the same start and dimension."""
+        index = len(self.start) - 1
+        while index >= 0 and self.start[index] == start:
+            if self.dimension[index] == dimension:
+                self.value[index] = value
+                self.change[index] = max(-32768, min(32767, self.change[index] + change))
+                self.count[index] += count
+                self.positive[index] += positive
+                self.negative[index] += negative
+                return
+            index -= 1
+
+        self.start.append(start)
+        self.dimension.append(dimension)
+        self.value.append(value)
+        self.change.append(max(-32768, min(32767, change)))
+        self.count.append(count)
+        self.positive.append(positive)
+        self.negative.append(negative)
+
+    def pop_before(self, cutoff: float) -> List[tuple]:
+        """Remove and return aggregates starting before cutoff."""
+        end = bisect_left(self.start, cutoff)
+        rows = list(zip(*(getattr(self, column)[:end] for column in self.__slots__)))
+        for column in self.__slots__:
+            del getattr(self, column)[:end]
+        return rows
+
+    def readings(self) -> int:
+        """Number of raw readings aggregated in this tier."""
+        return sum(self.count)
+
+    def entries(self) -> List[DimensionAggregate]:
+        return [
+            DimensionAggregate(
+                dimension=DIMENSIONS[self.dimension[index]],
+                start=datetime.fromtimestamp(self.start[index]),
+                value=self.value[index],
+                change=self.change[index],
+                count=self.count[index],
+                positive=self.positive[index],
+                negative=self.negative[index]
+            )
+            for index in range(len(self.start))
+        ]
+
+    def to_dict(self) -> Dict[str, List]:
+        return {column: getattr(self, column).tolist() for column in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List]) -> "AggregateTier":
+        tier = cls()
+        for column in cls.__slots__:
+            getattr(tier, column).extend(data.get(column, []))
+        return tier
+
+
+class LearningHistory:
+    """
+    Columnar history of dimension readings with tiered downsampling.
+
+    len() is the number of readings ever recorded; indexing and iteration
+    return the raw (recent) readings as DimensionReading objects.
+    """
+
+    __slots__ = ("ts", "dimension", "value", "change", "source",
+                 "sources", "_source_ids", "daily", "weekly", "total")
+
+    def __init__(self):
+        # Raw tier (parallel columns)
+        self.ts = array("d")
+        self.dimension = array("b")
+        self.value = array("b")
+        self.change = array("b")
+        self.source = array("I")
+
+        # Interned source strings; source column holds indexes
+        self.sources: List[str] = []
+        self._source_ids: Dict[str, int] = {}
+
+        self.daily = AggregateTier()
+        self.weekly = AggregateTier()
+        self.total = 0
+
+    def append(
+        self,
+        dimension: LearningDimension,
+        value: int,
+        change: int,
+        source: str = "",
+        timestamp: Optional[float] = None
+    ) -> None:
+        """
+        Record a reading (timestamps must not go backwards).
+
+        Args:
+            dimension: Dimension changed
+            value: New value (1-10)
+            change: Change from previous value
+            source: Source of change
+            timestamp: Epoch seconds (default: now)
+        """
+        ts = timestamp if timestamp is not None else datetime.now().timestamp()
+
+        self.ts.append(ts)
+        self.dimension.append(DIMENSION_INDEX[dimension])
+        self.value.append(value)
+        self.change.append(change)
+        self.source.append(self._intern(source))
+        self.total += 1
+
+        if len(self.ts) > RAW_HISTORY_LIMIT or self.ts[0] < ts - (RAW_HISTORY_DAYS + 1) * DAY_SECONDS:
+            self._downsample(ts)
+
+    def _intern(self, source: str) -> int:
+        source_id = self._source_ids.get(source)
+        if source_id is None:
+            source_id = self._source_ids[source] = len(self.sources)
+            self.sources.append(sys.intern(source))
+        return source_id
+
+    def _downsample(self, now: float) -> None:
+        """Move old raw readings to daily aggregates and old days to weeks."""
+        end = max(
+            bisect_left(self.ts, now - RAW_HISTORY_DAYS * DAY_SECONDS),
+            len(self.ts) - RAW_HISTORY_LIMIT // 2
+        )
+        for index in range(end):
+            change = self.change[index]
+            self.daily.add(
+                _day_start(self.ts[index]), self.dimension[index], self.value[index], change,
+                1, 1 if change > 0 else 0, 1 if change < 0 else 0
+            )
+        for column in (self.ts, self.dimension, self.value, self.change, self.source):
+            del column[:end]
+
+        for start, dimension, value, change, count, positive, negative in self.daily.pop_before(
+            now - DAILY_HISTORY_DAYS * DAY_SECONDS
+        ):
+            self.weekly.add(_week_start(start), dimension, value, change, count, positive, negative)
+
+        if len(self.sources) > 4 * RAW_HISTORY_LIMIT:
+            self._compact_sources()
+
+    def _compact_sources(self) -> None:
+        """Drop source strings no longer referenced by raw readings."""
+        used = sorted(set(self.source))
+        remap = {old: new for new, old in enumerate(used)}
+        self.sources = [self.sources[old] for old in used]
+        self._source_ids = {source: index for index, source in enumerate(self.sources)}
+        self.source = array("I", (remap[old] for old in self.source))
+
+    def __len__(self) -> int:
+        return self.total
+
+    def _reading(self, index: int) -> DimensionReading:
+        return DimensionReading(
+            dimension=DIMENSIONS[self.dimension[index]],
+            value=self.value[index],
+            change=self.change[index],
+            timestamp=datetime.fromtimestamp(self.ts[index]),
+            source=self.sources[self.source[index]]
+        )
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[DimensionReading, List[DimensionReading]]:
+        if isinstance(index, slice):
+            return [self._reading(i) for i in range(*index.indices(len(self.ts)))]
+        if index < 0:
+            index += len(self.ts)
+        if not 0 <= index < len(self.ts):
+            raise IndexError("history index out of range")
+        return self._reading(index)
+
+    def __iter__(self) -> Iterator[DimensionReading]:
+        return (self._reading(index) for index in range(len(self.ts)))
+
+    def recent_changes(self, count: int) -> array:
+        """Changes of the last count raw readings (no objects created)."""
+        return self.change[-count:]
+
+    def net_change(self, since: datetime) -> Dict[LearningDimension, int]:
+        """
+        Net change per dimension since a point in time.
+
+        Uses the raw tier and aggregates that start after since.
+
+        Args:
+            since: Start of the period
+
+        Returns:
+            {dimension: net change} for dimensions that changed
+        """
+        cutoff = since.timestamp()
+        totals = [0] * len(DIMENSIONS)
+
+        for tier in (self.weekly, self.daily):
+            for index in range(bisect_left(tier.start, cutoff), len(tier.start)):
+                totals[tier.dimension[index]] += tier.change[index]
+        for index in range(bisect_left(self.ts, cutoff), len(self.ts)):
+            totals[self.dimension[index]] += self.change[index]
+
+        return {DIMENSIONS[index]: total for index, total in enumerate(totals) if total}
+
+    def aggregates(self) -> List[DimensionAggregate]:
+        """Downsampled history, oldest first (weekly, then daily)."""
+        return self.weekly.entries() + self.daily.entries()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Columnar form for JSON (only referenced sources are kept)."""
+        if not self.total:
+            return {}
+
+        used = sorted(set(self.source))
+        remap = {old: new for new, old in enumerate(used)}
+        return {
+            "total": self.total,
+            "sources": [self.sources[old] for old in used],
+            "raw": {
+                "ts": [round(ts, 3) for ts in self.ts],
+                "dimension": self.dimension.tolist(),
+                "value": self.value.tolist(),
+                "change": self.change.tolist(),
+                "source": [remap[old] for old in self.source]
+            },
+            "daily": self.daily.to_dict(),
+            "weekly": self.weekly.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "LearningHistory":
+        """Restore history saved by to_dict."""
+        history = cls()
+        if not data:
+            return history
+
+        raw = data.get("raw", {})
+        history.ts.extend(raw.get("ts", []))
+        history.dimension.extend(raw.get("dimension", []))
+        history.value.extend(raw.get("value", []))
+        history.change.extend(raw.get("change", []))
+        history.source.extend(raw.get("source", []))
+        history.sources = [sys.intern(source) for source in data.get("sources", [])]
+        history._source_ids = {source: index for index, source in enumerate(history.sources)}
+        history.daily = AggregateTier.from_dict(data.get("daily", {}))
+        history.weekly = AggregateTier.from_dict(data.get("weekly", {}))
+        history.total = data.get("total", len(history.ts))
+        return history
+
+
+class LearningStats:
+    """
+    Running statistics of dimension changes, updated in O(1) per reading.
+
+    - recent: last RECENT_CHANGES changes, with positive/negative counts
+    - ewma: per-dimension EWMA of the value
+    - slope: per-dimension EWMA of the change per reading (trend)
+    - streak: per-dimension run of same-sign changes (+n rising, -n falling);
+      zero changes (clamped at 1 or 10) leave it unchanged
+    - week: net change per dimension for each of the last WEEK_DAYS days,
+      a ring of day buckets
+    """
+
+    __slots__ = ("readings", "recent", "positive", "negative",
+                 "count", "ewma", "slope", "streak", "day", "week")
+
+    def __init__(self):
+        self.readings = 0
+        self.recent: Deque[int] = deque(maxlen=RECENT_CHANGES)
+        self.positive = 0
+        self.negative = 0
+
+        # Per dimension
+        self.count = [0] * len(DIMENSIONS)
+        self.ewma = [0.0] * len(DIMENSIONS)
+        self.slope = [0.0] * len(DIMENSIONS)
+        self.streak = [0] * len(DIMENSIONS)
+
+        # Day ordinal and net change per dimension of each bucket
+        self.day = [0] * WEEK_DAYS
+        self.week = [[0] * len(DIMENSIONS) for _ in range(WEEK_DAYS)]
+
+    def record(
+        self,
+        dimension: LearningDimension,
+        value: int,
+        change: int,
+        timestamp: Optional[float] = None
+    ) -> None:
+        """
+        Add a reading.
+
+        Args:
+            dimension: Dimension changed
+            value: New value (1-10)
+            change: Change from previous value
+            timestamp: Epoch seconds (default: now)
+        """
+        index = DIMENSION_INDEX[dimension]
+        self.readings += 1
+
+        if len(self.recent) == RECENT_CHANGES:
+            evicted = self.recent[0]
+            self.positive -= 1 if evicted > 0 else 0
+            self.negative -= 1 if evicted < 0 else 0
+        self.recent.append(change)
+        self.positive += 1 if change > 0 else 0
+        self.negative += 1 if change < 0 else 0
+
+        if self.count[index]:
+            self.ewma[index] += EWMA_ALPHA * (value - self.ewma[index])
+            self.slope[index] += EWMA_ALPHA * (change - self.slope[index])
+        else:
+            self.ewma[index] = float(value)
+            self.slope[index] = float(change)
+        self.count[index] += 1
+
+        if change:
+            sign = 1 if change > 0 else -1
+            streak = self.streak[index]
+            self.streak[index] = streak + sign if streak * sign > 0 else sign
+
+        ts = timestamp if timestamp is not None else datetime.now().timestamp()
+        day = datetime.fromtimestamp(ts).toordinal()
+        slot = day % WEEK_DAYS
+        if self.day[slot] != day:
+            if day < self.day[slot]:
+                return  # Older than the week kept
+            self.day[slot] = day
+            self.week[slot] = [0] * len(DIMENSIONS)
+        self.week[slot][index] += change
+
+    def week_change(self, today: Optional[datetime] = None) -> Dict[LearningDimension, int]:
+        """
+        Net change per dimension over the last WEEK_DAYS days (today included).
+
+        Returns:
+            {dimension: net change} for dimensions that changed
+        """
+        end = (today or datetime.now()).toordinal()
+        totals = [0] * len(DIMENSIONS)
+        for day, changes in zip(self.day, self.week):
+            if end - WEEK_DAYS < day <= end:
+                totals = [total + change for total, change in zip(totals, changes)]
+        return {DIMENSIONS[index]: total for index, total in enumerate(totals) if total}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain form for JSON."""
+        if not self.readings:
+            return {}
+        return {
+            "readings": self.readings,
+            "recent": list(self.recent),
+            "count": self.count,
+            "ewma": [round(value, 4) for value in self.ewma],
+            "slope": [round(value, 4) for value in self.slope],
+            "streak": self.streak,
+            "day": self.day,
+            "week": self.week
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LearningStats":
+        """Restore statistics saved by to_dict."""
+        stats = cls()
+        stats.readings = data.get("readings", 0)
+        stats.recent.extend(data.get("recent", []))
+        stats.positive = sum(1 for change in stats.recent if change > 0)
+        stats.negative = sum(1 for change in stats.recent if change < 0)
+        for name in ("count", "ewma", "slope", "streak", "day"):
+            getattr(stats, name)[:] = data.get(name, getattr(stats, name))
+        stats.week = [list(changes) for changes in data.get("week", stats.week)]
+        return stats
+
+    @classmethod
+    def from_history(cls, history: "LearningHistory") -> "LearningStats":
+        """Rebuild statistics from the raw readings (profiles saved before stats)."""
+        stats = cls()
+        for index in range(len(history.ts)):
+            stats.record(DIMENSIONS[history.dimension[index]], history.value[index],
+                         history.change[index], history.ts[index])
+        return stats
+
+
 @dataclass
 class LearningProfile:
     """
@@ -51,8 +515,11 @@ class LearningProfile:
     attention: int = 5
     motivation: int = 5
 
-    # History of changes
-    history: List[DimensionReading] = field(default_factory=list)
+    # History of changes (columnar, downsampled)
+    history: LearningHistory = field(default_factory=LearningHistory)
+
+    # Running statistics of changes (O(1) reads for the analyzer)
+    stats: LearningStats = field(default_factory=LearningStats)
 
     def get_dimension(self, dimension: LearningDimension) -> int:
         """Get current value for a dimension."""
@@ -78,13 +545,9 @@ class LearningProfile:
         setattr(self, dimension.value, value)
 
         # Record change
-        reading = DimensionReading(
-            dimension=dimension,
-            value=value,
-            change=change,
-            source=source
-        )
-        self.history.append(reading)
+        now = datetime.now().timestamp()
+        self.history.append(dimension, value, change, source, timestamp=now)
+        self.stats.record(dimension, value, change, now)
 
     def adjust_dimension(
         self,
@@ -142,9 +605,26 @@ class LearningProfile:
             "motivation": self.motivation,
             "average": self.get_average_score(),
             "weakest": self.get_weakest_dimension().value,
-            "strongest": self.get_strongest_dimension().value
+            "strongest": self.get_strongest_dimension().value,
+            "history": self.history.to_dict(),
+            "stats": self.stats.to_dict()
         }
 
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "LearningProfile":
+        """Restore profile from to_dict() output (missing fields use defaults)."""
+        data = data or {}
+        history = LearningHistory.from_dict(data.get("history"))
+        stats = LearningStats.from_dict(data["stats"]) if data.get("stats") else LearningStats.from_history(history)
+        return cls(
+            understanding_meaning=data.get("understanding_meaning", 5),
+            memory=data.get("memory", 5),
+            attention=data.get("attention", 5),
+            motivation=data.get("motivation", 5),
+            history=history,
+            stats=stats
+        )
+
 
 class LearningProfileAnalyzer:
     """
@@ -186,12 +666,33 @@ class LearningProfileAnalyzer:
         ]
     }
 
+    @staticmethod
+    def route(profile: LearningProfile, emotion: Optional[str] = None, quests_completed: int = 0):
+        """
+        Look up the location routing index for a profile.
+
+        Args:
+            profile: Learning profile
+            emotion: EmotionalState value (None: learning focus only)
+            quests_completed: Completed quests (unlock conditions)
+
+        Returns:
+            LocationRoute (empty if location metadata is unavailable)
+        """
+        return get_location_index().route(
+            emotion=emotion,
+            weakest=profile.get_weakest_dimension().value,
+            profile={dimension.value: profile.get_dimension(dimension) for dimension in DIMENSIONS},
+            quests_completed=quests_completed
+        )
+
     @staticmethod
     def recommend_location(profile: LearningProfile) -> str:
         """
         Recommend starting location based on learning profile.
 
-        Targets weakest dimension first.
+        Targets weakest dimension first, among unlocked locations
+        (DIMENSION_TO_LOCATION if location metadata is unavailable).
 
         Args:
             profile: Learning profile
@@ -199,14 +700,19 @@ class LearningProfileAnalyzer:
         Returns:
             Location ID
         """
-        weakest = profile.get_weakest_dimension()
-        return LearningProfileAnalyzer.DIMENSION_TO_LOCATION[weakest]
+        route = LearningProfileAnalyzer.route(profile)
+        if route.locations:
+            return route.locations[0]
+        return LearningProfileAnalyzer.DIMENSION_TO_LOCATION[profile.get_weakest_dimension()]
 
     @staticmethod
     def recommend_modules(profile: LearningProfile, count: int = 3) -> List[int]:
         """
         Recommend modules to work on based on profile.
 
+        Modules of the recommended location (DIMENSION_TO_MODULES if
+        location metadata is unavailable).
+
         Args:
             profile: Learning profile
             count: Number of modules to recommend
@@ -214,9 +720,10 @@ class LearningProfileAnalyzer:
         Returns:
             List of module IDs
         """
-        weakest = profile.get_weakest_dimension()
-        modules = LearningProfileAnalyzer.DIMENSION_TO_MODULES[weakest]
-        return modules[:count]
+        modules = LearningProfileAnalyzer.route(profile).modules
+        if not modules:
+            modules = LearningProfileAnalyzer.DIMENSION_TO_MODULES[profile.get_weakest_dimension()]
+        return list(modules[:count])
 
     @staticmethod
     def get_difficulty_level(profile: LearningProfile) -> str:
@@ -241,7 +748,7 @@ class LearningProfileAnalyzer:
     @staticmethod
     def detect_learning_pattern(profile: LearningProfile) -> Dict[str, Any]:
         """
-        Detect learning patterns from profile history.
+        Detect learning patterns from running statistics (constant time).
 
         Args:
             profile: Learning profile
@@ -249,19 +756,17 @@ class LearningProfileAnalyzer:
         Returns:
             Dictionary with pattern analysis
         """
-        if len(profile.history) < 5:
+        stats = profile.stats
+        if stats.readings < 5:
             return {
                 "pattern": "insufficient_data",
                 "trend": "neutral",
                 "concern": False
             }
 
-        # Analyze recent changes (last 10 readings)
-        recent = profile.history[-10:]
-
-        # Count positive vs negative changes
-        positive = sum(1 for r in recent if r.change > 0)
-        negative = sum(1 for r in recent if r.change < 0)
+        # Positive vs negative changes among the last RECENT_CHANGES readings
+        positive = stats.positive
+        negative = stats.negative
 
         # Determine trend
         if positive > negative * 1.5:
@@ -301,7 +806,9 @@ class LearningProfileAnalyzer:
             "positive_changes": positive,
             "negative_changes": negative,
             "average_score": profile.get_average_score(),
-            "weakest_dimension": profile.get_weakest_dimension().value
+            "weakest_dimension": profile.get_weakest_dimension().value,
+            "slopes": {d.value: round(stats.slope[i], 2) for i, d in enumerate(DIMENSIONS) if stats.count[i]},
+            "streaks": {d.value: stats.streak[i] for i, d in enumerate(DIMENSIONS) if stats.streak[i]}
         }
 
     @staticmethod
@@ -319,16 +826,8 @@ class LearningProfileAnalyzer:
         weakest = profile.get_weakest_dimension()
         strongest = profile.get_strongest_dimension()
 
-        # Translate dimension names
-        dimension_names = {
-            LearningDimension.UNDERSTANDING_MEANING: "понимание смысла",
-            LearningDimension.MEMORY: "память",
-            LearningDimension.ATTENTION: "внимание",
-            LearningDimension.MOTIVATION: "мотивация"
-        }
-
-        weakest_name = dimension_names[weakest]
-        strongest_name = dimension_names[strongest]
+        weakest_name = DIMENSION_NAMES[weakest]
+        strongest_name = DIMENSION_NAMES[strongest]
 
         # Generate summary
         if avg >= 7:
@@ -341,6 +840,14 @@ class LearningProfileAnalyzer:
         summary += f"\n\nСильная сторона: {strongest_name} ({profile.get_dimension(strongest)}/10)"
         summary += f"\nНад чем поработаем: {weakest_name} ({profile.get_dimension(weakest)}/10)"
 
+        # Changes over the last week
+        week = profile.stats.week_change()
+        if week:
+            changes = ", ".join(
+                f"{DIMENSION_NAMES[dimension]} {change:+d}" for dimension, change in week.items()
+            )
+            summary += f"\nЗа неделю: {changes}"
+
         return summary
 
     @staticmethod
@@ -0,0 +1,697 @@
+"""
+Sharded runtime for InnerWorld Edu.
+
+Spreads StateManager across N worker processes so that the bot is not
+capped at one core:
+
+    Telegram update → ShardedRuntime (dispatcher)
+                    → HashRing(user_id) → worker process k
+                    → StateManager.process_message → reply
+
+Each worker owns the users that hash to it on a consistent hash ring:
+their UserState, emotional routers, quest progress and Reality Bridge
+reminders. Each worker talks to the dispatcher over its own duplex pipe
+(a Unix socket pair), so a crashed worker cannot wedge the others. A worker
+handles its users' messages concurrently (one task per message), one
+message per user at a time.
+
+When a worker dies its users move to the neighbouring ring points until the
+worker is restarted, then move back. Every membership change is broadcast
+with an epoch number, and each worker releases users it no longer owns
+(saving them first), so a user's reminders are scheduled by exactly one
+worker at a time.
+
+Workers do not talk to Telegram themselves: Reality Bridge reminders go
+back over the pipe and out through the dispatcher's OutboundSender, so all
+processes share one set of flood-limit token buckets.
+
+Note: quest progress is held in memory by QuestEngine, so an in-flight
+quest restarts when its user moves to another worker.
+"""
+
+import asyncio
+import bisect
+import contextlib
+import functools
+import hashlib
+import itertools
+import multiprocessing as mp
+import threading
+from multiprocessing.connection import Connection, wait
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Set, Any
+
+from src.bot.outbound import Priority
+from src.core.logger import get_logger
+from src.config import (
+    SHARD_WORKERS,
+    SHARD_VIRTUAL_NODES,
+    SHARD_HEALTH_INTERVAL_SECONDS,
+    SHARD_REQUEST_TIMEOUT_SECONDS,
+    SHARD_READY_TIMEOUT_SECONDS
+)
+
+logger = get_logger(__name__)
+
+
+def _ring_hash(key: str) -> int:
+    """Stable 64-bit hash (same value in every process, unlike hash())."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping user IDs to worker IDs.
+
+    Each worker is placed on the ring at `virtual_nodes` points, so removing
+    one worker only moves the users that were on its points.
+    """
+
+    def __init__(self, workers: List[int], virtual_nodes: int = SHARD_VIRTUAL_NODES):
+        """
+        Initialize hash ring.
+
+        Args:
+            workers: Worker IDs currently in the ring
+            virtual_nodes: Number of ring points per worker
+        """
+        self.virtual_nodes = virtual_nodes
+        self.workers = sorted(set(workers))
+
+        points = []
+        for worker_id in self.workers:
+            for replica in range(virtual_nodes):
+                points.append((_ring_hash(f"worker-{worker_id}-{replica}"), worker_id))
+        points.sort()
+
+        self._hashes = [point for point, _ in points]
+        self._owners = [owner for _, owner in points]
+
+    def get_worker(self, user_id: str) -> int:
+        """
+        Get worker that owns user.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Worker ID
+
+        Raises:
+            ValueError: If ring has no workers
+        """
+        if not self._hashes:
+            raise ValueError("Hash ring has no workers")
+
+        index = bisect.bisect(self._hashes, _ring_hash(str(user_id)))
+        if index == len(self._hashes):
+            index = 0
+        return self._owners[index]
+
+    def owns(self, worker_id: int, user_id: str) -> bool:
+        """Check if worker owns user."""
+        return self.get_worker(user_id) == worker_id
+
+
+class _OwnershipFilter:
+    """Ownership predicate for a worker's StateManager."""
+
+    def __init__(self, worker_id: int, ring: HashRing):
+        self.worker_id = worker_id
+        self.ring = ring
+
+    def __call__(self, user_id: str) -> bool:
+        if not self.ring.workers:
+            return False
+        return self.ring.owns(self.worker_id, user_id)
+
+
+class _UserLocks:
+    """Per-user asyncio locks, dropped once no message of the user is waiting."""
+
+    def __init__(self):
+        self._locks: Dict[str, List[Any]] = {}  # user_id -> [lock, holders]
+
+    @contextlib.asynccontextmanager
+    async def hold(self, user_id: str) -> AsyncIterator[None]:
+        entry = self._locks.get(user_id)
+        if entry is None:
+            entry = self._locks[user_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[user_id]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    """Mark a failed future's error as seen (the dispatcher logs send failures)."""
+    if not future.cancelled():
+        future.exception()
+
+
+class _PipeSender:
+    """
+    Worker-side stand-in for OutboundSender.
+
+    Messages are sent to the dispatcher process, which delivers them through
+    its OutboundSender and reports one error (or None) per message back.
+    """
+
+    def __init__(self, worker_id: int, conn: Connection):
+        self.worker_id = worker_id
+        self.conn = conn
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, List[asyncio.Future]] = {}  # outbound_id -> futures
+
+    def submit(self, chat_id: Any, text: str, priority: Priority = Priority.LIVE, **kwargs: Any) -> asyncio.Future:
+        """Enqueue one message (see OutboundSender.submit)."""
+        return self.submit_batch([(chat_id, text)], priority, **kwargs)[0]
+
+    def submit_batch(self, messages: List[Any], priority: Priority = Priority.REMINDER,
+                     **kwargs: Any) -> List[asyncio.Future]:
+        """Enqueue a batch (see OutboundSender.submit_batch)."""
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in messages]
+        for future in futures:
+            future.add_done_callback(_retrieve_exception)
+
+        outbound_id = next(self._ids)
+        try:
+            self.conn.send({
+                "type": "outbound",
+                "outbound_id": outbound_id,
+                "worker_id": self.worker_id,
+                "messages": list(messages),
+                "priority": int(priority),
+                "kwargs": kwargs
+            })
+        except (OSError, ValueError) as e:
+            for future in futures:
+                future.set_exception(RuntimeError(f"Dispatcher unavailable: {e}"))
+            return futures
+
+        self._pending[outbound_id] = futures
+        return futures
+
+    def resolve(self, item: Dict[str, Any]) -> None:
+        """Complete a batch's futures from the dispatcher's outbound_result."""
+        for future, error in zip(self._pending.pop(item["outbound_id"], ()), item["errors"]):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(RuntimeError(error))
+
+
+async def _serve_worker(worker_id: int, conn: Connection, state_manager: Any,
+                        virtual_nodes: int, worker_logger: Any,
+                        sender: Optional[_PipeSender] = None) -> None:
+    """
+    Worker request loop.
+
+    Each message runs as its own task, so one slow LLM call does not hold up
+    other users; a user's messages still run one at a time, in arrival order.
+    """
+    loop = asyncio.get_running_loop()
+    user_locks = _UserLocks()
+    tasks: Set[asyncio.Task] = set()
+
+    async def handle_message(item: Dict[str, Any]) -> None:
+        reply = {"type": "reply", "request_id": item["request_id"], "worker_id": worker_id}
+        try:
+            async with user_locks.hold(item["user_id"]):
+                reply["response"] = await state_manager.process_message(item["user_id"], item["text"])
+        except Exception as e:
+            reply["error"] = str(e)
+        try:
+            conn.send(reply)
+        except (OSError, ValueError):
+            pass  # Dispatcher went away
+
+    while True:
+        try:
+            item = await loop.run_in_executor(None, conn.recv)
+        except (EOFError, OSError):
+            break  # Dispatcher went away
+
+        kind = item["type"]
+
+        if kind == "stop":
+            break
+
+        if kind == "outbound_result":
+            if sender:
+                sender.resolve(item)
+            continue
+
+        if kind == "membership":
+            # Finish in-flight messages so released users are saved with their last turn
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            ring = HashRing(item["members"], virtual_nodes)
+            released = await state_manager.apply_ownership(
+                _OwnershipFilter(worker_id, ring)
+            )
+            worker_logger.info("shard_membership_applied",
+                               epoch=item["epoch"],
+                               members=item["members"],
+                               released=len(released))
+            continue
+
+        if kind == "message":
+            # Locks are taken in creation order, which keeps per-user ordering
+            task = loop.create_task(handle_message(item))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _worker_main(worker_id: int, conn: Connection,
+                 members: List[int], virtual_nodes: int) -> None:
+    """
+    Worker process entry point.
+
+    Runs its own event loop with a StateManager restricted to owned users.
+    """
+    from src.core.logger import setup_logging
+    from src.core.metrics import start_metrics_server, start_event_loop_monitor
+    from src.core.watchdog import start_watchdog
+    from src.core.profiler import install_profile_signal
+    from src.config import LOG_LEVEL, METRICS_ENABLED, METRICS_PORT
+    from src.orchestration.state_manager import StateManager
+
+    setup_logging(LOG_LEVEL)
+    worker_logger = get_logger(__name__, worker_id=worker_id)
+
+    async def run() -> None:
+        if METRICS_ENABLED and METRICS_PORT:
+            # Each worker has its own registry: scrape PORT + 1 + worker_id
+            try:
+                start_metrics_server(port=METRICS_PORT + 1 + worker_id)
+            except OSError as e:
+                worker_logger.warning("shard_metrics_server_failed", error=str(e))
+            start_event_loop_monitor()
+        start_watchdog()
+        install_profile_signal()  # kill -USR1 <worker pid>
+        state_manager = StateManager(
+            owner_filter=_OwnershipFilter(worker_id, HashRing(members, virtual_nodes))
+        )
+        sender = _PipeSender(worker_id, conn)
+        state_manager.set_outbound_sender(sender)
+        await state_manager.initialize()
+        conn.send({"type": "ready", "worker_id": worker_id})
+        worker_logger.info("shard_worker_ready", members=members)
+
+        await _serve_worker(worker_id, conn, state_manager, virtual_nodes, worker_logger, sender)
+
+        if state_manager.reality_bridge_manager:
+            await state_manager.reality_bridge_manager.shutdown()
+        if state_manager.link_manager:
+            await state_manager.link_manager.shutdown()
+        if state_manager.parent_dashboards:
+            await state_manager.parent_dashboards.shutdown()
+        worker_logger.info("shard_worker_stopped")
+
+    asyncio.run(run())
+
+
+@dataclass
+class _WorkerHandle:
+    """Dispatcher-side view of a worker process."""
+    worker_id: int
+    process: Optional[mp.Process] = None
+    conn: Optional[Connection] = None
+    ready: bool = False
+    restarts: int = 0
+    in_flight: Dict[int, str] = field(default_factory=dict)  # request_id -> user_id
+
+
+class ShardedRuntime:
+    """
+    Front dispatcher for the sharded bot runtime.
+
+    Routes each message to the worker that owns its user, restarts dead
+    workers and rebalances the ring around them.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = SHARD_WORKERS,
+        virtual_nodes: int = SHARD_VIRTUAL_NODES,
+        health_interval: float = SHARD_HEALTH_INTERVAL_SECONDS,
+        request_timeout: float = SHARD_REQUEST_TIMEOUT_SECONDS,
+        ready_timeout: float = SHARD_READY_TIMEOUT_SECONDS
+    ):
+        """
+        Initialize sharded runtime.
+
+        Args:
+            num_workers: Number of worker processes
+            virtual_nodes: Ring points per worker
+            health_interval: Seconds between worker liveness checks
+            request_timeout: Seconds to wait for a worker reply
+            ready_timeout: Seconds a restarted worker gets to become ready
+                before it is killed and restarted again
+        """
+        if num_workers < 1:
+            raise ValueError("num_workers must be >= 1")
+
+        self.num_workers = num_workers
+        self.virtual_nodes = virtual_nodes
+        self.health_interval = health_interval
+        self.request_timeout = request_timeout
+        self.ready_timeout = ready_timeout
+
+        self._ctx = mp.get_context("spawn")
+        self._workers: Dict[int, _WorkerHandle] = {
+            worker_id: _WorkerHandle(worker_id=worker_id)
+            for worker_id in range(num_workers)
+        }
+        self._ring = HashRing([], virtual_nodes)
+        self._epoch = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._request_ids = itertools.count(1)
+        self._reader: Optional[threading.Thread] = None
+        self._supervisor: Optional[asyncio.Task] = None
+        self._rejoin_tasks: Dict[int, asyncio.Task] = {}  # worker_id -> task
+        self._ready_events: Dict[int, asyncio.Event] = {}
+        self._outbound_tasks: Set[asyncio.Task] = set()
+        self.outbound_sender = None
+        self.running = False
+
+    async def start(self) -> None:
+        """Start all worker processes and wait until they are ready."""
+        self._loop = asyncio.get_running_loop()
+        self.running = True
+
+        members = list(self._workers)
+        for worker_id in members:
+            self._spawn(worker_id, members)
+
+        self._reader = threading.Thread(
+            target=self._read_replies, name="shard-reader", daemon=True
+        )
+        self._reader.start()
+
+        await asyncio.gather(*(
+            self._ready_events[worker_id].wait() for worker_id in members
+        ))
+
+        self._ring = HashRing(members, self.virtual_nodes)
+        self._supervisor = asyncio.create_task(self._supervise())
+
+        logger.info("sharded_runtime_started", workers=self.num_workers)
+
+    async def stop(self) -> None:
+        """Stop workers gracefully."""
+        self.running = False
+
+        if self._supervisor:
+            self._supervisor.cancel()
+        for task in self._rejoin_tasks.values():
+            task.cancel()
+
+        for handle in self._workers.values():
+            if handle.process and handle.process.is_alive():
+                self._send(handle, {"type": "stop"})
+
+        for handle in self._workers.values():
+            if handle.process:
+                await asyncio.to_thread(handle.process.join, 10)
+                if handle.process.is_alive():
+                    handle.process.terminate()
+
+        if self._reader:
+            await asyncio.to_thread(self._reader.join, 5)
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Sharded runtime stopped"))
+        self._pending.clear()
+
+        logger.info("sharded_runtime_stopped")
+
+    def set_outbound_sender(self, sender) -> None:
+        """
+        Set OutboundSender delivering messages the workers produce (reminders).
+
+        Args:
+            sender: src.bot.outbound.OutboundSender
+        """
+        self.outbound_sender = sender
+
+    def get_worker_for_user(self, user_id: str) -> int:
+        """Get worker currently owning user."""
+        return self._ring.get_worker(str(user_id))
+
+    async def process_message(self, user_id: str, message: str) -> str:
+        """
+        Route message to the owning worker and wait for its reply.
+
+        Args:
+            user_id: User ID
+            message: User message
+
+        Returns:
+            Bot response
+
+        Raises:
+            RuntimeError: If no worker is available, or the worker failed or
+                died while processing
+            asyncio.TimeoutError: If no reply within request_timeout
+        """
+        if not self.running:
+            raise RuntimeError("Sharded runtime is not running")
+        if not self._ring.workers:
+            raise RuntimeError("No shard workers available (restarting)")
+
+        user_id = str(user_id)
+        worker_id = self._ring.get_worker(user_id)
+        handle = self._workers[worker_id]
+
+        request_id = next(self._request_ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = future
+        handle.in_flight[request_id] = user_id
+
+        try:
+            if not self._send(handle, {
+                "type": "message",
+                "request_id": request_id,
+                "user_id": user_id,
+                "text": message
+            }):
+                raise RuntimeError(f"Shard worker {worker_id} is unavailable")
+
+            return await asyncio.wait_for(future, self.request_timeout)
+        finally:
+            self._pending.pop(request_id, None)
+            handle.in_flight.pop(request_id, None)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get runtime statistics.
+
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            "workers": self.num_workers,
+            "live_workers": len(self._ring.workers),
+            "epoch": self._epoch,
+            "pending_requests": len(self._pending),
+            "restarts": {
+                worker_id: handle.restarts
+                for worker_id, handle in self._workers.items()
+            }
+        }
+
+    def _spawn(self, worker_id: int, members: List[int]) -> None:
+        """Start (or restart) worker process."""
+        handle = self._workers[worker_id]
+        if handle.conn:
+            handle.conn.close()
+
+        parent_conn, child_conn = self._ctx.Pipe(duplex=True)
+        handle.conn = parent_conn
+        handle.ready = False
+        self._ready_events[worker_id] = asyncio.Event()
+
+        handle.process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, child_conn, members, self.virtual_nodes),
+            name=f"shard-worker-{worker_id}",
+            daemon=True
+        )
+        handle.process.start()
+        child_conn.close()
+        logger.info("shard_worker_spawned", worker_id=worker_id, pid=handle.process.pid)
+
+    def _send(self, handle: _WorkerHandle, item: Dict[str, Any]) -> bool:
+        """Send item to worker. Returns False if its pipe is broken."""
+        try:
+            handle.conn.send(item)
+            return True
+        except (OSError, ValueError) as e:
+            logger.warning("shard_send_failed", worker_id=handle.worker_id, error=str(e))
+            return False
+
+    def _broadcast_membership(self) -> None:
+        """Send current ring membership to all live workers."""
+        self._epoch += 1
+        members = list(self._ring.workers)
+
+        for worker_id in members:
+            self._send(self._workers[worker_id], {
+                "type": "membership",
+                "epoch": self._epoch,
+                "members": members
+            })
+
+        logger.info("shard_membership_changed", epoch=self._epoch, members=members)
+
+    async def _supervise(self) -> None:
+        """Restart dead workers and rebalance the ring around them."""
+        while self.running:
+            await asyncio.sleep(self.health_interval)
+
+            for worker_id, handle in self._workers.items():
+                if handle.process.is_alive():
+                    continue
+
+                logger.error("shard_worker_died",
+                             worker_id=worker_id,
+                             exitcode=handle.process.exitcode,
+                             in_flight=len(handle.in_flight),
+                             restarting=worker_id not in self._ring.workers)
+
+                if worker_id in self._ring.workers:
+                    # Move its users to neighbouring workers while it restarts
+                    self._ring = HashRing(
+                        [w for w in self._ring.workers if w != worker_id],
+                        self.virtual_nodes
+                    )
+                    if self._ring.workers:
+                        self._broadcast_membership()
+                else:
+                    # Died again before rejoining: replace the pending rejoin
+                    task = self._rejoin_tasks.pop(worker_id, None)
+                    if task:
+                        task.cancel()
+
+                for request_id in list(handle.in_flight):
+                    future = self._pending.get(request_id)
+                    if future and not future.done():
+                        future.set_exception(
+                            RuntimeError(f"Shard worker {worker_id} died")
+                        )
+                handle.in_flight.clear()
+
+                # Restarted worker owns nothing until it rejoins the ring,
+                # so its users never have two reminder owners
+                handle.restarts += 1
+                self._spawn(worker_id, list(self._ring.workers))
+                task = asyncio.create_task(self._rejoin(worker_id))
+                self._rejoin_tasks[worker_id] = task
+                task.add_done_callback(functools.partial(self._rejoin_done, worker_id))
+
+    def _rejoin_done(self, worker_id: int, task: asyncio.Task) -> None:
+        """Forget a finished rejoin task (unless it was already replaced)."""
+        if self._rejoin_tasks.get(worker_id) is task:
+            del self._rejoin_tasks[worker_id]
+
+    async def _rejoin(self, worker_id: int) -> None:
+        """Add restarted worker back to the ring once it is ready."""
+        try:
+            await asyncio.wait_for(self._ready_events[worker_id].wait(), self.ready_timeout)
+        except asyncio.TimeoutError:
+            # Hung during startup: kill it, the supervisor restarts it
+            logger.error("shard_worker_ready_timeout", worker_id=worker_id, timeout=self.ready_timeout)
+            self._workers[worker_id].process.kill()
+            return
+        self._ring = HashRing(self._ring.workers + [worker_id], self.virtual_nodes)
+        self._broadcast_membership()
+        logger.info("shard_worker_rejoined", worker_id=worker_id)
+
+    def _read_replies(self) -> None:
+        """Background thread: deliver worker messages to the event loop."""
+        # Connections whose worker died. Held by object, not id(): a restart
+        # closes the old pipe and CPython reuses its id for the new one.
+        closed: Set[Connection] = set()
+
+        while self.running:
+            conns = [
+                handle.conn for handle in self._workers.values()
+                if handle.conn is not None
+            ]
+            closed.intersection_update(conns)
+
+            try:
+                ready = wait([conn for conn in conns if conn not in closed], timeout=0.5)
+            except (OSError, ValueError):
+                continue  # A pipe was closed by _spawn meanwhile
+
+            for conn in ready:
+                try:
+                    item = conn.recv()
+                except (EOFError, OSError, ValueError):
+                    closed.add(conn)  # Worker died; supervisor restarts it
+                    continue
+
+                self._loop.call_soon_threadsafe(self._handle_worker_message, item)
+
+    def _handle_worker_message(self, item: Dict[str, Any]) -> None:
+        """Handle message from worker on the event loop thread."""
+        if item["type"] == "ready":
+            worker_id = item["worker_id"]
+            self._workers[worker_id].ready = True
+            self._ready_events[worker_id].set()
+            return
+
+        if item["type"] == "outbound":
+            task = self._loop.create_task(self._send_outbound(item))
+            self._outbound_tasks.add(task)
+            task.add_done_callback(self._outbound_tasks.discard)
+            return
+
+        future = self._pending.get(item["request_id"])
+        if future is None or future.done():
+            return
+
+        if "error" in item:
+            future.set_exception(RuntimeError(item["error"]))
+        else:
+            future.set_result(item["response"])
+
+    async def _send_outbound(self, item: Dict[str, Any]) -> None:
+        """Send a worker's messages through the OutboundSender and report the results."""
+        if self.outbound_sender is None:
+            errors = ["No outbound sender"] * len(item["messages"])
+        else:
+            futures = self.outbound_sender.submit_batch(
+                item["messages"], Priority(item["priority"]), **item["kwargs"]
+            )
+            results = await asyncio.gather(*futures, return_exceptions=True)
+            errors = [
+                (str(result) or type(result).__name__) if isinstance(result, BaseException) else None
+                for result in results
+            ]
+
+        self._send(self._workers[item["worker_id"]], {
+            "type": "outbound_result",
+            "outbound_id": item["outbound_id"],
+            "errors": errors
+        })
@@ -11,18 +11,22 @@ Manages educational flow through Ponimaliya:
 Integrates OpenAI for natural language understanding.
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Callable, AsyncIterator
 from enum import Enum
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 import asyncio
+import time
 
 from langgraph.graph import StateGraph, END
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
 from langchain_openai import ChatOpenAI
 
 from src.core.logger import get_logger
+from src.core.tracing import get_tracer, hash_user_id
+from src.core.metrics import REGISTRY, CACHE_REQUESTS, LLM_BUCKETS
+from src.core.profiler import register_state
 from src.config import (
     EDUCATIONAL_MODULES,
     EDUCATIONAL_LOCATIONS,
@@ -34,11 +38,52 @@ from src.orchestration.emotional_router import EmotionalRouter, EmotionalState
 from src.orchestration.learning_profile import LearningProfile, LearningProfileAnalyzer, LearningDimension
 from src.data.user_manager import UserManager, ScreeningMetrics as UserScreeningMetrics
 from src.data.link_manager import LinkManager
+from src.data.parent_dashboard import ParentDashboardStore, summarize_child
 from src.game.quest_engine import QuestEngine
+from src.game.quest_recommender import QuestRecommender
 from src.game.reality_bridge_manager import RealityBridgeManager
 
 logger = get_logger(__name__)
 
+# Metrics
+MESSAGES_TOTAL = REGISTRY.counter(
+    "innerworld_messages_total", "Processed child messages", ["status"]
+)
+MESSAGE_SECONDS = REGISTRY.histogram(
+    "innerworld_message_duration_seconds", "process_message latency"
+)
+MESSAGE_STAGE_SECONDS = REGISTRY.histogram(
+    "innerworld_message_stage_seconds", "process_message latency by stage", ["stage"]
+)
+GRAPH_NODE_SECONDS = REGISTRY.histogram(
+    "innerworld_graph_node_seconds", "LangGraph node latency", ["node"]
+)
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "innerworld_llm_request_seconds", "LLM call latency", ["model", "mode"], buckets=LLM_BUCKETS
+)
+LLM_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "innerworld_llm_first_token_seconds", "Time to first streamed LLM token", ["model"],
+    buckets=LLM_BUCKETS
+)
+LLM_TOKENS = REGISTRY.counter(
+    "innerworld_llm_tokens_total", "LLM tokens used", ["model", "direction"]
+)
+LLM_ERRORS = REGISTRY.counter(
+    "innerworld_llm_errors_total", "Failed LLM calls", ["model"]
+)
+
+_MESSAGES_OK = MESSAGES_TOTAL.labels("ok")
+_MESSAGES_FAILED = MESSAGES_TOTAL.labels("error")
+_STAGE_SECONDS = {
+    stage: MESSAGE_STAGE_SECONDS.labels(stage)
+    for stage in ("load_user_state", "emotion_detection", "screening", "graph", "save_user_state")
+}
+_USER_STATE_HIT = CACHE_REQUESTS.labels("user_state", "hit")
+_USER_STATE_MISS = CACHE_REQUESTS.labels("user_state", "miss")
+
+# Graph nodes whose replies come from the LLM (streamed by the bot)
+LLM_NODES = frozenset({"onboarding", "casual_chat"})
+
 
 class ConversationState(str, Enum):
     """Conversation states for educational bot."""
@@ -75,6 +120,8 @@ class UserState:
     current_location: Optional[str] = None
     current_quest: Optional[str] = None
     quest_step: int = 0
+    completed_quests: List[str] = field(default_factory=list)
+    progress: Dict[str, Any] = field(default_factory=dict)  # UserProfile.progress (level, xp, streak)
 
     # Screening for therapeutic transition
     screening: ScreeningMetrics = field(default_factory=ScreeningMetrics)
@@ -91,13 +138,21 @@ class UserState:
     # Parent linking
     parent_linked: bool = False
     link_id: Optional[str] = None
+    parent_id: Optional[str] = None
 
 
 class StateManager:
     """Manages educational conversation states using LangGraph."""
 
-    def __init__(self):
-        """Initialize state manager."""
+    def __init__(self, owner_filter: Optional[Callable[[str], bool]] = None):
+        """
+        Initialize state manager.
+
+        Args:
+            owner_filter: Predicate(user_id) for users owned by this process
+                (sharded runtime). None means this process owns every user.
+        """
+        self.owner_filter = owner_filter
         self.user_states: Dict[str, UserState] = {}
         self.graph: Optional[StateGraph] = None
         self.llm: Optional[ChatOpenAI] = None
@@ -106,12 +161,17 @@ class StateManager:
         self.emotional_router: Optional[EmotionalRouter] = None
         self.user_manager: Optional[UserManager] = None
         self.link_manager: Optional[LinkManager] = None
+        self.parent_dashboards: Optional[ParentDashboardStore] = None
         self.quest_engine: Optional[QuestEngine] = None
+        self.quest_recommender: Optional[QuestRecommender] = None
         self.reality_bridge_manager: Optional[RealityBridgeManager] = None
 
         # Emotional router per user (tracks emotional history)
         self.user_emotional_routers: Dict[str, EmotionalRouter] = {}
 
+        # Rate-limited Telegram sender (set by the bot, see set_outbound_sender)
+        self.outbound_sender = None
+
         self.initialized = False
 
     async def initialize(self) -> None:
@@ -121,31 +181,49 @@ class StateManager:
             self.llm = ChatOpenAI(
                 model="gpt-4",
                 temperature=0.7,
-                max_tokens=500
+                max_tokens=500,
+                stream_usage=True  # Token counts for streamed replies (tracing)
             )
             logger.info("llm_initialized", model="gpt-4")
 
             # Initialize helper classes
             self.user_manager = UserManager()
-            self.link_manager = LinkManager()
+            self.link_manager = LinkManager(owner_filter=self.owner_filter)
             self.quest_engine = QuestEngine()
-            self.reality_bridge_manager = RealityBridgeManager()
+            self.reality_bridge_manager = RealityBridgeManager(owner_filter=self.owner_filter)
 
             # Load all quests
             quest_count = await self.quest_engine.load_all_quests()
             logger.info("quests_loaded", count=quest_count)
 
+            # Precompute quest vectors for recommendations
+            self.quest_recommender = QuestRecommender(self.quest_engine)
+            self.quest_recommender.build_index()
+
+            # Link TTL index and expiry sweeper
+            await self.link_manager.initialize()
+
+            # Parent dashboard read model, updated on every profile save
+            self.parent_dashboards = ParentDashboardStore()
+            await self.parent_dashboards.initialize()
+            self.user_manager.set_save_callback(self._update_parent_dashboard)
+            self.link_manager.set_revoke_callback(self._unlink_revoked_parent)
+
             # Initialize Reality Bridge Manager
             await self.reality_bridge_manager.initialize()
 
             # Set reminder callback to send messages to users
             self.reality_bridge_manager.set_reminder_callback(self._send_reality_bridge_reminder)
+            self.reality_bridge_manager.set_reminder_batch_callback(self._send_reality_bridge_reminders)
+            self.reality_bridge_manager.set_expiry_callback(self._on_reality_bridge_expired)
             logger.info("reality_bridge_manager_ready")
 
             # Build state graph
             self.graph = self._build_state_graph()
             logger.info("state_graph_built")
 
+            self._register_metrics()
+
             self.initialized = True
             logger.info("state_manager_initialized")
 
@@ -158,17 +236,17 @@ class StateManager:
         workflow = StateGraph(Dict[str, Any])
 
         # Add nodes
-        workflow.add_node("start", self._handle_start)
-        workflow.add_node("parent_linking", self._handle_parent_linking)
-        workflow.add_node("onboarding", self._handle_onboarding)
-        workflow.add_node("emotion_check", self._handle_emotion_check)
-        workflow.add_node("location_selection", self._handle_location_selection)
-        workflow.add_node("quest_active", self._handle_quest_active)
-        workflow.add_node("quest_reflection", self._handle_quest_reflection)
-        workflow.add_node("casual_chat", self._handle_casual_chat)
-        workflow.add_node("learning_support", self._handle_learning_support)
-        workflow.add_node("screening_check", self._handle_screening_check)
-        workflow.add_node("end_session", self._handle_end_session)
+        workflow.add_node("start", self._traced_node("start", self._handle_start))
+        workflow.add_node("parent_linking", self._traced_node("parent_linking", self._handle_parent_linking))
+        workflow.add_node("onboarding", self._traced_node("onboarding", self._handle_onboarding))
+        workflow.add_node("emotion_check", self._traced_node("emotion_check", self._handle_emotion_check))
+        workflow.add_node("location_selection", self._traced_node("location_selection", self._handle_location_selection))
+        workflow.add_node("quest_active", self._traced_node("quest_active", self._handle_quest_active))
+        workflow.add_node("quest_reflection", self._traced_node("quest_reflection", self._handle_quest_reflection))
+        workflow.add_node("casual_chat", self._traced_node("casual_chat", self._handle_casual_chat))
+        workflow.add_node("learning_support", self._traced_node("learning_support", self._handle_learning_support))
+        workflow.add_node("screening_check", self._traced_node("screening_check", self._handle_screening_check))
+        workflow.add_node("end_session", self._traced_node("end_session", self._handle_end_session))
 
         # Set entry point
         workflow.set_entry_point("start")
@@ -190,7 +268,7 @@ class StateManager:
             "onboarding",
             self._route_after_onboarding,
             {
-                "continue": "onboarding",
+                "continue": END,  # Wait for the child's next message
                 "complete": "location_selection"
             }
         )
@@ -202,6 +280,7 @@ class StateManager:
             self._route_after_screening,
             {
                 "normal": "location_selection",
+                "quest": "quest_active",  # Quest chosen: continue it
                 "support_needed": "learning_support",
                 "crisis": "learning_support"  # Gentle support, escalate to parent
             }
@@ -213,7 +292,7 @@ class StateManager:
             "quest_active",
             self._route_after_quest,
             {
-                "continue": "quest_active",
+                "continue": END,  # Wait for the answer to the next step
                 "complete": "quest_reflection",
                 "stuck": "learning_support"
             }
@@ -237,6 +316,35 @@ class StateManager:
 
         return workflow.compile()
 
+    def _register_metrics(self) -> None:
+        """Expose in-memory cache sizes (read at scrape time / by the profiler)."""
+        REGISTRY.register_callback(
+            "innerworld_user_states", "UserState objects held in memory",
+            lambda: len(self.user_states)
+        )
+        REGISTRY.register_callback(
+            "innerworld_emotional_routers", "Per-user EmotionalRouter objects held in memory",
+            lambda: len(self.user_emotional_routers)
+        )
+        register_state("user_states", lambda: self.user_states)
+        register_state("user_emotional_routers", lambda: self.user_emotional_routers)
+        register_state("message_histories", lambda: [
+            message for state in self.user_states.values() for message in state.message_history
+        ])
+
+    def _traced_node(self, name: str, handler: Callable) -> Callable:
+        """Wrap graph node handler in a tracing span and latency histogram."""
+        node_seconds = GRAPH_NODE_SECONDS.labels(name)
+
+        async def node(state: Dict[str, Any]) -> Dict[str, Any]:
+            # Tracer looked up per call: configure_tracing() may replace it later
+            with get_tracer().start_span(f"graph.node.{name}") as span, node_seconds.time():
+                result = await handler(state)
+                span.set_attribute("conversation.state", state["user_state"].current_state.value)
+                return result
+
+        return node
+
     async def initialize_user(self, user_id: str, child_name: Optional[str] = None) -> None:
         """Initialize a new user state, loading from UserManager if exists."""
         # Try to load from UserManager
@@ -256,17 +364,61 @@ class StateManager:
         )
         logger.info("user_initialized_new", user_id=user_id, child_name=child_name)
 
+    def set_outbound_sender(self, sender) -> None:
+        """
+        Set OutboundSender used to deliver proactive messages (reminders).
+
+        Args:
+            sender: src.bot.outbound.OutboundSender
+        """
+        self.outbound_sender = sender
+        logger.info("outbound_sender_set")
+
+    async def apply_ownership(self, owner_filter: Optional[Callable[[str], bool]]) -> List[str]:
+        """
+        Switch to a new ownership predicate after shard rebalancing.
+
+        Users that moved to another worker are saved and evicted from memory
+        so the new owner reloads them from storage. Reminder and link sweep
+        ownership moves with them.
+
+        Args:
+            owner_filter: Predicate(user_id), or None to own every user
+
+        Returns:
+            List of released user IDs
+        """
+        self.owner_filter = owner_filter
+
+        released = [
+            user_id for user_id in self.user_states
+            if owner_filter is not None and not owner_filter(user_id)
+        ]
+
+        for user_id in released:
+            await self.save_user_state(self.user_states.pop(user_id))
+            self.user_emotional_routers.pop(user_id, None)
+            if self.quest_engine:
+                self.quest_engine.clear_quest_progress(user_id)
+
+        if self.link_manager:
+            await self.link_manager.apply_ownership(owner_filter)
+
+        if self.reality_bridge_manager:
+            await self.reality_bridge_manager.apply_ownership(owner_filter)
+
+        logger.info("user_ownership_applied",
+                   released=len(released),
+                   owned=len(self.user_states))
+
+        return released
+
     def _profile_to_state(self, profile) -> UserState:
         """Convert UserProfile to UserState."""
         from src.data.user_manager import UserProfile
 
-        # Reconstruct LearningProfile
-        learning_profile = LearningProfile()
-        if profile.learning_profile:
-            learning_profile.understanding_meaning = profile.learning_profile.get("understanding_meaning", 5)
-            learning_profile.memory = profile.learning_profile.get("memory", 5)
-            learning_profile.attention = profile.learning_profile.get("attention", 5)
-            learning_profile.motivation = profile.learning_profile.get("motivation", 5)
+        # Reconstruct LearningProfile (with columnar history)
+        learning_profile = LearningProfile.from_dict(profile.learning_profile)
 
         # Reconstruct ScreeningMetrics
         screening = ScreeningMetrics()
@@ -277,6 +429,8 @@ class StateManager:
             screening.manipulation_score = profile.screening.get("manipulation_score", 0)
             screening.self_harm_detected = profile.screening.get("self_harm_detected", False)
             screening.emotional_storm_count = profile.screening.get("emotional_storm_count", 0)
+            screening.last_emotional_storm = profile.screening.get("last_emotional_storm", "")
+            screening.last_check = profile.screening.get("last_check", "")
 
         # Create UserState
         user_state = UserState(
@@ -287,9 +441,12 @@ class StateManager:
             current_location=profile.current_location,
             current_quest=profile.current_quest,
             quest_step=profile.quest_step,
+            completed_quests=list(profile.completed_quests or []),
+            progress=dict(profile.progress or {}),
             screening=screening,
             parent_linked=profile.parent_linked,
-            link_id=profile.link_id
+            link_id=profile.link_id,
+            parent_id=profile.parent_id
         )
 
         return user_state
@@ -304,22 +461,29 @@ class StateManager:
             age=user_state.age,
             parent_linked=user_state.parent_linked,
             link_id=user_state.link_id,
+            parent_id=user_state.parent_id,
             learning_profile={
                 "understanding_meaning": user_state.learning_profile.understanding_meaning,
                 "memory": user_state.learning_profile.memory,
                 "attention": user_state.learning_profile.attention,
-                "motivation": user_state.learning_profile.motivation
+                "motivation": user_state.learning_profile.motivation,
+                "history": user_state.learning_profile.history.to_dict(),
+                "stats": user_state.learning_profile.stats.to_dict()
             },
             current_location=user_state.current_location,
             current_quest=user_state.current_quest,
             quest_step=user_state.quest_step,
+            completed_quests=list(user_state.completed_quests),
+            progress=dict(user_state.progress) or None,
             screening={
                 "self_worth": user_state.screening.self_worth,
                 "self_criticism": user_state.screening.self_criticism,
                 "emotional_volatility": user_state.screening.emotional_volatility,
                 "manipulation_score": user_state.screening.manipulation_score,
                 "self_harm_detected": user_state.screening.self_harm_detected,
-                "emotional_storm_count": user_state.screening.emotional_storm_count
+                "emotional_storm_count": user_state.screening.emotional_storm_count,
+                "last_emotional_storm": user_state.screening.last_emotional_storm,
+                "last_check": user_state.screening.last_check
             }
         )
 
@@ -337,56 +501,264 @@ class StateManager:
         except Exception as e:
             logger.error("user_state_save_failed", user_id=user_state.user_id, error=str(e))
 
-    async def process_message(self, user_id: str, message: str) -> str:
+    async def _update_parent_dashboard(self, profile) -> None:
+        """Refresh the linked parent's dashboard row for a saved profile."""
+        if not self.parent_dashboards or not profile.parent_linked:
+            return
+
+        parent_id = profile.parent_id
+        if not parent_id:
+            # Linked before parent_id was recorded: look it up once
+            parent_id = await self.link_manager.get_parent_for_child(profile.user_id)
+            if not parent_id:
+                return
+            profile.parent_id = parent_id
+            user_state = self.user_states.get(profile.user_id)
+            if user_state:
+                user_state.parent_id = parent_id
+
+        router = self.user_emotional_routers.get(profile.user_id)
+        emotional = router.get_emotional_summary() if router and router.emotional_history else None
+        self.parent_dashboards.update_child(parent_id, summarize_child(profile, emotional))
+
+    async def _unlink_revoked_parent(self, link) -> None:
+        """Unlink a child whose parent link was revoked (profile and dashboard row)."""
+        if link.parent_id and self.parent_dashboards:
+            self.parent_dashboards.remove_child(link.parent_id, link.child_id)
+
+        user_state = self.user_states.get(link.child_id)
+        if user_state and user_state.link_id in (link.link_id, None):
+            user_state.parent_linked = False
+            user_state.link_id = None
+            user_state.parent_id = None
+
+        profile = await self.user_manager.get_user(link.child_id) if self.user_manager else None
+        if not profile or profile.link_id not in (link.link_id, None):
+            return  # Linked again with a newer link
+
+        profile.parent_linked = False
+        profile.parent_id = None
+        profile.link_id = None
+        await self.user_manager.update_user(profile)
+        logger.info("child_unlinked", user_id=link.child_id, link_id=link.link_id)
+
+    async def process_message(
+        self,
+        user_id: str,
+        message: str,
+        token_sink: Optional[asyncio.Queue] = None
+    ) -> str:
         """
         Process user message through state machine with LLM.
 
         Uses OpenAI for natural language understanding while maintaining
         structured state transitions.
+
+        Args:
+            user_id: User ID
+            message: User message
+            token_sink: Queue receiving LLM tokens as they are generated
+                (used by stream_message)
+
+        Returns:
+            Full response text
+        """
+        if not self.initialized:
+            await self.initialize()
+
+        tracer = get_tracer()
+        started = time.perf_counter()
+
+        with tracer.start_span("process_message", {"user.id_hash": hash_user_id(user_id)}) as root:
+            # Get or create user state
+            user_state = self.user_states.get(user_id)
+            if user_state:
+                _USER_STATE_HIT.inc()
+            else:
+                _USER_STATE_MISS.inc()
+                with tracer.start_span("load_user_state"), _STAGE_SECONDS["load_user_state"].time():
+                    await self.initialize_user(user_id)
+                user_state = self.user_states[user_id]
+
+            root.set_attributes({
+                "conversation.state": user_state.current_state.value,
+                "conversation.messages_count": user_state.messages_count,
+                "message.length": len(message)
+            })
+
+            # Update state
+            user_state.last_activity = datetime.now()
+            user_state.messages_count += 1
+            user_state.message_history.append(HumanMessage(content=message))
+
+            # Detect emotional state from message
+            with tracer.start_span("emotion_detection") as span, _STAGE_SECONDS["emotion_detection"].time():
+                await self._detect_emotional_state(user_state, message)
+                span.set_attribute("emotion.state", user_state.emotional_state.value)
+
+            # Update screening metrics
+            with tracer.start_span("screening"), _STAGE_SECONDS["screening"].time():
+                await self._update_screening_metrics(user_state, message)
+
+            # Process through state graph
+            try:
+                graph_state = {
+                    "user_id": user_id,
+                    "message": message,
+                    "user_state": user_state,
+                    "timestamp": datetime.now().isoformat(),
+                    "token_sink": token_sink
+                }
+
+                with tracer.start_span("graph"), _STAGE_SECONDS["graph"].time():
+                    result = await self.graph.ainvoke(graph_state)
+                response = result.get("response", "Я здесь, чтобы помочь! 🌟")
+
+                root.set_attributes({
+                    "response.length": len(response),
+                    "llm.input_tokens": result.get("llm_input_tokens", 0),
+                    "llm.output_tokens": result.get("llm_output_tokens", 0)
+                })
+
+                # Add to message history
+                user_state.message_history.append(AIMessage(content=response))
+
+                # Save user state to persistent storage
+                with tracer.start_span("save_user_state"), _STAGE_SECONDS["save_user_state"].time():
+                    await self.save_user_state(user_state)
+
+                _MESSAGES_OK.inc()
+                MESSAGE_SECONDS.observe(time.perf_counter() - started)
+                return response
+
+            except Exception as e:
+                root.record_exception(e)
+                _MESSAGES_FAILED.inc()
+                MESSAGE_SECONDS.observe(time.perf_counter() - started)
+                logger.error("message_processing_failed", user_id=user_id, error=str(e))
+                return "Извини, что-то пошло не так. Давай попробуем еще раз? 😊"
+
+    async def stream_message(self, user_id: str, message: str) -> AsyncIterator[str]:
+        """
+        Process user message, yielding the response as it is generated.
+
+        LLM-backed states (onboarding, casual chat) yield tokens as they
+        arrive from OpenAI; other states yield their full response at once.
+        Joining all yielded chunks gives the same text process_message returns
+        (if a later node replaces a streamed reply, its text is appended).
+
+        Args:
+            user_id: User ID
+            message: User message
+
+        Yields:
+            Response text chunks
+        """
+        sink: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self.process_message(user_id, message, token_sink=sink))
+        task.add_done_callback(lambda _: sink.put_nowait(None))
+
+        streamed = []
+        while True:
+            chunk = await sink.get()
+            if chunk is None:
+                break
+            streamed.append(chunk)
+            yield chunk
+
+        response = task.result()
+        text = "".join(streamed)
+
+        if response.startswith(text):
+            if len(response) > len(text):
+                yield response[len(text):]
+        else:
+            yield "\n\n" + response
+
+    async def streams_reply(self, user_id: str) -> bool:
+        """
+        Check whether the user's next message is answered by an LLM-backed node.
+
+        The bot streams those replies (stream_message + StreamingReply) and
+        sends the others as one message.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            True if the reply should be streamed
         """
         if not self.initialized:
             await self.initialize()
 
-        # Get or create user state
         user_state = self.user_states.get(user_id)
         if not user_state:
             await self.initialize_user(user_id)
             user_state = self.user_states[user_id]
 
-        # Update state
-        user_state.last_activity = datetime.now()
-        user_state.messages_count += 1
-        user_state.message_history.append(HumanMessage(content=message))
+        # process_message counts the message before the graph routes it
+        return self._start_route(user_state, user_state.messages_count + 1) in LLM_NODES
 
-        # Detect emotional state from message
-        await self._detect_emotional_state(user_state, message)
-
-        # Update screening metrics
-        await self._update_screening_metrics(user_state, message)
-
-        # Process through state graph
-        try:
-            graph_state = {
-                "user_id": user_id,
-                "message": message,
-                "user_state": user_state,
-                "timestamp": datetime.now().isoformat()
-            }
+    async def _generate_llm_response(self, state: Dict[str, Any], messages: List[BaseMessage]) -> str:
+        """
+        Call LLM, streaming tokens to the request's token sink if present.
 
-            result = await self.graph.ainvoke(graph_state)
-            response = result.get("response", "Я здесь, чтобы помочь! 🌟")
+        If streaming fails after some tokens were already sent, the partial
+        text is kept as the response instead of raising.
+        """
+        sink = state.get("token_sink")
+        model = self.llm.model_name
+        started = time.perf_counter()
+
+        with get_tracer().start_span("llm.chat", {
+            "llm.model": model,
+            "llm.streaming": sink is not None,
+            "llm.messages": len(messages)
+        }) as span:
+            usage = None
+
+            try:
+                if sink is None:
+                    response = await self.llm.ainvoke(messages)
+                    text = response.content
+                    usage = response.usage_metadata
+                else:
+                    parts: List[str] = []
+                    try:
+                        async for chunk in self.llm.astream(messages):
+                            if chunk.content:
+                                if not parts:
+                                    LLM_FIRST_TOKEN_SECONDS.labels(model).observe(time.perf_counter() - started)
+                                parts.append(chunk.content)
+                                sink.put_nowait(chunk.content)
+                            if chunk.usage_metadata:
+                                usage = chunk.usage_metadata
+                    except Exception as e:
+                        if not parts:
+                            raise
+                        span.record_exception(e)
+                        LLM_ERRORS.labels(model).inc()
+                        logger.error("llm_stream_interrupted", error=str(e), tokens=len(parts))
+                    text = "".join(parts)
+            except Exception:
+                LLM_ERRORS.labels(model).inc()
+                raise
+            finally:
+                LLM_REQUEST_SECONDS.labels(model, "invoke" if sink is None else "stream").observe(
+                    time.perf_counter() - started
+                )
 
-            # Add to message history
-            user_state.message_history.append(AIMessage(content=response))
+            input_tokens = usage["input_tokens"] if usage else 0
+            output_tokens = usage["output_tokens"] if usage else 0
+            span.set_attributes({"llm.input_tokens": input_tokens, "llm.output_tokens": output_tokens})
+            LLM_TOKENS.labels(model, "input").inc(input_tokens)
+            LLM_TOKENS.labels(model, "output").inc(output_tokens)
 
-            # Save user state to persistent storage
-            await self.save_user_state(user_state)
+            # Totals for the process_message span
+            state["llm_input_tokens"] = state.get("llm_input_tokens", 0) + input_tokens
+            state["llm_output_tokens"] = state.get("llm_output_tokens", 0) + output_tokens
 
-            return response
-
-        except Exception as e:
-            logger.error("message_processing_failed", user_id=user_id, error=str(e))
-            return "Извини, что-то пошло не так. Давай попробуем еще раз? 😊"
+        return text
 
     async def _detect_emotional_state(self, user_state: UserState, message: str) -> None:
         """Detect emotional state using EmotionalRouter."""
@@ -424,10 +796,10 @@ class StateManager:
         # Check for emotional storm
         if user_state.emotional_state in [EmotionalState.ANGER, EmotionalState.ANXIETY]:
             if user_state.screening.last_emotional_storm:
-                time_since_last = datetime.now() - user_state.screening.last_emotional_storm
+                time_since_last = datetime.now() - datetime.fromisoformat(user_state.screening.last_emotional_storm)
                 if time_since_last.total_seconds() < 3600:  # Within 1 hour
                     user_state.screening.emotional_storm_count += 1
-            user_state.screening.last_emotional_storm = datetime.now()
+            user_state.screening.last_emotional_storm = datetime.now().isoformat()
 
     # State handlers
     async def _handle_start(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -450,11 +822,32 @@ class StateManager:
         return state
 
     async def _handle_parent_linking(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle parent linking flow."""
-        state["response"] = (
-            "Отправлю ссылку для родителя...\n"
-            "(В MVP это будет реализовано через LinkManager)"
-        )
+        """Handle parent linking flow.
+
+        The link itself is created by ChildBot (/start); this picks up a link the
+        parent activated since the state was cached, so the next save does not
+        write parent_linked=False back over the child's profile.
+        """
+        user_state = state["user_state"]
+        link = None
+        if self.link_manager:
+            link = await self.link_manager.get_active_link_by_child(user_state.user_id)
+
+        if link:
+            user_state.parent_linked = True
+            user_state.link_id = link.link_id
+            user_state.parent_id = link.parent_id
+            user_state.child_name = user_state.child_name or link.child_name
+            logger.info("parent_link_detected", user_id=user_state.user_id, link_id=link.link_id)
+            state["response"] = (
+                f"🎉 Родитель подключился! Рад знакомству, {user_state.child_name}!\n\n"
+                "Расскажи, как у тебя дела? 😊"
+            )
+        else:
+            state["response"] = (
+                "Сначала нужно, чтобы твой родитель подключился.\n"
+                "Нажми /start, и я дам ссылку для родителя."
+            )
         return state
 
     async def _handle_onboarding(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -485,8 +878,7 @@ class StateManager:
             messages.extend(user_state.message_history[-10:])
 
         try:
-            response = await self.llm.ainvoke(messages)
-            state["response"] = response.content
+            state["response"] = await self._generate_llm_response(state, messages)
 
             # Extract child name if mentioned
             if not user_state.child_name and user_state.messages_count == 1:
@@ -511,8 +903,32 @@ class StateManager:
         """Handle location selection based on learning profile."""
         user_state = state["user_state"]
 
-        # Use LearningProfileAnalyzer to recommend location based on weakest dimension
-        recommended = LearningProfileAnalyzer.recommend_location(user_state.learning_profile)
+        # Unlocked locations ranked by weakest dimension and emotion (location metadata)
+        route = LearningProfileAnalyzer.route(
+            user_state.learning_profile,
+            emotion=user_state.emotional_state.value,
+            quests_completed=len(user_state.completed_quests)
+        )
+
+        # Nearest quest to the child's needs and emotion (not yet completed, unlocked)
+        recommendations = []
+        if self.quest_recommender:
+            recommendations = [
+                recommendation for recommendation in self.quest_recommender.recommend(
+                    user_state.learning_profile,
+                    emotion=user_state.emotional_state,
+                    completed=user_state.completed_quests
+                )
+                if not route.locations or recommendation.location in route.locations
+            ]
+
+        if recommendations:
+            recommended = recommendations[0].location
+        elif route.locations:
+            recommended = route.locations[0]
+        else:
+            # Fall back to the location of the weakest dimension
+            recommended = LearningProfileAnalyzer.recommend_location(user_state.learning_profile)
 
         # Location names mapping
         location_names = {
@@ -528,10 +944,19 @@ class StateManager:
         location_name = location_names.get(recommended, "Башню Непонимания")
         user_state.current_location = recommended
 
-        # Get first quest for location from QuestEngine
-        first_quest = None
-        if self.quest_engine:
-            first_quest = self.quest_engine.get_first_quest_for_location(recommended)
+        # Recommended quest, else the location's first available quest (metadata order)
+        if recommendations:
+            user_state.current_quest = recommendations[0].quest_id
+        elif self.quest_engine:
+            listed = route.quests if route.locations and recommended == route.locations[0] else ()
+            available = [
+                quest_id for quest_id in listed
+                if quest_id not in user_state.completed_quests and self.quest_engine.get_quest(quest_id)
+            ]
+            first_quest = (
+                self.quest_engine.get_quest(available[0]) if available
+                else self.quest_engine.get_first_quest_for_location(recommended)
+            )
             if first_quest:
                 user_state.current_quest = first_quest.id
 
@@ -616,16 +1041,14 @@ class StateManager:
                 response_parts.append(f"\n\n🎁 **Награды:**")
                 response_parts.append(f"• XP: +{rewards.experience_points}")
 
-                # Apply learning profile changes
+                # Apply learning profile changes (recorded in history and stats)
                 for dimension, change in rewards.learning_profile_changes.items():
-                    if dimension == "understanding_meaning":
-                        user_state.learning_profile.understanding_meaning += change
-                    elif dimension == "memory":
-                        user_state.learning_profile.memory += change
-                    elif dimension == "attention":
-                        user_state.learning_profile.attention += change
-                    elif dimension == "motivation":
-                        user_state.learning_profile.motivation += change
+                    try:
+                        user_state.learning_profile.adjust_dimension(
+                            LearningDimension(dimension), change, f"{user_state.current_quest}_completed"
+                        )
+                    except ValueError:
+                        logger.warning("unknown_reward_dimension", dimension=dimension)
 
             # Get Reality Bridge micro-action
             reality_bridge = await self.quest_engine.get_reality_bridge(user_state.user_id)
@@ -638,7 +1061,8 @@ class StateManager:
                     title=reality_bridge.title,
                     description=reality_bridge.description,
                     deadline_hours=reality_bridge.deadline_hours,
-                    reminder_hours=reality_bridge.reminder_hours
+                    reminder_hours=reality_bridge.reminder_hours,
+                    location=user_state.current_location
                 )
 
                 response_parts.append(f"\n\n🌉 **Reality Bridge:**")
@@ -648,16 +1072,20 @@ class StateManager:
                 response_parts.append(f"\nЯ напомню через {reality_bridge.reminder_hours} часов. ⏰")
 
             # Mark quest as completed
+            if user_state.current_quest and user_state.current_quest not in user_state.completed_quests:
+                user_state.completed_quests.append(user_state.current_quest)
             user_state.current_quest = None
             user_state.quest_step = 0
+            self.quest_engine.clear_quest_progress(user_state.user_id)
+            state["quest_completed"] = True
 
         state["response"] = "".join(response_parts)
         return state
 
     async def _handle_quest_reflection(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle quest reflection state."""
-        state["response"] = (
-            "Отлично справился! 🎉\n\n"
+        """Handle quest reflection state (after the quest's rewards)."""
+        state["response"] = state.get("response", "") + (
+            "\n\nОтлично справился! 🎉\n\n"
             "Что нового ты узнал? Что было самым интересным?"
         )
         return state
@@ -690,8 +1118,7 @@ class StateManager:
             messages.extend(user_state.message_history[-10:])
 
         try:
-            response = await self.llm.ainvoke(messages)
-            state["response"] = response.content
+            state["response"] = await self._generate_llm_response(state, messages)
         except Exception as e:
             logger.error("llm_call_failed", error=str(e))
             state["response"] = "Ха-ха, интересно! 😄 Расскажи еще что-нибудь!"
@@ -756,10 +1183,13 @@ class StateManager:
     def _route_after_start(self, state: Dict[str, Any]) -> str:
         """Route after start state."""
         user_state = state["user_state"]
+        return self._start_route(user_state, user_state.messages_count)
 
+    def _start_route(self, user_state: UserState, messages_count: int) -> str:
+        """Node the start state routes to after messages_count messages."""
         if not user_state.parent_linked:
             return "parent_linking"
-        elif not user_state.child_name or user_state.messages_count < 5:
+        elif not user_state.child_name or messages_count < 5:
             return "onboarding"
         else:
             return "emotion_check"
@@ -783,12 +1213,15 @@ class StateManager:
         elif (metrics.self_worth < SCREENING_THRESHOLDS["moderate_concern"]["self_worth"] or
               metrics.emotional_storm_count > 5):
             return "support_needed"
+        elif user_state.current_quest:
+            return "quest"
         return "normal"
 
     def _route_after_quest(self, state: Dict[str, Any]) -> str:
         """Route after quest step."""
-        # TODO: Implement quest step tracking
-        return "complete"
+        if state.get("quest_completed"):
+            return "complete"
+        return "continue"
 
     def _route_after_casual_chat(self, state: Dict[str, Any]) -> str:
         """Route after casual chat."""
@@ -814,26 +1247,46 @@ class StateManager:
         }
         return translations.get(emotion, "что-то интересное")
 
+    def _format_reality_bridge_reminder(self, bridge) -> str:
+        """Build reminder text for Reality Bridge."""
+        return (
+            f"⏰ Напоминание: 🌉 {bridge.title}\n\n"
+            f"{bridge.description}\n\n"
+            f"Получилось выполнить?"
+        )
+
     async def _send_reality_bridge_reminder(self, user_id: str, bridge) -> None:
         """
         Send Reality Bridge reminder to user.
 
         This is called by RealityBridgeManager when it's time to remind user.
-        In production, this would send a Telegram message.
-        For now, we log it.
+        If an OutboundSender is set, the reminder is queued as a low-priority
+        Telegram message (live replies go first). It is also stored for the
+        next user interaction.
 
         Args:
             user_id: User ID
             bridge: ActiveBridge object
         """
-        # TODO: In production, send via Telegram bot
-        # For now, just log
         logger.info("reality_bridge_reminder_triggered",
                    user_id=user_id,
                    bridge_id=bridge.bridge_id,
                    title=bridge.title)
 
+        if self.outbound_sender:
+            from src.bot.outbound import Priority
+
+            self.outbound_sender.submit(
+                user_id,
+                self._format_reality_bridge_reminder(bridge),
+                priority=Priority.REMINDER
+            )
+
         # Store reminder for next user interaction
+        self._store_reality_bridge_reminder(user_id, bridge)
+
+    def _store_reality_bridge_reminder(self, user_id: str, bridge) -> None:
+        """Keep reminder in user context for the next interaction."""
         user_state = self.user_states.get(user_id)
         if user_state:
             user_state.context["pending_reality_bridge_reminder"] = {
@@ -843,3 +1296,69 @@ class StateManager:
                 "deadline_at": bridge.deadline_at
             }
             logger.debug("reminder_stored_in_context", user_id=user_id)
+
+    async def _on_reality_bridge_expired(self, bridge) -> None:
+        """
+        Tell the child their Reality Bridge deadline passed.
+
+        Called by RealityBridgeManager's deadline sweeper once per expired
+        bridge. Drops the bridge's stored reminder and queues a short
+        low-priority message (if an OutboundSender is set).
+
+        Args:
+            bridge: Expired ActiveBridge
+        """
+        logger.info("reality_bridge_expiry_reported",
+                   user_id=bridge.user_id,
+                   bridge_id=bridge.bridge_id)
+
+        user_state = self.user_states.get(bridge.user_id)
+        pending = user_state.context.get("pending_reality_bridge_reminder") if user_state else None
+        if pending and pending["bridge_id"] == bridge.bridge_id:
+            del user_state.context["pending_reality_bridge_reminder"]
+
+        if self.outbound_sender:
+            from src.bot.outbound import Priority
+
+            self.outbound_sender.submit(
+                bridge.user_id,
+                f"🌉 Время для задания «{bridge.title}» закончилось.\n\n"
+                f"Ничего страшного! В следующем квесте будет новое 🌟",
+                priority=Priority.REMINDER
+            )
+
+    async def _send_reality_bridge_reminders(self, bridges: List) -> List[Optional[BaseException]]:
+        """
+        Send a batch of Reality Bridge reminders as one fan-out.
+
+        Called by RealityBridgeManager with all reminders due in one tick.
+        The batch goes to OutboundSender.submit_batch in one call; its token
+        buckets and worker pool bound the concurrency. Waits for delivery so
+        that failed messages are retried by the reminder queue; without a
+        sender every reminder is reported as failed.
+
+        Args:
+            bridges: ActiveBridge objects due for a reminder
+
+        Returns:
+            One error (or None if sent) per bridge
+        """
+        logger.info("reality_bridge_reminders_triggered", count=len(bridges))
+
+        for bridge in bridges:
+            self._store_reality_bridge_reminder(bridge.user_id, bridge)
+
+        if not self.outbound_sender:
+            # Nothing was sent: report failures so the reminders are retried
+            logger.warning("reality_bridge_reminders_not_sent", count=len(bridges), reason="no outbound sender")
+            error = RuntimeError("No outbound sender")
+            return [error] * len(bridges)
+
+        from src.bot.outbound import Priority
+
+        futures = self.outbound_sender.submit_batch(
+            [(bridge.user_id, self._format_reality_bridge_reminder(bridge)) for bridge in bridges],
+            priority=Priority.REMINDER
+        )
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return [result if isinstance(result, BaseException) else None for result in results]
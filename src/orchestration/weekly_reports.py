@@ -0,0 +1,647 @@
+"""
+Weekly parent reports - batch pipeline.
+
+Every WEEKLY_REPORT_DAY at WEEKLY_REPORT_HOUR each parent with active
+links gets one message covering all their children for the past week.
+The pipeline touches every input once instead of scanning profiles per
+parent:
+
+1. Links: one pass over src/data/links groups active links by parent
+   (parents who turned weekly_reports off are dropped, one pass over
+   src/data/parents)
+2. Reality Bridge outcomes: one pass over the week's BridgeArchive
+   partitions counts created/completed/expired bridges per child
+3. Render: parents are split into tasks of REPORT_CHUNK_SIZE and rendered
+   by REPORT_WORKERS processes; each task reads its children's profiles
+   (progress, learning profile and history) and returns report texts
+4. Checkpoint: every finished task is committed to
+   src/data/reports/reports.db keyed (week, parent_id). A re-run of the
+   same week skips parents already rendered, so a crash resumes mid-run
+5. Delivery: rendered reports are handed to OutboundSender in batches of
+   REPORT_SEND_BATCH at REPORT_SEND_RATE per second, at NOTIFICATION
+   priority, and marked sent or failed. Sent reports are never re-sent;
+   failed ones are retried after REPORT_RETRY_DELAY_SECONDS (and on a
+   re-run of the week) until REPORT_MAX_ATTEMPTS delivery attempts
+
+Run:
+    python -m src.orchestration.weekly_reports                 # last week, send
+    python -m src.orchestration.weekly_reports --dry-run       # render only
+    python -m src.orchestration.weekly_reports --schedule      # wait for the weekly slot
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.core.logger import get_logger
+from src.core.metrics import REGISTRY
+from src.core.serialization import read_record
+from src.core.store_layout import StoreLayout
+from src.orchestration.learning_profile import LearningProfile, DIMENSION_NAMES
+from src.game.bridge_archive import BridgeArchive
+from src.bot.outbound import Priority
+from src.config import (
+    LINKS_DIR,
+    PARENTS_DIR,
+    USER_PROFILES_DIR,
+    WEEKLY_REPORT_DAY,
+    WEEKLY_REPORT_HOUR,
+    REPORT_WORKERS,
+    REPORT_CHUNK_SIZE,
+    REPORT_SEND_RATE,
+    REPORT_SEND_BATCH,
+    REPORT_MAX_ATTEMPTS,
+    REPORT_RETRY_DELAY_SECONDS,
+    REALITY_BRIDGES_DIR,
+    STORE_FANOUT_LEVELS
+)
+
+logger = get_logger(__name__)
+
+REPORTS_TOTAL = REGISTRY.counter(
+    "innerworld_weekly_reports_total", "Weekly parent reports by outcome", ["state"]
+)
+REPORT_PHASE_SECONDS = REGISTRY.histogram(
+    "innerworld_weekly_report_phase_seconds", "Weekly report pipeline phase duration", ["phase"],
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+)
+
+RENDERED = "rendered"
+SENT = "sent"
+FAILED = "failed"
+EMPTY = "empty"  # No child profile found; nothing to send
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    week TEXT NOT NULL,
+    parent_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    children INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (week, parent_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS reports_state ON reports (week, state);
+"""
+
+BRIDGE_EVENTS = ("created", "completed", "expired")
+
+# (parent_id, [child_id, ...])
+Family = Tuple[str, List[str]]
+
+
+def week_key(week_start: date) -> str:
+    """ISO week of a report, e.g. 2026-W42."""
+    year, week, _ = week_start.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def next_run_at(now: datetime) -> datetime:
+    """Next WEEKLY_REPORT_DAY, WEEKLY_REPORT_HOUR:00 after now."""
+    run_at = now.replace(hour=WEEKLY_REPORT_HOUR, minute=0, second=0, microsecond=0)
+    run_at += timedelta(days=(WEEKLY_REPORT_DAY - now.weekday()) % 7)
+    if run_at <= now:
+        run_at += timedelta(days=7)
+    return run_at
+
+
+def report_week_start(run_at: datetime) -> date:
+    """First day of the week a run reports on (the 7 days before the run)."""
+    return (run_at - timedelta(days=7)).date()
+
+
+# ----------------------------------------------------------------------
+# Rendering (runs in worker processes; module-level so it pickles)
+# ----------------------------------------------------------------------
+
+def _child_section(profile: Dict[str, Any], bridges: Dict[str, int], start: datetime, end: datetime) -> str:
+    """Report text of one child."""
+    learning_profile = LearningProfile.from_dict(profile.get("learning_profile"))
+    progress = profile.get("progress") or {}
+
+    weakest = learning_profile.get_weakest_dimension()
+    strongest = learning_profile.get_strongest_dimension()
+    lines = [
+        f"👤 {profile.get('child_name') or 'Ваш ребёнок'}",
+        f"Средний балл: {learning_profile.get_average_score():.1f}/10 "
+        f"(уровень {progress.get('level', 1)}, {progress.get('xp', 0)} XP)",
+        f"Сильная сторона: {DIMENSION_NAMES[strongest]} ({learning_profile.get_dimension(strongest)}/10)",
+        f"Над чем поработаем: {DIMENSION_NAMES[weakest]} ({learning_profile.get_dimension(weakest)}/10)"
+    ]
+
+    # Net change inside [start, end): since start minus since end
+    after_end = learning_profile.history.net_change(end)
+    week = {
+        dimension: change - after_end.get(dimension, 0)
+        for dimension, change in learning_profile.history.net_change(start).items()
+    }
+    changes = ", ".join(
+        f"{DIMENSION_NAMES[dimension]} {change:+d}" for dimension, change in week.items() if change
+    )
+    lines.append(f"За неделю: {changes}" if changes else "За неделю изменений не было")
+
+    quests = max(progress.get("total_quests_completed", 0), len(profile.get("completed_quests") or []))
+    lines.append(f"Квестов пройдено всего: {quests}")
+
+    if bridges.get("created"):
+        lines.append(f"Задания в реальной жизни: выполнено {bridges.get('completed', 0)} из {bridges['created']}")
+
+    return "\n".join(lines)
+
+
+def render_families(
+    profiles_dir: str,
+    levels: int,
+    families: List[Family],
+    bridges: Dict[str, Dict[str, int]],
+    start_ts: float,
+    end_ts: float
+) -> List[Tuple[str, str, int]]:
+    """
+    Render reports of a chunk of parents.
+
+    Args:
+        profiles_dir: UserManager profile directory
+        levels: Profile store fan-out levels (see StoreLayout)
+        families: [(parent_id, [child_id, ...])]
+        bridges: {child_id: {event: count}} for the week
+        start_ts: Week start, epoch seconds
+        end_ts: Week end (exclusive), epoch seconds
+
+    Returns:
+        [(parent_id, text, children rendered)]; text is empty if no child
+        profile was found
+    """
+    start, end = datetime.fromtimestamp(start_ts), datetime.fromtimestamp(end_ts)
+    header = f"📊 Еженедельный отчёт\n{start:%d.%m}–{(end - timedelta(days=1)):%d.%m}"
+
+    layout = StoreLayout(Path(profiles_dir), levels)
+    reports = []
+    for parent_id, children in families:
+        sections = []
+        for child_id in children:
+            try:
+                profile = read_record(layout.path(child_id))
+            except (OSError, ValueError):
+                continue
+            sections.append(_child_section(profile, bridges.get(child_id, {}), start, end))
+
+        text = "\n\n".join([header, *sections]) if sections else ""
+        reports.append((parent_id, text, len(sections)))
+    return reports
+
+
+# ----------------------------------------------------------------------
+# Checkpoint store
+# ----------------------------------------------------------------------
+
+@dataclass
+class PendingReport:
+    """Rendered report waiting for delivery."""
+    parent_id: str
+    text: str
+
+
+class ReportStore:
+    """SQLite checkpoint of rendered and delivered reports (thread-safe)."""
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite database file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        # Stores created before delivery attempts were counted
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(reports)")}
+        if "attempts" not in columns:
+            self._conn.execute("ALTER TABLE reports ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def done_parents(self, week: str) -> Set[str]:
+        """Parents whose report of week is already rendered (any state)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT parent_id FROM reports WHERE week = ?", (week,)).fetchall()
+        return {parent_id for (parent_id,) in rows}
+
+    def save_rendered(self, week: str, reports: List[Tuple[str, str, int]]) -> None:
+        """Commit a rendered chunk (existing rows are kept)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO reports (week, parent_id, text, children, state, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(week, parent_id, text, children, RENDERED if text else EMPTY, now)
+                 for parent_id, text, children in reports]
+            )
+            self._conn.execute("COMMIT")
+
+    def fetch_rendered(self, week: str, limit: int) -> List[PendingReport]:
+        """Rendered, not yet delivered reports."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT parent_id, text FROM reports WHERE week = ? AND state = ? ORDER BY parent_id LIMIT ?",
+                (week, RENDERED, limit)
+            ).fetchall()
+        return [PendingReport(parent_id, text) for parent_id, text in rows]
+
+    def mark(self, week: str, parent_ids: List[str], state: str) -> None:
+        """Set delivery state of reports (counts one delivery attempt each)."""
+        if not parent_ids:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE reports SET state = ?, updated_at = ?, attempts = attempts + 1 "
+                "WHERE week = ? AND parent_id = ?",
+                [(state, now, week, parent_id) for parent_id in parent_ids]
+            )
+
+    def requeue_failed(self, week: str, max_attempts: int) -> int:
+        """Return failed reports with attempts left to rendered; returns how many."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE reports SET state = ? WHERE week = ? AND state = ? AND attempts < ?",
+                (RENDERED, week, FAILED, max_attempts)
+            )
+        return cursor.rowcount
+
+    def counts(self, week: str) -> Dict[str, int]:
+        """Reports of week by state."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT state, COUNT(*) FROM reports WHERE week = ? GROUP BY state", (week,)
+            ).fetchall()
+        return dict(rows)
+
+
+# ----------------------------------------------------------------------
+# Pipeline
+# ----------------------------------------------------------------------
+
+class WeeklyReportPipeline:
+    """Streams links, bridges and profiles once per week and renders parent reports."""
+
+    def __init__(
+        self,
+        links_dir: Path = LINKS_DIR,
+        parents_dir: Path = PARENTS_DIR,
+        profiles_dir: Path = USER_PROFILES_DIR,
+        bridges_dir: Path = REALITY_BRIDGES_DIR,
+        store_path: Path = Path("src/data/reports/reports.db"),
+        workers: int = REPORT_WORKERS,
+        chunk_size: int = REPORT_CHUNK_SIZE,
+        send_rate: float = REPORT_SEND_RATE,
+        send_batch: int = REPORT_SEND_BATCH,
+        fanout_levels: int = STORE_FANOUT_LEVELS,
+        max_attempts: int = REPORT_MAX_ATTEMPTS,
+        retry_delay: float = REPORT_RETRY_DELAY_SECONDS
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            links_dir: LinkManager link directory
+            parents_dir: LinkManager parent profile directory
+            profiles_dir: UserManager profile directory
+            bridges_dir: RealityBridgeManager storage (archive/ holds bridge events)
+            store_path: Checkpoint database
+            workers: Render processes (0: render in this process)
+            chunk_size: Parents per render task / checkpoint
+            send_rate: Reports handed to the sender per second
+            send_batch: Reports per hand-off batch
+            fanout_levels: File layout of the link, parent and profile stores (0: flat)
+            max_attempts: Delivery attempts per report before it stays failed
+            retry_delay: Seconds before a run retries its failed reports
+        """
+        self.links_dir = links_dir
+        self.parents_dir = parents_dir
+        self.profiles_dir = profiles_dir
+        self.bridges_dir = bridges_dir
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.send_rate = send_rate
+        self.send_batch = send_batch
+        self.fanout_levels = fanout_levels
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+        self.store = ReportStore(store_path)
+
+        self.last_run: Dict[str, Any] = {}
+
+    def close(self) -> None:
+        self.store.close()
+
+    # ------------------------------------------------------------------
+    # Single-pass inputs
+    # ------------------------------------------------------------------
+
+    def _iter_records(self, directory: Path):
+        """Decoded record files of a store (lazy, unreadable files skipped)."""
+        for entry in StoreLayout(directory, self.fanout_levels).iter_entries():
+            try:
+                record = read_record(entry.path)
+            except (OSError, ValueError) as e:
+                logger.warning("weekly_report_file_skipped", path=entry.name, error=str(e))
+                continue
+            yield record
+
+    def scan_families(self) -> Dict[str, List[str]]:
+        """
+        Group active links by parent (one pass over links and parents).
+
+        Returns:
+            {parent_id: [child_id, ...]} of parents receiving weekly reports
+        """
+        families: Dict[str, List[str]] = {}
+        for link in self._iter_records(self.links_dir):
+            if link.get("status") == "active" and link.get("parent_id"):
+                children = families.setdefault(link["parent_id"], [])
+                if link["child_id"] not in children:
+                    children.append(link["child_id"])
+
+        for parent in self._iter_records(self.parents_dir):
+            settings = parent.get("notification_settings") or {}
+            if settings.get("weekly_reports", True) is False:
+                families.pop(parent.get("parent_id"), None)
+
+        return families
+
+    def bridge_outcomes(self, start: datetime, end: datetime, children: Set[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Count a week's bridge events per child (one pass over its partitions).
+
+        Args:
+            start: Week start
+            end: Week end (exclusive)
+            children: Children to count
+
+        Returns:
+            {child_id: {"created", "completed", "expired"}}
+        """
+        archive = BridgeArchive(self.bridges_dir / "archive")
+        start_ts, end_ts = start.timestamp(), end.timestamp()
+
+        outcomes: Dict[str, Dict[str, int]] = {}
+        for record in archive.iter_events(start.date(), (end - timedelta(days=1)).date()):
+            user_id = record.get("user_id")
+            event = record.get("event")
+            if user_id not in children or event not in BRIDGE_EVENTS or not start_ts <= record["ts"] < end_ts:
+                continue
+            counts = outcomes.setdefault(user_id, dict.fromkeys(BRIDGE_EVENTS, 0))
+            counts[event] += 1
+        return outcomes
+
+    # ------------------------------------------------------------------
+    # Render
+    # ------------------------------------------------------------------
+
+    async def generate(self, week_start: date) -> Dict[str, Any]:
+        """
+        Render reports of a week, resuming after the last committed chunk.
+
+        Args:
+            week_start: First day of the reported week
+
+        Returns:
+            Dictionary with parents, skipped (already rendered), rendered, chunks
+        """
+        week = week_key(week_start)
+        start = datetime.combine(week_start, datetime.min.time())
+        end = start + timedelta(days=7)
+        started = time.perf_counter()
+
+        families = await asyncio.to_thread(self.scan_families)
+        done = await asyncio.to_thread(self.store.done_parents, week)
+        todo = [(parent_id, families[parent_id]) for parent_id in sorted(families) if parent_id not in done]
+
+        children = {child_id for _, family in todo for child_id in family}
+        bridges = await asyncio.to_thread(self.bridge_outcomes, start, end, children)
+        REPORT_PHASE_SECONDS.labels("scan").observe(time.perf_counter() - started)
+
+        chunks = [todo[index:index + self.chunk_size] for index in range(0, len(todo), self.chunk_size)]
+        rendered = 0
+        render_started = time.perf_counter()
+
+        def payload(chunk: List[Family]) -> Tuple:
+            chunk_bridges = {
+                child_id: bridges[child_id] for _, family in chunk for child_id in family if child_id in bridges
+            }
+            return str(self.profiles_dir), self.fanout_levels, chunk, chunk_bridges, start.timestamp(), end.timestamp()
+
+        async def commit(reports: List[Tuple[str, str, int]]) -> None:
+            nonlocal rendered
+            await asyncio.to_thread(self.store.save_rendered, week, reports)
+            rendered += len(reports)
+            REPORTS_TOTAL.labels(RENDERED).inc(sum(1 for _, text, _ in reports if text))
+            REPORTS_TOTAL.labels(EMPTY).inc(sum(1 for _, text, _ in reports if not text))
+
+        if self.workers and len(chunks) > 1:
+            loop = asyncio.get_running_loop()
+            workers = min(self.workers, len(chunks))
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+                queued = iter(chunks)
+                running: Set[asyncio.Future] = set()
+                while True:
+                    # At most two tasks per worker in flight: bounded memory
+                    for chunk in queued:
+                        running.add(loop.run_in_executor(pool, render_families, *payload(chunk)))
+                        if len(running) >= workers * 2:
+                            break
+                    if not running:
+                        break
+                    finished, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for future in finished:
+                        await commit(future.result())
+        else:
+            for chunk in chunks:
+                await commit(await asyncio.to_thread(render_families, *payload(chunk)))
+
+        REPORT_PHASE_SECONDS.labels("render").observe(time.perf_counter() - render_started)
+        result = {
+            "week": week,
+            "parents": len(families),
+            "skipped": len(families) - len(todo),
+            "rendered": rendered,
+            "chunks": len(chunks),
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+        logger.info("weekly_reports_rendered", **result)
+        return result
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    async def deliver(self, week_start: date, sender: Any) -> Dict[str, Any]:
+        """
+        Hand rendered reports to the sender at send_rate.
+
+        Each batch waits for its messages to be sent (or fail) before the
+        next one is queued, so the sender's queue stays short and live
+        replies are not delayed behind a week's worth of reports. Failed
+        reports (also those of an earlier run) are retried, after
+        retry_delay, until they have had max_attempts delivery attempts.
+
+        Args:
+            week_start: First day of the reported week
+            sender: src.bot.outbound.OutboundSender of the parent bot
+
+        Returns:
+            Dictionary with sent, failed (given up for now), retried and batches
+        """
+        week = week_key(week_start)
+        sent = batches = 0
+        failed: Set[str] = set()
+        started = time.perf_counter()
+
+        retried = await asyncio.to_thread(self.store.requeue_failed, week, self.max_attempts)
+        while True:
+            batch = await asyncio.to_thread(self.store.fetch_rendered, week, self.send_batch)
+            if not batch:
+                requeued = await asyncio.to_thread(self.store.requeue_failed, week, self.max_attempts)
+                if not requeued:
+                    break
+                retried += requeued
+                logger.info("weekly_reports_retrying", week=week, count=requeued, delay=self.retry_delay)
+                await asyncio.sleep(self.retry_delay)
+                continue
+
+            batch_started = time.monotonic()
+            futures = sender.submit_batch(
+                [(report.parent_id, report.text) for report in batch], priority=Priority.NOTIFICATION
+            )
+            results = await asyncio.gather(*futures, return_exceptions=True)
+
+            delivered = [report.parent_id for report, result in zip(batch, results)
+                         if not isinstance(result, BaseException)]
+            errors = [report.parent_id for report, result in zip(batch, results)
+                      if isinstance(result, BaseException)]
+            await asyncio.to_thread(self.store.mark, week, delivered, SENT)
+            await asyncio.to_thread(self.store.mark, week, errors, FAILED)
+
+            sent += len(delivered)
+            failed.difference_update(delivered)
+            failed.update(errors)
+            batches += 1
+            REPORTS_TOTAL.labels(SENT).inc(len(delivered))
+            REPORTS_TOTAL.labels(FAILED).inc(len(errors))
+            if errors:
+                logger.warning("weekly_reports_failed", week=week, count=len(errors))
+
+            # Throttle the hand-off to send_rate
+            remaining = len(batch) / self.send_rate - (time.monotonic() - batch_started)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+        REPORT_PHASE_SECONDS.labels("deliver").observe(time.perf_counter() - started)
+        result = {"week": week, "sent": sent, "failed": len(failed), "retried": retried, "batches": batches}
+        logger.info("weekly_reports_delivered", **result)
+        return result
+
+    async def run(self, week_start: date, sender: Optional[Any] = None) -> Dict[str, Any]:
+        """
+        Render (resuming if interrupted) and deliver a week's reports.
+
+        Args:
+            week_start: First day of the reported week
+            sender: OutboundSender (None: render only)
+
+        Returns:
+            Dictionary with render and delivery results and final counts
+        """
+        result = {"render": await self.generate(week_start)}
+        if sender is not None:
+            result["deliver"] = await self.deliver(week_start, sender)
+        result["counts"] = await asyncio.to_thread(self.store.counts, week_key(week_start))
+        self.last_run = result
+        return result
+
+    async def run_scheduled(self, sender: Any) -> None:
+        """Run every WEEKLY_REPORT_DAY at WEEKLY_REPORT_HOUR (until cancelled)."""
+        while True:
+            run_at = next_run_at(datetime.now())
+            logger.info("weekly_reports_scheduled", run_at=run_at.isoformat())
+            await asyncio.sleep(max(0.0, (run_at - datetime.now()).total_seconds()))
+            try:
+                await self.run(report_week_start(run_at), sender)
+            except Exception as e:
+                logger.error("weekly_reports_run_failed", error=str(e))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        Get pipeline statistics.
+
+        Returns:
+            Dictionary with settings and the last run
+        """
+        return {
+            "workers": self.workers,
+            "chunk_size": self.chunk_size,
+            "send_rate": self.send_rate,
+            "last_run": self.last_run
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point (weekly batch)."""
+    parser = argparse.ArgumentParser(description="Weekly parent reports for InnerWorld Edu")
+    parser.add_argument("--week-start", type=date.fromisoformat,
+                        help="First day of the reported week (default: week before the last scheduled run)")
+    parser.add_argument("--workers", type=int, default=REPORT_WORKERS, help="Render processes")
+    parser.add_argument("--dry-run", action="store_true", help="Render and checkpoint only, do not send")
+    parser.add_argument("--schedule", action="store_true", help="Keep running, one report run per week")
+    args = parser.parse_args(argv)
+
+    pipeline = WeeklyReportPipeline(workers=args.workers)
+
+    async def run() -> Dict[str, Any]:
+        sender = None
+        if not args.dry_run:
+            from telegram import Bot
+            from src.bot.outbound import OutboundSender
+            from src.config import PARENT_BOT_TOKEN
+            sender = OutboundSender(Bot(PARENT_BOT_TOKEN))
+            await sender.start()
+        try:
+            if args.schedule:
+                await pipeline.run_scheduled(sender)
+            week_start = args.week_start or report_week_start(next_run_at(datetime.now()) - timedelta(days=7))
+            return await pipeline.run(week_start, sender)
+        finally:
+            if sender is not None:
+                await sender.stop()
+
+    try:
+        print(json.dumps(asyncio.run(run()), ensure_ascii=False, indent=2))
+    finally:
+        pipeline.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
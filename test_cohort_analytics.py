@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Test cohort analytics for InnerWorld Edu.
+
+Tests:
+1. Distributions and correlations - match in-memory NumPy on all profiles
+2. Trajectory - daily mean of a dimension for one location
+3. Quest deltas - sources ranked by how much they move a dimension
+4. Streaming - results independent of chunk size, memory bounded by chunk
+
+Run: python test_cohort_analytics.py
+"""
+
+import asyncio
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+from src.orchestration.learning_profile import LearningProfile, LearningDimension, DAY_SECONDS
+from src.orchestration.cohort_analytics import CohortAnalytics, FEATURES
+
+PROFILES = 2000
+
+
+def write_profiles(data_dir: Path, count: int, seed: int = 7) -> list:
+    """
+    Write synthetic profiles: forest_calm children gain attention every 10 days,
+    quest_workshop raises motivation by 2, quest_boring lowers it by 1.
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    rows = []
+
+    for index in range(count):
+        location = "forest_calm" if index % 2 else "valley_words"
+        learning = LearningProfile(attention=3, motivation=5)
+        created = now - 70 * DAY_SECONDS
+
+        for day in range(60, 0, -10):
+            ts = now - day * DAY_SECONDS
+            if location == "forest_calm":
+                learning.history.append(LearningDimension.ATTENTION, learning.attention + 1, 1,
+                                        "quest_breathing", timestamp=ts)
+                learning.attention += 1
+
+            source, change = rng.choice([("quest_workshop", 2), ("quest_boring", -1)])
+            value = max(1, min(10, learning.motivation + change))
+            learning.history.append(LearningDimension.MOTIVATION, value, value - learning.motivation,
+                                    source, timestamp=ts + 60)
+            learning.motivation = value
+
+        xp = learning.motivation * 100 + rng.randint(0, 50)
+        profile = {
+            "user_id": str(index),
+            "learning_profile": learning.to_dict(),
+            "progress": {"level": 1 + xp // 200, "xp": xp, "streak_days": rng.randint(0, 9),
+                         "total_quests_completed": rng.randint(0, 20)},
+            "current_location": location,
+            "created_at": datetime.fromtimestamp(created).isoformat()
+        }
+        (data_dir / f"{index}.json").write_text(json.dumps(profile), encoding="utf-8")
+        rows.append((location, [learning.get_dimension(d) for d in LearningDimension],
+                     [profile["progress"][name] for name in FEATURES[4:]]))
+
+    return rows
+
+
+async def test_distributions(data_dir: Path, rows: list):
+    """Test distributions and correlations against in-memory NumPy."""
+    print("\n" + "="*60)
+    print("TEST 1: Distributions and Correlations")
+    print("="*60 + "\n")
+
+    report = CohortAnalytics(data_dir, chunk_size=300).analyze()
+    values = np.array([row[1] for row in rows])
+
+    attention = report.distributions["attention"]
+    print(f"Attention: {attention}")
+    ok = report.users == PROFILES and abs(attention["mean"] - values[:, 2].mean()) < 1e-3
+    print(f"{'✅' if ok else '❌'} Mean attention {attention['mean']} over {report.users} children")
+    print(f"{'✅' if sum(attention['histogram']) == PROFILES else '❌'} Histogram covers every child")
+
+    features = np.array([row[1] + row[2] for row in rows], dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        expected = np.corrcoef(features, rowvar=False)
+    matrix = np.array(report.correlations["matrix"])
+    motivation, xp = FEATURES.index("motivation"), FEATURES.index("xp")
+    expected = np.nan_to_num(expected)  # Constant columns correlate as 0
+    np.fill_diagonal(expected, 1.0)
+    ok = np.allclose(matrix, expected, atol=1e-3) and matrix[motivation, xp] > 0.9
+    print(f"{'✅' if ok else '❌'} corr(motivation, xp) = {matrix[motivation, xp]} "
+          f"(NumPy on all rows: {expected[motivation, xp]:.3f})")
+
+
+async def test_trajectory(data_dir: Path):
+    """Test daily mean of attention for one location."""
+    print("\n" + "="*60)
+    print("TEST 2: Trajectory")
+    print("="*60 + "\n")
+
+    report = CohortAnalytics(data_dir, chunk_size=300).analyze(location="forest_calm", days=70)
+    attention = report.trajectory["attention"]
+    print(f"forest_calm attention, every 10 days: {attention[::10]} .. {attention[-1]}")
+
+    rising = all(b >= a for a, b in zip(attention, attention[1:]))
+    print(f"{'✅' if report.users == PROFILES // 2 and rising else '❌'} "
+          f"Attention rises for {report.users} children in forest_calm")
+    print(f"{'✅' if attention[0] == 3.0 and attention[-1] == 9.0 else '❌'} "
+          f"From {attention[0]} ({report.days[0]}) to {attention[-1]} ({report.days[-1]})")
+
+    other = CohortAnalytics(data_dir, chunk_size=300).analyze(location="valley_words", days=70)
+    flat = set(other.trajectory["attention"]) == {3.0}
+    print(f"{'✅' if flat else '❌'} valley_words attention stays flat")
+
+
+async def test_quest_deltas(data_dir: Path):
+    """Test sources ranked by change."""
+    print("\n" + "="*60)
+    print("TEST 3: Quest Deltas")
+    print("="*60 + "\n")
+
+    report = CohortAnalytics(data_dir, chunk_size=300).analyze()
+    motivation = report.quest_deltas["motivation"]
+    for delta in motivation:
+        print(f"   {delta}")
+
+    top = motivation[0] if motivation else {}
+    print(f"{'✅' if top.get('source') == 'quest_workshop' and top.get('mean_change', 0) > 1 else '❌'} "
+          f"quest_workshop moves motivation most")
+    sources = [delta["source"] for delta in report.quest_deltas["attention"]]
+    print(f"{'✅' if sources == ['quest_breathing'] else '❌'} Attention moved by {sources}")
+
+
+async def test_streaming(data_dir: Path):
+    """Test chunk-size independence and bounded memory."""
+    print("\n" + "="*60)
+    print("TEST 4: Streaming")
+    print("="*60 + "\n")
+
+    small = CohortAnalytics(data_dir, chunk_size=250)
+    report_small = small.analyze().to_dict()
+    report_large = CohortAnalytics(data_dir, chunk_size=PROFILES).analyze().to_dict()
+    print(f"{'✅' if report_small == report_large else '❌'} Same report with {small.chunks} chunks and 1 chunk")
+
+    # Double the profiles: peak memory should stay about the same
+    double_dir = Path(tempfile.mkdtemp())
+    for path in data_dir.iterdir():
+        shutil.copy(path, double_dir / path.name)
+        shutil.copy(path, double_dir / f"copy_{path.name}")
+
+    peaks = []
+    for directory in (data_dir, double_dir):
+        tracemalloc.start()
+        started = time.perf_counter()
+        CohortAnalytics(directory, chunk_size=250).analyze()
+        elapsed = time.perf_counter() - started
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        print(f"   {len(list(directory.iterdir()))} profiles: peak {peaks[-1] / 1e6:.1f} MB, {elapsed:.2f}s")
+
+    print(f"{'✅' if peaks[1] < peaks[0] * 1.3 else '❌'} Peak memory bounded by chunk size")
+    shutil.rmtree(double_dir, ignore_errors=True)
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Cohort Analytics Tests ===")
+
+    data_dir = Path(tempfile.mkdtemp())
+    try:
+        rows = write_profiles(data_dir, PROFILES)
+        await test_distributions(data_dir, rows)
+        await test_trajectory(data_dir)
+        await test_quest_deltas(data_dir)
+        await test_streaming(data_dir)
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -193,7 +193,7 @@ async def test_integration():
 
     if state_manager.reality_bridge_manager:
         print("✅ Reality Bridge Manager initialized")
-        print(f"   Scheduler running: {state_manager.reality_bridge_manager.scheduler.running}")
+        print(f"   Reminder store: {state_manager.reality_bridge_manager.reminder_store.count_by_state()}")
         print(f"   Active bridges: {len(state_manager.reality_bridge_manager.active_bridges)}")
 
         # Test creating a bridge
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Test LearningProfile history for InnerWorld Edu.
+
+Tests:
+1. Columnar history - bounded size, interned sources, readings as objects
+2. Downsampling - recent raw, older per day, oldest per week, counts kept
+3. Analyzer - trend and weekly summary read from running statistics
+4. Persistence - history round-trips through UserProfile
+5. Running statistics - EWMA, slope, streaks and week ring updated in O(1)
+
+Run: python test_learning_profile.py
+"""
+
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import src.orchestration  # noqa: F401 (import order: orchestration before data)
+from src.orchestration.learning_profile import (
+    LearningProfile,
+    LearningProfileAnalyzer,
+    LearningStats,
+    LearningDimension,
+    DimensionReading,
+    RAW_HISTORY_DAYS,
+    RAW_HISTORY_LIMIT,
+    DAILY_HISTORY_DAYS,
+    DAY_SECONDS,
+    RECENT_CHANGES
+)
+from src.orchestration.state_manager import StateManager, UserState
+
+DIMENSIONS = list(LearningDimension)
+
+
+def year_of_readings(profile: LearningProfile, per_day: int = 30) -> int:
+    """Record per_day readings a day for a year. Returns net change."""
+    now = time.time()
+    net = 0
+    for day in range(365, 0, -1):
+        for index in range(per_day):
+            change = 1 if index % 3 else -1
+            net += change
+            ts = now - day * DAY_SECONDS + index * 60
+            profile.history.append(DIMENSIONS[index % 4], 5, change, f"quest_{index % 12}_completed", timestamp=ts)
+            profile.stats.record(DIMENSIONS[index % 4], 5, change, ts)
+    return net
+
+
+async def test_columnar_history():
+    """Test that history stays bounded and compact."""
+    print("\n" + "="*60)
+    print("TEST 1: Columnar History")
+    print("="*60 + "\n")
+
+    profile = LearningProfile()
+    year_of_readings(profile)
+    history = profile.history
+
+    print(f"Readings: {len(history)}, raw: {len(history.ts)}, "
+          f"daily: {len(history.daily)}, weekly: {len(history.weekly)}")
+    print(f"{'✅' if len(history) == 365 * 30 and len(history.ts) <= RAW_HISTORY_LIMIT else '❌'} "
+          f"Raw tier bounded by RAW_HISTORY_LIMIT ({RAW_HISTORY_LIMIT})")
+
+    rows = len(history.ts) + len(history.daily) + len(history.weekly)
+    print(f"{'✅' if rows < 1000 else '❌'} {rows} rows kept for {len(history)} readings")
+
+    print(f"{'✅' if len(history.sources) <= 12 else '❌'} Sources interned: {len(history.sources)}")
+
+    profile.adjust_dimension(LearningDimension.MEMORY, +1, "quest_completed")
+    last = history[-1]
+    ok = isinstance(last, DimensionReading) and last.dimension == LearningDimension.MEMORY and last.change == 1
+    print(f"{'✅' if ok else '❌'} Last reading: {last.dimension.value} {last.change:+d} ({last.source})")
+
+
+async def test_downsampling():
+    """Test tier boundaries and that aggregates keep counts and net change."""
+    print("\n" + "="*60)
+    print("TEST 2: Downsampling")
+    print("="*60 + "\n")
+
+    profile = LearningProfile()
+    net = year_of_readings(profile, per_day=4)  # Few readings: age decides the tier
+    history = profile.history
+    now = time.time()
+
+    raw_age = (now - history.ts[0]) / DAY_SECONDS
+    # Raw readings are downsampled a day at a time
+    print(f"{'✅' if raw_age < RAW_HISTORY_DAYS + 1.1 else '❌'} Oldest raw reading: {raw_age:.1f} days")
+
+    aggregates = history.aggregates()
+    daily = aggregates[len(history.weekly):]
+    weekly = aggregates[:len(history.weekly)]
+    oldest_day = (datetime.now() - daily[0].start).days if daily else 0
+    print(f"{'✅' if oldest_day <= DAILY_HISTORY_DAYS + 1 else '❌'} Oldest daily aggregate: {oldest_day} days")
+    print(f"{'✅' if weekly and all(a.start.weekday() == 0 for a in weekly) else '❌'} "
+          f"Weekly aggregates start on Monday ({len(weekly)})")
+
+    counted = sum(a.count for a in aggregates) + len(history.ts)
+    changed = sum(a.change for a in aggregates) + sum(history.change)
+    print(f"{'✅' if counted == len(history) and changed == net else '❌'} "
+          f"Aggregates keep {counted} readings, net change {changed:+d}")
+
+
+async def test_analyzer():
+    """Test analyzer reads."""
+    print("\n" + "="*60)
+    print("TEST 3: Analyzer")
+    print("="*60 + "\n")
+
+    profile = LearningProfile()
+    for _ in range(10):
+        profile.adjust_dimension(LearningDimension.ATTENTION, -1, "distracted")
+
+    pattern = LearningProfileAnalyzer.detect_learning_pattern(profile)
+    print(f"Pattern: {pattern}")
+    print(f"{'✅' if pattern['trend'] == 'declining' and pattern['negative_changes'] == 4 else '❌'} "
+          f"Declining trend from recent changes")
+
+    summary = LearningProfileAnalyzer.get_progress_summary(profile)
+    print(summary)
+    print(f"{'✅' if 'За неделю: внимание -4' in summary else '❌'} Weekly change in summary")
+
+    profile = LearningProfile()
+    year_of_readings(profile)
+    started = time.perf_counter()
+    for _ in range(1000):
+        LearningProfileAnalyzer.detect_learning_pattern(profile)
+        LearningProfileAnalyzer.get_progress_summary(profile)
+    per_call = (time.perf_counter() - started) / 1000
+    print(f"{'✅' if per_call < 0.001 else '❌'} Pattern + summary on a year of history: {per_call * 1e6:.0f} µs")
+
+
+async def test_persistence():
+    """Test history round-trip through UserProfile."""
+    print("\n" + "="*60)
+    print("TEST 4: Persistence")
+    print("="*60 + "\n")
+
+    learning = LearningProfile()
+    year_of_readings(learning)
+    learning.adjust_dimension(LearningDimension.MOTIVATION, +2, "engaged_in_quest")
+
+    state_manager = StateManager()
+    profile = state_manager._state_to_profile(UserState(user_id="123", learning_profile=learning))
+    stored = json.loads(json.dumps(profile.learning_profile))
+    profile.learning_profile = stored
+    restored = state_manager._profile_to_state(profile).learning_profile
+
+    same = (
+        restored.motivation == learning.motivation
+        and len(restored.history) == len(learning.history)
+        and restored.history[-1].source == learning.history[-1].source
+        and abs(restored.history.ts[-1] - learning.history.ts[-1]) < 0.001  # Stored in ms
+        and restored.history.aggregates() == learning.history.aggregates()
+    )
+    print(f"{'✅' if same else '❌'} History restored: {len(restored.history)} readings, "
+          f"last {restored.history[-1].source}")
+    print(f"Stored history: {len(json.dumps(stored['history'])) / 1024:.1f} KB for {len(learning.history)} readings")
+
+    print(f"{'✅' if restored.stats.to_dict() == learning.stats.to_dict() else '❌'} Running statistics restored")
+
+    legacy = LearningProfile.from_dict({"understanding_meaning": 3, "memory": 7})
+    print(f"{'✅' if legacy.understanding_meaning == 3 and len(legacy.history) == 0 else '❌'} "
+          f"Profiles saved without history still load")
+
+
+async def test_running_stats():
+    """Test running statistics and their O(1) update."""
+    print("\n" + "="*60)
+    print("TEST 5: Running Statistics")
+    print("="*60 + "\n")
+
+    profile = LearningProfile(memory=2)
+    for _ in range(5):
+        profile.adjust_dimension(LearningDimension.MEMORY, +1, "quest_memory_completed")
+    profile.adjust_dimension(LearningDimension.ATTENTION, -2, "distracted")
+    stats = profile.stats
+    memory = DIMENSIONS.index(LearningDimension.MEMORY)
+    attention = DIMENSIONS.index(LearningDimension.ATTENTION)
+
+    print(f"EWMA: {stats.ewma}, slope: {stats.slope}, streak: {stats.streak}")
+    ok = stats.streak[memory] == 5 and stats.streak[attention] == -1 and 3 < stats.ewma[memory] < 7
+    print(f"{'✅' if ok else '❌'} Memory rising 5 in a row, attention falling")
+
+    pattern = LearningProfileAnalyzer.detect_learning_pattern(profile)
+    ok = pattern["streaks"] == {"memory": 5, "attention": -1} and pattern["slopes"]["memory"] == 1.0
+    print(f"{'✅' if ok else '❌'} Pattern reports slopes {pattern['slopes']} and streaks {pattern['streaks']}")
+
+    # Window matches a recount of the last RECENT_CHANGES changes
+    for index in range(50):
+        profile.adjust_dimension(DIMENSIONS[index % 4], 1 if index % 3 else -1)
+    recent = profile.history.recent_changes(RECENT_CHANGES)
+    ok = (stats.positive, stats.negative) == (sum(1 for c in recent if c > 0), sum(1 for c in recent if c < 0))
+    print(f"{'✅' if ok else '❌'} Recent counts {stats.positive}+/{stats.negative}- match the history")
+
+    # Week ring: older days drop out
+    stats = LearningStats()
+    now = time.time()
+    stats.record(LearningDimension.MOTIVATION, 6, +1, now - 10 * DAY_SECONDS)
+    stats.record(LearningDimension.MOTIVATION, 7, +1, now - 3 * DAY_SECONDS)
+    stats.record(LearningDimension.MOTIVATION, 9, +2, now)
+    week = stats.week_change()
+    print(f"{'✅' if week == {LearningDimension.MOTIVATION: 3} else '❌'} Last week: {week}")
+
+    # Legacy profiles rebuild statistics from raw history
+    rebuilt = LearningStats.from_history(profile.history)
+    print(f"{'✅' if rebuilt.streak == profile.stats.streak else '❌'} Statistics rebuilt from raw history")
+
+    # Update cost does not grow with history
+    costs = []
+    for _ in range(2):
+        started = time.perf_counter()
+        for index in range(20000):
+            profile.adjust_dimension(DIMENSIONS[index % 4], 1 if index % 2 else -1, "quest")
+        costs.append((time.perf_counter() - started) / 20000)
+    print(f"{'✅' if costs[1] < costs[0] * 1.5 else '❌'} set_dimension: {costs[0] * 1e6:.1f} µs, "
+          f"then {costs[1] * 1e6:.1f} µs with {len(profile.history)} readings")
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Learning Profile History Tests ===")
+
+    try:
+        await test_columnar_history()
+        await test_downsampling()
+        await test_analyzer()
+        await test_persistence()
+        await test_running_stats()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Test parent link expiry sweeper for InnerWorld Edu.
+
+Tests:
+1. TTL index - statistics and child lookups without scanning link files;
+   lookups still see links another process activated
+2. Expiry - due pending links expired in batches, others untouched
+3. Retention - old expired/revoked links archived and their files removed
+4. Background sweeper - pending link expires without being read
+5. Owner filter - shard worker sweeps only its children's links, and the
+   rest once ownership moves to it
+
+Run: python test_link_sweeper.py
+"""
+
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import src.orchestration  # noqa: F401 (import order: orchestration before data)
+from src.data.link_manager import LinkManager, ParentLink, LinkStatus
+from src.config import LINK_RETENTION_DAYS, LINK_SWEEP_BATCH
+
+
+def make_manager(**kwargs) -> LinkManager:
+    root = Path(tempfile.mkdtemp())
+    return LinkManager(links_dir=root / "links", parents_dir=root / "parents", **kwargs)
+
+
+def write_links(manager: LinkManager, count: int, status: LinkStatus, days_ago: float, prefix: str) -> None:
+    """Write link files directly (as an older process would have left them)."""
+    when = datetime.now() - timedelta(days=days_ago)
+    for index in range(count):
+        link = ParentLink(
+            link_id=f"{prefix}_{index}",
+            child_id=f"child_{prefix}_{index}",
+            child_name="Саша",
+            status=status,
+            created_at=(when - timedelta(days=7)).isoformat(),
+            expires_at=when.isoformat(),
+            revoked_at=when.isoformat() if status == LinkStatus.REVOKED else None
+        )
+        manager._write_link_file(link)
+
+
+def cleanup(manager: LinkManager) -> None:
+    shutil.rmtree(manager.links_dir.parent, ignore_errors=True)
+
+
+async def test_index():
+    """Test index-backed statistics and lookups."""
+    print("\n" + "="*60)
+    print("TEST 1: TTL Index")
+    print("="*60 + "\n")
+
+    manager = make_manager()
+    try:
+        write_links(manager, 300, LinkStatus.ACTIVE, days_ago=-3, prefix="active")
+        write_links(manager, 200, LinkStatus.PENDING, days_ago=-3, prefix="pending")
+
+        link = await manager.create_link(child_id="child_1", child_name="Маша")
+        await manager.activate_link(link.link_id, parent_id="parent_1")
+
+        stats = await manager.get_statistics()
+        print(f"Statistics: {stats}")
+        ok = stats["active_links"] == 301 and stats["pending_links"] == 200 and stats["total_parents"] == 1
+        print(f"{'✅' if ok else '❌'} Counts from the index")
+
+        scans = 0
+        original = manager._scan
+
+        def counting_scan():
+            nonlocal scans
+            scans += 1
+            return original()
+
+        manager._scan = counting_scan
+        started = time.perf_counter()
+        for _ in range(100):
+            await manager.get_parent_for_child("child_1")
+            await manager.get_statistics()
+        per_call = (time.perf_counter() - started) / 100
+        print(f"{'✅' if scans == 0 else '❌'} No directory scans after the index is built")
+        print(f"   Child lookup + statistics: {per_call * 1e6:.0f} µs")
+
+        parent = await manager.get_parent_for_child("child_1")
+        print(f"{'✅' if parent == 'parent_1' else '❌'} Active link found through the child index")
+
+        # Another process (parent bot, other shard worker) sharing the directory
+        other = LinkManager(links_dir=manager.links_dir, parents_dir=manager.parents_dir)
+        link = await manager.create_link(child_id="child_2", child_name="Петя")
+        await other.activate_link(link.link_id, parent_id="parent_2")
+        activated = await manager.is_child_linked("child_2")
+        link = await other.create_link(child_id="child_3", child_name="Оля")
+        await other.activate_link(link.link_id, parent_id="parent_3")
+        created = await manager.get_parent_for_child("child_3")
+        print(f"{'✅' if activated and created == 'parent_3' else '❌'} "
+              f"Links activated or created by another process found (linked={activated}, parent={created})")
+    finally:
+        cleanup(manager)
+
+
+async def test_expiry():
+    """Test batched expiry."""
+    print("\n" + "="*60)
+    print("TEST 2: Expiry")
+    print("="*60 + "\n")
+
+    manager = make_manager()
+    try:
+        count = LINK_SWEEP_BATCH * 2 + 100
+        write_links(manager, count, LinkStatus.PENDING, days_ago=1, prefix="due")
+        write_links(manager, 50, LinkStatus.PENDING, days_ago=-1, prefix="later")
+
+        result = await manager.sweep()
+        print(f"Sweep: {result}")
+        print(f"{'✅' if result['expired'] == count and result['batches'] >= 3 else '❌'} "
+              f"{result['expired']} links expired in {result['batches']} batches")
+
+        link = manager._read_link_file("due_0")
+        later = manager._read_link_file("later_0")
+        ok = link.status == LinkStatus.EXPIRED and later.status == LinkStatus.PENDING
+        print(f"{'✅' if ok else '❌'} Expired on disk; not-yet-due links still pending")
+
+        stats = await manager.get_statistics()
+        print(f"{'✅' if stats['expired_links'] == count and stats['pending_links'] == 50 else '❌'} "
+              f"Index updated: {stats['expired_links']} expired, {stats['pending_links']} pending")
+
+        again = await manager.sweep()
+        print(f"{'✅' if again['expired'] == 0 else '❌'} Second sweep has nothing to do")
+    finally:
+        cleanup(manager)
+
+
+async def test_retention():
+    """Test archiving of old closed links."""
+    print("\n" + "="*60)
+    print("TEST 3: Retention")
+    print("="*60 + "\n")
+
+    manager = make_manager()
+    try:
+        old = LINK_RETENTION_DAYS + 5
+        write_links(manager, 400, LinkStatus.EXPIRED, days_ago=old, prefix="old_expired")
+        write_links(manager, 100, LinkStatus.REVOKED, days_ago=old, prefix="old_revoked")
+        write_links(manager, 300, LinkStatus.PENDING, days_ago=old, prefix="old_pending")
+        write_links(manager, 50, LinkStatus.EXPIRED, days_ago=2, prefix="recent")
+        write_links(manager, 20, LinkStatus.ACTIVE, days_ago=old, prefix="active")
+
+        result = await manager.sweep()
+        files = sum(1 for _ in manager.links_dir.glob("*.json"))
+        archived = manager.iter_archived()
+        print(f"Sweep: {result}, link files left: {files}")
+
+        # Pending links that expired long ago are expired, then archived in the same sweep
+        ok = result["archived"] == 800 and files == 70 and len(archived) == 800
+        print(f"{'✅' if ok else '❌'} {result['archived']} old links archived, {files} files left")
+
+        revoked = [record for record in archived if record["status"] == "revoked"]
+        print(f"{'✅' if len(revoked) == 100 else '❌'} Archive keeps full records ({len(revoked)} revoked)")
+
+        link = await manager.create_link(child_id="child_r", child_name="Петя")
+        await manager.revoke_link(link.link_id)
+        revoked_link = await manager.get_link(link.link_id)
+        print(f"{'✅' if revoked_link.revoked_at else '❌'} Revocation time recorded")
+
+        stats = await manager.get_statistics()
+        print(f"{'✅' if stats['total_links'] == 71 else '❌'} Index holds {stats['total_links']} live links")
+    finally:
+        cleanup(manager)
+
+
+async def test_background_sweeper():
+    """Test sweeper task."""
+    print("\n" + "="*60)
+    print("TEST 4: Background Sweeper")
+    print("="*60 + "\n")
+
+    manager = make_manager()
+    try:
+        await manager.initialize()
+        link = await manager.create_link(child_id="child_bg", child_name="Оля")
+
+        # Expire in a second without reading it: the sweeper wakes up for it
+        link.expires_at = (datetime.now() + timedelta(seconds=1)).isoformat()
+        await manager._save_link(link)
+
+        await asyncio.sleep(1.5)
+        on_disk = manager._read_link_file(link.link_id)
+        print(f"{'✅' if on_disk.status == LinkStatus.EXPIRED else '❌'} "
+              f"Link expired by the sweeper ({manager.sweeps} sweeps)")
+        await manager.shutdown()
+    finally:
+        cleanup(manager)
+
+
+async def test_owner_filter():
+    """Test sharded sweeping."""
+    print("\n" + "="*60)
+    print("TEST 5: Owner Filter")
+    print("="*60 + "\n")
+
+    manager = make_manager(owner_filter=lambda child_id: child_id.endswith(("0", "2", "4", "6", "8")))
+    try:
+        write_links(manager, 100, LinkStatus.PENDING, days_ago=1, prefix="shard")
+        result = await manager.sweep()
+        print(f"{'✅' if result['expired'] == 50 else '❌'} Swept {result['expired']} of 100 links (owned half)")
+
+        # Other half's due links were parked, not dropped
+        await manager.apply_ownership(None)
+        result = await manager.sweep()
+        ok = result['expired'] == 50 and manager._counts[LinkStatus.PENDING] == 0
+        print(f"{'✅' if ok else '❌'} Swept the other {result['expired']} after ownership moved here")
+
+        # Closed links parked for retention are archived after a move too
+        manager.owner_filter = lambda child_id: False
+        archived = (await manager.sweep(now=time.time() + (LINK_RETENTION_DAYS + 1) * 86400))['archived']
+        await manager.apply_ownership(None)
+        result = await manager.sweep(now=time.time() + (LINK_RETENTION_DAYS + 1) * 86400)
+        print(f"{'✅' if archived == 0 and result['archived'] == 100 else '❌'} "
+              f"Archived {result['archived']} parked closed links after ownership moved here")
+    finally:
+        cleanup(manager)
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Link Sweeper Tests ===")
+
+    try:
+        await test_index()
+        await test_expiry()
+        await test_retention()
+        await test_background_sweeper()
+        await test_owner_filter()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test location routing index for InnerWorld Edu.
+
+Tests:
+1. Routes - emotion and weakest dimension match the metadata
+2. Unlock conditions - locations locked until their condition holds
+3. Hot reload - YAML edits are picked up, broken edits keep the old table
+4. Lookup cost - one route() is a table lookup
+
+Run: python test_location_index.py
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import yaml
+
+import src.orchestration  # noqa: F401 (import order: orchestration before data)
+from src.orchestration.emotional_router import EmotionalRouter
+from src.orchestration.learning_profile import LearningProfile, LearningProfileAnalyzer
+from src.game.location_index import LocationIndex
+from src.config import LOCATIONS_DIR
+
+METADATA = LOCATIONS_DIR / "locations_metadata.yaml"
+
+
+async def test_routes():
+    """Test routes against metadata."""
+    print("\n" + "="*60)
+    print("TEST 1: Routes")
+    print("="*60 + "\n")
+
+    index = LocationIndex(METADATA)
+    print(f"Index: {index.get_statistics()}")
+
+    # Emotion only: same as the hard-coded router table
+    same = all(
+        index.route(emotion=emotion.value).locations[0] == location
+        for emotion, location in EmotionalRouter.EMOTION_TO_LOCATION.items()
+    )
+    print(f"{'✅' if same else '❌'} Emotion routes agree with EmotionalRouter.EMOTION_TO_LOCATION")
+
+    # Weakest dimension (unlocked): same as the analyzer table
+    for dimension, location in LearningProfileAnalyzer.DIMENSION_TO_LOCATION.items():
+        profile = LearningProfile(**{dimension.value: 2})
+        route = LearningProfileAnalyzer.route(profile)
+        print(f"{'✅' if route.locations[0] == location else '❌'} "
+              f"Weakest {dimension.value} -> {route.locations[0]}, modules {route.modules}")
+
+    profile = LearningProfile(understanding_meaning=2)
+    route = index.route(emotion="interest", weakest="understanding_meaning",
+                        profile={"understanding_meaning": 4})
+    print(f"{'✅' if route.locations[0] == 'city_mind' else '❌'} "
+          f"Emotion breaks ties between locations with the same focus: {route.locations[:2]}")
+    print(f"{'✅' if route.quests[0] == 'city_quest_01_facts_vs_opinions' else '❌'} "
+          f"Route lists quests of the best location: {route.quests}")
+    print(f"{'✅' if LearningProfileAnalyzer.recommend_modules(profile) == [15, 6] else '❌'} "
+          f"Modules from metadata: {LearningProfileAnalyzer.recommend_modules(profile)}")
+
+
+async def test_unlock_conditions():
+    """Test unlock conditions."""
+    print("\n" + "="*60)
+    print("TEST 2: Unlock Conditions")
+    print("="*60 + "\n")
+
+    index = LocationIndex(METADATA)
+
+    locked = index.route(weakest="motivation", profile={"motivation": 5}).locations
+    unlocked = index.route(weakest="motivation", profile={"motivation": 4}).locations
+    print(f"{'✅' if 'workshop_creator' not in locked and unlocked[0] == 'workshop_creator' else '❌'} "
+          f"workshop_creator unlocks at motivation <= 4")
+
+    calm = index.route(emotion="interest").locations
+    angry = index.route(emotion="anger").locations
+    print(f"{'✅' if 'mountain_emptiness' not in calm and angry[0] == 'mountain_emptiness' else '❌'} "
+          f"mountain_emptiness only for anger/numbness")
+
+    city = index.route(weakest="understanding_meaning", profile={"understanding_meaning": 2}).locations
+    print(f"{'✅' if 'city_mind' not in city else '❌'} city_mind locked below understanding 3")
+
+    before = index.route(quests_completed=2).locations
+    after = index.route(quests_completed=3).locations
+    print(f"{'✅' if 'bridge_actions' not in before and 'bridge_actions' in after else '❌'} "
+          f"bridge_actions unlocks after 3 quests")
+
+
+async def test_hot_reload():
+    """Test YAML hot reload."""
+    print("\n" + "="*60)
+    print("TEST 3: Hot Reload")
+    print("="*60 + "\n")
+
+    directory = Path(tempfile.mkdtemp())
+    path = directory / "locations_metadata.yaml"
+    shutil.copy(METADATA, path)
+    try:
+        index = LocationIndex(path, reload_seconds=0)
+        print(f"Before: anxiety -> {index.route(emotion='anxiety').locations[0]}")
+
+        data = yaml.safe_load(path.read_text(encoding="utf-8"))
+        data["locations"]["forest_calm"]["emotional_states"] = ["tiredness"]
+        data["locations"]["valley_words"]["emotional_states"].append("anxiety")
+        path.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+
+        after = index.route(emotion="anxiety").locations[0]
+        print(f"{'✅' if after == 'valley_words' and index.reloads == 2 else '❌'} "
+              f"After edit: anxiety -> {after} (reloads: {index.reloads})")
+
+        path.write_text("locations: [not: a, mapping", encoding="utf-8")
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 2_000_000))
+        kept = index.route(emotion="anxiety").locations[0]
+        print(f"{'✅' if kept == 'valley_words' and index.reload_errors == 1 else '❌'} "
+              f"Broken YAML keeps the previous table ({kept})")
+
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+async def test_lookup_cost():
+    """Test route() cost."""
+    print("\n" + "="*60)
+    print("TEST 4: Lookup Cost")
+    print("="*60 + "\n")
+
+    profile = LearningProfile(attention=2, motivation=3)
+    started = time.perf_counter()
+    for _ in range(10000):
+        LearningProfileAnalyzer.route(profile, emotion="anxiety", quests_completed=4)
+    per_call = (time.perf_counter() - started) / 10000
+    route = LearningProfileAnalyzer.route(profile, emotion="anxiety", quests_completed=4)
+    print(f"Route: {route.locations}")
+    print(f"{'✅' if per_call < 50e-6 else '❌'} Route lookup: {per_call * 1e6:.1f} µs")
+    print(f"{'✅' if route.locations[0] == 'forest_calm' else '❌'} "
+          f"Weak attention and anxiety -> {route.locations[0]}")
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Location Index Tests ===")
+
+    try:
+        await test_routes()
+        await test_unlock_conditions()
+        await test_hot_reload()
+        await test_lookup_cost()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
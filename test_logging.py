@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test the queue-based logging pipeline for InnerWorld Edu.
+
+Tests:
+1. Queue mode - events rendered and written by the writer thread
+2. Sampling and callsite - high-volume events rate-limited, callsite by level
+3. Saturation - full queue drops events and reports the drop count
+
+Run: python test_logging.py
+"""
+
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import structlog
+
+from src.core.logger import setup_logging, get_logger, get_log_writer, shutdown_logging, LogWriter, CallsiteByLevel
+
+
+class ThreadRecordingStream(io.StringIO):
+    """StringIO remembering which threads wrote to it."""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def write(self, text):
+        self.threads.add(threading.current_thread().name)
+        return super().write(text)
+
+
+def read_events(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines() if line]
+
+
+async def test_queue_mode():
+    """Test that the calling thread only enqueues."""
+    print("\n" + "="*60)
+    print("TEST 1: Queue Mode")
+    print("="*60 + "\n")
+
+    stream = ThreadRecordingStream()
+    setup_logging("INFO", log_dir=Path("data/logs"), mode="queue", stream=stream)
+    logger = get_logger("test.queue")
+
+    logger.info("message_processed", user_id="1", length=12)
+    logger.debug("not_written")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.error("processing_failed", exc_info=True)
+
+    written_before_flush = stream.getvalue()
+    await asyncio.sleep(0.2)  # Writer flushes every LOG_FLUSH_INTERVAL_SECONDS
+
+    events = read_events(stream)
+    names = [event["event"] for event in events]
+    print(f"Events: {names}")
+    print(f"{'✅' if names == ['message_processed', 'processing_failed'] else '❌'} Events written, debug filtered")
+    print(f"{'✅' if stream.threads == {'log-writer'} else '❌'} Written by writer thread: {stream.threads}")
+
+    exception = events[-1].get("exception", [{}])[0] if events else {}
+    print(f"{'✅' if exception.get('exc_type') == 'ValueError' else '❌'} Exception captured on calling thread")
+    print(f"   (nothing written before flush: {not written_before_flush})")
+
+    shutdown_logging()
+
+
+async def test_sampling_and_callsite():
+    """Test rate-limited sampling and per-level callsite capture."""
+    print("\n" + "="*60)
+    print("TEST 2: Sampling and Callsite")
+    print("="*60 + "\n")
+
+    stream = io.StringIO()
+    setup_logging("INFO", log_dir=Path("data/logs"), mode="queue", stream=stream)
+    logger = get_logger("test.sampling")
+
+    for index in range(100):
+        logger.info("user_loaded", user_id=str(index))
+    logger.info("quest_started", user_id="1")
+    logger.warning("reminder_time_passed", user_id="1")
+
+    get_log_writer().flush()
+    events = read_events(stream)
+    loaded = [e for e in events if e["event"] == "user_loaded"]
+    print(f"{'✅' if len(loaded) == 10 else '❌'} user_loaded sampled: {len(loaded)} of 100 written")
+
+    info = next(e for e in events if e["event"] == "quest_started")
+    warning = next(e for e in events if e["event"] == "reminder_time_passed")
+    ok = "lineno" not in info and warning.get("func_name") == "test_sampling_and_callsite"
+    print(f"{'✅' if ok else '❌'} Callsite only on warning: {warning.get('filename')}:{warning.get('lineno')}")
+
+    # Next window reports how many were suppressed
+    await asyncio.sleep(1.05)
+    logger.info("user_loaded", user_id="late")
+    get_log_writer().flush()
+    late = read_events(stream)[-1]
+    print(f"{'✅' if late.get('sampled_out') == 90 else '❌'} Next event carries sampled_out={late.get('sampled_out')}")
+
+    shutdown_logging()
+
+    # Sync mode keeps recording the callsite at every level by default
+    setup_logging("INFO", log_dir=Path("data/logs"), mode="sync")
+    callsite = next(p for p in structlog.get_config()["processors"] if isinstance(p, CallsiteByLevel))
+    print(f"{'✅' if 'info' in callsite.levels else '❌'} Sync mode callsite levels: {sorted(callsite.levels)}")
+
+    env = dict(os.environ, LOG_CALLSITE_LEVELS=" Warning, error,,")
+    levels = subprocess.run(
+        [sys.executable, "-c", "from src.config import LOG_CALLSITE_LEVELS; print(LOG_CALLSITE_LEVELS)"],
+        env=env, cwd=Path(__file__).parent, capture_output=True, text=True
+    ).stdout.strip()
+    print(f"{'✅' if levels == str(['warning', 'error']) else '❌'} LOG_CALLSITE_LEVELS parsed: {levels}")
+
+
+async def test_saturation():
+    """Test drop counter when queue is full."""
+    print("\n" + "="*60)
+    print("TEST 3: Saturation")
+    print("="*60 + "\n")
+
+    stream = io.StringIO()
+    writer = LogWriter(stream, structlog.processors.JSONRenderer(), max_queue=5, flush_interval=60.0)
+
+    for index in range(20):
+        writer.enqueue({"event": "burst", "level": "info", "index": index, "timestamp": time.time()})
+
+    print(f"Stats before flush: {writer.get_statistics()}")
+    writer.shutdown()
+
+    events = read_events(stream)
+    burst = [e for e in events if e["event"] == "burst"]
+    dropped = next((e for e in events if e["event"] == "log_events_dropped"), {})
+    print(f"{'✅' if len(burst) == 5 else '❌'} Queue kept {len(burst)} events")
+    print(f"{'✅' if writer.dropped == 15 and dropped.get('count') == 15 else '❌'} "
+          f"Dropped events counted and reported: {dropped.get('count')}")
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Logging Tests ===")
+
+    try:
+        await test_queue_mode()
+        await test_sampling_and_callsite()
+        await test_saturation()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        shutdown_logging()
+        structlog.reset_defaults()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
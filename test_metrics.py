@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test Prometheus metrics for InnerWorld Edu.
+
+Tests:
+1. Registry - counters, gauges, histograms and callbacks in text format
+2. StateManager metrics - message, stage, cache and storage metrics
+3. Exposition - /metrics server and event loop lag
+
+Run: python test_metrics.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.core.metrics import (
+    Metric,
+    MetricsRegistry,
+    REGISTRY,
+    CONTENT_TYPE,
+    start_metrics_server,
+    monitor_event_loop_lag
+)
+
+
+async def test_registry():
+    """Test metric types and text rendering."""
+    print("\n" + "="*60)
+    print("TEST 1: Registry")
+    print("="*60 + "\n")
+
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "Requests", ["route"])
+    latency = registry.histogram("test_latency_seconds", "Latency", buckets=(0.1, 1.0))
+    queue = {"items": [1, 2, 3]}
+
+    requests.labels("/a").inc()
+    requests.labels("/a").inc(2)
+    requests.labels('/b"x').inc()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5.0)
+    registry.register_callback("test_queue_depth", "Queue depth", lambda: len(queue["items"]))
+
+    text = registry.render()
+    print(text)
+
+    expected = [
+        "# TYPE test_requests_total counter",
+        'test_requests_total{route="/a"} 3.0',
+        'test_requests_total{route="/b\\"x"} 1.0',
+        'test_latency_seconds_bucket{le="0.1"} 1',
+        'test_latency_seconds_bucket{le="1.0"} 2',
+        'test_latency_seconds_bucket{le="+Inf"} 3',
+        "test_latency_seconds_sum 5.55",
+        "test_latency_seconds_count 3",
+        "test_queue_depth 3.0",
+    ]
+    missing = [line for line in expected if line not in text]
+    print(f"{'✅' if not missing else '❌'} Text format (missing: {missing})")
+
+    same = registry.counter("test_requests_total", "Requests", ["route"]) is requests
+    print(f"{'✅' if same else '❌'} Re-registering returns existing metric")
+
+    queue["items"].append(4)
+    print(f"{'✅' if registry.get_sample_value('test_queue_depth') == 4 else '❌'} Callback read at scrape time")
+
+    try:
+        Metric("test_base", "Base")
+        print("❌ Metric without _new_child instantiated")
+    except TypeError:
+        print("✅ Metric subclasses must implement _new_child")
+
+
+async def test_state_manager_metrics():
+    """Test metrics recorded by process_message."""
+    print("\n" + "="*60)
+    print("TEST 2: StateManager Metrics")
+    print("="*60 + "\n")
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+    from src.orchestration.state_manager import StateManager
+
+    def value(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    before = {
+        "ok": value("innerworld_messages_total", status="ok"),
+        "miss": value("innerworld_cache_requests_total", cache="user_state", result="miss"),
+        "hit": value("innerworld_cache_requests_total", cache="user_state", result="hit"),
+        "writes": value("innerworld_storage_operation_seconds_count", store="user_profile", operation="write"),
+        "node": value("innerworld_graph_node_seconds_count", node="start"),
+    }
+
+    state_manager = StateManager()
+    await state_manager.initialize()
+
+    await state_manager.process_message("metrics_user", "Привет!")
+    await state_manager.process_message("metrics_user", "Меня зовут Саша")
+
+    ok = value("innerworld_messages_total", status="ok") - before["ok"]
+    print(f"{'✅' if ok == 2 else '❌'} Messages counted: {ok}")
+
+    miss = value("innerworld_cache_requests_total", cache="user_state", result="miss") - before["miss"]
+    hit = value("innerworld_cache_requests_total", cache="user_state", result="hit") - before["hit"]
+    print(f"{'✅' if (miss, hit) == (1, 1) else '❌'} User state cache: {hit} hit, {miss} miss")
+
+    writes = value("innerworld_storage_operation_seconds_count", store="user_profile", operation="write") - before["writes"]
+    print(f"{'✅' if writes >= 2 else '❌'} Profile writes timed: {writes}")
+
+    node = value("innerworld_graph_node_seconds_count", node="start") - before["node"]
+    print(f"{'✅' if node >= 1 else '❌'} Graph node latency recorded: {node}")
+
+    stage = value("innerworld_message_stage_seconds_count", stage="graph")
+    states = value("innerworld_user_states")
+    quests = value("innerworld_quests_loaded")
+    print(f"{'✅' if stage >= 2 and states >= 1 and quests > 0 else '❌'} "
+          f"Stage histogram and cache sizes (graph={stage}, user_states={states}, quests={quests})")
+
+    await state_manager.reality_bridge_manager.shutdown()
+    Path("src/data/user_profiles/metrics_user.json").unlink(missing_ok=True)
+
+
+async def test_exposition():
+    """Test /metrics server and event loop lag."""
+    print("\n" + "="*60)
+    print("TEST 3: Exposition")
+    print("="*60 + "\n")
+
+    monitor = asyncio.create_task(monitor_event_loop_lag(interval=0.01))
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)  # Block the loop
+    await asyncio.sleep(0.05)
+    monitor.cancel()
+
+    lag = REGISTRY.get_sample_value("innerworld_event_loop_lag_last_seconds") or 0
+    peak = REGISTRY.get_sample_value("innerworld_event_loop_lag_seconds_bucket", {"le": "0.05"})
+    total = REGISTRY.get_sample_value("innerworld_event_loop_lag_seconds_count")
+    print(f"{'✅' if total and peak < total else '❌'} Blocking call seen as lag (last={lag:.3f}s)")
+
+    server = start_metrics_server(port=0, host="127.0.0.1")
+    port = server.server_address[1]
+
+    def scrape():
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            return response.headers["Content-Type"], response.read().decode("utf-8")
+
+    content_type, body = await asyncio.get_running_loop().run_in_executor(None, scrape)
+    server.shutdown()
+
+    print(f"{'✅' if content_type == CONTENT_TYPE else '❌'} Content-Type: {content_type}")
+    print(f"{'✅' if 'innerworld_event_loop_lag_seconds_bucket' in body else '❌'} Served {len(body)} bytes")
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Metrics Tests ===")
+
+    try:
+        await test_registry()
+        await test_state_manager_metrics()
+        await test_exposition()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
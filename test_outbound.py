@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Test OutboundSender for InnerWorld Edu.
+
+Uses a fake Bot API object that records send times and can answer 429.
+
+Tests:
+1. Global and per-chat rate limits
+2. Priority - live replies overtake queued reminders
+3. RetryAfter handling - pause and retry, fail after OUTBOUND_MAX_RETRY_AFTER
+4. Reality Bridge reminder and expiry notice go through the sender
+
+Run: python test_outbound.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from telegram.error import RetryAfter
+
+from src.bot.outbound import OutboundSender, Priority
+
+
+class FakeBot:
+    """Fake Bot API: records (time, chat_id, text) for every sent message."""
+
+    def __init__(self, retry_after_first: int = 0):
+        self.sent = []
+        self.retry_after_first = retry_after_first
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if self.retry_after_first:
+            retry_after, self.retry_after_first = self.retry_after_first, 0
+            raise RetryAfter(retry_after)
+
+        await asyncio.sleep(0.001)
+        self.sent.append((time.monotonic(), chat_id, text))
+        return {"chat_id": chat_id, "text": text}
+
+
+async def test_rate_limits():
+    """Test global and per-chat buckets."""
+    print("\n" + "="*60)
+    print("TEST 1: Rate Limits")
+    print("="*60 + "\n")
+
+    bot = FakeBot()
+    sender = OutboundSender(bot, global_rate=20, per_chat_rate=2, per_chat_burst=1)
+
+    started = time.monotonic()
+    futures = [sender.submit(chat_id=i % 10, text=f"msg {i}") for i in range(40)]
+    await asyncio.gather(*futures)
+    elapsed = time.monotonic() - started
+    await sender.stop()
+
+    # 40 messages at 20/s with a burst of 20 need about 1 second
+    print(f"Sent {len(bot.sent)} messages in {elapsed:.2f}s")
+    print(f"{'✅' if elapsed >= 0.9 else '❌'} Global rate respected")
+
+    per_chat_ok = True
+    for chat_id in range(10):
+        times = [t for t, c, _ in bot.sent if c == chat_id]
+        gaps = [b - a for a, b in zip(times, times[1:])]
+        if any(gap < 0.45 for gap in gaps):
+            per_chat_ok = False
+    print(f"{'✅' if per_chat_ok else '❌'} Per-chat rate respected (>= 0.5s between messages)")
+
+
+async def test_priority():
+    """Test that live replies overtake reminders."""
+    print("\n" + "="*60)
+    print("TEST 2: Priority")
+    print("="*60 + "\n")
+
+    bot = FakeBot()
+    sender = OutboundSender(bot, global_rate=10, per_chat_rate=100, per_chat_burst=100)
+
+    reminders = sender.submit_batch(
+        [(f"child_{i}", "⏰ reminder") for i in range(30)],
+        priority=Priority.REMINDER
+    )
+    await asyncio.sleep(0.3)
+    live = sender.submit("child_live", "live reply")
+    await live
+    await asyncio.gather(*reminders)
+    await sender.stop()
+
+    position = [c for _, c, _ in bot.sent].index("child_live")
+    print(f"Live reply sent at position {position + 1} of {len(bot.sent)}")
+    print(f"{'✅' if position < 20 else '❌'} Live reply overtook queued reminders")
+
+
+async def test_retry_after():
+    """Test 429 handling."""
+    print("\n" + "="*60)
+    print("TEST 3: RetryAfter")
+    print("="*60 + "\n")
+
+    bot = FakeBot(retry_after_first=1)
+    sender = OutboundSender(bot)
+
+    started = time.monotonic()
+    await sender.send("child_1", "hello")
+    elapsed = time.monotonic() - started
+    stats = sender.get_statistics()
+    await sender.stop()
+
+    print(f"Delivered after {elapsed:.2f}s, throttled={stats['throttled']}")
+    print(f"{'✅' if elapsed >= 1.0 and stats['sent'] == 1 else '❌'} Message retried after pause")
+
+    calls = []
+
+    async def flood_limited(chat_id, text, **kwargs):
+        calls.append(chat_id)
+        raise RetryAfter(0)
+
+    bot.send_message = flood_limited
+    sender = OutboundSender(bot, max_retry_after=2)
+    try:
+        await asyncio.wait_for(sender.send("child_1", "hello"), timeout=5)
+        failed = False
+    except RetryAfter:
+        failed = True
+    stats = sender.get_statistics()
+    await sender.stop()
+
+    ok = failed and len(calls) == 3 and stats["failed"] == 1
+    print(f"{'✅' if ok else '❌'} Flood-limited message fails after {len(calls) - 1} retries")
+
+
+async def test_reminder_delivery():
+    """Test Reality Bridge reminder sent through StateManager."""
+    print("\n" + "="*60)
+    print("TEST 4: Reality Bridge Reminder")
+    print("="*60 + "\n")
+
+    from src.orchestration.state_manager import StateManager
+    from src.game.reality_bridge_manager import ActiveBridge
+
+    bot = FakeBot()
+    sender = OutboundSender(bot)
+
+    state_manager = StateManager()
+    state_manager.set_outbound_sender(sender)
+
+    bridge = ActiveBridge(
+        user_id="12345",
+        quest_id="quest",
+        bridge_id="bridge",
+        title="Объясни слово другу",
+        description="Объясни одно сложное слово другу",
+        created_at="",
+        deadline_at="",
+        reminder_at=""
+    )
+    await state_manager._send_reality_bridge_reminder("12345", bridge)
+    await state_manager._on_reality_bridge_expired(bridge)
+    await sender.stop()
+
+    delivered = any(c == "12345" and "Объясни слово другу" in text for _, c, text in bot.sent)
+    print(f"{'✅' if delivered else '❌'} Reminder delivered via OutboundSender")
+
+    notified = any(c == "12345" and "закончилось" in text for _, c, text in bot.sent)
+    print(f"{'✅' if notified else '❌'} Expiry reported to the child via OutboundSender")
+
+    unsent = await StateManager()._send_reality_bridge_reminders([bridge])
+    ok = len(unsent) == 1 and isinstance(unsent[0], RuntimeError)
+    print(f"{'✅' if ok else '❌'} No sender: reminder reported as failed, not sent ({unsent})")
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Outbound Sender Tests ===")
+
+    try:
+        await test_rate_limits()
+        await test_priority()
+        await test_retry_after()
+        await test_reminder_delivery()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
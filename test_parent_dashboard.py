@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Test parent dashboard read model for InnerWorld Edu.
+
+Tests:
+1. Summaries - precomputed progress, learning and emotional summary per child
+2. Staleness - writes coalesced and bounded by the flush interval, lag measured
+3. Incremental updates - profile saves refresh the linked parent's dashboard,
+   parent_id and progress carried through UserState
+4. Rebuild - dashboards backfilled from parent profiles and stored users
+5. Revocation - revoked parent loses the child's row, profile unlinked
+
+Run: python test_parent_dashboard.py
+"""
+
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import src.orchestration  # noqa: F401 (import order: orchestration before data)
+from src.orchestration.emotional_router import EmotionalRouter
+from src.orchestration.learning_profile import LearningProfile, LearningProfileAnalyzer, LearningDimension
+from src.orchestration.state_manager import StateManager, UserState
+from src.data.user_manager import UserManager
+from src.data.link_manager import LinkManager
+from src.data.parent_dashboard import ParentDashboardStore, summarize_child
+
+
+async def test_summaries(root: Path):
+    """Test summary contents."""
+    print("\n" + "="*60)
+    print("TEST 1: Summaries")
+    print("="*60 + "\n")
+
+    users = UserManager(data_dir=root / "users_1")
+    store = ParentDashboardStore(root / "dashboards_1.db")
+    try:
+        profile = await users.create_user("child_1", child_name="Маша", age=9)
+        learning = LearningProfile(understanding_meaning=8, memory=6, attention=3, motivation=7)
+        profile.learning_profile = learning.to_dict()
+        profile.completed_quests = ["quest_a", "quest_b"]
+
+        router = EmotionalRouter()
+        router.detect_emotion("Мне страшно, я волнуюсь")
+        store.update_child("parent_1", summarize_child(profile, router.get_emotional_summary()))
+        await store.flush()
+
+        dashboard = await store.get_dashboard("parent_1")
+        child = dashboard.children[0]
+        print(f"Child: {child.child_name}, avg {child.average_score}, weakest {child.weakest_dimension}")
+        ok = (child.quests_completed == 2 and child.weakest_dimension == "attention"
+              and child.progress_summary == LearningProfileAnalyzer.get_progress_summary(learning))
+        print(f"{'✅' if ok else '❌'} Progress and learning summary precomputed")
+        print(f"{'✅' if child.emotional['current_emotion'] == 'anxiety' else '❌'} "
+              f"Emotional summary stored: {child.emotional['current_emotion']}")
+
+        # A save without an emotional summary keeps the stored one
+        store.update_child("parent_1", summarize_child(profile))
+        await store.flush()
+        child = (await store.get_dashboard("parent_1")).children[0]
+        print(f"{'✅' if child.emotional and child.emotional['current_emotion'] == 'anxiety' else '❌'} "
+              f"Emotional summary kept when not recomputed")
+
+        store.remove_child("parent_1", "child_1")
+        print(f"{'✅' if (await store.get_dashboard('parent_1')).children == [] else '❌'} Removed child hidden")
+    finally:
+        store.close()
+
+
+async def test_staleness(root: Path):
+    """Test bounded staleness."""
+    print("\n" + "="*60)
+    print("TEST 2: Staleness")
+    print("="*60 + "\n")
+
+    users = UserManager(data_dir=root / "users_2")
+    path = root / "dashboards_2.db"
+    writer = ParentDashboardStore(path, flush_seconds=0.3)
+    reader = ParentDashboardStore(path)  # Another process, e.g. the parent bot
+    try:
+        await writer.initialize()
+        profiles = [await users.create_user(f"child_{index}", child_name=f"Ребёнок {index}") for index in range(50)]
+
+        for index, profile in enumerate(profiles):
+            writer.update_child(f"parent_{index % 10}", summarize_child(profile))
+        print(f"{'✅' if writer.get_statistics()['pending'] == 50 else '❌'} 50 updates queued")
+
+        local = await writer.get_dashboard("parent_3")
+        remote = await reader.get_dashboard("parent_3")
+        print(f"{'✅' if len(local.children) == 5 and remote.children == [] else '❌'} "
+              f"Same process sees queued updates, other readers do not yet")
+
+        await asyncio.sleep(0.6)
+        remote = await reader.get_dashboard("parent_3")
+        stats = writer.get_statistics()
+        print(f"Statistics: {stats}")
+        ok = len(remote.children) == 5 and stats["flushes"] == 1 and stats["rows_written"] == 50
+        print(f"{'✅' if ok else '❌'} Written in one flush within the interval")
+        print(f"{'✅' if 0.3 <= remote.lag_seconds < 0.6 else '❌'} Measured lag: {remote.lag_seconds:.3f} s")
+
+        started = time.perf_counter()
+        for _ in range(200):
+            await reader.get_dashboard("parent_3")
+        per_read = (time.perf_counter() - started) / 200
+        print(f"   Dashboard read (5 children): {per_read * 1e6:.0f} µs")
+
+        await writer.shutdown()
+    finally:
+        writer.close()
+        reader.close()
+
+
+async def test_incremental(root: Path):
+    """Test StateManager saves update the dashboard."""
+    print("\n" + "="*60)
+    print("TEST 3: Incremental Updates")
+    print("="*60 + "\n")
+
+    state_manager = StateManager()
+    state_manager.user_manager = UserManager(data_dir=root / "users_3")
+    state_manager.link_manager = LinkManager(links_dir=root / "links_3", parents_dir=root / "parents_3")
+    state_manager.parent_dashboards = ParentDashboardStore(root / "dashboards_3.db")
+    state_manager.user_manager.set_save_callback(state_manager._update_parent_dashboard)
+    try:
+        link = await state_manager.link_manager.create_link(child_id="child_1", child_name="Петя")
+        await state_manager.link_manager.activate_link(link.link_id, parent_id="parent_1")
+
+        user_state = UserState(user_id="child_1", child_name="Петя", parent_linked=True, link_id=link.link_id)
+        state_manager.user_states["child_1"] = user_state
+        router = EmotionalRouter()
+        router.detect_emotion("Я боюсь, мне тревожно")
+        state_manager.user_emotional_routers["child_1"] = router
+        await state_manager.save_user_state(user_state)
+
+        dashboard = await state_manager.parent_dashboards.get_dashboard("parent_1")
+        print(f"{'✅' if [c.child_id for c in dashboard.children] == ['child_1'] else '❌'} "
+              f"Saved child appears on the parent's dashboard")
+
+        user_state.learning_profile.adjust_dimension(LearningDimension.MEMORY, 3, "quest_completed")
+        user_state.completed_quests.append("quest_memory")
+        await state_manager.save_user_state(user_state)
+        child = (await state_manager.parent_dashboards.get_dashboard("parent_1")).children[0]
+        ok = child.learning_profile["memory"] == 8 and child.quests_completed == 1
+        print(f"{'✅' if ok else '❌'} Progress change reflected (memory {child.learning_profile['memory']}, "
+              f"{child.quests_completed} quest)")
+        print(f"{'✅' if child.emotional['current_emotion'] == 'anxiety' else '❌'} Emotional summary from the live router")
+
+        lookups = 0
+        original = state_manager.link_manager.get_parent_for_child
+
+        async def counting_lookup(child_id):
+            nonlocal lookups
+            lookups += 1
+            return await original(child_id)
+
+        state_manager.link_manager.get_parent_for_child = counting_lookup
+        for _ in range(5):
+            await state_manager.save_user_state(user_state)
+        stored = await state_manager.user_manager.get_user("child_1")
+        ok = user_state.parent_id == "parent_1" and stored.parent_id == "parent_1" and lookups == 0
+        print(f"{'✅' if ok else '❌'} parent_id kept in state and profile, no link lookups on later saves ({lookups})")
+
+        stored.progress.update(level=3, xp=40, streak_days=2)
+        await state_manager.user_manager.update_user(stored)
+        reloaded = state_manager._profile_to_state(await state_manager.user_manager.get_user("child_1"))
+        await state_manager.save_user_state(reloaded)
+        child = (await state_manager.parent_dashboards.get_dashboard("parent_1")).children[0]
+        stored = await state_manager.user_manager.get_user("child_1")
+        ok = (child.level, child.xp, child.streak_days) == (3, 40, 2) and stored.progress["xp"] == 40
+        print(f"{'✅' if ok else '❌'} Progress survives a state round trip: level {child.level}, xp {child.xp}")
+
+        reloaded.screening.emotional_storm_count = 2
+        reloaded.screening.last_emotional_storm = "2026-10-19T12:00:00"
+        await state_manager.save_user_state(reloaded)
+        screening = state_manager._profile_to_state(await state_manager.user_manager.get_user("child_1")).screening
+        ok = (screening.emotional_storm_count, screening.last_emotional_storm) == (2, "2026-10-19T12:00:00")
+        print(f"{'✅' if ok else '❌'} Emotional storm count and time survive a state round trip")
+
+        unlinked = UserState(user_id="child_2")
+        updates = state_manager.parent_dashboards.updates
+        await state_manager.save_user_state(unlinked)
+        print(f"{'✅' if state_manager.parent_dashboards.updates == updates else '❌'} Unlinked children are skipped")
+    finally:
+        state_manager.parent_dashboards.close()
+
+
+async def test_rebuild(root: Path):
+    """Test backfill."""
+    print("\n" + "="*60)
+    print("TEST 4: Rebuild")
+    print("="*60 + "\n")
+
+    users = UserManager(data_dir=root / "users_4")
+    links = LinkManager(links_dir=root / "links_4", parents_dir=root / "parents_4")
+    store = ParentDashboardStore(root / "dashboards_4.db")
+    try:
+        for index in range(30):
+            await users.create_user(f"child_{index}", child_name=f"Ребёнок {index}")
+            link = await links.create_link(child_id=f"child_{index}", child_name=f"Ребёнок {index}")
+            await links.activate_link(link.link_id, parent_id=f"parent_{index % 7}")
+
+        count = await store.rebuild(links, users)
+        stats = store.get_statistics()
+        print(f"{'✅' if count == 30 and stats['rows'] == 30 and stats['parents'] == 7 else '❌'} "
+              f"Rebuilt {count} children for {stats['parents']} parents")
+
+        dashboard = await store.get_dashboard("parent_0")
+        print(f"{'✅' if len(dashboard.children) == 5 else '❌'} parent_0 has {len(dashboard.children)} children")
+    finally:
+        store.close()
+
+
+async def test_revocation(root: Path):
+    """Test that revoking a link unlinks the child everywhere."""
+    print("\n" + "="*60)
+    print("TEST 5: Revocation")
+    print("="*60 + "\n")
+
+    state_manager = StateManager()
+    state_manager.user_manager = UserManager(data_dir=root / "users_5")
+    state_manager.link_manager = LinkManager(links_dir=root / "links_5", parents_dir=root / "parents_5")
+    state_manager.parent_dashboards = ParentDashboardStore(root / "dashboards_5.db")
+    state_manager.user_manager.set_save_callback(state_manager._update_parent_dashboard)
+    state_manager.link_manager.set_revoke_callback(state_manager._unlink_revoked_parent)
+    try:
+        links = state_manager.link_manager
+        link = await links.create_link(child_id="child_1", child_name="Петя")
+        await links.activate_link(link.link_id, parent_id="parent_1")
+        user_state = UserState(user_id="child_1", child_name="Петя", parent_linked=True, link_id=link.link_id)
+        state_manager.user_states["child_1"] = user_state
+        await state_manager.save_user_state(user_state)
+        await state_manager.parent_dashboards.flush()
+        before = await state_manager.parent_dashboards.get_dashboard("parent_1")
+        print(f"{'✅' if len(before.children) == 1 else '❌'} Linked child on the dashboard")
+
+        await links.revoke_link(link.link_id)
+        await state_manager.parent_dashboards.flush()
+        dashboard = await state_manager.parent_dashboards.get_dashboard("parent_1")
+        print(f"{'✅' if dashboard.children == [] else '❌'} Row removed after revocation")
+
+        profile = await state_manager.user_manager.get_user("child_1")
+        ok = not profile.parent_linked and profile.parent_id is None and not user_state.parent_linked
+        print(f"{'✅' if ok else '❌'} Profile and live state unlinked")
+        parent = await links.get_parent("parent_1")
+        print(f"{'✅' if parent.children == [] else '❌'} Child removed from the parent profile")
+
+        # Later saves must not bring the row back
+        updates = state_manager.parent_dashboards.updates
+        await state_manager.save_user_state(user_state)
+        await state_manager.parent_dashboards.flush()
+        dashboard = await state_manager.parent_dashboards.get_dashboard("parent_1")
+        ok = dashboard.children == [] and state_manager.parent_dashboards.updates == updates
+        print(f"{'✅' if ok else '❌'} Profile save after revocation does not re-add the row")
+
+        count = await state_manager.parent_dashboards.rebuild(links, state_manager.user_manager)
+        dashboard = await state_manager.parent_dashboards.get_dashboard("parent_1")
+        print(f"{'✅' if count == 0 and dashboard.children == [] else '❌'} Rebuild skips the revoked child")
+    finally:
+        state_manager.parent_dashboards.close()
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Parent Dashboard Tests ===")
+
+    root = Path(tempfile.mkdtemp())
+    try:
+        await test_summaries(root)
+        await test_staleness(root)
+        await test_incremental(root)
+        await test_rebuild(root)
+        await test_revocation(root)
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
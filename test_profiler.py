@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Test on-demand profiling for InnerWorld Edu.
+
+Tests:
+1. CPU profile - hot function found, folded stacks written
+2. Memory diff - allocation growth attributed to its call site
+3. Admin API - token check, state sizes and profile routes
+
+Run: python test_profiler.py
+"""
+
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import httpx
+from fastapi import FastAPI
+
+import src.core.admin as admin
+from src.core.profiler import (
+    CPUProfiler,
+    MemoryProfiler,
+    register_state,
+    get_state_sizes,
+    get_cpu_profiler,
+    get_memory_profiler
+)
+
+
+def busy_loop(seconds: float):
+    """CPU-heavy work on the event loop."""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+def grow_cache(cache: list):
+    """Allocate ~1 MB that stays referenced."""
+    cache.extend(bytearray(1024) for _ in range(1000))
+
+
+def read_folded(path: str):
+    stacks = {}
+    for line in Path(path).read_text().splitlines():
+        stack, value = line.rsplit(" ", 1)
+        stacks[stack] = int(value)
+    return stacks
+
+
+async def test_cpu_profile():
+    """Test sampling the event loop thread."""
+    print("\n" + "="*60)
+    print("TEST 1: CPU Profile")
+    print("="*60 + "\n")
+
+    output_dir = Path(tempfile.mkdtemp())
+    profiler = CPUProfiler(interval=0.002, max_duration=0.5, output_dir=output_dir)
+
+    done = asyncio.Event()
+
+    async def workload():
+        while not done.is_set():
+            busy_loop(0.05)
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(workload())
+    result = await profiler.profile(5.0)  # Capped at max_duration
+    done.set()
+    await task
+
+    print(f"Samples: {result['samples']}, top: {result['top'][:3]}")
+    print(f"{'✅' if result['duration'] == 0.5 else '❌'} Time-boxed to {result['duration']}s")
+
+    hottest = result["top"][0]["frame"] if result["top"] else ""
+    print(f"{'✅' if hottest.startswith('busy_loop (test_profiler.py:') else '❌'} Hottest frame: {hottest}")
+
+    stacks = read_folded(result["path"])
+    busy = sum(count for stack, count in stacks.items() if "busy_loop" in stack)
+    print(f"{'✅' if sum(stacks.values()) == result['samples'] and busy > 0 else '❌'} "
+          f"Folded file: {len(stacks)} stacks, {busy} samples in busy_loop")
+
+    try:
+        profiler.running = True
+        await profiler.profile(0.1)
+        print("❌ Concurrent profile not rejected")
+    except RuntimeError:
+        print("✅ Concurrent profile rejected")
+    finally:
+        profiler.running = False
+
+
+async def test_memory_diff():
+    """Test tracemalloc diff between snapshots."""
+    print("\n" + "="*60)
+    print("TEST 2: Memory Diff")
+    print("="*60 + "\n")
+
+    profiler = MemoryProfiler(frames=10, output_dir=Path(tempfile.mkdtemp()))
+    profiler.start()
+    profiler.snapshot()
+
+    cache = []
+    grow_cache(cache)
+
+    diff = profiler.diff(top=5)
+    for site in diff["top"][:3]:
+        print(f"   {site['site']}: +{site['size_diff']} bytes")
+
+    top_site = diff["top"][0]["site"] if diff["top"] else ""
+    print(f"{'✅' if top_site.startswith('test_profiler.py:') and diff['growth_bytes'] > 1_000_000 else '❌'} "
+          f"Growth {diff['growth_bytes']} bytes at {top_site}")
+
+    stacks = read_folded(diff["path"])
+    grown = sum(size for stack, size in stacks.items() if "test_profiler.py" in stack)
+    print(f"{'✅' if grown > 1_000_000 else '❌'} Folded file attributes {grown} bytes to the test")
+
+    profiler.stop()
+    print(f"{'✅' if not profiler.get_statistics()['tracing'] else '❌'} tracemalloc stopped")
+
+
+async def test_admin_api():
+    """Test token check and routes."""
+    print("\n" + "="*60)
+    print("TEST 3: Admin API")
+    print("="*60 + "\n")
+
+    histories = {f"user_{i}": {"history": ["message " * 10] * 20} for i in range(500)}
+    register_state("test_histories", lambda: histories)
+
+    sizes = get_state_sizes()["test_histories"]
+    print(f"{'✅' if sizes['items'] == 500 and sizes['approx_bytes'] > 500 * 20 * 8 else '❌'} State sizes: {sizes}")
+
+    app = FastAPI()
+    app.include_router(admin.router)
+    transport = httpx.ASGITransport(app=app)
+    output_dir = Path(tempfile.mkdtemp())
+    get_cpu_profiler().output_dir = get_memory_profiler().output_dir = output_dir
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        admin.ADMIN_TOKEN = ""
+        disabled = await client.get("/debug/state")
+
+        admin.ADMIN_TOKEN = "secret"
+        wrong = await client.get("/debug/state", headers={"X-Admin-Token": "guess"})
+        print(f"{'✅' if disabled.status_code == 403 and wrong.status_code == 403 else '❌'} "
+              f"Rejected without token ({disabled.status_code}) and with wrong token ({wrong.status_code})")
+
+        headers = {"X-Admin-Token": "secret"}
+        state = (await client.get("/debug/state", headers=headers)).json()
+        print(f"{'✅' if state.get('test_histories', {}).get('items') == 500 else '❌'} /debug/state")
+
+        response = await client.post("/debug/profile", params={"seconds": 0.2}, headers=headers)
+        body = response.json()
+        ok = response.status_code == 200 and body["cpu"]["samples"] > 0 and "test_histories" in body["state"]
+        print(f"{'✅' if ok else '❌'} /debug/profile: {body['cpu']['samples']} samples, "
+              f"memory diff at {Path(body['memory']['path']).name}")
+
+    admin.ADMIN_TOKEN = ""
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Profiler Tests ===")
+
+    try:
+        await test_cpu_profile()
+        await test_memory_diff()
+        await test_admin_api()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,7 +5,7 @@ Test QuestEngine for InnerWorld Edu.
 Tests:
 1. Loading quest from YAML
 2. Starting quest
-3. Processing step responses
+3. Processing step responses (choice answers as index or typed number)
 4. Quest completion
 5. Rewards and Reality Bridge
 
@@ -80,7 +80,7 @@ async def test_quest_engine():
         (0, "Step 2: Choose explanation method"),
         ("Это когда целое число делится на части", "Step 3: Explain in own words"),
         ("Пицца, разделённая на кусочки", "Step 4: Real example"),
-        (0, "Step 5: Reflection")
+        ("2", "Step 5: Reflection (typed option number)")
     ]
 
     for i, (response, description) in enumerate(test_responses, 1):
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Test quest recommender for InnerWorld Edu.
+
+Tests:
+1. Retrieval - weakest dimension and emotion pick the quest, top-k matches brute force
+2. Completed quests - excluded from recommendations
+3. Batch mode - top-k of active children precomputed and stored
+4. Location selection - StateManager assigns the recommended quest
+
+Run: python test_quest_recommender.py
+"""
+
+import asyncio
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import numpy as np
+
+import src.orchestration  # noqa: F401 (import order: orchestration before data)
+from src.orchestration.emotional_router import EmotionalState
+from src.orchestration.learning_profile import LearningProfile, DIMENSIONS
+from src.orchestration.state_manager import StateManager, UserState
+from src.game.quest_engine import QuestEngine, Quest, QuestDifficulty, QuestRewards
+from src.game.quest_recommender import QuestRecommender
+from src.config import EDUCATIONAL_LOCATIONS
+
+LEVELS = ("low", "medium", "high")
+
+
+def make_quest(quest_id: str, location: str, target: dict, changes: dict = None) -> Quest:
+    """Quest with only the fields the recommender reads."""
+    return Quest(
+        id=quest_id, title=quest_id, location=location, psychological_module="module_15",
+        difficulty=QuestDifficulty.EASY, estimated_time_minutes=10, description="",
+        rewards=QuestRewards(experience_points=10, learning_profile_changes=changes or {}),
+        target_learning_profile=target
+    )
+
+
+def make_engine(random_quests: int = 0, seed: int = 3) -> QuestEngine:
+    """One quest per dimension (each in its own location), plus random quests."""
+    engine = QuestEngine(quests_dir=Path(tempfile.mkdtemp()))
+    locations = ["tower_confusion", "valley_words", "forest_calm", "city_mind"]
+    for dimension, location in zip(DIMENSIONS, locations):
+        target = {d.value: "high" if d == dimension else "low" for d in DIMENSIONS}
+        quest = make_quest(f"quest_{dimension.value}", location, target, {dimension.value: 2})
+        engine.quests[quest.id] = quest
+
+    rng = random.Random(seed)
+    for index in range(random_quests):
+        target = {d.value: rng.choice(LEVELS) for d in DIMENSIONS}
+        changes = {rng.choice(DIMENSIONS).value: rng.randint(1, 3)}
+        quest = make_quest(f"random_{index:04d}", rng.choice(EDUCATIONAL_LOCATIONS), target, changes)
+        engine.quests[quest.id] = quest
+    return engine
+
+
+async def test_retrieval():
+    """Test top-k retrieval."""
+    print("\n" + "="*60)
+    print("TEST 1: Retrieval")
+    print("="*60 + "\n")
+
+    recommender = QuestRecommender(make_engine())
+    print(f"Indexed {recommender.build_index()} quests")
+
+    profile = LearningProfile(understanding_meaning=8, memory=8, attention=2, motivation=7)
+    top = recommender.recommend(profile)
+    print(f"Weak attention: {[(r.quest_id, r.score) for r in top]}")
+    print(f"{'✅' if top[0].quest_id == 'quest_attention' else '❌'} Quest training the weakest dimension first")
+
+    balanced = LearningProfile(understanding_meaning=5, memory=5, attention=5, motivation=5)
+    calm = recommender.recommend(balanced, emotion=EmotionalState.ANXIETY, k=1)
+    curious = recommender.recommend(balanced, emotion=EmotionalState.INTEREST, k=1)
+    print(f"{'✅' if calm[0].location == 'forest_calm' and curious[0].location == 'city_mind' else '❌'} "
+          f"Emotion picks the location: anxiety -> {calm[0].location}, interest -> {curious[0].location}")
+
+    # Brute force over a larger catalog
+    recommender = QuestRecommender(make_engine(random_quests=2000))
+    recommender.build_index()
+    rng = np.random.default_rng(5)
+    values = rng.integers(1, 11, size=(200, len(DIMENSIONS)))
+    emotions = [rng.choice(list(EmotionalState)) for _ in range(200)]
+
+    started = time.perf_counter()
+    results = recommender.top_k_many(recommender.child_vectors(values, emotions), k=5)
+    per_child = (time.perf_counter() - started) / 200
+
+    queries = recommender.child_vectors(values, emotions)
+    matches = 0
+    for row, result in enumerate(results):
+        scores = sorted(((float(recommender._index[i] @ queries[row]), quest_id)
+                         for i, quest_id in enumerate(recommender.quest_ids)), reverse=True)
+        matches += np.allclose([r.score for r in result], [score for score, _ in scores[:5]], atol=1e-4)
+    print(f"{'✅' if matches == 200 else '❌'} Top-5 matches brute force for {matches}/200 children")
+    print(f"   {len(recommender.quest_ids)} quests: {per_child * 1e6:.0f} µs per child in a batch")
+
+
+async def test_completed():
+    """Test that completed quests are excluded."""
+    print("\n" + "="*60)
+    print("TEST 2: Completed Quests")
+    print("="*60 + "\n")
+
+    recommender = QuestRecommender(make_engine())
+    recommender.build_index()
+    profile = LearningProfile(understanding_meaning=8, memory=8, attention=2, motivation=7)
+
+    top = recommender.recommend(profile, completed=["quest_attention"])
+    ids = [r.quest_id for r in top]
+    print(f"Attention quest completed: {ids}")
+    print(f"{'✅' if 'quest_attention' not in ids and len(ids) == 3 else '❌'} Completed quest excluded")
+
+    everything = recommender.recommend(profile, completed=recommender.quest_ids)
+    print(f"{'✅' if everything == [] else '❌'} No recommendations once every quest is completed")
+
+
+async def test_batch(data_dir: Path, store_dir: Path):
+    """Test nightly precompute."""
+    print("\n" + "="*60)
+    print("TEST 3: Batch Mode")
+    print("="*60 + "\n")
+
+    rng = random.Random(11)
+    recent = datetime.now().isoformat()
+    stale = (datetime.now() - timedelta(days=90)).isoformat()
+    expected = {}
+    for index in range(1000):
+        values = {d.value: rng.randint(1, 10) for d in DIMENSIONS}
+        completed = ["quest_attention"] if index % 3 == 0 else []
+        active = index % 4 != 0
+        profile = {
+            "user_id": str(index),
+            "learning_profile": values,
+            "completed_quests": completed,
+            "last_activity": recent if active else stale
+        }
+        (data_dir / f"{index}.json").write_text(json.dumps(profile), encoding="utf-8")
+        if active:
+            expected[str(index)] = (LearningProfile(**values), completed)
+
+    recommender = QuestRecommender(make_engine(random_quests=200), store_path=store_dir / "recommendations.db")
+    recommender.build_index()
+    stored = recommender.precompute(data_dir, active_days=30, chunk_size=128)
+    print(f"Precompute: {recommender.get_statistics()['last_precompute']}")
+    print(f"{'✅' if stored == len(expected) else '❌'} Stored {stored} of 1000 children (active: {len(expected)})")
+
+    # Compare scores: quests with equal vectors tie
+    same = all(
+        [r.score for r in recommender.get_precomputed(user_id)]
+        == [r.score for r in recommender.recommend(profile, completed=completed)]
+        for user_id, (profile, completed) in expected.items()
+    )
+    print(f"{'✅' if same else '❌'} Stored top-k equals live recommend()")
+    print(f"{'✅' if recommender.get_precomputed('0') is None else '❌'} Inactive children skipped")
+    recommender.close()
+
+
+async def test_location_selection():
+    """Test StateManager uses the recommender."""
+    print("\n" + "="*60)
+    print("TEST 4: Location Selection")
+    print("="*60 + "\n")
+
+    state_manager = StateManager()
+    state_manager.quest_engine = make_engine()
+    state_manager.quest_recommender = QuestRecommender(state_manager.quest_engine)
+    state_manager.quest_recommender.build_index()
+
+    user_state = UserState(user_id="123", emotional_state=EmotionalState.DOUBT)
+    user_state.learning_profile = LearningProfile(understanding_meaning=9, memory=2, attention=9, motivation=9)
+    await state_manager._handle_location_selection({"user_state": user_state, "message": ""})
+    print(f"{'✅' if user_state.current_quest == 'quest_memory' else '❌'} "
+          f"Quest {user_state.current_quest} in {user_state.current_location}")
+
+    user_state.completed_quests.append("quest_memory")
+    await state_manager._handle_location_selection({"user_state": user_state, "message": ""})
+    print(f"{'✅' if user_state.current_quest != 'quest_memory' else '❌'} "
+          f"After completing it: {user_state.current_quest}")
+
+    restored = state_manager._profile_to_state(state_manager._state_to_profile(user_state))
+    print(f"{'✅' if restored.completed_quests == ['quest_memory'] else '❌'} Completed quests persisted")
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Quest Recommender Tests ===")
+
+    data_dir = Path(tempfile.mkdtemp())
+    store_dir = Path(tempfile.mkdtemp())
+    try:
+        await test_retrieval()
+        await test_completed()
+        await test_batch(data_dir, store_dir)
+        await test_location_selection()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
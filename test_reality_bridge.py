@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Test Reality Bridge deadline tracking for InnerWorld Edu.
+
+Tests:
+1. Deadline heap - expired bridges popped once and evicted, completed ones skipped
+2. Sweeper - fires when the next deadline is due, no polling
+3. Persistence - epoch times stored, old ISO-only files still load, expiries while down archived
+4. Reminder paging - only due-soon reminders held in memory, sent on time
+5. At-least-once - failed and interrupted reminders re-sent, keys idempotent
+6. Batched fan-out - one send batch and one bulk write per tick
+7. History archive - lifecycle events partitioned by day, completion rates
+
+Run: python test_reality_bridge.py
+"""
+
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import src.game.reality_bridge_manager as reality_bridge_manager
+from src.game.reality_bridge_manager import RealityBridgeManager
+from src.game.reminder_store import ReminderJob
+from src.bot.outbound import OutboundSender, Priority
+
+SECOND = 1 / 3600  # In hours
+
+
+async def make_manager(storage_path: Path, reminder=None) -> RealityBridgeManager:
+    manager = RealityBridgeManager(storage_path=storage_path)
+
+    async def ignore(user_id, bridge):
+        pass
+
+    await manager.initialize()
+    manager.set_reminder_callback(reminder or ignore)
+    return manager
+
+
+async def create(manager: RealityBridgeManager, user_id: str, deadline_seconds: float,
+                 reminder_seconds: float = 48 * 3600):
+    return await manager.create_bridge(
+        user_id=user_id,
+        quest_id="quest_1",
+        bridge_id=f"bridge_{user_id}",
+        title="Помоги маме",
+        description="Помоги маме накрыть на стол",
+        deadline_hours=deadline_seconds * SECOND,
+        reminder_hours=reminder_seconds * SECOND
+    )
+
+
+async def test_deadline_heap():
+    """Test O(k log n) expiry with lazy deletion."""
+    print("\n" + "="*60)
+    print("TEST 1: Deadline Heap")
+    print("="*60 + "\n")
+
+    manager = await make_manager(Path(tempfile.mkdtemp()))
+    expired = []
+
+    async def on_expired(bridge):
+        expired.append(bridge.user_id)
+
+    manager.set_expiry_callback(on_expired)
+
+    for index in range(1000):
+        await create(manager, f"user_{index}", 3600 + index)
+    for index in range(5):
+        await create(manager, f"late_{index}", 0.05)
+    await create(manager, "done", 0.05)
+    await manager.complete_bridge("done", "Помог!")
+    await create(manager, "replaced", 0.05)
+    await create(manager, "replaced", 3600)  # New bridge for same user
+
+    await asyncio.sleep(0.1)
+
+    print(f"Expired: {expired}")
+    print(f"{'✅' if sorted(expired) == [f'late_{i}' for i in range(5)] else '❌'} Only pending overdue bridges expired")
+
+    again = await manager.check_deadlines()
+    print(f"{'✅' if not again else '❌'} Each expiry reported once")
+    evicted = not any(f"late_{i}" in manager.active_bridges for i in range(5))
+    print(f"{'✅' if evicted else '❌'} Expired bridges evicted ({len(manager.active_bridges)} active)")
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        await manager.check_deadlines()
+    per_check = (time.perf_counter() - started) / 1000
+    print(f"{'✅' if per_check < 0.0005 else '❌'} Check with nothing due: {per_check * 1e6:.1f} µs "
+          f"({len(manager.active_bridges)} bridges)")
+
+    await manager.shutdown()
+
+
+async def test_sweeper():
+    """Test sweeper firing at the deadline."""
+    print("\n" + "="*60)
+    print("TEST 2: Sweeper")
+    print("="*60 + "\n")
+
+    manager = await make_manager(Path(tempfile.mkdtemp()))
+    expired_at = {}
+
+    async def on_expired(bridge):
+        expired_at[bridge.user_id] = time.time() - bridge.deadline_ts
+
+    manager.set_expiry_callback(on_expired)
+
+    await create(manager, "later", 0.6)
+    await create(manager, "sooner", 0.3)  # Earlier deadline re-arms the timer
+    await create(manager, "completed", 0.2)
+    await manager.complete_bridge("completed")
+
+    await asyncio.sleep(0.8)
+
+    lateness = {user: f"{delay * 1000:.0f} ms" for user, delay in expired_at.items()}
+    print(f"Expired after deadline: {lateness}")
+    print(f"{'✅' if list(expired_at) == ['sooner', 'later'] else '❌'} Fired in deadline order, completed skipped")
+    print(f"{'✅' if expired_at and max(expired_at.values()) < 0.05 else '❌'} Fired when due")
+
+    armed = manager._sweep_handle is not None
+    print(f"{'✅' if not armed else '❌'} No timer armed with nothing pending")
+
+    await manager.shutdown()
+
+
+async def test_persistence():
+    """Test epoch fields round-trip and legacy files."""
+    print("\n" + "="*60)
+    print("TEST 3: Persistence")
+    print("="*60 + "\n")
+
+    storage_path = Path(tempfile.mkdtemp())
+    manager = await make_manager(storage_path)
+    bridge = await create(manager, "saved", 3600)
+    await manager.shutdown()
+
+    stored = json.loads((storage_path / "saved.json").read_text(encoding="utf-8"))
+    print(f"{'✅' if stored['deadline_ts'] == bridge.deadline_ts else '❌'} Epoch deadline stored")
+
+    deadline = datetime.now() + timedelta(hours=1)
+    legacy = {key: value for key, value in stored.items() if not key.endswith("_ts")}
+    legacy.update(user_id="legacy", deadline_at=deadline.isoformat())
+    (storage_path / "legacy.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    expired = dict(legacy, user_id="expired", deadline_at=(datetime.now() - timedelta(hours=1)).isoformat())
+    (storage_path / "expired.json").write_text(json.dumps(expired), encoding="utf-8")
+
+    manager = await make_manager(storage_path)
+    loaded = manager.active_bridges
+    print(f"{'✅' if sorted(loaded) == ['legacy', 'saved'] else '❌'} Loaded: {sorted(loaded)}")
+
+    legacy_bridge = loaded.get("legacy")
+    ok = legacy_bridge and abs(legacy_bridge.deadline_ts - deadline.timestamp()) < 1e-3
+    print(f"{'✅' if ok else '❌'} Legacy ISO deadline converted to epoch")
+    print(f"{'✅' if len(manager._deadline_heap) == 2 else '❌'} Loaded bridges indexed")
+
+    # Expired while down: archived once, not again on the next restart
+    today = date.today()
+    rates = await manager.get_completion_rates(today - timedelta(days=1), today)
+    await manager.shutdown()
+    manager = await make_manager(storage_path)
+    again = await manager.get_completion_rates(today - timedelta(days=1), today)
+    ok = rates["quest_1"]["expired"] == 1 and again["quest_1"]["expired"] == 1
+    print(f"{'✅' if ok else '❌'} Bridge expired while down archived once")
+
+    await manager.shutdown()
+
+
+async def test_reminder_paging():
+    """Test that only due-soon reminders are paged into memory."""
+    print("\n" + "="*60)
+    print("TEST 4: Reminder Paging")
+    print("="*60 + "\n")
+
+    storage_path = Path(tempfile.mkdtemp())
+    manager = await make_manager(storage_path)
+    for index in range(500):
+        await create(manager, f"user_{index}", 7200, reminder_seconds=3600 + index)
+    await manager.shutdown()
+
+    sent = {}
+
+    async def reminder(user_id, bridge):
+        sent[user_id] = time.time() - bridge.reminder_ts
+
+    # Exact due times (no tick coalescing) to check reminders are sent on time
+    tick_seconds = reality_bridge_manager.REMINDER_TICK_SECONDS
+    reality_bridge_manager.REMINDER_TICK_SECONDS = 0.0
+
+    started = time.perf_counter()
+    manager = await make_manager(storage_path, reminder)
+    startup = time.perf_counter() - started
+    await asyncio.sleep(0.05)  # Startup page-in
+
+    for index in range(3):
+        await create(manager, f"soon_{index}", 7200, reminder_seconds=0.2)
+    await asyncio.sleep(0.01)
+
+    paged = len(manager._paged_jobs)
+    print(f"{'✅' if paged == 3 else '❌'} Paged into memory: {paged} of {len(manager.active_bridges)} "
+          f"(startup {startup * 1000:.0f} ms)")
+
+    await asyncio.sleep(0.4)
+    lateness = max(sent.values()) if sent else 1.0
+    print(f"{'✅' if sorted(sent) == ['soon_0', 'soon_1', 'soon_2'] and lateness < 0.05 else '❌'} "
+          f"Due reminders sent, max {lateness * 1000:.0f} ms late")
+
+    counts = manager.reminder_store.count_by_state()
+    print(f"{'✅' if counts == {'pending': 500, 'done': 3} else '❌'} Store: {counts}")
+
+    await manager.shutdown()
+    reality_bridge_manager.REMINDER_TICK_SECONDS = tick_seconds
+
+
+async def test_at_least_once():
+    """Test retries, redelivery after a crash and idempotency keys."""
+    print("\n" + "="*60)
+    print("TEST 5: At-Least-Once Delivery")
+    print("="*60 + "\n")
+
+    storage_path = Path(tempfile.mkdtemp())
+    retry_seconds = reality_bridge_manager.REMINDER_RETRY_SECONDS
+    reality_bridge_manager.REMINDER_RETRY_SECONDS = 0.1
+
+    try:
+        # Callback fails once, then succeeds
+        calls = []
+
+        async def flaky(user_id, bridge):
+            calls.append(user_id)
+            if len(calls) == 1:
+                raise ConnectionError("Bot API unavailable")
+
+        manager = await make_manager(storage_path, flaky)
+        bridge = await create(manager, "flaky", 7200, reminder_seconds=0.05)
+        await asyncio.sleep(0.4)
+        state = manager.reminder_store.get_state(bridge.reminder_key)
+        print(f"{'✅' if calls == ['flaky', 'flaky'] and state == 'done' else '❌'} "
+              f"Failed delivery retried: {len(calls)} calls, state {state}")
+
+        # Process dies while the reminder is being sent
+        async def hang(user_id, bridge):
+            await asyncio.Event().wait()
+
+        manager.set_reminder_callback(hang)
+        bridge = await create(manager, "crash", 7200, reminder_seconds=0.05)
+        await asyncio.sleep(0.2)
+        manager._reminder_task.cancel()  # Crash: nothing after the callback runs
+
+        resent = []
+
+        async def record(user_id, bridge):
+            resent.append((user_id, bridge.reminder_key))
+
+        restarted = await make_manager(storage_path, record)
+        await asyncio.sleep(0.1)
+        print(f"{'✅' if resent == [('crash', bridge.reminder_key)] else '❌'} "
+              f"Interrupted reminder re-sent after restart with key {bridge.reminder_key}")
+        await restarted.shutdown()
+
+        again = []
+
+        async def record_again(user_id, bridge):
+            again.append(user_id)
+
+        restarted = await make_manager(storage_path, record_again)
+        await asyncio.sleep(0.1)
+        job = ReminderJob(key=bridge.reminder_key, user_id="crash", due_at=time.time())
+        added = restarted.reminder_store.schedule(job)
+        print(f"{'✅' if not again and not added else '❌'} Delivered key never re-sent or re-queued")
+        await restarted.shutdown()
+
+    finally:
+        reality_bridge_manager.REMINDER_RETRY_SECONDS = retry_seconds
+
+
+async def test_batched_fan_out():
+    """Test that reminders due together go out as one batch."""
+    print("\n" + "="*60)
+    print("TEST 6: Batched Fan-Out")
+    print("="*60 + "\n")
+
+    class FakeBot:
+        def __init__(self):
+            self.sent = []
+
+        async def send_message(self, chat_id, text, **kwargs):
+            await asyncio.sleep(0.001)
+            self.sent.append(chat_id)
+
+    bot = FakeBot()
+    sender = OutboundSender(bot, global_rate=10000, max_concurrency=20)
+    batches = []
+
+    async def send_batch(bridges):
+        batches.append(len(bridges))
+        futures = sender.submit_batch([(b.user_id, f"⏰ {b.title}") for b in bridges], priority=Priority.REMINDER)
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return [result if isinstance(result, BaseException) else None for result in results]
+
+    manager = await make_manager(Path(tempfile.mkdtemp()))
+    manager.set_reminder_batch_callback(send_batch)
+
+    commits = []
+    mark_done = manager.reminder_store.mark_done
+
+    def counting_mark_done(keys):
+        commits.append(len(keys))
+        mark_done(keys)
+
+    manager.reminder_store.mark_done = counting_mark_done
+
+    # All reminders due at the same moment
+    await asyncio.gather(*(create(manager, f"user_{index}", 7200, reminder_seconds=0.2) for index in range(300)))
+    await asyncio.sleep(1.0)
+
+    print(f"{'✅' if len(bot.sent) == 300 else '❌'} Delivered: {len(bot.sent)}")
+    print(f"{'✅' if batches == [300] and commits == [300] else '❌'} "
+          f"Fan-out batches: {batches}, store commits: {commits}")
+
+    reminded = sum(1 for bridge in manager.active_bridges.values() if bridge.reminded)
+    print(f"{'✅' if reminded == 300 else '❌'} Reminded flags persisted: {reminded}")
+
+    stats = manager.get_statistics()
+    print(f"Last batch: {stats['last_batch']}")
+    ok = stats["reminders_sent"] == 300 and stats["last_batch"]["throughput"] > 0
+    print(f"{'✅' if ok else '❌'} Throughput {stats['last_batch']['throughput']}/s, "
+          f"lag p50 {stats['reminder_lag_p50'] * 1000:.0f} ms, p95 {stats['reminder_lag_p95'] * 1000:.0f} ms")
+
+    await manager.shutdown()
+    await sender.stop()
+
+
+async def test_history_archive():
+    """Test lifecycle archive and completion-rate queries."""
+    print("\n" + "="*60)
+    print("TEST 7: History Archive")
+    print("="*60 + "\n")
+
+    storage_path = Path(tempfile.mkdtemp())
+    manager = await make_manager(storage_path)
+
+    for index in range(10):
+        quest = "quest_a" if index < 6 else "quest_b"
+        await manager.create_bridge(
+            user_id=f"user_{index}", quest_id=quest, bridge_id=f"bridge_{quest}",
+            title="Помоги маме", description="Помоги маме накрыть на стол",
+            deadline_hours=1, location="forest_calm" if index % 2 else "tower_confusion"
+        )
+    for index in (0, 1, 2, 6):
+        await manager.complete_bridge(f"user_{index}", "Помог!")
+
+    # Old history in partitions outside the queried range
+    archive = manager.archive
+    old = manager.active_bridges["user_9"]
+    for days_ago in range(1, 31):
+        archive.append("created", old, time.time() - days_ago * 86400)
+    await archive.flush()
+
+    today = date.today()
+    scanned = archive.partitions_scanned
+    rates = await manager.get_completion_rates(today, today)
+    print(f"By quest: {rates}")
+    ok = (rates["quest_a"]["created"] == 6 and rates["quest_a"]["completed"] == 3
+          and rates["quest_a"]["completion_rate"] == 0.5 and rates["quest_b"]["completion_rate"] == 0.25)
+    print(f"{'✅' if ok else '❌'} Completion rate per quest")
+    print(f"{'✅' if archive.partitions_scanned - scanned == 1 else '❌'} "
+          f"Scanned {archive.partitions_scanned - scanned} of {archive.get_statistics()['partitions']} partitions")
+
+    by_location = await manager.get_completion_rates(today, today, group_by="location")
+    print(f"{'✅' if by_location['tower_confusion']['completed'] == 3 else '❌'} By location: "
+          f"{ {location: group['completion_rate'] for location, group in by_location.items()} }")
+
+    week = await manager.get_completion_rates(today - timedelta(days=6), today, group_by="bridge_id")
+    print(f"{'✅' if week['bridge_quest_b']['created'] == 4 + 6 else '❌'} Week range includes 6 older partitions")
+
+    files = sorted(path.name for path in (storage_path / "archive").iterdir())
+    print(f"{'✅' if len(files) == 31 and all(name.endswith('.jsonl.gz') for name in files) else '❌'} "
+          f"Day partitions: {files[0]} .. {files[-1]}")
+
+    await manager.shutdown()
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Reality Bridge Tests ===")
+
+    try:
+        await test_deadline_heap()
+        await test_sweeper()
+        await test_persistence()
+        await test_reminder_paging()
+        await test_at_least_once()
+        await test_batched_fan_out()
+        await test_history_archive()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Test record serialization for InnerWorld Edu.
+
+Tests:
+1. Codecs - compact JSON and MessagePack round trips with a schema header, no deep copy
+2. Backward compatibility - old pretty-printed files read, codec switch without migration
+3. Schema versions - older records upgraded, newer records rejected
+4. Stores - users, links, parents, bridges and cohort scans on MessagePack files
+
+Run: python test_serialization.py
+"""
+
+import asyncio
+import json
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import src.orchestration  # noqa: F401 (import order: orchestration before data)
+from src.core.serialization import RecordSerializer, SCHEMA_KEY, decode, read_record, to_record
+from src.orchestration.cohort_analytics import CohortAnalytics
+from src.orchestration.learning_profile import LearningProfile, LearningDimension
+from src.data.user_manager import UserManager, UserProfile
+from src.data.link_manager import LinkManager, LinkStatus
+from src.game.reality_bridge_manager import RealityBridgeManager
+
+
+def make_profile(user_id: str) -> UserProfile:
+    learning = LearningProfile(attention=3)
+    learning.adjust_dimension(LearningDimension.ATTENTION, 2, "quest_completed")
+    return UserProfile(user_id=user_id, child_name="Маша", age=9, learning_profile=learning.to_dict(),
+                       completed_quests=["forest_calm_quest_01"], current_location="forest_calm")
+
+
+def legacy_bytes(profile: UserProfile) -> bytes:
+    """File as written before serialization.py."""
+    return json.dumps(asdict(profile), indent=2, ensure_ascii=False).encode("utf-8")
+
+
+async def test_codecs():
+    """Test codec round trips."""
+    print("\n" + "="*60)
+    print("TEST 1: Codecs")
+    print("="*60 + "\n")
+
+    profile = make_profile("child_1")
+    legacy = legacy_bytes(profile)
+
+    for codec in ("json", "msgpack"):
+        serializer = RecordSerializer(UserProfile, codec)
+        raw = serializer.dumps(profile)
+        version, data = decode(raw)
+        ok = serializer.loads(raw) == profile and version == 1 and SCHEMA_KEY not in data
+        print(f"{'✅' if ok else '❌'} {codec}: round trip with schema header "
+              f"({len(raw)} bytes, legacy {len(legacy)})")
+
+    raw = RecordSerializer(UserProfile, "json").dumps(profile)
+    compact = raw.startswith(b'{"_schema":1,') and b"\n" not in raw
+    print(f"{'✅' if compact else '❌'} Compact JSON, header first: {raw[:40]!r}")
+
+    record = to_record(profile)
+    print(f"{'✅' if record['learning_profile'] is profile.learning_profile else '❌'} "
+          f"Nested values shared, not deep-copied")
+
+    try:
+        RecordSerializer(UserProfile, "yaml")
+        print("❌ Unknown codec accepted")
+    except ValueError as e:
+        print(f"✅ Unknown codec rejected: {e}")
+
+
+async def test_backward_compatibility(root: Path):
+    """Test legacy files and codec switches."""
+    print("\n" + "="*60)
+    print("TEST 2: Backward Compatibility")
+    print("="*60 + "\n")
+
+    data_dir = root / "users_legacy"
+    data_dir.mkdir()
+    profile = make_profile("child_1")
+    (data_dir / "child_1.json").write_bytes(legacy_bytes(profile))
+
+    version, _ = decode((data_dir / "child_1.json").read_bytes())
+    users = UserManager(data_dir=data_dir, codec="msgpack")
+    loaded = await users.get_user("child_1")
+    print(f"{'✅' if loaded == profile and version == 0 else '❌'} Pretty-printed file read (schema {version})")
+
+    await users.update_user(loaded)
+    raw = (data_dir / "child_1.json").read_bytes()
+    print(f"{'✅' if raw[:1] != b'{' and decode(raw)[0] == 1 else '❌'} Rewritten as MessagePack on save")
+
+    back = UserManager(data_dir=data_dir, codec="json")
+    loaded = await back.get_user("child_1")
+    print(f"{'✅' if loaded and loaded.learning_profile == profile.learning_profile else '❌'} "
+          f"JSON store reads the MessagePack file")
+    print(f"{'✅' if read_record(data_dir / 'child_1.json')['child_name'] == 'Маша' else '❌'} "
+          f"read_record() decodes either codec")
+
+
+async def test_schema_versions(root: Path):
+    """Test upgrades."""
+    print("\n" + "="*60)
+    print("TEST 3: Schema Versions")
+    print("="*60 + "\n")
+
+    def rename_location(data):
+        data["current_location"] = {"forest": "forest_calm"}.get(data["current_location"], data["current_location"])
+        return data
+
+    v1 = RecordSerializer(UserProfile, "json", version=1)
+    v2 = RecordSerializer(UserProfile, "json", version=2, upgrades={1: rename_location})
+
+    old = make_profile("child_1")
+    old.current_location = "forest"
+    upgraded = v2.loads(v1.dumps(old))
+    print(f"{'✅' if upgraded.current_location == 'forest_calm' else '❌'} "
+          f"Schema 1 record upgraded on read: {upgraded.current_location}")
+    print(f"{'✅' if decode(v2.dumps(upgraded))[0] == 2 else '❌'} Written back with schema 2")
+
+    try:
+        v1.loads(v2.dumps(upgraded))
+        print("❌ Newer record accepted")
+    except ValueError as e:
+        print(f"✅ Newer record rejected: {e}")
+
+    path = root / "newer" / "child_1.json"
+    path.parent.mkdir()
+    path.write_bytes(v2.dumps(upgraded))
+    users = UserManager(data_dir=path.parent)
+    print(f"{'✅' if await users.get_user('child_1') is None else '❌'} UserManager skips a record it cannot read")
+
+
+async def test_stores(root: Path):
+    """Test managers on MessagePack files."""
+    print("\n" + "="*60)
+    print("TEST 4: Stores")
+    print("="*60 + "\n")
+
+    users = UserManager(data_dir=root / "users", codec="msgpack")
+    for index in range(20):
+        profile = await users.create_user(f"child_{index}", child_name=f"Ребёнок {index}")
+        profile.current_location = "forest_calm" if index % 2 else "tower_confusion"
+        await users.update_user(profile)
+
+    analytics = CohortAnalytics(root / "users", chunk_size=8)
+    chunks = list(analytics.iter_chunks(location="forest_calm"))
+    print(f"{'✅' if analytics.profiles_scanned == 20 and sum(len(c) for c in chunks) == 10 else '❌'} "
+          f"Cohort scan decodes MessagePack profiles")
+
+    links = LinkManager(links_dir=root / "links", parents_dir=root / "parents",
+                        links_codec="msgpack", parents_codec="msgpack")
+    link = await links.create_link(child_id="child_1", child_name="Ребёнок 1")
+    await links.activate_link(link.link_id, parent_id="parent_1")
+
+    rescanned = LinkManager(links_dir=root / "links", parents_dir=root / "parents")
+    await rescanned.initialize()
+    stored = await rescanned.get_link(link.link_id)
+    parent = await rescanned.get_parent("parent_1")
+    ok = stored.status == LinkStatus.ACTIVE and rescanned._counts[LinkStatus.ACTIVE] == 1
+    print(f"{'✅' if ok else '❌'} Link status enum round trip: {stored.status}")
+    print(f"{'✅' if parent and parent.children == ['child_1'] else '❌'} Parent profile round trip")
+    await rescanned.shutdown()
+
+    bridges = RealityBridgeManager(storage_path=root / "bridges", codec="msgpack")
+    bridge = await bridges.create_bridge(user_id="child_1", quest_id="quest_1", bridge_id="bridge_1",
+                                         title="Помоги маме", description="Помоги маме накрыть на стол")
+    reloaded = RealityBridgeManager(storage_path=root / "bridges")
+    await reloaded._load_active_bridges()
+    ok = reloaded.active_bridges.get("child_1") == bridge
+    print(f"{'✅' if ok else '❌'} Bridge round trip")
+    bridges.reminder_store.close()
+    reloaded.reminder_store.close()
+
+    profile = make_profile("child_x")
+    for name, encode in (("legacy", legacy_bytes),
+                         ("json", RecordSerializer(UserProfile, "json").dumps),
+                         ("msgpack", RecordSerializer(UserProfile, "msgpack").dumps)):
+        started = time.perf_counter()
+        for _ in range(2000):
+            raw = encode(profile)
+        print(f"   Encode {name}: {(time.perf_counter() - started) / 2000 * 1e6:.1f} µs, {len(raw)} bytes")
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Serialization Tests ===")
+
+    root = Path(tempfile.mkdtemp())
+    try:
+        await test_codecs()
+        await test_backward_compatibility(root)
+        await test_schema_versions(root)
+        await test_stores(root)
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Test sharded runtime building blocks for InnerWorld Edu.
+
+Tests:
+1. HashRing - even distribution, minimal movement on worker loss
+2. RealityBridgeManager ownership - reminders owned by exactly one worker
+3. Dispatch - bot updates routed through MessageDispatcher to worker processes
+4. Restart - killed worker restarted, rejoins the ring and serves messages again;
+   also when killed while restarting or not ready in time
+5. Worker concurrency - slow replies overlap across users, in order per user
+6. Worker reminders - sent through the dispatcher's OutboundSender, errors reported back
+
+Run: python test_sharding.py
+"""
+
+import asyncio
+import multiprocessing as mp
+import os
+import shutil
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.orchestration.sharding import HashRing, ShardedRuntime, _OwnershipFilter, _PipeSender, _serve_worker
+from src.bot.outbound import OutboundSender, Priority
+from src.core.logger import get_logger
+from src.game.reality_bridge_manager import RealityBridgeManager
+from src.bot.dispatcher import MessageDispatcher
+from src.config import USER_PROFILES_DIR
+
+# Workers build ChatOpenAI; first messages (start state) never call it
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+
+TEST_USERS = [f"test_shard_{i}" for i in range(8)]
+
+
+class FakeMessage:
+    """Incoming text message recording replies."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.replies = []
+
+    async def reply_text(self, text: str, **kwargs):
+        self.replies.append(text)
+
+
+def make_update(user_id: str, text: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        effective_user=SimpleNamespace(id=user_id),
+        effective_chat=SimpleNamespace(id=user_id),
+        message=FakeMessage(text)
+    )
+
+
+async def wait_for(predicate, timeout: float = 60.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.1)
+    return True
+
+
+def remove_test_profiles():
+    for user_id in TEST_USERS:
+        (USER_PROFILES_DIR / f"{user_id}.json").unlink(missing_ok=True)
+
+
+async def test_hash_ring():
+    """Test consistent hashing of user IDs to workers."""
+    print("\n" + "="*60)
+    print("TEST 1: Hash Ring")
+    print("="*60 + "\n")
+
+    users = [str(100000 + i) for i in range(20000)]
+    ring = HashRing([0, 1, 2, 3])
+
+    owners = {user_id: ring.get_worker(user_id) for user_id in users}
+    counts = Counter(owners.values())
+    print(f"Distribution over 4 workers: {dict(sorted(counts.items()))}")
+
+    balanced = all(abs(count - 5000) < 1500 for count in counts.values())
+    print(f"{'✅' if balanced else '❌'} Distribution is balanced")
+
+    # Same answer from a freshly built ring (as in another process)
+    stable = all(HashRing([0, 1, 2, 3]).get_worker(u) == owners[u] for u in users[:100])
+    print(f"{'✅' if stable else '❌'} Ring is deterministic")
+
+    # Remove worker 2: only its users move
+    shrunk = HashRing([0, 1, 3])
+    moved = [u for u in users if shrunk.get_worker(u) != owners[u]]
+    only_worker_2 = all(owners[u] == 2 for u in moved)
+    print(f"Moved users: {len(moved)} (worker 2 had {counts[2]})")
+    print(f"{'✅' if only_worker_2 else '❌'} Only users of the removed worker moved")
+
+
+async def test_reminder_ownership():
+    """Test that each bridge is loaded by exactly one worker."""
+    print("\n" + "="*60)
+    print("TEST 2: Reminder Ownership")
+    print("="*60 + "\n")
+
+    storage = Path("src/data/test_sharding_bridges")
+    shutil.rmtree(storage, ignore_errors=True)
+
+    try:
+        # Create bridges with a single-process manager
+        writer = RealityBridgeManager(storage_path=storage)
+        for i in range(20):
+            await writer.create_bridge(
+                user_id=f"user_{i}",
+                quest_id="quest",
+                bridge_id="bridge",
+                title="Title",
+                description="Description"
+            )
+
+        ring = HashRing([0, 1])
+        managers = [
+            RealityBridgeManager(storage_path=storage, owner_filter=_OwnershipFilter(w, ring))
+            for w in (0, 1)
+        ]
+        for manager in managers:
+            await manager._load_active_bridges()
+
+        loaded = [set(manager.active_bridges) for manager in managers]
+        disjoint = not (loaded[0] & loaded[1])
+        complete = len(loaded[0] | loaded[1]) == 20
+        print(f"Worker 0: {len(loaded[0])} bridges, worker 1: {len(loaded[1])} bridges")
+        print(f"{'✅' if disjoint and complete else '❌'} Every bridge has exactly one owner")
+
+        # Worker 1 leaves: worker 0 takes over all bridges
+        await managers[0].apply_ownership(_OwnershipFilter(0, HashRing([0])))
+        takeover = len(managers[0].active_bridges) == 20
+        print(f"{'✅' if takeover else '❌'} Remaining worker took over all bridges")
+
+    finally:
+        shutil.rmtree(storage, ignore_errors=True)
+
+
+async def test_dispatch():
+    """Test bot updates reaching the owning worker."""
+    print("\n" + "="*60)
+    print("TEST 3: Dispatch")
+    print("="*60 + "\n")
+
+    dispatcher = MessageDispatcher(num_workers=2)
+    runtime = dispatcher.runtime
+    print(f"{'✅' if dispatcher.sharded else '❌'} SHARD_WORKERS > 1 creates a ShardedRuntime")
+
+    await dispatcher.start()
+    try:
+        updates = [make_update(user_id, "Привет") for user_id in TEST_USERS]
+        await asyncio.gather(*(dispatcher.handle(update) for update in updates))
+
+        replied = all(len(update.message.replies) == 1 and update.message.replies[0] for update in updates)
+        print(f"{'✅' if replied else '❌'} {len(updates)} updates answered by workers")
+
+        owners = Counter(runtime.get_worker_for_user(user_id) for user_id in TEST_USERS)
+        print(f"Owners: {dict(owners)}")
+        print(f"{'✅' if set(owners) == {0, 1} else '❌'} Users spread over both workers")
+
+        stats = runtime.get_statistics()
+        print(f"{'✅' if stats['pending_requests'] == 0 and stats['live_workers'] == 2 else '❌'} "
+              f"No pending requests: {stats}")
+    finally:
+        await dispatcher.stop()
+
+    try:
+        await runtime.process_message(TEST_USERS[0], "Привет")
+        print("❌ Stopped runtime accepted a message")
+    except RuntimeError as e:
+        print(f"✅ Stopped runtime rejects messages: {e}")
+
+
+async def test_restart():
+    """Test that a killed worker is restarted and serves its users again."""
+    print("\n" + "="*60)
+    print("TEST 4: Restart")
+    print("="*60 + "\n")
+
+    runtime = ShardedRuntime(num_workers=2, health_interval=0.2, request_timeout=30.0)
+    await runtime.start()
+    try:
+        user_id = next(u for u in TEST_USERS if runtime.get_worker_for_user(u) == 1)
+        await runtime.process_message(user_id, "Привет")
+
+        # Several restarts in a row: each reuses the slot of a closed pipe
+        for attempt in range(1, 4):
+            old_pid = runtime._workers[1].process.pid
+            runtime._workers[1].process.kill()
+
+            moved = await wait_for(lambda: runtime.get_statistics()["live_workers"] == 1, 10.0)
+            during = runtime.get_worker_for_user(user_id) if moved else None
+            print(f"{'✅' if during == 0 else '❌'} Kill {attempt}: user moved to worker {during} while restarting")
+
+            rejoined = await wait_for(lambda: runtime.get_statistics()["live_workers"] == 2)
+            handle = runtime._workers[1]
+            ok = rejoined and handle.ready and handle.process.pid != old_pid and handle.restarts == attempt
+            print(f"{'✅' if ok else '❌'} Kill {attempt}: worker 1 restarted (pid {old_pid} → "
+                  f"{handle.process.pid}) and rejoined the ring")
+
+            response = await runtime.process_message(user_id, "Привет")
+            back = runtime.get_worker_for_user(user_id) == 1 and bool(response)
+            print(f"{'✅' if back else '❌'} Kill {attempt}: restarted worker serves its users again")
+
+        # Killed again while restarting (before it rejoined the ring)
+        handle = runtime._workers[1]
+        restarts, old_pid = handle.restarts, handle.process.pid
+        handle.process.kill()
+        respawned = await wait_for(lambda: handle.process.pid != old_pid and not handle.ready, 10.0)
+        restarting_pid = handle.process.pid
+        handle.process.kill()
+        rejoined = respawned and await wait_for(lambda: runtime.get_statistics()["live_workers"] == 2)
+        ok = rejoined and handle.process.pid not in (old_pid, restarting_pid) and handle.restarts == restarts + 2
+        print(f"{'✅' if ok else '❌'} Worker killed while restarting is restarted again "
+              f"({handle.restarts - restarts} restarts) and rejoins")
+
+        # Not ready within ready_timeout: killed and restarted
+        runtime.ready_timeout = 0.2
+        restarts = handle.restarts
+        handle.process.kill()
+        retried = await wait_for(lambda: handle.restarts >= restarts + 2, 20.0)
+        runtime.ready_timeout = 60.0
+        rejoined = retried and await wait_for(lambda: runtime.get_statistics()["live_workers"] == 2)
+        print(f"{'✅' if rejoined else '❌'} Worker not ready in time killed and restarted "
+              f"({handle.restarts - restarts} restarts), rejoins once it starts in time")
+    finally:
+        await runtime.stop()
+
+    single = ShardedRuntime(num_workers=1, health_interval=0.2)
+    await single.start()
+    try:
+        single._workers[0].process.kill()
+        await wait_for(lambda: single.get_statistics()["live_workers"] == 0, 10.0)
+        try:
+            await single.process_message(TEST_USERS[0], "Привет")
+            print("❌ Message accepted with no live workers")
+        except RuntimeError as e:
+            print(f"✅ No live workers: RuntimeError ({e})")
+
+        rejoined = await wait_for(lambda: single.get_statistics()["live_workers"] == 1)
+        response = rejoined and await single.process_message(TEST_USERS[0], "Привет")
+        print(f"{'✅' if response else '❌'} Single worker restarted and serving again")
+    finally:
+        await single.stop()
+
+
+class SlowStateManager:
+    """StateManager stand-in whose replies take `delay` seconds (an LLM call)."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.handled = []  # (user_id, text) in completion order
+
+    async def process_message(self, user_id: str, text: str) -> str:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            self.handled.append((user_id, text))
+            return f"{user_id}:{text}"
+        finally:
+            self.active -= 1
+
+
+async def test_worker_concurrency():
+    """Test that a worker overlaps slow messages of different users."""
+    print("\n" + "="*60)
+    print("TEST 5: Worker Concurrency")
+    print("="*60 + "\n")
+
+    dispatcher_conn, worker_conn = mp.Pipe(duplex=True)
+    state_manager = SlowStateManager(delay=0.3)
+    worker = asyncio.create_task(_serve_worker(0, worker_conn, state_manager, 16, get_logger("test")))
+
+    messages = [(f"user_{i}", "1") for i in range(6)] + [("user_0", str(n)) for n in range(2, 5)]
+    started = time.perf_counter()
+    for request_id, (user_id, text) in enumerate(messages):
+        dispatcher_conn.send({"type": "message", "request_id": request_id, "user_id": user_id, "text": text})
+
+    loop = asyncio.get_running_loop()
+    replies = [await loop.run_in_executor(None, dispatcher_conn.recv) for _ in messages]
+    elapsed = time.perf_counter() - started
+    dispatcher_conn.send({"type": "stop"})
+    await asyncio.wait_for(worker, 5.0)
+
+    ok = all("response" in reply for reply in replies) and len(replies) == len(messages)
+    print(f"{'✅' if ok else '❌'} {len(replies)} replies")
+    # Serial: 9 × 0.3 s; user_0 has 4 messages in a row: ~1.2 s
+    print(f"{'✅' if elapsed < 2.0 and state_manager.max_active >= 6 else '❌'} "
+          f"Users served concurrently: {elapsed:.2f} s, max {state_manager.max_active} at once")
+    order = [text for user_id, text in state_manager.handled if user_id == "user_0"]
+    print(f"{'✅' if order == ['1', '2', '3', '4'] else '❌'} One user's messages handled in order: {order}")
+
+
+class FakeBot:
+    """Fake Bot API recording sent messages; chat "blocked" rejects them."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if chat_id == "blocked":
+            raise ValueError("Forbidden: bot was blocked by the user")
+        self.sent.append((chat_id, text))
+        return {"chat_id": chat_id, "text": text}
+
+
+async def test_worker_reminders():
+    """Test reminders from a worker going out through the dispatcher."""
+    print("\n" + "="*60)
+    print("TEST 6: Worker Reminders")
+    print("="*60 + "\n")
+
+    loop = asyncio.get_running_loop()
+    dispatcher_conn, worker_conn = mp.Pipe(duplex=True)
+    runtime = ShardedRuntime(num_workers=1)
+    runtime._loop = loop
+    runtime._workers[0].conn = dispatcher_conn
+    pipe_sender = _PipeSender(0, worker_conn)
+
+    async def round_trip(futures):
+        runtime._handle_worker_message(await loop.run_in_executor(None, dispatcher_conn.recv))
+        pipe_sender.resolve(await loop.run_in_executor(None, worker_conn.recv))
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    results = await round_trip(pipe_sender.submit_batch([("child_1", "⏰ Напоминание")]))
+    ok = isinstance(results[0], RuntimeError) and "No outbound sender" in str(results[0])
+    print(f"{'✅' if ok else '❌'} No sender: reminder reported as failed ({results[0]})")
+
+    bot = FakeBot()
+    sender = OutboundSender(bot, global_rate=1000)
+    runtime.set_outbound_sender(sender)
+    batch = [("child_1", "⏰ Напоминание 1"), ("blocked", "⏰ Напоминание 2"), ("child_3", "⏰ Напоминание 3")]
+    results = await round_trip(pipe_sender.submit_batch(batch, priority=Priority.REMINDER))
+    await sender.stop()
+
+    print(f"{'✅' if bot.sent == [batch[0], batch[2]] else '❌'} Sent by the dispatcher's OutboundSender: {bot.sent}")
+    ok = results[0] is None and isinstance(results[1], RuntimeError) and results[2] is None
+    print(f"{'✅' if ok else '❌'} Per-message results back in the worker: {results}")
+    print(f"{'✅' if not pipe_sender._pending else '❌'} No batches left pending")
+
+    dispatcher = MessageDispatcher(num_workers=2, sender=sender)
+    print(f"{'✅' if dispatcher.runtime.outbound_sender is sender else '❌'} "
+          f"MessageDispatcher hands its sender to the ShardedRuntime")
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Sharding Tests ===")
+
+    try:
+        await test_hash_ring()
+        await test_reminder_ownership()
+        await test_dispatch()
+        await test_restart()
+        await test_worker_concurrency()
+        await test_worker_reminders()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        remove_test_profiles()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Test JSON store file layout for InnerWorld Edu.
+
+Tests:
+1. Paths - hashed ab/cd/{id}.json buckets, stable and spread evenly
+2. Enumeration - lazy scandir walk, non-bucket entries and temp files ignored
+3. Migration - flat to fan-out and back, interrupted runs finished by re-running
+4. Managers - users, links, bridges and cohort scans on a fan-out layout
+
+Run: python test_store_layout.py
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import src.orchestration  # noqa: F401 (import order: orchestration before data)
+from src.core.store_layout import StoreLayout
+from src.orchestration.cohort_analytics import CohortAnalytics
+from src.data.user_manager import UserManager
+from src.data.link_manager import LinkManager, LinkStatus
+from src.game.reality_bridge_manager import RealityBridgeManager
+
+
+def write_flat(root: Path, count: int) -> None:
+    root.mkdir(parents=True, exist_ok=True)
+    for index in range(count):
+        (root / f"user_{index}.json").write_text(json.dumps({"user_id": f"user_{index}"}))
+
+
+async def test_paths(root: Path):
+    """Test bucket placement."""
+    print("\n" + "="*60)
+    print("TEST 1: Paths")
+    print("="*60 + "\n")
+
+    flat = StoreLayout(root / "paths", levels=0)
+    hashed = StoreLayout(root / "paths", levels=2)
+
+    print(f"{'✅' if flat.path('user_1') == root / 'paths' / 'user_1.json' else '❌'} Flat: {flat.path('user_1').name}")
+    path = hashed.path("user_1")
+    relative = path.relative_to(root / "paths").parts
+    ok = len(relative) == 3 and all(len(part) == 2 for part in relative[:2]) and relative[2] == "user_1.json"
+    print(f"{'✅' if ok else '❌'} Fan-out: {'/'.join(relative)}")
+    print(f"{'✅' if StoreLayout(root / 'paths', 2).path('user_1') == path else '❌'} Same ID, same bucket")
+
+    first_level = Counter(hashed.bucket(f"user_{index}").parent.name for index in range(25600))
+    print(f"{'✅' if len(first_level) == 256 and max(first_level.values()) < 200 else '❌'} "
+          f"25600 IDs over {len(first_level)} top-level buckets (max {max(first_level.values())} per bucket)")
+
+    try:
+        StoreLayout(root, levels=5)
+        print("❌ Invalid level count accepted")
+    except ValueError as e:
+        print(f"✅ Invalid level count rejected: {e}")
+
+
+async def test_enumeration(root: Path):
+    """Test lazy enumeration."""
+    print("\n" + "="*60)
+    print("TEST 2: Enumeration")
+    print("="*60 + "\n")
+
+    layout = StoreLayout(root / "enum", levels=2)
+    for index in range(500):
+        layout.path_for_write(f"user_{index}").write_text("{}")
+
+    # Not records: store files, archive directory, temp file of an interrupted write
+    (root / "enum" / "reminders.db").write_text("")
+    (root / "enum" / "archive").mkdir()
+    (root / "enum" / "archive" / "old.json").write_text("{}")
+    layout.path("user_1").with_suffix(".tmp").write_text("{")
+
+    ids = layout.iter_ids()
+    first = next(ids)
+    print(f"{'✅' if first.startswith('user_') and not isinstance(ids, list) else '❌'} Lazy: first ID {first}")
+
+    found = {first, *ids}
+    print(f"{'✅' if found == {f'user_{index}' for index in range(500)} else '❌'} "
+          f"{len(found)} IDs, archive/, reminders.db and .tmp ignored")
+    print(f"{'✅' if layout.count() == 500 else '❌'} count() = {layout.count()}")
+    print(f"{'✅' if StoreLayout(root / 'missing', 2).count() == 0 else '❌'} Missing store is empty")
+
+
+async def test_migration(root: Path):
+    """Test migration in both directions and resume."""
+    print("\n" + "="*60)
+    print("TEST 3: Migration")
+    print("="*60 + "\n")
+
+    store = root / "migrate"
+    write_flat(store, 2000)
+    (store / "archive").mkdir()
+
+    dry = StoreLayout(store, 2).migrate(dry_run=True)
+    print(f"{'✅' if dry['moved'] == 2000 and StoreLayout(store, 0).count() == 2000 else '❌'} "
+          f"Dry run moves nothing: {dry['moved']} to move")
+
+    # Interrupted run: a quarter of the files already moved
+    for index in range(500):
+        os.replace(store / f"user_{index}.json", StoreLayout(store, 2).path_for_write(f"user_{index}"))
+
+    result = StoreLayout(store, 2).migrate()
+    print(f"Migrated: {result}")
+    ok = result["moved"] == 1500 and result["in_place"] == 500 and StoreLayout(store, 2).count() == 2000
+    print(f"{'✅' if ok else '❌'} Re-run finished the interrupted migration")
+    print(f"{'✅' if StoreLayout(store, 0).count() == 0 and (store / 'archive').is_dir() else '❌'} "
+          f"No flat files left, archive/ untouched")
+
+    back = StoreLayout(store, 0).migrate()
+    ok = back["moved"] == 2000 and back["buckets_removed"] > 256 and StoreLayout(store, 0).count() == 2000
+    print(f"{'✅' if ok else '❌'} Back to flat: {back['moved']} moved, {back['buckets_removed']} empty buckets removed")
+
+    for levels in (0, 2):
+        StoreLayout(store, levels).migrate()
+        started = time.perf_counter()
+        count = StoreLayout(store, levels).count()
+        print(f"   Scan {count} files, levels={levels}: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+async def test_managers(root: Path):
+    """Test managers on a fan-out layout."""
+    print("\n" + "="*60)
+    print("TEST 4: Managers")
+    print("="*60 + "\n")
+
+    users = UserManager(data_dir=root / "users", fanout_levels=2)
+    for index in range(30):
+        profile = await users.create_user(f"child_{index}", child_name=f"Ребёнок {index}")
+        profile.parent_id = "parent_1"
+        await users.update_user(profile)
+    await users.update_progress("child_3", xp_gain=40)
+
+    nested = (root / "users" / "child_3.json").exists() is False and users._get_user_path("child_3").exists()
+    print(f"{'✅' if nested else '❌'} Profiles written under buckets")
+    profile = await users.get_user("child_3")
+    print(f"{'✅' if profile and profile.progress['xp'] == 40 else '❌'} Profile read back (xp {profile.progress['xp']})")
+    stats = await users.get_statistics()
+    linked = await users.get_users_by_parent("parent_1")
+    print(f"{'✅' if stats['total_users'] == 30 and len(linked) == 30 else '❌'} "
+          f"Statistics and parent lookup stream {stats['total_users']} users")
+    print(f"{'✅' if await users.list_users() == sorted(f'child_{index}' for index in range(30)) else '❌'} "
+          f"list_users() still sorted")
+
+    links = LinkManager(links_dir=root / "links", parents_dir=root / "parents", fanout_levels=2)
+    for index in range(10):
+        link = await links.create_link(child_id=f"child_{index}", child_name=f"Ребёнок {index}")
+        if index < 4:
+            await links.activate_link(link.link_id, parent_id=f"parent_{index}")
+
+    rescanned = LinkManager(links_dir=root / "links", parents_dir=root / "parents", fanout_levels=2)
+    await rescanned.initialize()
+    counts = rescanned._counts
+    ok = counts[LinkStatus.ACTIVE] == 4 and counts[LinkStatus.PENDING] == 6 and rescanned._parents == 4
+    print(f"{'✅' if ok else '❌'} Link index rebuilt from buckets: {dict(counts)}, {rescanned._parents} parents")
+    active = await rescanned.get_active_link_by_child("child_2")
+    print(f"{'✅' if active and active.parent_id == 'parent_2' else '❌'} Active link found by child")
+    print(f"{'✅' if sorted(rescanned.iter_parent_ids()) == [f'parent_{i}' for i in range(4)] else '❌'} "
+          f"Parent IDs streamed")
+    await rescanned.shutdown()
+
+    bridges = RealityBridgeManager(storage_path=root / "bridges", fanout_levels=2)
+    bridge = await bridges.create_bridge(user_id="child_1", quest_id="quest_1", bridge_id="bridge_1",
+                                         title="Помоги маме", description="Помоги маме накрыть на стол")
+    reloaded = RealityBridgeManager(storage_path=root / "bridges", fanout_levels=2)
+    await reloaded._load_active_bridges()
+    ok = bridge and "child_1" in reloaded.active_bridges and reloaded._get_bridge_path("child_1").exists()
+    print(f"{'✅' if ok else '❌'} Bridge saved under a bucket and reloaded")
+    bridges.reminder_store.close()
+    reloaded.reminder_store.close()
+
+    analytics = CohortAnalytics(root / "users", chunk_size=8, fanout_levels=2)
+    chunks = list(analytics.iter_chunks())
+    print(f"{'✅' if analytics.profiles_scanned == 30 and len(chunks) == 4 else '❌'} "
+          f"Cohort scan: {analytics.profiles_scanned} profiles in {len(chunks)} chunks")
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Store Layout Tests ===")
+
+    root = Path(tempfile.mkdtemp())
+    try:
+        await test_paths(root)
+        await test_enumeration(root)
+        await test_migration(root)
+        await test_managers(root)
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
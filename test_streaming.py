@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Test streamed replies for InnerWorld Edu.
+
+Uses a fake Bot API object that records sends and edits, and a fake LLM
+that yields tokens with a delay.
+
+Tests:
+1. Debounce - edits limited by interval and size, final edit has the full text
+2. Overflow - replies over 4096 characters continue in new messages
+3. Not modified - "Message is not modified" BadRequest does not break the stream
+4. StateManager - stream_message chunks join to the process_message text
+5. Bot reply path - LLM states streamed, other states sent as one message
+6. ChildBot - /start linking flow, then replies streamed through its text handler
+
+Run: python test_streaming.py
+"""
+
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from telegram.error import BadRequest
+
+import src.orchestration  # noqa: F401 (import order: orchestration before data)
+from src.bot.streaming import StreamingReply
+from src.bot.dispatcher import MessageDispatcher
+from src.bot.child_bot import ChildBot
+from src.orchestration.state_manager import StateManager, UserState
+from src.data.user_manager import UserManager
+from src.data.link_manager import LinkManager
+from src.config import STREAM_PLACEHOLDER, TELEGRAM_MAX_MESSAGE_LENGTH
+
+LLM_REPLY = "Привет! Я рад тебя видеть. Расскажи, какой предмет в школе тебе нравится больше всего? 🌟"
+
+
+class FakeBot:
+    """Fake Bot API recording messages; edits can fail with BadRequest."""
+
+    def __init__(self, not_modified: bool = False):
+        self.sent = []  # texts of send_message calls
+        self.edits = []  # (message_id, text)
+        self.texts = {}  # message_id -> current text
+        self.not_modified = not_modified
+
+    async def send_message(self, chat_id, text, **kwargs):
+        message_id = len(self.sent) + 1
+        self.sent.append(text)
+        self.texts[message_id] = text
+        return SimpleNamespace(message_id=message_id, chat_id=chat_id, text=text)
+
+    async def edit_message_text(self, chat_id, text, message_id, **kwargs):
+        if self.not_modified:
+            raise BadRequest("Message is not modified: specified new message content and reply markup "
+                             "are exactly the same as a current content and reply markup of the message")
+        self.edits.append((message_id, text))
+        self.texts[message_id] = text
+
+    def final_text(self) -> str:
+        return "".join(self.texts[message_id] for message_id in sorted(self.texts))
+
+
+async def token_stream(text: str, size: int = 4, delay: float = 0.0):
+    """Yield text in chunks of size characters."""
+    for start in range(0, len(text), size):
+        if delay:
+            await asyncio.sleep(delay)
+        yield text[start:start + size]
+
+
+class FakeLLM:
+    """ChatOpenAI stand-in: same reply for ainvoke and astream."""
+
+    model_name = "fake-gpt"
+
+    def __init__(self, reply: str = LLM_REPLY, delay: float = 0.005):
+        self.reply = reply
+        self.delay = delay
+
+    async def ainvoke(self, messages):
+        return SimpleNamespace(content=self.reply, usage_metadata={"input_tokens": 10, "output_tokens": 20})
+
+    async def astream(self, messages):
+        async for chunk in token_stream(self.reply, size=3, delay=self.delay):
+            yield SimpleNamespace(content=chunk, usage_metadata=None)
+        yield SimpleNamespace(content="", usage_metadata={"input_tokens": 10, "output_tokens": 20})
+
+
+def make_state_manager(root: Path) -> StateManager:
+    """StateManager with a fake LLM and a temporary user store."""
+    state_manager = StateManager()
+    state_manager.user_manager = UserManager(data_dir=root / "users")
+    state_manager.llm = FakeLLM()
+    state_manager.graph = state_manager._build_state_graph()
+    state_manager.initialized = True
+    return state_manager
+
+
+def make_update(user_id: str, text: str) -> SimpleNamespace:
+    replies = []
+
+    async def reply_text(reply: str, **kwargs):
+        replies.append(reply)
+
+    return SimpleNamespace(
+        effective_user=SimpleNamespace(id=user_id),
+        effective_chat=SimpleNamespace(id=user_id),
+        message=SimpleNamespace(text=text, reply_text=reply_text, replies=replies)
+    )
+
+
+async def test_debounce():
+    """Test edit debouncing."""
+    print("\n" + "="*60)
+    print("TEST 1: Debounce")
+    print("="*60 + "\n")
+
+    text = "Жили-были в Понималии добрые слова. " * 20  # 740 characters
+    bot = FakeBot()
+    reply = StreamingReply(bot, chat_id=1, edit_interval=0.1, min_chars_per_edit=20)
+
+    started = time.perf_counter()
+    result = await reply.stream(token_stream(text, size=4, delay=0.005))
+    elapsed = time.perf_counter() - started
+    chunks = (len(text) + 3) // 4
+
+    print(f"{chunks} chunks in {elapsed:.2f} s → {len(bot.edits)} edits")
+    print(f"{'✅' if bot.sent == [STREAM_PLACEHOLDER] else '❌'} Placeholder sent first: {bot.sent}")
+    limit = elapsed / 0.1 + 2
+    print(f"{'✅' if 1 < len(bot.edits) <= limit else '❌'} Edits debounced (at most {limit:.0f}, not {chunks})")
+    print(f"{'✅' if result == text and bot.final_text() == text else '❌'} Final edit shows the full text")
+
+    bot = FakeBot()
+    reply = StreamingReply(bot, chat_id=1, edit_interval=0.0, min_chars_per_edit=50)
+    await reply.stream(token_stream(text, size=4))
+    grown = [len(edit) for _, edit in bot.edits]
+    steps = [after - before for before, after in zip(grown, grown[1:-1])]
+    print(f"{'✅' if all(step >= 50 for step in steps) else '❌'} "
+          f"Edits skipped until 50 new characters: {len(bot.edits)} edits")
+
+
+async def test_overflow():
+    """Test continuation past Telegram's message limit."""
+    print("\n" + "="*60)
+    print("TEST 2: Overflow")
+    print("="*60 + "\n")
+
+    text = "".join(f"Строка номер {index} длинного ответа.\n" for index in range(400))  # ~12k characters
+    bot = FakeBot()
+    reply = StreamingReply(bot, chat_id=1, edit_interval=0.0)
+    result = await reply.stream(token_stream(text, size=50))
+
+    lengths = [len(bot.texts[message_id]) for message_id in sorted(bot.texts)]
+    print(f"{len(text)} characters → messages of {lengths}")
+    # Splits at line breaks lose at most one line per message
+    ok = len(lengths) <= len(text) // (TELEGRAM_MAX_MESSAGE_LENGTH - 100) + 1
+    print(f"{'✅' if len(lengths) >= 3 and max(lengths) <= TELEGRAM_MAX_MESSAGE_LENGTH else '❌'} "
+          f"Continued in {len(lengths)} messages, none over {TELEGRAM_MAX_MESSAGE_LENGTH}")
+    print(f"{'✅' if ok else '❌'} No more messages than needed")
+    split_on_lines = all(bot.texts[message_id].endswith("\n") for message_id in sorted(bot.texts)[:-1])
+    print(f"{'✅' if split_on_lines else '❌'} Split at line breaks")
+    print(f"{'✅' if result == text and bot.final_text() == text else '❌'} Messages join to the full text")
+
+
+async def test_not_modified():
+    """Test BadRequest handling."""
+    print("\n" + "="*60)
+    print("TEST 3: Not Modified")
+    print("="*60 + "\n")
+
+    bot = FakeBot(not_modified=True)
+    reply = StreamingReply(bot, chat_id=1, edit_interval=0.0, min_chars_per_edit=1)
+    try:
+        result = await reply.stream(token_stream(LLM_REPLY, size=5))
+        print(f"{'✅' if result == LLM_REPLY else '❌'} Stream completed despite BadRequest on every edit")
+    except BadRequest as e:
+        print(f"❌ BadRequest escaped: {e}")
+
+
+async def test_state_manager(root: Path):
+    """Test stream_message against process_message."""
+    print("\n" + "="*60)
+    print("TEST 4: StateManager")
+    print("="*60 + "\n")
+
+    state_manager = make_state_manager(root / "sm")
+    for user_id in ("child_invoke", "child_stream"):
+        state_manager.user_states[user_id] = UserState(user_id=user_id, child_name="Маша", parent_linked=True)
+
+    processed = await state_manager.process_message("child_invoke", "Привет!")
+    chunks = [chunk async for chunk in state_manager.stream_message("child_stream", "Привет!")]
+    streamed = "".join(chunks)
+
+    print(f"process_message: {processed!r}")
+    print(f"{'✅' if len(chunks) > 10 else '❌'} LLM state streamed in {len(chunks)} chunks")
+    print(f"{'✅' if streamed == processed == LLM_REPLY else '❌'} Chunks join to the process_message text")
+
+    state_manager.user_states["child_plain"] = UserState(user_id="child_plain")
+    processed = await state_manager.process_message("child_plain", "Привет!")
+    chunks = [chunk async for chunk in state_manager.stream_message("child_plain", "Привет!")]
+    print(f"{'✅' if chunks == [processed] else '❌'} Non-LLM state yields its reply at once")
+
+
+async def test_reply_path(root: Path):
+    """Test MessageDispatcher streaming LLM states only."""
+    print("\n" + "="*60)
+    print("TEST 5: Bot Reply Path")
+    print("="*60 + "\n")
+
+    state_manager = make_state_manager(root / "dispatch")
+    state_manager.user_states["child_llm"] = UserState(user_id="child_llm", child_name="Маша", parent_linked=True)
+    dispatcher = MessageDispatcher(state_manager=state_manager)
+
+    bot = FakeBot()
+    update = make_update("child_llm", "Привет!")
+    text = await dispatcher.handle(update, SimpleNamespace(bot=bot))
+    ok = bot.sent == [STREAM_PLACEHOLDER] and bot.final_text() == text == LLM_REPLY and not update.message.replies
+    print(f"{'✅' if ok else '❌'} Onboarding reply streamed: placeholder + {len(bot.edits)} edits")
+
+    bot = FakeBot()
+    update = make_update("child_new", "Привет!")
+    text = await dispatcher.handle(update, SimpleNamespace(bot=bot))
+    ok = update.message.replies == [text] and not bot.sent
+    print(f"{'✅' if ok else '❌'} Unlinked child (parent linking state) answered with one message")
+
+
+async def test_child_bot(root: Path):
+    """Test ChildBot linking a child and streaming replies end to end."""
+    print("\n" + "="*60)
+    print("TEST 6: ChildBot")
+    print("="*60 + "\n")
+
+    child_bot = ChildBot(mode="webhook", token="123456:TEST")
+    ok = child_bot.dispatcher.sender is child_bot.sender and child_bot.sender.bot is child_bot.app.bot
+    print(f"{'✅' if ok else '❌'} Dispatcher replies through the bot's OutboundSender")
+
+    state_manager = make_state_manager(root / "child_bot")
+    child_bot.user_manager = state_manager.user_manager
+    child_bot.link_manager = state_manager.link_manager = LinkManager(
+        links_dir=root / "child_bot" / "links", parents_dir=root / "child_bot" / "parents"
+    )
+    child_bot.dispatcher = MessageDispatcher(state_manager=state_manager)
+    # Written to before the parent links, as a cached state would be
+    state_manager.user_states["child_bot"] = UserState(user_id="child_bot")
+
+    bot = FakeBot()
+    context = SimpleNamespace(bot=bot, user_data={})
+    update = make_update("child_bot", "/start")
+    await child_bot.start(update, context)
+    print(f"{'✅' if context.user_data.get('flow') == 'waiting_for_name' else '❌'} /start asks a new child for their name")
+
+    update = make_update("child_bot", "Маша")
+    await child_bot.text_handler(update, context)
+    link_id = context.user_data.get("link_id")
+    ok = link_id and child_bot.link_manager.generate_link_url(link_id) in update.message.replies[0]
+    print(f"{'✅' if ok else '❌'} Name creates a parent link")
+
+    await child_bot.link_manager.activate_link(link_id, "parent_1")
+    edits = []
+
+    async def edit_message_text(text, **kwargs):
+        edits.append(text)
+
+    query = SimpleNamespace(from_user=SimpleNamespace(id="child_bot"), edit_message_text=edit_message_text)
+    await child_bot._check_link_status(query, context)
+    profile = await child_bot.user_manager.get_user("child_bot")
+    ok = profile.parent_linked and profile.parent_id == "parent_1" and "flow" not in context.user_data
+    print(f"{'✅' if ok else '❌'} Check status records the active link in the profile")
+
+    update = make_update("child_bot", "Привет!")
+    await child_bot.text_handler(update, context)
+    profile = await child_bot.user_manager.get_user("child_bot")
+    ok = profile.parent_linked and state_manager.user_states["child_bot"].parent_linked
+    print(f"{'✅' if ok else '❌'} Stale cached state picks up the link instead of overwriting the profile")
+
+    update = make_update("child_bot", "Привет!")
+    await child_bot.text_handler(update, context)
+    ok = bot.sent == [STREAM_PLACEHOLDER] and bot.final_text() == LLM_REPLY and not update.message.replies
+    print(f"{'✅' if ok else '❌'} Next message streamed: placeholder + {len(bot.edits)} edits")
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Streaming Tests ===")
+
+    root = Path(tempfile.mkdtemp())
+    try:
+        await test_debounce()
+        await test_overflow()
+        await test_not_modified()
+        await test_state_manager(root)
+        await test_reply_path(root)
+        await test_child_bot(root)
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test span tracing for InnerWorld Edu.
+
+Tests:
+1. Tail sampling - slow and failed traces kept, fast traces dropped
+2. StateManager spans - stages and graph nodes nested under process_message
+
+Run: python test_tracing.py
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.core.tracing import Tracer, SpanExporter, FileSpanExporter, configure_tracing
+
+TRACE_DIR = Path("src/data/test_traces")
+
+
+def read_traces(path: Path):
+    """Read exported OTLP payloads, return list of span lists."""
+    if not path.exists():
+        return []
+    traces = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            payload = json.loads(line)
+            traces.append(payload["resourceSpans"][0]["scopeSpans"][0]["spans"])
+    return traces
+
+
+async def test_tail_sampling():
+    """Test that only slow or failed traces are exported."""
+    print("\n" + "="*60)
+    print("TEST 1: Tail Sampling")
+    print("="*60 + "\n")
+
+    path = TRACE_DIR / "sampling.jsonl"
+    exporter = FileSpanExporter(path)
+    tracer = Tracer(exporter=exporter, slow_threshold=0.05)
+
+    # Fast trace - dropped
+    with tracer.start_span("fast"):
+        with tracer.start_span("child"):
+            pass
+
+    # Slow trace - kept
+    with tracer.start_span("slow"):
+        with tracer.start_span("child"):
+            await asyncio.sleep(0.06)
+
+    # Failed trace - kept
+    try:
+        with tracer.start_span("failed"):
+            with tracer.start_span("child"):
+                raise ValueError("boom")
+    except ValueError:
+        pass
+
+    exporter.shutdown()
+    traces = read_traces(path)
+    roots = sorted(span["name"] for spans in traces for span in spans if "parentSpanId" not in span)
+
+    print(f"Stats: {tracer.get_statistics()}")
+    print(f"{'✅' if roots == ['failed', 'slow'] else '❌'} Exported traces: {roots}")
+
+    nested = all(len(spans) == 2 and len({s['traceId'] for s in spans}) == 1 for spans in traces)
+    print(f"{'✅' if nested else '❌'} Child spans exported with their root")
+
+
+async def test_state_manager_spans():
+    """Test spans produced by process_message."""
+    print("\n" + "="*60)
+    print("TEST 2: StateManager Spans")
+    print("="*60 + "\n")
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+    path = TRACE_DIR / "state_manager.jsonl"
+
+    # Keep every trace
+    tracer = configure_tracing(enabled=True, exporter="file", path=path, base_sample_rate=1.0)
+
+    from src.orchestration.state_manager import StateManager
+
+    state_manager = StateManager()
+    await state_manager.initialize()
+
+    await state_manager.process_message("tracing_user", "Привет!")
+
+    tracer.shutdown()
+    configure_tracing(enabled=False)
+
+    traces = read_traces(path)
+    spans = traces[-1] if traces else []
+    names = {span["name"] for span in spans}
+    print(f"Spans: {sorted(names)}")
+
+    expected = {"process_message", "emotion_detection", "screening", "graph",
+                "graph.node.start", "save_user_state"}
+    print(f"{'✅' if expected <= names else '❌'} Stage and node spans recorded")
+
+    root = next((s for s in spans if s["name"] == "process_message"), None)
+    attributes = {a["key"]: a["value"] for a in (root or {}).get("attributes", [])}
+    hashed = "user.id_hash" in attributes and "tracing_user" not in json.dumps(spans)
+    print(f"{'✅' if hashed else '❌'} User ID is hashed")
+
+    node = next((s for s in spans if s["name"] == "graph.node.start"), {})
+    graph = next((s for s in spans if s["name"] == "graph"), {})
+    print(f"{'✅' if node.get('parentSpanId') == graph.get('spanId') else '❌'} Node spans nested under graph span")
+
+    # Graph built while tracing is off: node spans must follow a later configure_tracing()
+    state_manager.graph = state_manager._build_state_graph()
+    path = TRACE_DIR / "reconfigured.jsonl"
+    tracer = configure_tracing(enabled=True, exporter="file", path=path, base_sample_rate=1.0)
+    await state_manager.process_message("tracing_user", "Как дела?")
+    tracer.shutdown()
+    configure_tracing(enabled=False)
+    names = {span["name"] for spans in read_traces(path) for span in spans}
+    print(f"{'✅' if 'graph.node.start' in names else '❌'} Node spans use the tracer configured after graph build")
+
+    try:
+        SpanExporter()
+        print("❌ Exporter without _write instantiated")
+    except TypeError:
+        print("✅ SpanExporter subclasses must implement _write")
+
+    await state_manager.reality_bridge_manager.shutdown()
+    user_file = Path("src/data/user_profiles/tracing_user.json")
+    user_file.unlink(missing_ok=True)
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Tracing Tests ===")
+
+    shutil.rmtree(TRACE_DIR, ignore_errors=True)
+
+    try:
+        await test_tail_sampling()
+        await test_state_manager_spans()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        shutil.rmtree(TRACE_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
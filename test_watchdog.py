@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test the event loop watchdog for InnerWorld Edu.
+
+Tests:
+1. Detection - a blocking call is attributed to its call site
+2. Report - offenders aggregated and ranked, exported as metrics
+3. Toggle - disabled watchdog records nothing and stops its thread
+
+Run: python test_watchdog.py
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.core.watchdog import LoopWatchdog, get_watchdog
+from src.core.metrics import REGISTRY
+
+
+def blocking_save():
+    """Stand-in for sync file I/O inside a coroutine."""
+    time.sleep(0.3)
+
+
+def blocking_parse(seconds: float):
+    """Stand-in for CPU-heavy parsing."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def handler():
+    blocking_save()
+
+
+async def test_detection():
+    """Test that the stall is attributed to the blocking function."""
+    print("\n" + "="*60)
+    print("TEST 1: Detection")
+    print("="*60 + "\n")
+
+    watchdog = LoopWatchdog(threshold=0.1, interval=0.02)
+    watchdog.enable()
+    await asyncio.sleep(0.1)
+
+    await handler()
+    await asyncio.sleep(0.1)
+
+    report = watchdog.get_report()
+    print(watchdog.format_report())
+
+    site = report[0]["site"] if report else ""
+    print(f"{'✅' if site.startswith('test_watchdog.py:') and site.endswith('blocking_save') else '❌'} Call site: {site}")
+    blocked = report[0]["max_seconds"] if report else 0
+    print(f"{'✅' if 0.25 <= blocked < 1.0 else '❌'} Stall duration: {blocked:.3f}s")
+
+    watchdog.disable()
+
+
+async def test_report():
+    """Test aggregation, ranking and metrics export."""
+    print("\n" + "="*60)
+    print("TEST 2: Report")
+    print("="*60 + "\n")
+
+    watchdog = get_watchdog()
+    watchdog.threshold, watchdog.interval = 0.1, 0.02
+    watchdog.reset()
+    watchdog.enable()
+    await asyncio.sleep(0.1)
+
+    for _ in range(3):
+        blocking_parse(0.15)
+        await asyncio.sleep(0.1)
+    blocking_save()
+    await asyncio.sleep(0.1)
+
+    report = watchdog.get_report()
+    counts = {site["site"].split()[-1]: site["count"] for site in report}
+    print(f"Counts: {counts}")
+    print(f"{'✅' if counts.get('blocking_parse') == 3 and counts.get('blocking_save') == 1 else '❌'} Stalls aggregated per site")
+    print(f"{'✅' if report and report[0]['site'].endswith('blocking_parse') else '❌'} Ranked by total blocked time")
+
+    text = REGISTRY.render()
+    exported = 'innerworld_loop_blocked_seconds_total{site="test_watchdog.py:' in text
+    print(f"{'✅' if exported and REGISTRY.get_sample_value('innerworld_loop_blocks_total') == 4 else '❌'} Exported via /metrics")
+
+    watchdog.disable()
+
+
+async def test_toggle():
+    """Test runtime enable/disable."""
+    print("\n" + "="*60)
+    print("TEST 3: Toggle")
+    print("="*60 + "\n")
+
+    watchdog = LoopWatchdog(threshold=0.1, interval=0.02)
+
+    watchdog.enable()
+    await asyncio.sleep(0.5)
+    print(f"{'✅' if watchdog.blocks == 0 else '❌'} Idle loop: {watchdog.blocks} stalls, last lag {watchdog.last_lag * 1000:.2f} ms")
+
+    watchdog.disable()
+    await asyncio.sleep(0.1)
+    blocking_save()
+    await asyncio.sleep(0.05)
+
+    threads = [t.name for t in threading.enumerate() if t.name == "loop-watchdog"]
+    print(f"{'✅' if watchdog.blocks == 0 and not threads else '❌'} Disabled: nothing recorded, no monitor thread")
+
+    watchdog.enable()
+    await asyncio.sleep(0.05)
+    blocking_save()
+    await asyncio.sleep(0.1)
+    print(f"{'✅' if watchdog.blocks == 1 else '❌'} Re-enabled: {watchdog.blocks} stall recorded")
+    watchdog.disable()
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Watchdog Tests ===")
+
+    try:
+        await test_detection()
+        await test_report()
+        await test_toggle()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Test webhook ingestion for InnerWorld Edu.
+
+Requests go through the real FastAPI app (httpx ASGI transport) into a fake
+Application that records processed updates.
+
+Tests:
+1. Secret token - wrong or missing secret rejected with 403
+2. Dedup - retried update_id processed once
+3. Backpressure - 503 when a partition queue is full, the retry accepted later
+4. Ordering - one chat's updates processed in order, chats run concurrently
+5. Shutdown - a hung update does not block stop()
+6. Endpoints - public listener has no /metrics, stats need the admin token
+
+Run: python test_webhook.py
+"""
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from telegram import Bot
+
+from src.bot.webhook import WebhookServer
+from src.core import admin
+
+SECRET = "test-secret"
+
+
+class FakeApplication:
+    """Fake telegram.ext.Application recording processed updates."""
+
+    def __init__(self, delay: float = 0.0):
+        self.bot = Bot("123456:TEST")
+        self.delay = delay
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self.processed = []  # (chat_id, update_id)
+        self.active = 0
+        self.max_active = 0
+
+    async def initialize(self):
+        pass
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def process_update(self, update):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await self.gate.wait()
+            if self.delay:
+                await asyncio.sleep(random.uniform(0, self.delay))
+            self.processed.append((update.effective_chat.id, update.update_id))
+        finally:
+            self.active -= 1
+
+
+def make_update(update_id: int, chat_id: int, text: str = "Привет") -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Test"},
+            "text": text
+        }
+    }
+
+
+def make_server(application: FakeApplication, **kwargs) -> WebhookServer:
+    return WebhookServer(application, webhook_url="", secret_token=SECRET, **kwargs)
+
+
+def make_client(server: WebhookServer) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://bot")
+
+
+async def post(client: httpx.AsyncClient, server: WebhookServer, data: dict, secret: str = SECRET) -> int:
+    headers = {"X-Telegram-Bot-Api-Secret-Token": secret} if secret is not None else {}
+    response = await client.post(server.path, json=data, headers=headers)
+    return response.status_code
+
+
+async def drain(server: WebhookServer, timeout: float = 5.0) -> None:
+    await asyncio.wait_for(asyncio.gather(*(queue.join() for queue in server._queues)), timeout)
+
+
+async def test_secret():
+    """Test secret token check."""
+    print("\n" + "="*60)
+    print("TEST 1: Secret Token")
+    print("="*60 + "\n")
+
+    application = FakeApplication()
+    server = make_server(application, concurrency=2)
+    await server.start()
+    try:
+        async with make_client(server) as client:
+            wrong = await post(client, server, make_update(1, 100), secret="wrong-secret")
+            missing = await post(client, server, make_update(2, 100), secret=None)
+            print(f"{'✅' if wrong == 403 and missing == 403 else '❌'} "
+                  f"Wrong secret: {wrong}, missing secret: {missing}")
+            print(f"{'✅' if server.received == 0 else '❌'} Rejected requests never reach the queue")
+
+            accepted = await post(client, server, make_update(3, 100))
+            await drain(server)
+            print(f"{'✅' if accepted == 200 and application.processed == [(100, 3)] else '❌'} "
+                  f"Correct secret accepted and processed")
+    finally:
+        await server.stop()
+
+
+async def test_dedup():
+    """Test update_id dedup."""
+    print("\n" + "="*60)
+    print("TEST 2: Dedup")
+    print("="*60 + "\n")
+
+    application = FakeApplication()
+    server = make_server(application, concurrency=2)
+    await server.start()
+    try:
+        async with make_client(server) as client:
+            statuses = [await post(client, server, make_update(10, 100)) for _ in range(3)]
+            await drain(server)
+
+        print(f"Statuses: {statuses}")
+        ok = statuses == [200, 200, 200] and application.processed == [(100, 10)]
+        print(f"{'✅' if ok else '❌'} Retried update acknowledged but processed once")
+        print(f"{'✅' if server.duplicates == 2 else '❌'} {server.duplicates} duplicates counted")
+    finally:
+        await server.stop()
+
+
+async def test_backpressure():
+    """Test 503 on a full partition queue and acceptance of the retry."""
+    print("\n" + "="*60)
+    print("TEST 3: Backpressure")
+    print("="*60 + "\n")
+
+    application = FakeApplication()
+    application.gate.clear()  # Hold the worker on the first update
+    server = make_server(application, concurrency=1, queue_size=2)
+    await server.start()
+    try:
+        async with make_client(server) as client:
+            first = await post(client, server, make_update(20, 100))
+            await asyncio.sleep(0.05)  # Worker takes it off the queue
+            queued = [await post(client, server, make_update(update_id, 100)) for update_id in (21, 22)]
+            full = await post(client, server, make_update(23, 100))
+            print(f"{'✅' if [first, *queued] == [200, 200, 200] and full == 503 else '❌'} "
+                  f"Queue full: {full} (rejected {server.rejected})")
+
+            application.gate.set()
+            await drain(server)
+
+            retry = await post(client, server, make_update(23, 100))
+            await drain(server)
+
+        processed = [update_id for _, update_id in application.processed]
+        print(f"{'✅' if retry == 200 and processed == [20, 21, 22, 23] else '❌'} "
+              f"Retry accepted once there was room: {processed}")
+        print(f"{'✅' if server.duplicates == 0 else '❌'} Rejected update was not remembered as seen")
+    finally:
+        await server.stop()
+
+
+async def test_ordering():
+    """Test per-chat ordering with concurrent chats."""
+    print("\n" + "="*60)
+    print("TEST 4: Ordering")
+    print("="*60 + "\n")
+
+    random.seed(0)
+    application = FakeApplication(delay=0.01)
+    server = make_server(application, concurrency=4, queue_size=400)
+    await server.start()
+    try:
+        chats = [101, 102, 103, 104]
+        updates = [make_update(1000 + index, chats[index % len(chats)]) for index in range(80)]
+        async with make_client(server) as client:
+            statuses = [await post(client, server, update) for update in updates]
+            await drain(server)
+
+        print(f"{'✅' if all(status == 200 for status in statuses) else '❌'} {len(updates)} updates accepted")
+        in_order = True
+        for chat_id in chats:
+            ids = [update_id for chat, update_id in application.processed if chat == chat_id]
+            sent = [update["update_id"] for update in updates if update["message"]["chat"]["id"] == chat_id]
+            in_order = in_order and ids == sorted(ids) and sorted(ids) == sent
+        print(f"{'✅' if in_order else '❌'} Each chat's updates processed in update_id order")
+        print(f"{'✅' if application.max_active > 1 else '❌'} "
+              f"Different chats processed concurrently (max {application.max_active} at once)")
+    finally:
+        await server.stop()
+
+
+async def test_shutdown():
+    """Test that stop() gives up on a hung update."""
+    print("\n" + "="*60)
+    print("TEST 5: Shutdown")
+    print("="*60 + "\n")
+
+    application = FakeApplication()
+    application.gate.clear()  # Never released: process_update hangs
+    server = make_server(application, concurrency=1, drain_timeout=0.5)
+    await server.start()
+
+    async with make_client(server) as client:
+        await post(client, server, make_update(30, 100))
+        await post(client, server, make_update(31, 100))
+
+    started = time.perf_counter()
+    await asyncio.wait_for(server.stop(), 5.0)
+    elapsed = time.perf_counter() - started
+    print(f"{'✅' if elapsed < 2.0 and server._workers == [] else '❌'} "
+          f"stop() returned after {elapsed:.2f} s with a hung update")
+
+
+async def test_endpoints():
+    """Test that the public listener does not expose stats or metrics."""
+    print("\n" + "="*60)
+    print("TEST 6: Endpoints")
+    print("="*60 + "\n")
+
+    application = FakeApplication()
+    server = make_server(application, concurrency=2)
+    async with make_client(server) as client:
+        health = await client.get("/health")
+        metrics = await client.get("/metrics")
+        print(f"{'✅' if health.json() == {'status': 'healthy'} else '❌'} /health is liveness only: {health.json()}")
+        print(f"{'✅' if metrics.status_code == 404 else '❌'} No /metrics on the public listener ({metrics.status_code})")
+
+        admin.ADMIN_TOKEN = "admin-secret"
+        try:
+            anonymous = await client.get("/debug/webhook")
+            wrong = await client.get("/debug/webhook", headers={"X-Admin-Token": "guess"})
+            stats = await client.get("/debug/webhook", headers={"X-Admin-Token": "admin-secret"})
+        finally:
+            admin.ADMIN_TOKEN = ""
+        print(f"{'✅' if anonymous.status_code == 403 and wrong.status_code == 403 else '❌'} "
+              f"Stats rejected without the admin token ({anonymous.status_code}, {wrong.status_code})")
+        print(f"{'✅' if stats.status_code == 200 and 'queue_depth' in stats.json() else '❌'} "
+              f"Stats served with the admin token")
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Webhook Tests ===")
+
+    try:
+        await test_secret()
+        await test_dedup()
+        await test_backpressure()
+        await test_ordering()
+        await test_shutdown()
+        await test_endpoints()
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Test weekly parent report pipeline for InnerWorld Edu.
+
+Tests:
+1. Single pass - links grouped by parent, profiles and bridge outcomes joined
+2. Worker processes - parallel render matches in-process render
+3. Checkpoint - a crashed run resumes after the last committed chunk
+4. Delivery - throttled hand-off to OutboundSender, failed reports retried up to
+   REPORT_MAX_ATTEMPTS, sent reports never re-sent
+
+Run: python test_weekly_reports.py
+"""
+
+import asyncio
+import json
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from telegram.error import Forbidden
+
+import src.orchestration  # noqa: F401 (import order: orchestration before data)
+from src.orchestration.learning_profile import LearningProfile, LearningDimension
+from src.orchestration import weekly_reports
+from src.orchestration.weekly_reports import WeeklyReportPipeline, next_run_at, report_week_start, week_key
+from src.data.user_manager import UserProfile
+from src.data.link_manager import LinkManager, ParentLink, ParentProfile, LinkStatus
+from src.game.bridge_archive import BridgeArchive
+from src.bot.outbound import OutboundSender
+
+WEEK_START = date.today() - timedelta(days=6)  # Week ending today: changes made now are inside it
+
+
+def make_data(root: Path, parents: int) -> None:
+    """Parents with 1-3 children each; parent_0 turned weekly reports off."""
+    links = LinkManager(links_dir=root / "links", parents_dir=root / "parents")
+    profiles_dir = root / "profiles"
+    profiles_dir.mkdir()
+    archive = BridgeArchive(root / "bridges" / "archive")
+
+    for parent_index in range(parents):
+        parent_id = f"parent_{parent_index}"
+        for child_index in range(parent_index % 3 + 1):
+            child_id = f"child_{parent_index}_{child_index}"
+            links._write_link_file(ParentLink(
+                link_id=f"link_{child_id}", child_id=child_id, child_name=f"Ребёнок {child_index}",
+                parent_id=parent_id, status=LinkStatus.ACTIVE
+            ))
+
+            learning = LearningProfile(attention=3)
+            learning.adjust_dimension(LearningDimension.ATTENTION, 2, "quest_completed")
+            profile = UserProfile(user_id=child_id, child_name=f"Ребёнок {child_index}",
+                                  learning_profile=learning.to_dict(), completed_quests=["quest_1"])
+            (profiles_dir / f"{child_id}.json").write_text(json.dumps(asdict(profile), ensure_ascii=False))
+
+            bridge = SimpleNamespace(user_id=child_id, quest_id="quest_1", bridge_id="bridge_1",
+                                     location="forest_calm", reminder_key=f"{child_id}:bridge_1")
+            archive.append("created", bridge)
+            if child_index == 0:
+                archive.append("completed", bridge)
+
+    # A pending link and a parent who opted out
+    links._write_link_file(ParentLink(link_id="pending", child_id="child_x", child_name="X"))
+    opted_out = ParentProfile(parent_id="parent_0", children=["child_0_0"],
+                              notification_settings={"weekly_reports": False})
+    (root / "parents" / "parent_0.json").write_text(json.dumps(asdict(opted_out)))
+    archive.flush_sync()
+
+
+def make_pipeline(root: Path, **kwargs) -> WeeklyReportPipeline:
+    return WeeklyReportPipeline(
+        links_dir=root / "links", parents_dir=root / "parents", profiles_dir=root / "profiles",
+        bridges_dir=root / "bridges", store_path=root / kwargs.pop("store", "reports.db"), **kwargs
+    )
+
+
+class FakeBot:
+    """Fake parent bot: records sends, parent_13 blocked the bot, parent_7's first send fails."""
+
+    def __init__(self):
+        self.sent = []
+        self.flaky = {"parent_7"}
+
+    async def send_message(self, chat_id, text, **kwargs):
+        if chat_id == "parent_13":
+            raise Forbidden("bot was blocked by the user")
+        if chat_id in self.flaky:
+            self.flaky.discard(chat_id)
+            raise RuntimeError("temporary send error")
+        self.sent.append((time.monotonic(), chat_id, text))
+        return {"chat_id": chat_id}
+
+
+async def test_single_pass(root: Path):
+    """Test grouping and joined report contents."""
+    print("\n" + "="*60)
+    print("TEST 1: Single Pass")
+    print("="*60 + "\n")
+
+    pipeline = make_pipeline(root, workers=0, chunk_size=7)
+    try:
+        families = pipeline.scan_families()
+        print(f"{'✅' if len(families) == 29 and 'parent_0' not in families else '❌'} "
+              f"{len(families)} parents with active links (opted-out parent skipped)")
+        print(f"{'✅' if families['parent_5'] == ['child_5_0', 'child_5_1', 'child_5_2'] else '❌'} "
+              f"Children grouped per parent: {families['parent_5']}")
+
+        result = await pipeline.generate(WEEK_START)
+        print(f"Render: {result}")
+        print(f"{'✅' if result['rendered'] == 29 and result['chunks'] == 5 else '❌'} One report per parent")
+
+        text = pipeline.store.fetch_rendered(week_key(WEEK_START), 100)[2].text
+        print(f"\n{text}\n")
+        ok = text.count("👤") == 3 and "внимание +2" in text and "выполнено 1 из 1" in text
+        print(f"{'✅' if ok else '❌'} Profile, weekly change and Reality Bridge outcomes joined")
+    finally:
+        pipeline.close()
+
+
+async def test_worker_processes(root: Path):
+    """Test parallel render."""
+    print("\n" + "="*60)
+    print("TEST 2: Worker Processes")
+    print("="*60 + "\n")
+
+    inline = make_pipeline(root, workers=0, chunk_size=5, store="inline.db")
+    parallel = make_pipeline(root, workers=2, chunk_size=5, store="parallel.db")
+    try:
+        await inline.generate(WEEK_START)
+        started = time.perf_counter()
+        result = await parallel.generate(WEEK_START)
+        print(f"Render with 2 processes: {result} ({time.perf_counter() - started:.2f} s)")
+
+        week = week_key(WEEK_START)
+        same = inline.store.fetch_rendered(week, 100) == parallel.store.fetch_rendered(week, 100)
+        print(f"{'✅' if same and result['rendered'] == 29 else '❌'} Same reports as in-process render")
+    finally:
+        inline.close()
+        parallel.close()
+
+
+async def test_checkpoint(root: Path):
+    """Test resume after a crash."""
+    print("\n" + "="*60)
+    print("TEST 3: Checkpoint")
+    print("="*60 + "\n")
+
+    pipeline = make_pipeline(root, workers=0, chunk_size=5, store="resume.db")
+    render = weekly_reports.render_families
+    calls = 0
+
+    def crashing(*args):
+        nonlocal calls
+        calls += 1
+        if calls == 3:
+            raise RuntimeError("worker crashed")
+        return render(*args)
+
+    try:
+        weekly_reports.render_families = crashing
+        try:
+            await pipeline.generate(WEEK_START)
+        except RuntimeError as e:
+            print(f"First run failed: {e}")
+        finally:
+            weekly_reports.render_families = render
+
+        counts = pipeline.store.counts(week_key(WEEK_START))
+        print(f"{'✅' if counts == {'rendered': 10} else '❌'} Two chunks committed before the crash: {counts}")
+
+        result = await pipeline.generate(WEEK_START)
+        print(f"{'✅' if result['skipped'] == 10 and result['rendered'] == 19 else '❌'} "
+              f"Resumed: {result['skipped']} skipped, {result['rendered']} rendered")
+    finally:
+        pipeline.close()
+
+
+async def test_delivery(root: Path):
+    """Test throttled delivery."""
+    print("\n" + "="*60)
+    print("TEST 4: Delivery")
+    print("="*60 + "\n")
+
+    pipeline = make_pipeline(root, workers=0, send_rate=50, send_batch=10, store="deliver.db", retry_delay=0)
+    bot = FakeBot()
+    sender = OutboundSender(bot, global_rate=1000)
+    try:
+        started = time.monotonic()
+        result = await pipeline.run(WEEK_START, sender)
+        elapsed = time.monotonic() - started
+        print(f"Run: {result}")
+
+        ok = result["deliver"]["sent"] == 28 and result["deliver"]["failed"] == 1 and len(bot.sent) == 28
+        print(f"{'✅' if ok else '❌'} 28 reports sent, blocked parent marked failed")
+        ok = any(chat_id == "parent_7" for _, chat_id, _ in bot.sent) and result["deliver"]["retried"] == 3
+        print(f"{'✅' if ok else '❌'} Transient failure retried, blocked parent tried {pipeline.max_attempts} times")
+        print(f"{'✅' if elapsed >= 29 / 50 - 0.05 else '❌'} Hand-off throttled to 50/s: {elapsed:.2f} s")
+
+        again = await pipeline.run(WEEK_START, sender)
+        print(f"{'✅' if again['deliver']['sent'] == 0 and len(bot.sent) == 28 else '❌'} "
+              f"Re-run sends nothing: {again['counts']}")
+    finally:
+        await sender.stop()
+        pipeline.close()
+
+    run_at = next_run_at(datetime(2026, 10, 19, 10, 0))  # Monday after 9:00
+    print(f"{'✅' if run_at == datetime(2026, 10, 26, 9, 0) else '❌'} Next run: {run_at}")
+    print(f"{'✅' if report_week_start(run_at) == date(2026, 10, 19) else '❌'} "
+          f"Reports week {week_key(report_week_start(run_at))}")
+
+
+async def main():
+    """Run all tests."""
+    print("\n=== InnerWorld Edu - Weekly Report Tests ===")
+
+    root = Path(tempfile.mkdtemp())
+    try:
+        make_data(root, parents=30)
+
+        await test_single_pass(root)
+        await test_worker_processes(root)
+        await test_checkpoint(root)
+        await test_delivery(root)
+
+        print("\n" + "="*60)
+        print("✅ All tests completed successfully!")
+        print("="*60 + "\n")
+
+    except Exception as e:
+        print(f"\n❌ Test failed: {e}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())